@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class AccountsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.accounts"
+
+    def ready(self):
+        """Registra a invalidação dos snapshots de autenticação"""
+        from apps.accounts.authentication import connect_auth_snapshot_signals
+        connect_auth_snapshot_signals()
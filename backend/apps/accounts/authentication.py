@@ -0,0 +1,203 @@
+"""
+Autenticação por token com snapshot do usuário em cache.
+
+O `TokenAuthentication` do DRF faz `authtoken_token JOIN user` em toda
+requisição. Aqui o token resolve para um snapshot guardado no cache (Redis
+em produção) com os campos do usuário, os vínculos ativos (`ChurchUser`:
+igreja, denominação, papel, filial ativa) e o papel pretendido do perfil.
+O usuário é reconstruído sem query; a senha e os demais campos fora do
+snapshot ficam adiados (carregados sob demanda e nunca sobrescritos por
+`save()`).
+
+Invalidação (`connect_auth_snapshot_signals`): salvar/excluir o usuário, um
+`ChurchUser`, o `UserProfile` ou o próprio token (logout, rotação) descarta
+os snapshots do usuário. O timeout é apenas uma rede de segurança.
+
+Opcional: `AUTH_TOKEN_TTL` expira tokens antigos e `AUTH_TOKEN_ROTATE_AFTER`
+troca o token no login (`issue_token`).
+"""
+
+import hashlib
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+CACHE_PREFIX = 'auth-snapshot'
+
+# Campos do usuário fora do snapshot (carregados sob demanda)
+EXCLUDED_USER_FIELDS = ('password',)
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def snapshot_key(token_key):
+    # Chave do cache derivada do token: o token em si não aparece no Redis
+    return f'{CACHE_PREFIX}:{hashlib.sha256(token_key.encode()).hexdigest()}'
+
+
+# =====================================
+# SNAPSHOT
+# =====================================
+
+def _user_field_names():
+    return [
+        field.attname for field in get_user_model()._meta.concrete_fields
+        if field.name not in EXCLUDED_USER_FIELDS
+    ]
+
+
+def build_snapshot(user, token=None):
+    """Snapshot do usuário e de seus vínculos ativos (duas queries)."""
+    from .models import ChurchUser, UserProfile
+
+    memberships = list(
+        ChurchUser.objects.filter(user_id=user.pk, is_active=True)
+        .order_by('-is_user_active_church', 'id')
+        .values('id', 'church_id', 'church__denomination_id', 'role', 'active_branch_id', 'is_user_active_church')
+    )
+    for membership in memberships:
+        membership['denomination_id'] = membership.pop('church__denomination_id')
+    profile = (
+        UserProfile.objects.filter(user_id=user.pk)
+        .values('intended_role', 'intended_denomination_id')
+        .first()
+    ) or {}
+
+    return {
+        'user': {name: getattr(user, name) for name in _user_field_names()},
+        'memberships': memberships,
+        'profile': profile,
+        'token_created': token.created if token else None,
+    }
+
+
+def user_from_snapshot(snapshot):
+    """Usuário reconstruído sem query; campos fora do snapshot ficam adiados."""
+    values = snapshot['user']
+    user = get_user_model().from_db('default', list(values), list(values.values()))
+    user._auth_snapshot = snapshot
+    return user
+
+
+def get_snapshot(user):
+    """Snapshot do usuário autenticado (montado na hora para sessão/admin)."""
+    snapshot = getattr(user, '_auth_snapshot', None)
+    if snapshot is None:
+        snapshot = build_snapshot(user)
+        user._auth_snapshot = snapshot
+    return snapshot
+
+
+def active_membership(snapshot):
+    """Vínculo ativo (mesma ordem do `TenantMiddleware`), ou None."""
+    memberships = snapshot['memberships']
+    return memberships[0] if memberships else None
+
+
+# =====================================
+# TOKENS
+# =====================================
+
+def token_expired(created, now=None):
+    ttl = _setting('AUTH_TOKEN_TTL', 0)
+    if not ttl or created is None:
+        return False
+    return (now or timezone.now()) - created >= timedelta(seconds=ttl)
+
+
+def issue_token(user):
+    """
+    Token do login: reaproveita o atual ou cria um novo quando expirado ou
+    mais velho que `AUTH_TOKEN_ROTATE_AFTER` (rotação).
+    """
+    token, created = Token.objects.get_or_create(user=user)
+    if created:
+        return token
+    rotate_after = _setting('AUTH_TOKEN_ROTATE_AFTER', 0)
+    age = timezone.now() - token.created
+    if token_expired(token.created) or (rotate_after and age >= timedelta(seconds=rotate_after)):
+        with transaction.atomic():
+            token.delete()
+            token = Token.objects.create(user=user)
+    return token
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """`TokenAuthentication` que resolve o token pelo snapshot em cache."""
+
+    def authenticate_credentials(self, key):
+        cache_key = snapshot_key(key)
+        snapshot = cache.get(cache_key)
+        if snapshot is None:
+            try:
+                token = self.get_model().objects.select_related('user').get(key=key)
+            except self.get_model().DoesNotExist:
+                raise exceptions.AuthenticationFailed(_('Invalid token.'))
+            snapshot = build_snapshot(token.user, token)
+            cache.set(cache_key, snapshot, _setting('AUTH_SNAPSHOT_TIMEOUT', 300))
+
+        if not snapshot['user']['is_active']:
+            raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+        if token_expired(snapshot['token_created']):
+            self.get_model().objects.filter(key=key).delete()
+            raise exceptions.AuthenticationFailed('Token expirado. Faça login novamente.')
+
+        user = user_from_snapshot(snapshot)
+        token = self.get_model().from_db(
+            'default', ['key', 'user_id', 'created'], [key, user.pk, snapshot['token_created']]
+        )
+        return user, token
+
+
+# =====================================
+# INVALIDAÇÃO
+# =====================================
+
+def invalidate_user(user_id):
+    """Descarta os snapshots dos tokens do usuário (agora e no commit)."""
+    if not user_id:
+        return
+    keys = [snapshot_key(key) for key in Token.objects.filter(user_id=user_id).values_list('key', flat=True)]
+    if not keys:
+        return
+    cache.delete_many(keys)
+    # Um snapshot montado antes do commit não pode sobreviver à alteração
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def _user_changed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        invalidate_user(instance.pk)
+
+
+def _related_changed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        invalidate_user(instance.user_id)
+
+
+def _token_changed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        cache.delete(snapshot_key(instance.key))
+
+
+def connect_auth_snapshot_signals():
+    """Registra a invalidação dos snapshots (chamado em `AccountsConfig.ready`)."""
+    from .models import ChurchUser, UserProfile
+
+    user_model = get_user_model()
+    for signal, name in ((post_save, 'save'), (post_delete, 'delete')):
+        signal.connect(_user_changed, sender=user_model, dispatch_uid=f'auth-snapshot-user-{name}')
+        signal.connect(_related_changed, sender=ChurchUser, dispatch_uid=f'auth-snapshot-churchuser-{name}')
+        signal.connect(_related_changed, sender=UserProfile, dispatch_uid=f'auth-snapshot-profile-{name}')
+        signal.connect(_token_changed, sender=Token, dispatch_uid=f'auth-snapshot-token-{name}')
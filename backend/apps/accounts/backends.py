@@ -1,11 +1,16 @@
 """
 Backend de autenticação personalizado para ObreiroVirtual
 Permite login com email ao invés de username
+
+A busca usa `LOWER(email)` (ou `LOWER(username)`), coberta pelos índices
+funcionais do `CustomUser`: uma única query indexada por login, em vez de
+um `UPPER(email) OR UPPER(username)` que varria a tabela de usuários.
 """
 
 from django.contrib.auth.backends import ModelBackend
 from django.contrib.auth import get_user_model
-from django.db.models import Q
+from django.db.models import Value
+from django.db.models.functions import Lower
 
 User = get_user_model()
 
@@ -33,12 +38,10 @@ class EmailBackend(ModelBackend):
             return None
         
         try:
-            # Tentar encontrar usuário por email ou username
-            user = User.objects.get(
-                Q(email__iexact=username) | Q(username__iexact=username)
-            )
+            user = self.get_user_by_login(username)
             
-            # Verificar senha
+            # Verificar senha (o Django refaz o hash se o algoritmo ou o
+            # número de iterações configurado mudou)
             if user.check_password(password) and self.user_can_authenticate(user):
                 return user
                 
@@ -50,6 +53,18 @@ class EmailBackend(ModelBackend):
         
         return None
     
+    @staticmethod
+    def get_user_by_login(login):
+        """
+        Usuário pelo email (ou username, quando não há '@'), sem diferenciar
+        maiúsculas. Usa os índices `LOWER(email)`/`LOWER(username)`.
+        """
+        if '@' in login:
+            return User.objects.with_email(login).get()
+        return User.objects.alias(
+            username_lower=Lower('username')
+        ).get(username_lower=Lower(Value(login)))
+    
     def get_user(self, user_id):
         """
         Obter usuário pelo ID
@@ -0,0 +1,18 @@
+"""
+Hasher de senhas com custo configurável.
+
+O mesmo PBKDF2-SHA256 do Django, com o número de iterações definido por
+`PASSWORD_HASH_ITERATIONS` (0 usa o padrão do Django). O algoritmo continua
+`pbkdf2_sha256`, então os hashes existentes seguem válidos; quando o número
+de iterações muda, o hash é refeito no próximo login (`check_password`).
+Ver `benchmarks/bench_login.py` para o custo por login.
+"""
+
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+
+class ConfigurablePBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    @property
+    def iterations(self):
+        return getattr(settings, 'PASSWORD_HASH_ITERATIONS', 0) or PBKDF2PasswordHasher.iterations
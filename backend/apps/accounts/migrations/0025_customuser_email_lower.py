@@ -0,0 +1,55 @@
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+def check_case_insensitive_duplicates(apps, schema_editor):
+    """
+    Interrompe a migração se houver emails que só diferem em maiúsculas.
+
+    O índice único `LOWER(email)` falharia com um IntegrityError genérico;
+    aqui a mensagem lista as contas em conflito. Mesclar contas envolve
+    vínculos, membros e histórico, então a decisão fica com quem administra
+    a base: mescle ou renomeie as contas listadas e rode a migração de novo.
+    """
+    CustomUser = apps.get_model('accounts', 'CustomUser')
+    duplicates = (
+        CustomUser.objects.annotate(email_lower=django.db.models.functions.text.Lower('email'))
+        .values('email_lower')
+        .annotate(total=models.Count('id'))
+        .filter(total__gt=1)
+        .values_list('email_lower', flat=True)
+    )
+    conflicts = []
+    for email in duplicates.order_by('email_lower'):
+        accounts = CustomUser.objects.filter(email__iexact=email).order_by('pk').values_list('pk', 'email')
+        conflicts.append(', '.join(f'#{pk} {value}' for pk, value in accounts))
+    if conflicts:
+        raise RuntimeError(
+            'Não é possível criar o índice único LOWER(email): há emails que só diferem em '
+            'maiúsculas. Mescle ou renomeie as contas abaixo antes de migrar:\n  '
+            + '\n  '.join(conflicts)
+        )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('accounts', '0024_make_email_unique'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_case_insensitive_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='customuser',
+            constraint=models.UniqueConstraint(
+                django.db.models.functions.text.Lower('email'),
+                name='accounts_user_email_lower_uniq',
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='customuser',
+            index=models.Index(
+                django.db.models.functions.text.Lower('username'),
+                name='accounts_user_username_lower',
+            ),
+        ),
+    ]
@@ -4,10 +4,13 @@ Gerencia papéis hierárquicos e acesso por igreja
 """
 
 from django.db import models
+from django.db.models import Value
+from django.db.models.functions import Lower
 from django.contrib.auth.models import AbstractUser, BaseUserManager
 from django.core.exceptions import ValidationError
 from apps.core.models import BaseModel, ActiveManager, RoleChoices, GenderChoices, SubscriptionPlanChoices
 from apps.core.models import validate_cpf, phone_validator
+from apps.core.query_cache import CachedQuerySetMixin
 
 # Importar modelo de reset de senha
 from .models_password_reset import PasswordResetToken
@@ -61,6 +64,13 @@ class CustomUserManager(BaseUserManager):
             raise ValueError('Superuser deve ter is_superuser=True.')
         
         return self.create_user(email, password, **extra_fields)
+    
+    def with_email(self, email):
+        """
+        Usuários com o email informado, sem diferenciar maiúsculas.
+        Usa o índice único `LOWER(email)` (`accounts_user_email_lower_uniq`).
+        """
+        return self.alias(email_lower=Lower('email')).filter(email_lower=Lower(Value(email)))
 
 
 class CustomUser(AbstractUser):
@@ -133,6 +143,13 @@ class CustomUser(AbstractUser):
         verbose_name = 'Usuário'
         verbose_name_plural = 'Usuários'
         db_table = 'accounts_customuser'
+        constraints = [
+            # Login sem diferenciar maiúsculas (EmailBackend): um email por usuário
+            models.UniqueConstraint(Lower('email'), name='accounts_user_email_lower_uniq'),
+        ]
+        indexes = [
+            models.Index(Lower('username'), name='accounts_user_username_lower'),
+        ]
     
     def __str__(self):
         return f"{self.full_name} ({self.email})"
@@ -178,7 +195,11 @@ class CustomUser(AbstractUser):
         super().save(*args, **kwargs)
 
 
-class ChurchUserManager(models.Manager):
+class ChurchUserQuerySet(CachedQuerySetMixin, models.QuerySet):
+    """QuerySet de vínculos com `.cached()` (ver apps.core.query_cache)."""
+
+
+class ChurchUserManager(models.Manager.from_queryset(ChurchUserQuerySet)):
     """Manager para usuários de igreja com filtros especializados"""
     
     def for_church(self, church):
@@ -28,7 +28,7 @@ class RequestPasswordResetSerializer(serializers.Serializer):
         value = value.lower().strip()
         
         # Verificar se existe usuário com este email
-        if not User.objects.filter(email=value, is_active=True).exists():
+        if not User.objects.with_email(value).filter(is_active=True).exists():
             # Por segurança, não revelar se o email existe ou não
             # Retornar sucesso sempre, mas logar tentativa suspeita
             logger.warning(
@@ -46,7 +46,7 @@ class RequestPasswordResetSerializer(serializers.Serializer):
         email = validated_data['email']
         
         try:
-            user = User.objects.get(email=email, is_active=True)
+            user = User.objects.with_email(email).get(is_active=True)
         except User.DoesNotExist:
             # Por segurança, não revelar que o email não existe
             # Retornar None silenciosamente
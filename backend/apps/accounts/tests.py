@@ -1,9 +1,20 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import IntegrityError, connection, transaction
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
 from rest_framework.test import APITestCase
 from rest_framework import status
 
+from apps.churches.models import Church
+from apps.core.models import RoleChoices
 from apps.denominations.models import Denomination
-from apps.accounts.models import CustomUser
+from apps.accounts.backends import EmailBackend
+from apps.accounts.models import ChurchUser, CustomUser
 
 
 class FinalizeRegistrationTests(APITestCase):
@@ -46,3 +57,139 @@ class FinalizeRegistrationTests(APITestCase):
             created_user.profile.intended_denomination_id,
             denomination.id
         )
+
+
+class CachedTokenAuthenticationTests(APITestCase):
+    """Autenticação por token servida pelo snapshot em cache."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(
+            email="snapshot@test.com",
+            password="SenhaForte123!",
+            full_name="Usuário Snapshot",
+            phone="(11) 99999-4141",
+        )
+        denomination = Denomination.objects.create(
+            name="Snapshot Denomination",
+            short_name="SD",
+            administrator=self.user,
+            email="snapshotden@test.com",
+            phone="(11) 98888-4141",
+            headquarters_address="Rua 1",
+            headquarters_city="Cidade",
+            headquarters_state="SP",
+            headquarters_zipcode="01010-010",
+        )
+        self.church = Church.objects.create(
+            denomination=denomination,
+            name="Snapshot Church",
+            short_name="SC",
+            email="snapshotchurch@test.com",
+            phone="(11) 97777-4141",
+            address="Rua 2",
+            city="Cidade",
+            state="SP",
+            zipcode="02020-020",
+            subscription_plan="basic",
+        )
+        self.church_user = ChurchUser.objects.create(
+            user=self.user,
+            church=self.church,
+            role=RoleChoices.SECRETARY,
+            is_active=True,
+            is_user_active_church=True,
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+        self.url = reverse("me-summary")
+
+    def test_summary_is_served_from_snapshot_without_queries(self):
+        first = self.client.get(self.url)
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual(first.data["active_church"]["church_id"], self.church.pk)
+        self.assertEqual(first.data["active_church"]["role"], RoleChoices.SECRETARY)
+        self.assertTrue(first.data["has_church"])
+
+        with CaptureQueriesContext(connection) as queries:
+            second = self.client.get(self.url)
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(len(queries), 0, [query["sql"] for query in queries])
+
+    def test_church_user_change_invalidates_snapshot(self):
+        self.client.get(self.url)
+        self.church_user.role = RoleChoices.CHURCH_ADMIN
+        self.church_user.save()
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.data["active_church"]["role"], RoleChoices.CHURCH_ADMIN)
+
+    def test_user_deactivation_invalidates_snapshot(self):
+        self.client.get(self.url)
+        self.user.is_active = False
+        self.user.save()
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_logout_revokes_token(self):
+        self.client.get(self.url)
+        response = self.client.post(reverse("logout"))
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(Token.objects.filter(user=self.user).exists())
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(AUTH_TOKEN_TTL=3600)
+    def test_expired_token_is_rejected_and_rotated_on_login(self):
+        Token.objects.filter(pk=self.token.pk).update(created=timezone.now() - timedelta(hours=2))
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertFalse(Token.objects.filter(pk=self.token.pk).exists())
+
+        self.client.credentials()
+        response = self.client.post(
+            reverse("login"), {"email": "snapshot@test.com", "password": "SenhaForte123!"}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response.data["token"], self.token.key)
+
+
+class EmailBackendLoginTests(APITestCase):
+    """Login pelo email normalizado (LOWER(email)) e custo do hash."""
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            email="Login.Case@Test.com",
+            password="SenhaForte123!",
+            full_name="Usuário Login",
+            phone="(11) 99999-4242",
+        )
+
+    def test_lookup_is_case_insensitive_single_query(self):
+        with self.assertNumQueries(1):
+            user = EmailBackend.get_user_by_login("login.case@TEST.COM")
+        self.assertEqual(user.pk, self.user.pk)
+
+        response = self.client.post(
+            reverse("login"), {"email": "LOGIN.CASE@test.com", "password": "SenhaForte123!"}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_email_differing_only_in_case_is_rejected(self):
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            CustomUser.objects.create_user(
+                email="login.case@test.com", password="SenhaForte123!", full_name="Duplicado"
+            )
+
+    def test_password_is_rehashed_when_cost_changes(self):
+        with override_settings(PASSWORD_HASH_ITERATIONS=1000):
+            response = self.client.post(
+                reverse("login"), {"email": "login.case@test.com", "password": "SenhaForte123!"}, format="json"
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.password.split("$")[1], "1000")
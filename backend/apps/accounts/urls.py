@@ -5,6 +5,8 @@ from .views import (
     active_church,
     set_active_church,
     me,
+    me_summary,
+    logout,
     my_church,
     upload_avatar,
     update_personal_data,
@@ -20,6 +22,7 @@ from .views_password_reset import (
 urlpatterns = [
     # Auth
     path('login/', CustomAuthToken.as_view(), name='login'),
+    path('logout/', logout, name='logout'),
     path('finalize-registration/', finalize_registration, name='finalize-registration'),
     
     # Password Reset
@@ -29,6 +32,7 @@ urlpatterns = [
 
     # Users endpoints (compat com frontend)
     path('users/me/', me, name='me'),
+    path('users/me/summary/', me_summary, name='me-summary'),
     path('users/my_church/', my_church, name='my_church'),
     path('users/upload-avatar/', upload_avatar, name='upload-avatar'),
     path('users/update_personal_data/', update_personal_data, name='update-personal-data'),
@@ -1,3 +1,4 @@
+import logging
 from datetime import date, datetime
 
 from django.core.exceptions import ValidationError
@@ -12,41 +13,29 @@ from rest_framework.response import Response
 from apps.core.models import GenderChoices, RoleChoices, validate_cpf
 
 from .auth_serializers import CustomAuthTokenSerializer
+from .authentication import active_membership, get_snapshot, issue_token
 from apps.core.throttling import AuthAnonRateThrottle, AuthUserRateThrottle
 from .models import ChurchUser, CustomUser, UserProfile
 
+logger = logging.getLogger(__name__)
+
 class CustomAuthToken(ObtainAuthToken):
     serializer_class = CustomAuthTokenSerializer
     throttle_classes = [AuthAnonRateThrottle, AuthUserRateThrottle]
     
     def post(self, request, *args, **kwargs):
-        print('🔍 DEBUG - Login Request Data:', request.data)
-        print('🔍 DEBUG - Content Type:', request.content_type)
-        
         serializer = self.serializer_class(data=request.data, context={'request': request})
-        
-        if not serializer.is_valid():
-            print('❌ DEBUG - Serializer Errors:', serializer.errors)
-        
         serializer.is_valid(raise_exception=True)
         user = serializer.validated_data['user']
-        token, created = Token.objects.get_or_create(user=user)
+        token = issue_token(user)
 
         # Se o usuário já possui vínculo com alguma igreja, considerar perfil completo
-        try:
-            from .models import ChurchUser
-            if not getattr(user, 'is_profile_complete', False):
-                has_church = ChurchUser.objects.filter(user=user, is_active=True).exists()
-                if has_church:
-                    user.is_profile_complete = True
-                    try:
-                        user.save(update_fields=['is_profile_complete', 'updated_at'])
-                    except Exception:
-                        user.save()
-        except Exception:
-            pass
+        # (só consulta os vínculos enquanto o perfil não está completo)
+        if not user.is_profile_complete and ChurchUser.objects.filter(user=user, is_active=True).exists():
+            user.is_profile_complete = True
+            user.save(update_fields=['is_profile_complete'])
         
-        print('✅ DEBUG - Login successful for user:', user.email)
+        logger.debug(f"[LOGIN] Login realizado: usuário {user.pk}")
         
         return Response({
             'token': token.key,
@@ -200,6 +189,65 @@ def set_active_church(request):
             status=status.HTTP_404_NOT_FOUND
         )
 
+def _needs_church_setup(user, intended_role, has_church):
+    """
+    Determina se precisa criar igreja:
+    1. Usuário recém-cadastrado como CHURCH_ADMIN sem igreja (intended_role)
+    2. Usuário existente que ficou sem igreja ativa (has_church=False)
+    3. Usuário com subscription_plan mas sem igreja vinculada
+    """
+    if has_church:
+        return False
+    # Caso 1: Recém-cadastrado com papel pretendido
+    # Caso 2: Tem plano mas não tem igreja (removido ou desvinculado)
+    # Caso 3: Perfil completo mas sem igreja (edge case)
+    return bool(
+        intended_role == 'CHURCH_ADMIN'
+        or user.subscription_plan
+        or user.is_profile_complete
+    )
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def logout(request):
+    """Invalida o token atual (e o snapshot em cache do usuário)"""
+    Token.objects.filter(user=request.user).delete()
+    return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def me_summary(request):
+    """
+    Versão enxuta do `me`, montada apenas com o snapshot da autenticação
+    (sem queries quando o snapshot está em cache).
+    """
+    user = request.user
+    snapshot = get_snapshot(user)
+    membership = active_membership(snapshot)
+    has_church = membership is not None
+    return Response({
+        'id': user.id,
+        'email': user.email,
+        'full_name': user.full_name,
+        'phone': user.phone,
+        'is_profile_complete': user.is_profile_complete,
+        'subscription_plan': user.subscription_plan,
+        'is_staff': user.is_staff,
+        'is_superuser': user.is_superuser,
+        'intended_role': snapshot['profile'].get('intended_role'),
+        'has_church': has_church,
+        'needs_church_setup': _needs_church_setup(user, snapshot['profile'].get('intended_role'), has_church),
+        'active_church': {
+            'church_id': membership['church_id'],
+            'denomination_id': membership['denomination_id'],
+            'role': membership['role'],
+            'active_branch_id': membership['active_branch_id'],
+        } if membership else None,
+    })
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def me(request):
@@ -227,25 +275,9 @@ def me(request):
                 'name': user.profile.intended_denomination.name
             }
     
-    # Buscar vínculo com igrejas (ChurchUser)
-    church_users = ChurchUser.objects.filter(user=user, is_active=True)
-    has_church = church_users.exists()
-    
-    # Determinar se precisa criar igreja:
-    # 1. Usuário recém-cadastrado como CHURCH_ADMIN sem igreja (intended_role)
-    # 2. Usuário existente que ficou sem igreja ativa (has_church=False)
-    # 3. Usuário com subscription_plan mas sem igreja vinculada
-    needs_church_setup = False
-    
-    if intended_role == 'CHURCH_ADMIN' and not has_church:
-        # Caso 1: Recém-cadastrado com papel pretendido
-        needs_church_setup = True
-    elif not has_church and user.subscription_plan:
-        # Caso 2: Tem plano mas não tem igreja (removido ou desvinculado)
-        needs_church_setup = True
-    elif not has_church and user.is_profile_complete:
-        # Caso 3: Perfil completo mas sem igreja (edge case)
-        needs_church_setup = True
+    # Vínculo com igrejas (ChurchUser) vem do snapshot da autenticação
+    has_church = bool(get_snapshot(user)['memberships'])
+    needs_church_setup = _needs_church_setup(user, intended_role, has_church)
     
     return Response({
         'id': user.id,
@@ -324,7 +356,7 @@ def update_personal_data(request):
 
     if email and email != user.email:
         # Garantir unicidade global
-        if CustomUser.objects.filter(email=email).exclude(pk=user.pk).exists():
+        if CustomUser.objects.with_email(email).exclude(pk=user.pk).exists():
             return Response({'error': 'Este e-mail já está em uso por outro usuário.'}, status=status.HTTP_400_BAD_REQUEST)
         user.email = email
 
@@ -528,7 +560,7 @@ def finalize_registration(request):
             )
         
         # Verificar se email já existe
-        if CustomUser.objects.filter(email=data['email']).exists():
+        if CustomUser.objects.with_email(data['email']).exists():
             return Response(
                 {'error': 'Email já cadastrado no sistema'},
                 status=status.HTTP_400_BAD_REQUEST
@@ -704,7 +736,7 @@ def finalize_registration(request):
             profile.save()
             
             # Criar token de autenticação
-            token, _ = Token.objects.get_or_create(user=user)
+            token = issue_token(user)
             
             # Preparar resposta
             user_data = {
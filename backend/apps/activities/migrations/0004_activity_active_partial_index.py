@@ -0,0 +1,21 @@
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Índices criados com CREATE INDEX CONCURRENTLY (sem bloquear escritas)
+    atomic = False
+
+    dependencies = [
+        ('activities', '0003_remove_activity_activities__branch__f60ef3_idx_and_more'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='activity',
+            index=models.Index(
+                fields=['church', 'start_datetime'], name='activity_active_start_idx',
+                condition=models.Q(('is_active', True)),
+            ),
+        ),
+    ]
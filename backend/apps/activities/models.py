@@ -8,7 +8,7 @@ from django.conf import settings
 from django.utils import timezone
 from django.core.exceptions import ValidationError
 from datetime import timedelta
-from apps.core.models import BaseModel, ActiveManager, TenantManager
+from apps.core.models import BaseModel, ActiveManager, TenantManager, TenantQuerySet
 
 
 class MinistryManager(TenantManager):
@@ -90,7 +90,7 @@ class Ministry(BaseModel):
     )
     
     # Managers
-    objects = models.Manager()
+    objects = TenantQuerySet.as_manager()
     active = ActiveManager()
     church_ministries = MinistryManager()
     
@@ -319,6 +319,11 @@ class Activity(BaseModel):
         ordering = ['-start_datetime']
         indexes = [
             models.Index(fields=['church', '-start_datetime']),
+            # Parcial (só atividades ativas): agenda e próximas atividades
+            models.Index(
+                fields=['church', 'start_datetime'], name='activity_active_start_idx',
+                condition=models.Q(is_active=True),
+            ),
         ]
     
     def __str__(self):
@@ -18,10 +18,11 @@ from .serializers import (
     ActivitySerializer, ActivityCreateSerializer, ActivitySummarySerializer,
     PublicMinistrySerializer, PublicActivitySerializer
 )
+from apps.core.mixins import ConditionalRequestMixin, SparseFieldsetMixin
 from apps.core.permissions import IsChurchAdmin, IsMemberUser
 
 
-class MinistryViewSet(viewsets.ModelViewSet):
+class MinistryViewSet(ConditionalRequestMixin, viewsets.ModelViewSet):
     """
     ViewSet para ministérios
     """
@@ -33,6 +34,8 @@ class MinistryViewSet(viewsets.ModelViewSet):
     filterset_fields = ['church', 'is_active']
     ordering_fields = ['name', 'created_at']
     ordering = ['name']
+    conditional_related = ('church',)
+    conditional_depends_on = ('activities',)
     
     def get_permissions(self):
         """
@@ -60,7 +63,9 @@ class MinistryViewSet(viewsets.ModelViewSet):
         active_church = ChurchUser.objects.get_active_church_for_user(user)
         
         if active_church:
-            return Ministry.objects.filter(church=active_church)
+            queryset = Ministry.objects.filter(church=active_church)
+            # Listagem alimenta os seletores de ministério: resultado em cache por igreja
+            return queryset.cached() if self.action == 'list' else queryset
         else:
             return Ministry.objects.none()
     
@@ -115,7 +120,7 @@ class MinistryViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
-class ActivityViewSet(viewsets.ModelViewSet):
+class ActivityViewSet(ConditionalRequestMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
     """
     ViewSet para atividades
     """
@@ -127,6 +132,7 @@ class ActivityViewSet(viewsets.ModelViewSet):
     filterset_fields = ['church', 'ministry', 'is_active', 'activity_type']
     ordering_fields = ['name', 'start_datetime', 'created_at']
     ordering = ['-start_datetime']
+    conditional_related = ('ministry', 'branch')
     
     def get_permissions(self):
         """
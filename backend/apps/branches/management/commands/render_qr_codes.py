@@ -0,0 +1,39 @@
+"""
+Comando Django que gera as imagens de QR Code pendentes das filiais.
+
+Filiais criadas pelo provisionamento em lote ficam sem imagem até a task
+`branches.render_pending_qr_codes` rodar; este comando faz o mesmo de
+forma síncrona (ex.: sem worker Celery).
+
+Uso: python manage.py render_qr_codes
+     python manage.py render_qr_codes --batch-size 200
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.branches.qr_codes import DEFAULT_BATCH_SIZE, pending_qr_codes, render_pending_qr_codes
+
+
+class Command(BaseCommand):
+    help = 'Gera as imagens de QR Code pendentes das filiais'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help='Filiais por lote (padrão: 100)'
+        )
+
+    def handle(self, *args, **options):
+        pending = pending_qr_codes().count()
+        if not pending:
+            self.stdout.write('✅ Nenhum QR Code pendente')
+            return
+
+        started = time.monotonic()
+        rendered = render_pending_qr_codes(batch_size=options['batch_size'])
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ {rendered} de {pending} QR Code(s) gerado(s) em {elapsed:.1f}s '
+            f'({rendered / elapsed if elapsed else rendered:.1f}/s)'
+        ))
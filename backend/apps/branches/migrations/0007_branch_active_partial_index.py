@@ -0,0 +1,25 @@
+from django.contrib.postgres.operations import AddIndexConcurrently, RemoveIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Índices criados com CREATE INDEX CONCURRENTLY (sem bloquear escritas)
+    atomic = False
+
+    dependencies = [
+        ('branches', '0006_rename_is_headquarters_to_is_main'),
+    ]
+
+    operations = [
+        RemoveIndexConcurrently(
+            model_name='branch',
+            name='branches_br_church__4012d1_idx',
+        ),
+        AddIndexConcurrently(
+            model_name='branch',
+            index=models.Index(
+                fields=['church', 'name'], name='branch_active_name_idx',
+                condition=models.Q(('is_active', True)),
+            ),
+        ),
+    ]
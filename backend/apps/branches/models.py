@@ -216,7 +216,11 @@ class Branch(BaseModel):
         unique_together = [['church', 'name']]  # Nome único por igreja
         indexes = [
             models.Index(fields=['church', 'name']),
-            models.Index(fields=['church', 'is_active']),
+            # Parcial (só filiais ativas): seletores e listagens da igreja
+            models.Index(
+                fields=['church', 'name'], name='branch_active_name_idx',
+                condition=models.Q(is_active=True),
+            ),
             models.Index(fields=['qr_code_uuid']),
             models.Index(fields=['state', 'city']),
             models.Index(fields=['latitude', 'longitude']),
@@ -0,0 +1,86 @@
+"""
+Renderização em lote dos QR Codes das filiais.
+
+Filiais inseridas em massa (ver `apps.churches.services`) já têm o
+`qr_code_uuid` — a URL de registro de visitantes funciona desde a criação —
+mas ainda não têm a imagem. `render_pending_qr_codes` gera os PNGs fora da
+requisição, em lotes, gravando o campo com `bulk_update` (sem os signals de
+contadores e cache de um `save()` por filial).
+
+`QR_CODE_RENDERING` define o que acontece após o commit do provisionamento:
+- `celery`: publica a task `branches.render_pending_qr_codes`;
+- `inline`: renderiza no próprio processo (desenvolvimento/testes);
+- `none`: fica para a varredura periódica (beat) ou o comando
+  `render_qr_codes`.
+"""
+
+import logging
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+
+from .models import Branch
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 100
+
+
+def pending_qr_codes():
+    """Filiais ativas ainda sem imagem de QR Code."""
+    return Branch._base_manager.filter(is_active=True).filter(
+        Q(qr_code_image='') | Q(qr_code_image__isnull=True)
+    )
+
+
+def render_pending_qr_codes(branch_ids=None, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Gera as imagens pendentes (das filiais informadas ou de todas) e retorna
+    quantas foram gravadas. Cada lote é travado com `SKIP LOCKED`, então
+    workers concorrentes não renderizam a mesma filial.
+    """
+    queryset = pending_qr_codes()
+    if branch_ids is not None:
+        queryset = queryset.filter(pk__in=list(branch_ids))
+
+    rendered = 0
+    while True:
+        with transaction.atomic():
+            branches = list(
+                queryset.select_for_update(skip_locked=True)
+                .only('id', 'qr_code_uuid', 'qr_code_image')
+                .order_by('pk')[:batch_size]
+            )
+            if not branches:
+                break
+            for branch in branches:
+                branch.generate_qr_code()
+            Branch._base_manager.bulk_update(branches, ['qr_code_image'])
+        rendered += len(branches)
+        if len(branches) < batch_size:
+            break
+
+    if rendered:
+        logger.info(f"[QR CODE] {rendered} imagem(ns) de QR Code gerada(s)")
+    return rendered
+
+
+def _dispatch(branch_ids):
+    mode = getattr(settings, 'QR_CODE_RENDERING', 'celery')
+    if mode == 'inline':
+        render_pending_qr_codes(branch_ids)
+    elif mode == 'celery':
+        try:
+            from config.celery import app
+
+            app.send_task('branches.render_pending_qr_codes', args=[branch_ids])
+        except Exception:
+            logger.exception(f"[QR CODE] Falha ao publicar a renderização de {len(branch_ids)} filial(is)")
+
+
+def schedule_qr_rendering(branch_ids):
+    """Agenda a renderização dos QR Codes das filiais para depois do commit."""
+    branch_ids = list(branch_ids)
+    if branch_ids:
+        transaction.on_commit(lambda: _dispatch(branch_ids))
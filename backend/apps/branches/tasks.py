@@ -0,0 +1,12 @@
+"""
+Tasks Celery das filiais
+"""
+from celery import shared_task
+
+from .qr_codes import render_pending_qr_codes as render
+
+
+@shared_task(name='branches.render_pending_qr_codes')
+def render_pending_qr_codes(branch_ids=None):
+    """Gera os QR Codes pendentes (após provisionamento e na varredura do beat)"""
+    return render(branch_ids)
@@ -15,10 +15,12 @@ from rest_framework.filters import SearchFilter, OrderingFilter
 from .models import Branch
 from .serializers import BranchSerializer, BranchQRCodeSerializer
 from apps.churches.models import Church
+from apps.core.mixins import ConditionalRequestMixin, SparseFieldsetMixin
+from apps.core.renderers import StreamingJSONResponse, serialize_in_chunks
 from apps.core.permissions import IsMemberUser
 
 
-class BranchViewSet(viewsets.ModelViewSet):
+class BranchViewSet(ConditionalRequestMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
     """
     ViewSet para gerenciamento de filiais
     Inclui funcionalidades de QR Code
@@ -30,6 +32,8 @@ class BranchViewSet(viewsets.ModelViewSet):
     filterset_fields = ['church', 'state', 'city', 'qr_code_active', 'is_active']
     ordering_fields = ['name', 'created_at', 'total_visitors_registered']
     ordering = ['name']
+    conditional_related = ('church',)
+    conditional_depends_on = ('visitors', 'activities')
     
     def get_queryset(self):
         """
@@ -248,8 +252,9 @@ class BranchViewSet(viewsets.ModelViewSet):
     def qr_codes(self, request):
         """Lista todas as filiais com informações de QR Code"""
         queryset = self.get_queryset()
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        return StreamingJSONResponse(
+            serialize_in_chunks(queryset, self.get_serializer_class(), context=self.get_serializer_context())
+        )
     
     @action(detail=True, methods=['post'])
     def regenerate_qr_code(self, request, pk=None):
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.3 on 2026-10-19 03:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('churches', '0006_remove_church_qr_code_active_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='church',
+            name='total_members',
+            field=models.PositiveIntegerField(default=0, help_text='Membros ativos com membresia ativa. Calculado automaticamente', verbose_name='Total de Membros'),
+        ),
+    ]
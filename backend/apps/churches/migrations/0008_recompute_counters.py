@@ -0,0 +1,102 @@
+from django.db import migrations
+from django.db.models import Count, Sum
+from django.utils import timezone
+
+# Valor de MembershipStatusChoices.ACTIVE quando esta migração foi criada
+ACTIVE = 'active'
+
+
+def _grouped(queryset, group_field, aggregate):
+    rows = queryset.values(group_field).annotate(value=aggregate).values_list(group_field, 'value')
+    return {key: int(value or 0) for key, value in rows}
+
+
+def _write(model, values_by_field):
+    """Grava os valores calculados apenas nas linhas que mudaram."""
+    now = timezone.now()
+    fields = list(values_by_field)
+    changed = []
+    for obj in model._base_manager.only('id', *fields):
+        values = {field: values_by_field[field].get(obj.pk, 0) for field in fields}
+        if any(getattr(obj, field) != value for field, value in values.items()):
+            for field, value in values.items():
+                setattr(obj, field, value)
+            obj.updated_at = now
+            changed.append(obj)
+    model._base_manager.bulk_update(changed, fields + ['updated_at'], batch_size=500)
+
+
+def recompute_counters(apps, schema_editor):
+    """
+    Recalcula os contadores desnormalizados existentes.
+
+    A partir da 0007 `Church.total_members` conta só membros com status
+    ativo e a listagem de igrejas lê os contadores gravados, atualizados por
+    deltas (apps.core.signals): sem este recálculo os deltas partiriam de
+    valores antigos. As agregações repetem as do `KPIRecomputeService` com
+    os modelos históricos, para que mudanças futuras no serviço não quebrem
+    a migração.
+    """
+    Activity = apps.get_model('activities', 'Activity')
+    Ministry = apps.get_model('activities', 'Ministry')
+    Branch = apps.get_model('branches', 'Branch')
+    Church = apps.get_model('churches', 'Church')
+    Denomination = apps.get_model('denominations', 'Denomination')
+    Member = apps.get_model('members', 'Member')
+    Visitor = apps.get_model('visitors', 'Visitor')
+
+    _write(Branch, {
+        'total_visitors': _grouped(
+            Visitor._base_manager.filter(is_active=True, branch__isnull=False), 'branch_id', Count('id')
+        ),
+        'total_activities': _grouped(
+            Activity._base_manager.filter(is_active=True, branch__isnull=False), 'branch_id', Count('id')
+        ),
+    })
+    _write(Ministry, {
+        'total_members': _grouped(
+            Member.ministries.through.objects.filter(member__is_active=True), 'ministry_id', Count('member_id')
+        ),
+        'total_activities': _grouped(Activity._base_manager.filter(is_active=True), 'ministry_id', Count('id')),
+    })
+    _write(Church, {
+        'total_members': _grouped(
+            Member._base_manager.filter(is_active=True, membership_status=ACTIVE), 'church_id', Count('id')
+        ),
+        'total_visitors': _grouped(Visitor._base_manager.filter(is_active=True), 'church_id', Count('id')),
+        'total_visitors_registered': _grouped(
+            Branch._base_manager.filter(is_active=True), 'church_id', Sum('total_visitors_registered')
+        ),
+    })
+
+    # Denominações depois das igrejas: somam os totais recém-gravados
+    active_churches = Church._base_manager.filter(is_active=True)
+    _write(Denomination, {
+        'total_churches': _grouped(active_churches, 'denomination_id', Count('id')),
+        'total_members': _grouped(
+            Member._base_manager.filter(church__is_active=True, is_active=True),
+            'church__denomination_id', Count('id'),
+        ),
+        'total_visitors': _grouped(active_churches, 'denomination_id', Sum('total_visitors')),
+        'total_visitors_registered': _grouped(active_churches, 'denomination_id', Sum('total_visitors_registered')),
+    })
+
+
+def noop(apps, schema_editor):
+    pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('churches', '0007_church_total_members_help_text'),
+        ('members', '0030_member_active_partial_indexes'),
+        ('visitors', '0006_visitor_active_partial_indexes'),
+        ('branches', '0007_branch_active_partial_index'),
+        ('activities', '0004_activity_active_partial_index'),
+        ('denominations', '0004_backfill_denomination_stats'),
+    ]
+
+    operations = [
+        migrations.RunPython(recompute_counters, noop),
+    ]
@@ -9,7 +9,7 @@ from datetime import timedelta
 from apps.core.models import BaseModel, ActiveManager, TenantManager
 from apps.core.models import (
     validate_cnpj, phone_validator, cep_validator,
-    SubscriptionPlanChoices, SubscriptionStatusChoices
+    SubscriptionPlanChoices, SubscriptionStatusChoices, MembershipStatusChoices
 )
 
 
@@ -183,11 +183,11 @@ class Church(BaseModel):
         help_text="Máximo de filiais permitidas no plano"
     )
     
-    # Estatísticas
+    # Estatísticas (mantidas por apps.core.signals)
     total_members = models.PositiveIntegerField(
         "Total de Membros",
         default=0,
-        help_text="Calculado automaticamente"
+        help_text="Membros ativos com membresia ativa. Calculado automaticamente"
     )
     
     total_visitors = models.PositiveIntegerField(
@@ -229,6 +229,14 @@ class Church(BaseModel):
     
     def save(self, *args, **kwargs):
         """Override save para configurar assinatura inicial e gerar QR Code"""
+        self.prepare_for_save()
+        super().save(*args, **kwargs)
+    
+    def prepare_for_save(self):
+        """
+        Defaults de assinatura (novo registro) e normalização de campos.
+        Também usado por inserções em massa, que não passam pelo save().
+        """
         if not self.pk:  # Novo registro
             # Configurar trial de 15 dias
             if not self.trial_end_date:
@@ -248,8 +256,6 @@ class Church(BaseModel):
         # Tratar CNPJ vazio para evitar constraint unique
         if self.cnpj == '':
             self.cnpj = None
-        
-        super().save(*args, **kwargs)
     
     def set_plan_limits(self):
         """Configura limites baseados no plano de assinatura"""
@@ -333,7 +339,8 @@ class Church(BaseModel):
         from django.db.models import Sum
         
         self.total_members = Member.objects.filter(
-            church=self, is_active=True
+            church=self, is_active=True,
+            membership_status=MembershipStatusChoices.ACTIVE
         ).count()
         
         self.total_visitors = Visitor.objects.filter(
@@ -82,6 +82,25 @@ class ChurchSerializer(serializers.ModelSerializer):
         return bool(branch.qr_code_active) if branch else False
 
 
+def max_churches_for(denomination):
+    """Limite de igrejas ativas da denominação"""
+    from apps.core.models import SubscriptionPlanChoices
+
+    # Prioriza limite explícito configurado na denominação quando > 0
+    explicit_limit = getattr(denomination, 'max_churches', 0) or 0
+    if explicit_limit > 0:
+        return explicit_limit
+    # Fallback: limites por plano (compatibilidade)
+    denomination_plan = getattr(denomination, 'subscription_plan', SubscriptionPlanChoices.BASIC)
+    limits = {
+        SubscriptionPlanChoices.BASIC: 1,
+        SubscriptionPlanChoices.PROFESSIONAL: 5,
+        SubscriptionPlanChoices.ENTERPRISE: 20,
+        SubscriptionPlanChoices.DENOMINATION: 999999,  # Ilimitado
+    }
+    return limits.get(denomination_plan, 1)
+
+
 class ChurchCreateSerializer(serializers.ModelSerializer):
     """Serializer para criação de Church"""
     
@@ -154,22 +173,7 @@ class ChurchCreateSerializer(serializers.ModelSerializer):
         
         # Verificar limites de igrejas por denominação
         if denomination:
-            from apps.core.models import SubscriptionPlanChoices
-
-            # Prioriza limite explícito configurado na denominação quando > 0
-            explicit_limit = getattr(denomination, 'max_churches', 0) or 0
-            if explicit_limit > 0:
-                max_churches = explicit_limit
-            else:
-                # Fallback: limites por plano (compatibilidade)
-                denomination_plan = getattr(denomination, 'subscription_plan', SubscriptionPlanChoices.BASIC)
-                limits = {
-                    SubscriptionPlanChoices.BASIC: 1,
-                    SubscriptionPlanChoices.PROFESSIONAL: 5,
-                    SubscriptionPlanChoices.ENTERPRISE: 20,
-                    SubscriptionPlanChoices.DENOMINATION: 999999,  # Ilimitado
-                }
-                max_churches = limits.get(denomination_plan, 1)
+            max_churches = max_churches_for(denomination)
             current_churches = Church.objects.filter(
                 denomination=denomination,
                 is_active=True
@@ -441,6 +445,8 @@ class ChurchStatisticsSerializer(serializers.ModelSerializer):
             'members_by_age_group', 'visitors_by_month', 'subscription_health',
             'days_until_expiration', 'can_add_members', 'can_add_branches'
         ]
+        # Agregados caros: com `?fields=` só são calculados via `?expand=`
+        expandable_fields = ('members_by_age_group', 'visitors_by_month')
     
     def get_plan_features(self, obj):
         return obj.get_plan_features()
@@ -455,80 +461,39 @@ class ChurchStatisticsSerializer(serializers.ModelSerializer):
         return obj.branches.filter(is_active=True, is_main=False).count()
     
     def get_members_by_age_group(self, obj):
-        """Estatísticas de membros por faixa etária"""
+        """Estatísticas de membros por faixa etária (agregadas no banco)"""
         try:
             from apps.members.models import Member
-            from django.utils import timezone
-            from datetime import date
-            
-            members = Member.objects.filter(church=obj, is_active=True)
-            
-            age_groups = {
-                '0-12': 0,
-                '13-17': 0,
-                '18-30': 0,
-                '31-50': 0,
-                '51-65': 0,
-                '65+': 0
-            }
-            
-            today = date.today()
-            
-            for member in members:
-                if member.birth_date:
-                    age = today.year - member.birth_date.year
-                    if today.month < member.birth_date.month or (
-                        today.month == member.birth_date.month and today.day < member.birth_date.day
-                    ):
-                        age -= 1
-                    
-                    if age <= 12:
-                        age_groups['0-12'] += 1
-                    elif age <= 17:
-                        age_groups['13-17'] += 1
-                    elif age <= 30:
-                        age_groups['18-30'] += 1
-                    elif age <= 50:
-                        age_groups['31-50'] += 1
-                    elif age <= 65:
-                        age_groups['51-65'] += 1
-                    else:
-                        age_groups['65+'] += 1
-            
-            return age_groups
+            from apps.members.demographics import CHURCH_AGE_BANDS, age_band_counts
+
+            return age_band_counts(Member.objects.filter(church=obj, is_active=True), CHURCH_AGE_BANDS)
         except:
             return {'0-12': 0, '13-17': 0, '18-30': 0, '31-50': 0, '51-65': 0, '65+': 0}
     
     def get_visitors_by_month(self, obj):
-        """Visitantes por mês nos últimos 6 meses"""
+        """Visitantes por mês nos últimos 6 meses (uma query, em cache por igreja)"""
         try:
             from apps.visitors.models import Visitor
-            from django.utils import timezone
-            from datetime import datetime, timedelta
+            from apps.core.services import TimeSeries
+            from django.db.models import Count
             import calendar
-            
-            visitors_data = []
-            today = timezone.now().date()
-            
-            for i in range(6):
-                month_start = today.replace(day=1) - timedelta(days=i*30)
-                month_start = month_start.replace(day=1)
-                next_month = month_start.replace(day=28) + timedelta(days=4)
-                month_end = next_month - timedelta(days=next_month.day)
-                
-                count = Visitor.objects.filter(
-                    church=obj,
-                    first_visit_date__gte=month_start,
-                    first_visit_date__lte=month_end
-                ).count()
-                
-                visitors_data.append({
-                    'month': calendar.month_name[month_start.month],
-                    'year': month_start.year,
-                    'count': count
-                })
-            
-            return list(reversed(visitors_data))
+
+            rows = TimeSeries(
+                Visitor.objects.filter(church=obj),
+                'created_at',
+                metrics={'count': Count('id')},
+                periods=6,
+                tenant=f'church:{obj.pk}',
+                depends_on=('visitors',),
+            ).run()
+            return [
+                {
+                    'month': calendar.month_name[row['period'].month],
+                    'year': row['period'].year,
+                    'count': row['count'],
+                }
+                for row in rows
+            ]
         except:
             return []
     
@@ -0,0 +1,286 @@
+"""
+Provisionamento de igrejas em lote.
+
+Criar igreja por igreja com `save()` dispara, por linha, o post_save que cria
+a filial matriz, o `Branch.save` que renderiza e grava o PNG do QR Code e os
+signals de KPIs e de cache. No onboarding de uma denominação com centenas de
+igrejas isso domina o tempo total.
+
+`ChurchProvisioningService.provision`:
+1. valida os campos de cada linha (`ChurchProvisionSerializer`) e verifica
+   e-mail, CNPJ e limite de igrejas da denominação para o lote inteiro, com
+   uma consulta para cada;
+2. insere igrejas, filiais matriz (com o `qr_code_uuid` já atribuído) e o
+   vínculo do administrador com `bulk_create`, sem signals por linha;
+3. aplica os efeitos colaterais uma única vez: totais das denominações,
+   invalidação do cache de respostas e de consultas e do snapshot de
+   autenticação do administrador;
+4. agenda a geração das imagens de QR Code para depois do commit
+   (`apps.branches.qr_codes`).
+
+Linhas inválidas não impedem a criação das demais; o resultado traz os
+erros por índice e a vazão (`churches_per_second`).
+"""
+
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+from rest_framework import serializers
+
+from apps.accounts.authentication import invalidate_user
+from apps.accounts.models import ChurchUser, RoleChoices
+from apps.branches.models import Branch
+from apps.branches.qr_codes import schedule_qr_rendering
+from apps.core import response_cache
+from apps.core.query_cache import invalidate_query_cache
+from apps.core.services import KPIRecomputeService
+from apps.denominations.models import Denomination
+from .models import Church
+from .serializers import ChurchCreateSerializer, max_churches_for
+
+logger = logging.getLogger(__name__)
+
+
+class ChurchProvisionSerializer(ChurchCreateSerializer):
+    """
+    Validação dos campos de uma linha. Denominação, e-mail e CNPJ duplicados
+    e o limite de igrejas são verificados pelo serviço para o lote inteiro.
+    """
+
+    class Meta(ChurchCreateSerializer.Meta):
+        fields = [
+            'name', 'short_name', 'description', 'email', 'phone', 'website', 'address', 'city',
+            'state', 'zipcode', 'cnpj', 'main_pastor', 'logo', 'cover_image', 'subscription_plan',
+        ]
+        extra_kwargs = {'cnpj': {'validators': []}}
+
+    def validate_email(self, value):
+        return value
+
+    def validate_cnpj(self, value):
+        return value
+
+    def validate(self, attrs):
+        state = attrs.get('state')
+        if state and len(state) != 2:
+            raise serializers.ValidationError({
+                'state': 'Estado deve ter exatamente 2 caracteres (ex: SP, RJ)'
+            })
+        return attrs
+
+
+class ChurchProvisioningService:
+    """
+    Cria igrejas com filial matriz em lote (ver módulo).
+
+    `user`, quando informado, é vinculado como CHURCH_ADMIN de cada igreja
+    criada (como no `ChurchCreateSerializer`).
+    """
+
+    MEMBERSHIP_DEFAULTS = {
+        'role': RoleChoices.CHURCH_ADMIN,
+        'is_active': True,
+        'can_access_admin': True,
+        'can_manage_members': True,
+        'can_manage_visitors': True,
+        'can_manage_activities': True,
+        'can_view_reports': True,
+        'can_manage_branches': True,
+    }
+
+    def __init__(
+        self,
+        *,
+        user=None,
+        enforce_limits: bool = True,
+        batch_size: Optional[int] = None,
+    ):
+        self.user = user
+        self.enforce_limits = enforce_limits
+        self.batch_size = batch_size or getattr(settings, 'CHURCH_PROVISIONING_BATCH_SIZE', 500)
+
+    def provision(self, rows: List[Dict[str, Any]], denomination: Optional[Denomination] = None) -> Dict[str, Any]:
+        """
+        Cria as igrejas de `rows`. Sem `denomination`, cada linha informa a
+        sua (`denomination`: id).
+        """
+        started = time.monotonic()
+        errors: List[Dict[str, Any]] = []
+
+        candidates = self._validate(rows, denomination, errors)
+        candidates = self._check_conflicts(candidates, errors)
+        if self.enforce_limits:
+            candidates = self._check_limits(candidates, errors)
+
+        churches = [church for _, church in candidates]
+        branches: List[Branch] = []
+        if churches:
+            with transaction.atomic():
+                Church.objects.bulk_create(churches, batch_size=self.batch_size)
+                branches = Branch.objects.bulk_create(
+                    [self._main_branch(church) for church in churches], batch_size=self.batch_size
+                )
+                if self.user is not None:
+                    ChurchUser.objects.bulk_create(
+                        [ChurchUser(user=self.user, church=church, **self.MEMBERSHIP_DEFAULTS) for church in churches],
+                        batch_size=self.batch_size,
+                    )
+                self._apply_side_effects(churches, branches)
+
+        duration = time.monotonic() - started
+        errors.sort(key=lambda error: error['index'])
+        result = {
+            'churches': churches,
+            'errors': errors,
+            'created_count': len(churches),
+            'branches_count': len(branches),
+            'duration_seconds': round(duration, 3),
+            'churches_per_second': round(len(churches) / duration, 1) if duration else float(len(churches)),
+        }
+        logger.info(
+            f"[PROVISIONAMENTO] {len(churches)} igreja(s) e {len(branches)} filial(is) matriz "
+            f"criadas em {duration:.2f}s ({result['churches_per_second']}/s), {len(errors)} erro(s)"
+        )
+        return result
+
+    # =====================================
+    # VALIDAÇÃO
+    # =====================================
+
+    def _validate(self, rows, denomination, errors):
+        denominations = self._denominations(rows) if denomination is None else {}
+        candidates = []
+        for index, row in enumerate(rows):
+            target = denomination or denominations.get(self._denomination_id(row))
+            if target is None:
+                errors.append({'index': index, 'errors': {'denomination': ['Denominação inválida.']}})
+                continue
+            serializer = ChurchProvisionSerializer(data=row)
+            if not serializer.is_valid():
+                errors.append({'index': index, 'errors': serializer.errors})
+                continue
+            church = Church(denomination=target, **serializer.validated_data)
+            church.prepare_for_save()
+            candidates.append((index, church))
+        return candidates
+
+    @staticmethod
+    def _denomination_id(row):
+        try:
+            return int(row.get('denomination'))
+        except (TypeError, ValueError):
+            return None
+
+    def _denominations(self, rows):
+        ids = {self._denomination_id(row) for row in rows} - {None}
+        return Denomination.objects.in_bulk(ids) if ids else {}
+
+    def _check_conflicts(self, candidates, errors):
+        """E-mail único por denominação (igrejas ativas) e CNPJ único, no banco e no próprio lote."""
+        if not candidates:
+            return candidates
+        churches = [church for _, church in candidates]
+        taken_emails = set(
+            Church._base_manager.filter(
+                denomination_id__in={church.denomination_id for church in churches},
+                email__in={church.email for church in churches},
+                is_active=True,
+            ).values_list('denomination_id', 'email')
+        )
+        cnpjs = {church.cnpj for church in churches if church.cnpj}
+        taken_cnpjs = set(
+            Church._base_manager.filter(cnpj__in=cnpjs).values_list('cnpj', flat=True)
+        ) if cnpjs else set()
+
+        accepted = []
+        for index, church in candidates:
+            email_key = (church.denomination_id, church.email)
+            if email_key in taken_emails:
+                errors.append({'index': index, 'errors': {
+                    'email': ['Já existe uma igreja com este email nesta denominação'],
+                }})
+                continue
+            if church.cnpj and church.cnpj in taken_cnpjs:
+                errors.append({'index': index, 'errors': {'cnpj': ['Já existe uma igreja com este CNPJ']}})
+                continue
+            taken_emails.add(email_key)
+            if church.cnpj:
+                taken_cnpjs.add(church.cnpj)
+            accepted.append((index, church))
+        return accepted
+
+    def _check_limits(self, candidates, errors):
+        """Recusa as linhas que ultrapassam o limite de igrejas ativas de cada denominação."""
+        if not candidates:
+            return candidates
+        denominations = {church.denomination_id: church.denomination for _, church in candidates}
+        current = dict(
+            Church._base_manager.filter(denomination_id__in=denominations, is_active=True)
+            .values('denomination_id').annotate(total=Count('id')).values_list('denomination_id', 'total')
+        )
+        remaining = {
+            denomination_id: max_churches_for(denomination) - current.get(denomination_id, 0)
+            for denomination_id, denomination in denominations.items()
+        }
+
+        accepted = []
+        for index, church in candidates:
+            if remaining[church.denomination_id] <= 0:
+                errors.append({'index': index, 'errors': {'non_field_errors': [
+                    f'Esta denominação atingiu o limite de {max_churches_for(church.denomination)} igrejas'
+                ]}})
+                continue
+            remaining[church.denomination_id] -= 1
+            accepted.append((index, church))
+        return accepted
+
+    # =====================================
+    # INSERÇÃO E EFEITOS COLATERAIS
+    # =====================================
+
+    @staticmethod
+    def _main_branch(church):
+        # `qr_code_uuid` vem do default do campo; a imagem é gerada depois
+        return Branch(
+            church=church,
+            name=f'{church.name} - Matriz'[:200],
+            short_name=(church.short_name or 'Matriz')[:50],
+            address=church.address,
+            city=church.city,
+            state=church.state,
+            zipcode=church.zipcode,
+            phone=church.phone,
+            email=church.email,
+            qr_code_active=True,
+            is_active=True,
+            is_main=True,
+        )
+
+    def _apply_side_effects(self, churches, branches):
+        """O que os signals fariam por linha, uma vez para o lote."""
+        church_ids = [church.pk for church in churches]
+        denomination_ids = sorted({church.denomination_id for church in churches})
+
+        user_id = self.user.pk if self.user is not None else None
+
+        def invalidate_caches():
+            response_cache.invalidate(
+                [f'church:{church_id}' for church_id in church_ids]
+                + [f'denomination:{denomination_id}' for denomination_id in denomination_ids],
+                ['churches', 'branches'],
+            )
+            invalidate_query_cache(Branch, church_ids)
+            if user_id is not None:
+                invalidate_query_cache(ChurchUser, church_ids)
+                invalidate_user(user_id)
+
+        # Após o commit: uma leitura concorrente antes dele guardaria os dados antigos
+        transaction.on_commit(invalidate_caches)
+
+        # Igrejas novas não têm membros nem visitantes: só os totais das denominações mudam
+        transaction.on_commit(lambda: KPIRecomputeService().recompute_denominations(denomination_ids))
+        schedule_qr_rendering([branch.pk for branch in branches])
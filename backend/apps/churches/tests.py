@@ -1,5 +1,8 @@
 from datetime import timedelta
 
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 from rest_framework import status
@@ -7,8 +10,11 @@ from rest_framework.test import APITestCase, APIClient
 
 from apps.accounts.models import CustomUser, ChurchUser
 from apps.core.models import RoleChoices
+from apps.core.response_cache import get_generations
 from apps.denominations.models import Denomination
+from apps.branches.models import Branch
 from apps.churches.models import Church
+from apps.churches.services import ChurchProvisioningService
 
 
 class AssignAdminSecurityTests(APITestCase):
@@ -106,3 +112,105 @@ class AssignAdminSecurityTests(APITestCase):
 
         church_user = ChurchUser.objects.get(user=self.secretary, church=self.church)
         self.assertEqual(church_user.role, RoleChoices.CHURCH_ADMIN)
+
+
+@override_settings(MEDIA_ROOT='/tmp/obreiro-test-media', QR_CODE_RENDERING='inline')
+class ChurchProvisioningServiceTests(TestCase):
+    """Provisionamento em lote: inserções em massa e efeitos colaterais agrupados."""
+
+    def setUp(self):
+        self.admin = CustomUser.objects.create_user(
+            email='onboarding@example.com', password='StrongPass123', full_name='Onboarding Admin'
+        )
+        self.denomination = Denomination.objects.create(
+            name='Denominação Lote',
+            short_name='DL',
+            administrator=self.admin,
+            email='contato@lote.com',
+            phone='(11) 99999-9999',
+            headquarters_address='Rua da Fé, 123',
+            headquarters_city='São Paulo',
+            headquarters_state='SP',
+            headquarters_zipcode='01001-000',
+            max_churches=10,
+        )
+
+    def _rows(self, count, start=0):
+        return [
+            {
+                'name': f'Igreja Lote {index}',
+                'short_name': f'Lote {index}',
+                'email': f'lote{index}@example.com',
+                'phone': '(11) 98888-7777',
+                'address': 'Rua Principal, 456',
+                'city': 'São Paulo',
+                'state': 'sp',
+                'zipcode': '01002-000',
+            }
+            for index in range(start, start + count)
+        ]
+
+    def _provision(self, rows, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            return ChurchProvisioningService(user=self.admin, **kwargs).provision(rows, self.denomination)
+
+    def test_creates_churches_main_branches_and_links_in_bulk(self):
+        rows = self._rows(3)
+        rows.append({**self._rows(1, start=9)[0], 'email': 'lote0@example.com'})  # e-mail repetido
+        rows.append({'name': 'Sem dados'})
+
+        result = self._provision(rows)
+
+        self.assertEqual(result['created_count'], 3)
+        self.assertEqual([error['index'] for error in result['errors']], [3, 4])
+        self.assertIn('email', result['errors'][0]['errors'])
+        self.assertGreater(result['churches_per_second'], 0)
+
+        churches = Church.objects.filter(denomination=self.denomination)
+        self.assertEqual(churches.count(), 3)
+        church = churches.get(name='Igreja Lote 0')
+        self.assertEqual(church.state, 'SP')
+        self.assertEqual(church.max_branches, 1)  # defaults de assinatura do save()
+        self.assertIsNotNone(church.trial_end_date)
+
+        branch = Branch.objects.get(church=church)
+        self.assertTrue(branch.is_main)
+        self.assertTrue(branch.qr_code_image.name.endswith(f'qr_code_{branch.qr_code_uuid}.png'))
+        self.assertTrue(ChurchUser.objects.filter(
+            user=self.admin, church=church, role=RoleChoices.CHURCH_ADMIN, can_manage_branches=True
+        ).exists())
+
+        self.denomination.refresh_from_db()
+        self.assertEqual(self.denomination.total_churches, 3)
+
+    def test_caches_are_invalidated_after_commit(self):
+        tenant = f'denomination:{self.denomination.pk}'
+        before = get_generations(tenant, ['churches'])
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            ChurchProvisioningService(user=self.admin).provision(self._rows(1), self.denomination)
+            self.assertEqual(get_generations(tenant, ['churches']), before)
+        for callback in callbacks:
+            callback()
+
+        self.assertNotEqual(get_generations(tenant, ['churches']), before)
+
+    def test_query_count_does_not_grow_with_batch_size(self):
+        with override_settings(QR_CODE_RENDERING='none'):
+            with CaptureQueriesContext(connection) as small:
+                self._provision(self._rows(2))
+            with CaptureQueriesContext(connection) as large:
+                self._provision(self._rows(8, start=2))
+
+        self.assertEqual(len(small), len(large))
+        self.assertEqual(Branch.objects.filter(church__denomination=self.denomination, qr_code_image='').count(), 10)
+
+    def test_church_limit_is_checked_for_the_whole_batch(self):
+        self.denomination.max_churches = 2
+        self.denomination.save(update_fields=['max_churches'])
+
+        result = self._provision(self._rows(3))
+
+        self.assertEqual(result['created_count'], 2)
+        self.assertEqual(result['errors'][0]['index'], 2)
+        self.assertIn('limite de 2 igrejas', result['errors'][0]['errors']['non_field_errors'][0])
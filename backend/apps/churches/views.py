@@ -6,7 +6,8 @@ Gerencia endpoints de igrejas
 import logging
 import csv
 from datetime import datetime
-from django.db.models import Q, Count, Prefetch
+from django.db.models import Q, Count, Prefetch, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 from django.http import HttpResponse
 from rest_framework import viewsets, status, permissions
@@ -18,6 +19,8 @@ from rest_framework.filters import SearchFilter, OrderingFilter
 from django_filters import rest_framework as filters
 
 from .models import Church
+from .services import ChurchProvisioningService
+from apps.branches.models import Branch
 from .serializers import (
     ChurchSerializer, ChurchCreateSerializer, ChurchSummarySerializer,
     ChurchStatsSerializer, ChurchSubscriptionSerializer,
@@ -28,7 +31,9 @@ from apps.core.permissions import (
     IsChurchAdmin, IsPlatformAdmin,
     CanCreateChurches, CanManageChurchAdmins
 )
-from apps.core.models import MembershipStatusChoices
+from apps.core.services import DashboardFanout, KPIRecomputeService
+from apps.core.mixins import ConditionalRequestMixin, SparseFieldsetMixin
+from apps.core.response_cache import cache_response, user_active_church
 from apps.accounts.models import LEGACY_DENOMINATION_ROLE, RoleChoices
 
 # Setup logging
@@ -93,7 +98,11 @@ class ChurchFilter(filters.FilterSet):
         return queryset.filter(subscription_end_date__gte=now)
 
 
-class ChurchViewSet(viewsets.ModelViewSet):
+# Dados que alimentam os indicadores do dashboard principal da igreja
+MAIN_DASHBOARD_DEPENDENCIES = ('members', 'visitors', 'activities')
+
+
+class ChurchViewSet(ConditionalRequestMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
     """
     ViewSet completo para gerenciamento de igrejas
     
@@ -113,6 +122,9 @@ class ChurchViewSet(viewsets.ModelViewSet):
     search_fields = ['name', 'short_name', 'city', 'state', 'email']
     ordering_fields = ['name', 'city', 'created_at', 'total_members', 'subscription_end_date']
     ordering = ['name']
+    sparse_fieldset_actions = ('list', 'retrieve', 'statistics')
+    conditional_related = ('denomination',)
+    conditional_depends_on = ('members', 'visitors', 'branches')
     
     def get_queryset(self):
         """
@@ -120,30 +132,19 @@ class ChurchViewSet(viewsets.ModelViewSet):
         """
         user = self.request.user
         
-        # Queryset base otimizado
+        # Queryset base otimizado: membros e visitantes vêm dos contadores
+        # mantidos por apps.core.signals (sem JOIN membros × filiais × visitantes).
+        # _base_manager: o TenantManager restringiria a subquery à igreja ativa.
+        active_branches = Branch._base_manager.filter(
+            church=OuterRef('pk'), is_active=True, is_main=False
+        ).order_by().values('church').annotate(total=Count('id')).values('total')
+
         queryset = Church.objects.select_related(
             'denomination', 'main_pastor'
         ).prefetch_related(
             'branches'
         ).annotate(
-            members_count=Count(
-                'members',
-                filter=Q(
-                    members__is_active=True,
-                    members__membership_status=MembershipStatusChoices.ACTIVE
-                ),
-                distinct=True
-            ),
-            branches_count=Count(
-                'branches',
-                filter=Q(branches__is_active=True, branches__is_main=False),
-                distinct=True
-            ),
-            visitors_count=Count(
-                'visitors',
-                filter=Q(visitors__is_active=True),
-                distinct=True
-            )
+            branches_count=Coalesce(Subquery(active_branches), 0)
         )
         
         # Superuser vê tudo
@@ -401,8 +402,13 @@ class ChurchViewSet(viewsets.ModelViewSet):
                 logger.info(f"   URL de registro: {main_branch.get_visitor_registration_url()}")
 
                 # Atualizar vínculo do usuário para apontar filial ativa
+                from apps.accounts.authentication import invalidate_user
                 from apps.accounts.models import ChurchUser
+                from apps.core.query_cache import invalidate_query_cache
                 ChurchUser.objects.filter(user=user, church=church).update(active_branch=main_branch)
+                # `update()` não dispara os signals: snapshot de autenticação e cache de consultas
+                invalidate_user(user.pk)
+                invalidate_query_cache(ChurchUser, [church.pk])
             
             except Exception as branch_error:
                 logger.warning(f"⚠️ Erro ao criar filial matriz: {str(branch_error)}")
@@ -444,7 +450,7 @@ class ChurchViewSet(viewsets.ModelViewSet):
     def statistics(self, request, pk=None):
         """Estatísticas detalhadas da igreja"""
         church = self.get_object()
-        serializer = ChurchStatisticsSerializer(church)
+        serializer = self.get_serializer(church)
         return Response(serializer.data)
     
     @action(detail=True, methods=['get'])
@@ -454,7 +460,7 @@ class ChurchViewSet(viewsets.ModelViewSet):
         
         # Assumindo que existe um modelo Branch relacionado
         try:
-            branches = church.branches.filter(is_active=True, is_main=False)
+            branches = church.branches.filter(is_active=True, is_main=False).cached()
             # Usar serializer básico para evitar circular import
             branches_data = []
             for branch in branches:
@@ -722,7 +728,8 @@ class ChurchViewSet(viewsets.ModelViewSet):
     def update_statistics(self, request, pk=None):
         """Atualizar estatísticas da igreja"""
         church = self.get_object()
-        church.update_statistics()
+        KPIRecomputeService(church_ids=[church.id]).run()
+        church.refresh_from_db()
         
         logger.info(f"Estatísticas da igreja '{church.name}' atualizadas por {request.user.email}")
         
@@ -786,7 +793,10 @@ class ChurchViewSet(viewsets.ModelViewSet):
     
     @action(detail=False, methods=['post'], url_path='bulk-create')
     def bulk_create(self, request):
-        """Criar múltiplas igrejas em lote (para denominações)"""
+        """
+        Criar múltiplas igrejas em lote (para denominações).
+        Cada linha informa sua `denomination`; ver ChurchProvisioningService.
+        """
         churches_data = request.data.get('churches', [])
         
         if not churches_data or not isinstance(churches_data, list):
@@ -795,39 +805,31 @@ class ChurchViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        created_churches = []
-        errors = []
-        
-        for idx, church_data in enumerate(churches_data):
-            serializer = ChurchCreateSerializer(data=church_data)
-            if serializer.is_valid():
-                try:
-                    church = serializer.save()
-                    created_churches.append({
-                        'id': church.id,
-                        'name': church.name,
-                        'city': church.city
-                    })
-                    logger.info(f"Igreja '{church.name}' criada em lote por {request.user.email}")
-                except Exception as e:
-                    errors.append({
-                        'index': idx,
-                        'error': f'Erro ao criar igreja: {str(e)}'
-                    })
-            else:
-                errors.append({
-                    'index': idx,
-                    'errors': serializer.errors
-                })
+        result = ChurchProvisioningService(user=request.user).provision(churches_data)
+        created_churches = [
+            {'id': church.id, 'name': church.name, 'city': church.city}
+            for church in result['churches']
+        ]
+        if created_churches:
+            logger.info(
+                f"{len(created_churches)} igreja(s) criada(s) em lote por {request.user.email} "
+                f"({result['churches_per_second']} igrejas/s)"
+            )
         
         return Response({
             'created_count': len(created_churches),
             'created_churches': created_churches,
-            'errors_count': len(errors),
-            'errors': errors
+            'errors_count': len(result['errors']),
+            'errors': result['errors'],
+            'duration_seconds': result['duration_seconds'],
+            'churches_per_second': result['churches_per_second'],
         }, status=status.HTTP_201_CREATED if created_churches else status.HTTP_400_BAD_REQUEST)
     
     @action(detail=False, methods=['get'], url_path='main-dashboard')
+    @cache_response(
+        'church-main-dashboard', depends_on=MAIN_DASHBOARD_DEPENDENCIES, vary_on=(),
+        church=user_active_church,
+    )
     def main_dashboard(self, request):
         """
         Retorna os dados consolidados para o dashboard principal
@@ -858,7 +860,6 @@ class ChurchViewSet(viewsets.ModelViewSet):
             )
         
         try:
-            from django.db.models import Sum, Count
             from django.utils import timezone
             from datetime import timedelta
             from apps.members.models import Member
@@ -870,59 +871,43 @@ class ChurchViewSet(viewsets.ModelViewSet):
             start_of_last_month = (start_of_this_month - timedelta(days=1)).replace(day=1)
             end_of_last_month = start_of_this_month - timedelta(days=1)
 
+            members = Member._base_manager.filter(church=church)
+            visitors = Visitor._base_manager.filter(church=church, is_active=True)
+
+            # Contagens independentes executadas em paralelo
+            result = DashboardFanout(f'church-{church.id}', {
+                'members': members.filter(is_active=True).count,
+                'members_last_month': members.filter(
+                    is_active=True, created_at__lt=start_of_this_month
+                ).count,
+                # Visitantes do mês atual (padronizado com componente de QR Code)
+                'visitors_this_month': visitors.filter(created_at__gte=start_of_this_month).count,
+                'visitors_last_month': visitors.filter(
+                    created_at__range=(start_of_last_month, end_of_last_month)
+                ).count,
+                'active_events': Activity._base_manager.filter(
+                    church=church, is_active=True, start_datetime__gte=today
+                ).count,
+            }, tenant=f'church:{church.id}', depends_on=MAIN_DASHBOARD_DEPENDENCIES).run()
+
             # Métricas atuais (priorizar dados reais, fallback para campos da igreja)
-            try:
-                real_members = Member.objects.filter(church=church, is_active=True).count()
-                total_members = real_members if real_members > 0 else (church.total_members or 0)
-            except:
-                total_members = church.total_members or 0
-                
-            try:
-                # Contar visitantes do mês atual (padronizado com componente de QR Code)
-                real_visitors_this_month = Visitor.objects.filter(
-                    church=church, 
-                    is_active=True,
-                    created_at__gte=start_of_this_month
-                ).count()
-                print(f"📊 Dashboard Visitantes - Este mês: {real_visitors_this_month}")
-                # Mostrar visitantes do mês corrente (padronizado)
-                total_visitors_display = real_visitors_this_month
-            except Exception as e:
-                print(f"❌ Erro ao contar visitantes: {e}")
+            total_members = result.get('members') or church.total_members or 0
+            if 'visitors_this_month' in result.failed:
                 total_visitors_display = church.total_visitors or 0
-                real_visitors_this_month = 0
-                
-            try:
-                active_events = Activity.objects.filter(
-                    church=church, is_active=True, start_datetime__gte=today
-                ).count()
-            except:
-                active_events = 0
-                
+            else:
+                total_visitors_display = result['visitors_this_month']
+            real_visitors_this_month = result.get('visitors_this_month', 0)
+            active_events = result.get('active_events', 0)
+
             # Para dízimos, calcular baseado no número de membros (média R$ 150 por membro)
             tithes_this_month = total_members * 150
 
-            # Métricas do mês passado para comparação
-            try:
-                real_members_last_month = Member.objects.filter(
-                    church=church, created_at__lt=start_of_this_month
-                ).count()
-                # Estimar crescimento: 95% dos membros atuais
-                total_members_last_month = real_members_last_month if real_members_last_month > 0 else int(total_members * 0.95)
-            except:
-                total_members_last_month = int(total_members * 0.95)
-                
-            try:
-                real_visitors_last_month = Visitor.objects.filter(
-                    church=church, 
-                    is_active=True,
-                    created_at__range=(start_of_last_month, end_of_last_month)
-                ).count()
-                # Estimar: 85% dos visitantes deste mês
-                total_visitors_last_month = real_visitors_last_month if real_visitors_last_month > 0 else int(real_visitors_this_month * 0.85)
-            except:
-                total_visitors_last_month = int(real_visitors_this_month * 0.85)
-                
+            # Métricas do mês passado para comparação (estimativas na ausência de dados)
+            total_members_last_month = result.get('members_last_month') or int(total_members * 0.95)
+            total_visitors_last_month = (
+                result.get('visitors_last_month') or int(real_visitors_this_month * 0.85)
+            )
+
             tithes_last_month = total_members_last_month * 140 # R$ 140 por membro no mês passado
             
             def calculate_percentage_change(current, previous):
@@ -949,7 +934,7 @@ class ChurchViewSet(viewsets.ModelViewSet):
                 }
             }
             
-            return Response(data)
+            return result.apply_headers(Response(data))
             
         except Exception as e:
             # Se algo der errado, retornar dados zerados
@@ -960,9 +945,16 @@ class ChurchViewSet(viewsets.ModelViewSet):
                 'events': {'total': 0, 'change': 0},
                 'tithes': {'total': 0, 'change': 0}
             }
-            return Response(fallback_data)
+            response = Response(fallback_data)
+            # Resposta de contingência: não deve ser cacheada
+            response['X-Dashboard-Partial'] = 'all'
+            return response
 
     @action(detail=True, methods=['get'])
+    @cache_response(
+        'church-dashboard', depends_on=('members', 'visitors', 'activities', 'churches'), vary_on=(),
+        church=lambda view, request: view.get_object(),
+    )
     def dashboard(self, request, pk=None):
         """Dashboard da igreja com métricas principais"""
         church = self.get_object()
@@ -987,13 +979,13 @@ class ChurchViewSet(viewsets.ModelViewSet):
                 ).count(),
                 'new_visitors_last_month': Visitor.objects.filter(
                     church=church,
-                    first_visit_date__gte=last_month
+                    created_at__date__gte=last_month
                 ).count(),
                 'upcoming_activities': Activity.objects.filter(
                     church=church,
-                    start_datetime__gte=datetime.now(),
+                    start_datetime__gte=timezone.now(),
                     is_active=True
-                ).count()[:5],
+                ).count(),
             },
             'subscription': {
                 'plan': church.subscription_plan,
@@ -1004,7 +996,7 @@ class ChurchViewSet(viewsets.ModelViewSet):
             }
         }
         
-
+        return Response(dashboard_data)
     
     @action(detail=True, methods=['get'])
     def members(self, request, pk=None):
@@ -1104,6 +1096,63 @@ class ChurchViewSet(viewsets.ModelViewSet):
             logger.error(f"Erro ao transferir membro: {str(e)}")
 
     
+    @action(detail=False, methods=['post'], url_path='bulk-transfer-members')
+    def bulk_transfer_members(self, request):
+        """
+        Transferir vários membros para outra igreja (e filial) em uma única
+        transação. Corpo: {"member_ids": [...], "target_church_id": X,
+        "target_branch_id": Y (opcional, padrão: matriz), "reason": ""}.
+        """
+        from apps.branches.models import Branch
+        from apps.members.models import Member
+        from apps.members.services import MemberBulkTransferService
+
+        target_church_id = request.data.get('target_church_id')
+        if not target_church_id:
+            return Response(
+                {'error': 'target_church_id é obrigatório'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        # Permissão verificada uma única vez para todo o lote
+        user_churches = set(self.get_queryset().values_list('id', flat=True))
+        try:
+            target_church_id = int(target_church_id)
+        except (TypeError, ValueError):
+            return Response({'error': 'target_church_id inválido'}, status=status.HTTP_400_BAD_REQUEST)
+        if target_church_id not in user_churches:
+            return Response(
+                {'error': 'Sem permissão para transferir para essa igreja'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        # Sem o filtro de tenant: a igreja de destino pode não ser a ativa
+        branches = Branch._base_manager.filter(church_id=target_church_id, is_active=True)
+        target_branch_id = request.data.get('target_branch_id')
+        if target_branch_id:
+            target_branch = branches.filter(id=target_branch_id).first()
+        else:
+            target_branch = branches.order_by('-is_main', 'name').first()
+        if not target_branch:
+            return Response(
+                {'error': 'Filial de destino não encontrada'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        service = MemberBulkTransferService(
+            user=request.user,
+            target_branch=target_branch,
+            reason=request.data.get('reason', ''),
+        )
+        summary = service.transfer(
+            members=Member._base_manager.filter(church_id__in=user_churches),
+            member_ids=request.data.get('member_ids'),
+        )
+        logger.info(
+            f"{summary['transferred_count']} membros transferidos para {target_branch.name} por {request.user.email}"
+        )
+        return Response(summary)
+
     @action(detail=False, methods=['get'], url_path='managed-churches')
     def managed_churches(self, request):
         """Listar igrejas que o usuário pode gerenciar (para dropdown)"""
@@ -4,3 +4,19 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.core"
+
+    def ready(self):
+        """Registra a manutenção incremental dos contadores, a invalidação dos caches de respostas e de querysets e as métricas de conexão, e compila os templates de email"""
+        from apps.core.signals import connect_counter_signals
+        connect_counter_signals()
+
+        from apps.core.response_cache import connect_response_cache_signals
+        connect_response_cache_signals()
+
+        from apps.core.query_cache import connect_query_cache_signals
+        connect_query_cache_signals()
+
+        from apps.core import db  # noqa: F401 - conecta `connection_created`
+
+        from apps.core.services.email_rendering import warm_email_templates
+        warm_email_templates()
@@ -0,0 +1,97 @@
+"""
+Roteamento de leituras para a réplica e métricas de conexões.
+
+As leituras só vão para a réplica dentro de um contexto `use_replica()`,
+ativado pelo `ReplicaRoutingMiddleware` nos endpoints pesados somente
+leitura (`DATABASE_REPLICA_PATHS`). Fora dele, e sempre que não houver
+alias "replica" em `DATABASES`, tudo usa o banco principal. Escritas vão
+sempre para o principal.
+
+O estado fica em uma `ContextVar`, propagada pelo asgiref para as threads
+do `DashboardFanout`.
+"""
+
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+REPLICA_ALIAS = 'replica'
+
+_replica_reads = ContextVar('replica_reads', default=False)
+
+
+def replica_enabled() -> bool:
+    return REPLICA_ALIAS in settings.DATABASES
+
+
+@contextmanager
+def use_replica():
+    """Envia as leituras do bloco para a réplica (se configurada)."""
+    token = _replica_reads.set(True)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+class ReadReplicaRouter:
+    """Router de leitura: réplica dentro de `use_replica()`, principal fora."""
+
+    def db_for_read(self, model, **hints):
+        if _replica_reads.get() and replica_enabled():
+            return REPLICA_ALIAS
+        return None
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Réplica e principal contêm os mesmos dados
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db != REPLICA_ALIAS
+
+
+# =====================================
+# MÉTRICAS
+# =====================================
+
+_opened = {}
+_opened_lock = threading.Lock()
+
+
+def _count_connection(sender, connection, **kwargs):
+    with _opened_lock:
+        _opened[connection.alias] = _opened.get(connection.alias, 0) + 1
+
+
+connection_created.connect(_count_connection, dispatch_uid='core-db-connection-metrics')
+
+
+def connection_metrics():
+    """
+    Métricas por alias: conexões abertas pelo processo, configuração de
+    persistência e, com o pool do psycopg 3, as estatísticas do pool (nesse
+    caso `connections_opened` conta os checkouts do pool).
+    """
+    metrics = {}
+    for alias in connections:
+        config = settings.DATABASES[alias]
+        pool_options = config.get('OPTIONS', {}).get('pool')
+        entry = {
+            'connections_opened': _opened.get(alias, 0),
+            'conn_max_age': config.get('CONN_MAX_AGE', 0),
+            'health_checks': config.get('CONN_HEALTH_CHECKS', False),
+            'pooled': bool(pool_options),
+        }
+        if pool_options:
+            pool = getattr(connections[alias], 'pool', None)
+            if pool is not None:
+                entry['pool'] = pool.get_stats()
+        metrics[alias] = entry
+    return metrics
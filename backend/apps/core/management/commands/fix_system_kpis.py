@@ -1,14 +1,18 @@
 """
 Comando Django para corrigir KPIs e estatísticas do sistema
-Uso: python manage.py fix_system_kpis
+Uso: python manage.py fix_system_kpis --all
+     python manage.py fix_system_kpis --fix-church-kpis --since 2025-01-01 --workers 4
 """
 
-from django.core.management.base import BaseCommand
+from datetime import datetime, time
+
+from django.core.management.base import BaseCommand, CommandError
 from django.contrib.auth import get_user_model
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 from apps.members.models import Member
-from apps.churches.models import Church
-from apps.denominations.models import Denomination
 from apps.accounts.models import ChurchUser
+from apps.core.services import KPIRecomputeService
 
 User = get_user_model()
 
@@ -37,6 +41,29 @@ class Command(BaseCommand):
             action='store_true',
             help='Executar todas as correções',
         )
+        parser.add_argument(
+            '--since',
+            help='Recalcular apenas igrejas alteradas desde a data (YYYY-MM-DD ou ISO 8601)',
+        )
+        parser.add_argument(
+            '--denomination',
+            type=int,
+            action='append',
+            dest='denominations',
+            help='Restringir o recálculo a uma denominação (pode repetir)',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Número de denominações processadas em paralelo',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=KPIRecomputeService.DEFAULT_CHUNK_SIZE,
+            help='Tamanho do lote de igrejas por agregação/bulk_update',
+        )
 
     def handle(self, *args, **options):
         if options['all']:
@@ -55,11 +82,8 @@ class Command(BaseCommand):
         if options['fix_leaders']:
             self.fix_leaders_without_users()
 
-        if options['fix_church_kpis']:
-            self.fix_church_kpis()
-
-        if options['fix_denomination_kpis']:
-            self.fix_denomination_kpis()
+        if options['fix_church_kpis'] or options['fix_denomination_kpis']:
+            self.recompute_kpis(options)
 
         self.stdout.write(self.style.SUCCESS('✅ Todas as correções concluídas!'))
 
@@ -130,61 +154,35 @@ class Command(BaseCommand):
             self.style.SUCCESS(f'✓ {count} líderes corrigidos')
         )
 
-    def fix_church_kpis(self):
-        """Corrigir KPIs das igrejas"""
-        self.stdout.write('🔍 Corrigindo KPIs das igrejas...')
-        
-        churches = Church.objects.all()
-        count = 0
-        
-        for church in churches:
-            # Contar membros reais
-            real_members = Member.objects.filter(church=church, is_active=True).count()
-            
-            # Contar visitantes reais
-            real_visitors = 0
-            try:
-                from apps.visitors.models import Visitor
-                real_visitors = Visitor.objects.filter(church=church).count()
-            except:
-                real_visitors = 0
-            
-            # Atualizar apenas se houver diferença
-            if church.total_members != real_members or church.total_visitors != real_visitors:
-                church.total_members = real_members
-                church.total_visitors = real_visitors
-                church.save(update_fields=['total_members', 'total_visitors', 'updated_at'])
-                count += 1
-        
-        self.stdout.write(
-            self.style.SUCCESS(f'✓ {count} igrejas atualizadas')
-        )
+    def _parse_since(self, value):
+        if not value:
+            return None
+        parsed = parse_datetime(value)
+        if parsed is None:
+            parsed_date = parse_date(value)
+            if parsed_date is None:
+                raise CommandError(f'Data inválida para --since: {value}')
+            parsed = datetime.combine(parsed_date, time.min)
+        if timezone.is_naive(parsed):
+            parsed = timezone.make_aware(parsed)
+        return parsed
+
+    def recompute_kpis(self, options):
+        """Recalcular KPIs de filiais, ministérios, igrejas e denominações em lote"""
+        since = self._parse_since(options.get('since'))
+        scope = f" desde {since:%d/%m/%Y %H:%M}" if since else ''
+        self.stdout.write(f'🔍 Recalculando KPIs{scope}...')
+
+        summary = KPIRecomputeService(
+            since=since,
+            denomination_ids=options.get('denominations'),
+            chunk_size=options['chunk_size'],
+        ).run(workers=options['workers'])
 
-    def fix_denomination_kpis(self):
-        """Corrigir KPIs das denominações"""
-        self.stdout.write('🔍 Corrigindo KPIs das denominações...')
-        
-        denominations = Denomination.objects.all()
-        count = 0
-        
-        for denomination in denominations:
-            # Contar igrejas reais
-            real_churches = denomination.churches.filter(is_active=True).count()
-            
-            # Contar membros reais de todas as igrejas
-            church_ids = denomination.churches.filter(is_active=True).values_list('id', flat=True)
-            real_total_members = Member.objects.filter(
-                church_id__in=church_ids, 
-                is_active=True
-            ).count()
-            
-            # Atualizar apenas se houver diferença
-            if denomination.total_churches != real_churches or denomination.total_members != real_total_members:
-                denomination.total_churches = real_churches
-                denomination.total_members = real_total_members
-                denomination.save(update_fields=['total_churches', 'total_members', 'updated_at'])
-                count += 1
-        
         self.stdout.write(
-            self.style.SUCCESS(f'✓ {count} denominações atualizadas')
-        )
\ No newline at end of file
+            self.style.SUCCESS(
+                f"✓ {summary['churches']} igrejas, {summary['branches']} filiais, "
+                f"{summary['ministries']} ministérios e {summary['denominations']} denominações "
+                f"atualizadas em {summary['duration_seconds']}s"
+            )
+        )
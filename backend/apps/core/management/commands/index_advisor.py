@@ -0,0 +1,91 @@
+"""
+Comando Django que roda EXPLAIN nas consultas mais frequentes do sistema
+e aponta as que fazem Seq Scan (ver apps.core.services.index_advisor).
+
+Uso: python manage.py index_advisor                      # planos estimados
+     python manage.py index_advisor --analyze            # executa as consultas (EXPLAIN ANALYZE)
+     python manage.py index_advisor --force-index        # índice escolhido mesmo em bancos pequenos
+     python manage.py index_advisor --fail-on-seq-scan   # código de saída != 0 se houver Seq Scan
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from apps.core.services.index_advisor import IndexAdvisor
+
+
+class Command(BaseCommand):
+    help = 'Roda EXPLAIN no catálogo de consultas frequentes e aponta Seq Scans'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--church',
+            type=int,
+            help='Igreja usada como parâmetro das consultas (padrão: a ativa de menor id)',
+        )
+        parser.add_argument(
+            '--analyze',
+            action='store_true',
+            help='Executar as consultas (EXPLAIN ANALYZE) e mostrar o tempo real',
+        )
+        parser.add_argument(
+            '--force-index',
+            action='store_true',
+            help='Desabilitar Seq Scan no planner para ver qual índice seria usado',
+        )
+        parser.add_argument(
+            '--fail-on-seq-scan',
+            action='store_true',
+            help='Encerrar com erro quando alguma consulta fizer Seq Scan',
+        )
+        parser.add_argument(
+            '--database',
+            default='default',
+            help='Alias do banco (padrão: default)',
+        )
+        parser.add_argument(
+            '--show-plans',
+            action='store_true',
+            help='Mostrar o plano completo de cada consulta',
+        )
+
+    def handle(self, *args, **options):
+        using = options['database']
+        if connections[using].vendor != 'postgresql':
+            raise CommandError('index_advisor requer PostgreSQL.')
+
+        advisor = IndexAdvisor(
+            church_id=options.get('church'),
+            analyze=options['analyze'],
+            force_index=options['force_index'],
+            using=using,
+        )
+        plans = advisor.run()
+        if not plans:
+            self.stdout.write(self.style.WARNING('⚠️ Nenhuma igreja ativa para usar como parâmetro das consultas.'))
+            return
+
+        self.stdout.write('🔍 Planos das consultas frequentes:')
+        flagged = []
+        for plan in plans:
+            timing = f', {plan.execution_ms:.2f} ms' if plan.execution_ms is not None else ''
+            details = f'custo {plan.total_cost:.2f}{timing}'
+            if plan.seq_scans:
+                flagged.append(plan)
+                self.stdout.write(self.style.WARNING(
+                    f'  ⚠️ {plan.label}: Seq Scan em {", ".join(plan.seq_scans)} ({details})'
+                ))
+            else:
+                indexes = ', '.join(plan.indexes) or '-'
+                self.stdout.write(f'  ✓ {plan.label}: {indexes} ({details})')
+            if options['show_plans']:
+                self.stdout.write(f'    {plan.description}')
+                self.stdout.write(plan.plan)
+
+        if not flagged:
+            self.stdout.write(self.style.SUCCESS(f'✓ {len(plans)} consultas sem Seq Scan'))
+            return
+        message = f'{len(flagged)} de {len(plans)} consultas com Seq Scan'
+        if options['fail_on_seq_scan']:
+            raise CommandError(message)
+        self.stdout.write(self.style.WARNING(f'⚠️ {message}. Em bancos pequenos, confira com --force-index.'))
@@ -0,0 +1,64 @@
+"""
+Comando Django para detectar e corrigir divergências nos contadores
+desnormalizados mantidos por apps.core.signals.
+
+Uso: python manage.py reconcile_counters            # apenas relatório
+     python manage.py reconcile_counters --fix      # corrige as divergências
+"""
+
+from collections import Counter
+
+from django.core.management.base import BaseCommand
+
+from apps.core.services import KPIRecomputeService
+
+
+class Command(BaseCommand):
+    help = 'Detecta (e opcionalmente corrige) divergências nos contadores de igrejas, filiais e denominações'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--fix',
+            action='store_true',
+            help='Gravar os valores corretos para os contadores divergentes',
+        )
+        parser.add_argument(
+            '--denomination',
+            type=int,
+            action='append',
+            dest='denominations',
+            help='Restringir a verificação a uma denominação (pode repetir)',
+        )
+        parser.add_argument(
+            '--verbose-drift',
+            action='store_true',
+            help='Listar cada contador divergente',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write('🔍 Verificando contadores desnormalizados...')
+
+        service = KPIRecomputeService(
+            denomination_ids=options.get('denominations'),
+            dry_run=not options['fix'],
+        )
+        service.run()
+
+        if not service.drift:
+            self.stdout.write(self.style.SUCCESS('✓ Nenhuma divergência encontrada'))
+            return
+
+        by_field = Counter((label, field) for label, _, field, _, _ in service.drift)
+        for (label, field), total in sorted(by_field.items()):
+            self.stdout.write(self.style.WARNING(f'  {label}.{field}: {total} divergência(s)'))
+
+        if options['verbose_drift']:
+            for label, pk, field, stored, expected in service.drift:
+                self.stdout.write(f'    {label}#{pk} {field}: {stored} → {expected}')
+
+        if options['fix']:
+            self.stdout.write(self.style.SUCCESS(f'✓ {len(service.drift)} contadores corrigidos'))
+        else:
+            self.stdout.write(
+                self.style.WARNING(f'⚠️ {len(service.drift)} contadores divergentes. Use --fix para corrigir.')
+            )
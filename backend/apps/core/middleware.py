@@ -2,9 +2,12 @@
 Middleware para gerenciamento de Multi-Tenancy (tenant = Denomination)
 """
 
+import re
 import threading
 import logging
 
+from django.conf import settings
+
 from apps.accounts.models import ChurchUser
 from apps.core.models import RoleChoices
 from apps.denominations.models import Denomination  # novo import
@@ -29,6 +32,13 @@ class TenantMiddleware:
 
     Mantém `request.church` e `request.branch` como escopos convenientes,
     mas o isolamento de dados deve usar SEMPRE `request.denomination`.
+
+    Roda antes da autenticação do DRF: requisições por token chegam aqui
+    como anônimas e não fazem a consulta de `ChurchUser` abaixo (o vínculo
+    delas vem do snapshot de `CachedTokenAuthentication`, já na view). A
+    consulta só ocorre para usuários de sessão (admin, API navegável).
+    Resolver o tenant dos tokens aqui ligaria o filtro do `TenantManager`
+    em todas as chamadas da API.
     """
 
     def __init__(self, get_response):
@@ -49,7 +59,7 @@ class TenantMiddleware:
             # Preferir o vínculo marcado como "ativo" pelo usuário;
             # fallback: qualquer vínculo ativo
             qs = (ChurchUser.objects
-                  .select_related('church__denomination', 'branch')
+                  .select_related('church__denomination', 'active_branch')
                   .filter(user=request.user, is_active=True)
                   .order_by('-is_user_active_church', 'id'))
             church_user = qs.first()
@@ -77,7 +87,11 @@ class TenantMiddleware:
         if header_church_id and request.user and request.user.is_authenticated:
             try:
                 from apps.churches.models import Church
-                header_church = Church.objects.get(pk=header_church_id)
+                # `_base_manager`: o TenantManager já estaria filtrado pela igreja
+                # resolvida acima, e o header serve justamente para trocá-la
+                header_church = Church._base_manager.select_related('denomination').get(
+                    pk=header_church_id, is_active=True
+                )
                 
                 # Verificar se o usuário tem acesso a essa igreja
                 has_church_access = ChurchUser.objects.filter(
@@ -99,7 +113,7 @@ class TenantMiddleware:
                         logger.info(f"[MIDDLEWARE] Tentando buscar branch ID={header_branch_id} da igreja ID={header_church.id}")
                         try:
                             from apps.branches.models import Branch
-                            header_branch = Branch.objects.get(
+                            header_branch = Branch._base_manager.get(
                                 pk=header_branch_id,
                                 church=header_church,  # Branch deve pertencer à igreja
                                 is_active=True
@@ -159,7 +173,7 @@ class TenantMiddleware:
                         # Opcional: reposicionar church/branch "ativas" para essa denom
                         if not (request.church and request.church.denomination_id == header_denom.id):
                             cu = (ChurchUser.objects
-                                  .select_related('church__denomination', 'branch')
+                                  .select_related('church__denomination', 'active_branch')
                                   .filter(user=request.user,
                                           is_active=True,
                                           church__denomination=header_denom)
@@ -185,3 +199,161 @@ class TenantMiddleware:
             del _thread_locals.request
 
         return response
+
+
+class RateLimitHeadersMiddleware:
+    """
+    Expõe os dados do throttle avaliado na requisição como cabeçalhos
+    `X-RateLimit-Limit`, `X-RateLimit-Remaining` e `X-RateLimit-Reset`.
+
+    Os valores são registrados em `request.ratelimit` pelos throttles de
+    `apps.core.throttling`.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+
+        ratelimit = getattr(request, 'ratelimit', None)
+        if ratelimit:
+            response['X-RateLimit-Limit'] = str(ratelimit['limit'])
+            response['X-RateLimit-Remaining'] = str(ratelimit['remaining'])
+            response['X-RateLimit-Reset'] = str(ratelimit['reset'])
+
+        return response
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Envia as leituras de requisições GET/HEAD cujo caminho casa com
+    `DATABASE_REPLICA_PATHS` para a réplica de leitura (`apps.core.db`).
+    """
+
+    SAFE_METHODS = ('GET', 'HEAD')
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.patterns = [
+            re.compile(pattern) for pattern in getattr(settings, 'DATABASE_REPLICA_PATHS', [])
+        ]
+
+    def __call__(self, request):
+        from apps.core.db import replica_enabled, use_replica
+
+        if (
+            request.method in self.SAFE_METHODS
+            and replica_enabled()
+            and any(pattern.search(request.path) for pattern in self.patterns)
+        ):
+            with use_replica():
+                return self.get_response(request)
+
+        return self.get_response(request)
+
+
+class CompressionMiddleware:
+    """
+    Compressão negociada das respostas: brotli (se o pacote `brotli` estiver
+    instalado) ou gzip, conforme o `Accept-Encoding` do cliente.
+
+    Só comprime tipos textuais (`RESPONSE_COMPRESSION_TYPES`) e respostas a
+    partir de `RESPONSE_COMPRESSION_MIN_SIZE` bytes; respostas em streaming
+    (exportações) são comprimidas pedaço a pedaço, exceto SSE.
+    """
+
+    DEFAULT_TYPES = ('application/json', 'text/', 'application/javascript', 'application/xml')
+    # gzip com bytes aleatórios no cabeçalho, como o GZipMiddleware (mitiga BREACH)
+    max_random_bytes = 100
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.min_size = getattr(settings, 'RESPONSE_COMPRESSION_MIN_SIZE', 1024)
+        self.types = tuple(getattr(settings, 'RESPONSE_COMPRESSION_TYPES', self.DEFAULT_TYPES))
+        self.brotli_quality = getattr(settings, 'RESPONSE_COMPRESSION_BROTLI_QUALITY', 5)
+        try:
+            import brotli
+        except ImportError:
+            brotli = None
+        self.brotli = brotli
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if not self._compressible(response):
+            return response
+
+        from django.utils.cache import patch_vary_headers
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = self._negotiate(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            response.streaming_content = self._compress_stream(response.streaming_content, encoding)
+            del response.headers['Content-Length']
+        else:
+            compressed = self._compress(response.content, encoding)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(compressed))
+
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+    def _compressible(self, response):
+        if response.has_header('Content-Encoding') or response.status_code == 304:
+            return False
+        content_type = response.get('Content-Type', '').split(';')[0].strip().lower()
+        if content_type == 'text/event-stream' or not content_type.startswith(self.types):
+            return False
+        if response.streaming:
+            return not response.is_async
+        return len(response.content) >= self.min_size
+
+    def _negotiate(self, header):
+        """'br' ou 'gzip' aceito pelo cliente (q > 0), preferindo brotli."""
+        accepted = {}
+        for part in header.split(','):
+            name, _, params = part.strip().partition(';')
+            quality = 1.0
+            params = params.strip()
+            if params.startswith('q='):
+                try:
+                    quality = float(params[2:])
+                except ValueError:
+                    quality = 0.0
+            accepted[name.strip().lower()] = quality
+        wildcard = accepted.get('*', 0.0)
+        if self.brotli is not None and accepted.get('br', wildcard) > 0:
+            return 'br'
+        if accepted.get('gzip', wildcard) > 0:
+            return 'gzip'
+        return None
+
+    def _compress(self, content, encoding):
+        from django.utils.text import compress_string
+
+        if encoding == 'br':
+            return self.brotli.compress(content, quality=self.brotli_quality)
+        return compress_string(content, max_random_bytes=self.max_random_bytes)
+
+    def _compress_stream(self, chunks, encoding):
+        from django.utils.text import compress_sequence
+
+        if encoding == 'gzip':
+            return compress_sequence(chunks, max_random_bytes=self.max_random_bytes)
+        return self._brotli_stream(chunks)
+
+    def _brotli_stream(self, chunks):
+        compressor = self.brotli.Compressor(quality=self.brotli_quality)
+        for chunk in chunks:
+            data = compressor.process(chunk) + compressor.flush()
+            if data:
+                yield data
+        yield compressor.finish()
@@ -158,3 +158,357 @@ class ChurchScopedQuerysetMixin:
 
         return queryset
 
+
+class SparseFieldsetMixin:
+    """
+    Sparse fieldsets para viewsets DRF: `?fields=id,full_name,phone` limita a
+    resposta (e o trabalho) aos campos pedidos e `?expand=` acrescenta campos
+    caros/aninhados declarados em `Meta.expandable_fields` do serializer.
+    Sem `?fields=` a resposta continua completa.
+
+    Com uma seleção ativa:
+    - os campos não pedidos são removidos do serializer, então
+      `SerializerMethodField`s caros nunca são calculados;
+    - o queryset é reduzido com `.only()` e os `select_related`/
+      `prefetch_related` ficam apenas com as relações usadas pelos campos.
+
+    As dependências de cada campo saem do `source`; para campos calculados
+    (métodos, propriedades) o serializer declara `Meta.field_sources =
+    {'age': ('birth_date',)}`. Se algum campo pedido não tiver dependências
+    conhecidas, o queryset não é reduzido (apenas a resposta).
+    """
+
+    sparse_fieldset_actions = ('list', 'retrieve')
+
+    def get_sparse_fieldset(self):
+        """(campos, expand) pedidos na query string, ou None sem seleção."""
+        if hasattr(self, '_sparse_fieldset'):
+            return self._sparse_fieldset
+        self._sparse_fieldset = None
+        request = getattr(self, 'request', None)
+        if request is not None and request.method == 'GET' and self.action in self.sparse_fieldset_actions:
+            fields = _split_param(request.query_params.get('fields'))
+            expand = _split_param(request.query_params.get('expand'))
+            if fields:
+                self._sparse_fieldset = (fields, expand)
+        return self._sparse_fieldset
+
+    def _selected_fields(self, serializer):
+        fields, expand = self.get_sparse_fieldset()
+        available = serializer.fields
+        expandable = set(getattr(getattr(serializer, 'Meta', None), 'expandable_fields', ()))
+        unknown = [name for name in fields if name not in available]
+        unknown += [name for name in expand if name not in expandable]
+        if unknown:
+            from rest_framework.exceptions import ValidationError
+            raise ValidationError({'fields': [f"Campo inválido: {name}" for name in unknown]})
+        wanted = set(fields) | set(expand)
+        return [name for name in available if name in wanted]
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        if self.get_sparse_fieldset():
+            target = getattr(serializer, 'child', serializer)
+            keep = self._selected_fields(target)
+            for name in list(target.fields):
+                if name not in keep:
+                    target.fields.pop(name)
+            _restrict_output(target, keep)
+        return serializer
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.get_sparse_fieldset():
+            serializer = self.get_serializer_class()(context=self.get_serializer_context())
+            queryset = prune_queryset(queryset, serializer, self._selected_fields(serializer))
+        return queryset
+
+
+def _split_param(value):
+    return [part.strip() for part in (value or '').split(',') if part.strip()]
+
+
+def _restrict_output(serializer, keep):
+    """Filtra chaves acrescentadas por `to_representation` customizados."""
+    keep = set(keep)
+    to_representation = serializer.to_representation
+
+    def restricted(instance):
+        return {key: value for key, value in to_representation(instance).items() if key in keep}
+
+    serializer.to_representation = restricted
+
+
+def _field_dependencies(name, field, meta):
+    """Caminhos do ORM usados por um campo do serializer (None se desconhecidos)."""
+    from rest_framework import serializers
+
+    declared = getattr(meta, 'field_sources', {})
+    if name in declared:
+        return tuple(declared[name])
+    if isinstance(field, serializers.SerializerMethodField) or field.source == '*':
+        return None
+    attrs = list(field.source_attrs)
+    # `get_<campo>_display` depende apenas do próprio campo
+    if attrs[-1].startswith('get_') and attrs[-1].endswith('_display'):
+        attrs[-1] = attrs[-1][len('get_'):-len('_display')]
+    return ('__'.join(attrs),)
+
+
+def _resolve_path(model, path, selected):
+    """
+    Dependências de um caminho do ORM: (colunas para `only`, relações FK a
+    juntar, relações carregadas inteiras, raiz de prefetch). None quando o
+    caminho não começa por um campo do modelo. `selected` são as relações
+    que o queryset original já trazia com `select_related`.
+    """
+    from django.core.exceptions import FieldDoesNotExist
+
+    joined = set()
+    parts = path.split('__')
+    for index, part in enumerate(parts):
+        prefix = '__'.join(parts[:index + 1])
+        try:
+            field = model._meta.get_field(part)
+        except FieldDoesNotExist:
+            if not index:
+                return None
+            # Propriedade/método do relacionado: carrega o objeto inteiro
+            relation = '__'.join(parts[:index])
+            return {relation}, joined, {relation}, None
+        if field.many_to_many or field.one_to_many or (field.one_to_one and not field.concrete):
+            return set(), joined, set(), prefix
+        if not field.is_relation:
+            return {prefix}, joined, set(), None
+        if index == len(parts) - 1:
+            # A própria relação (id ou serializer aninhado)
+            whole = {prefix} if prefix in selected else set()
+            return {prefix}, joined | whole, whole, None
+        joined.add(prefix)
+        model = field.related_model
+    return set(), joined, set(), None
+
+
+def prune_queryset(queryset, serializer, field_names):
+    """Reduz colunas, `select_related` e prefetches aos usados por `field_names`."""
+    meta = getattr(serializer, 'Meta', None)
+    existing = queryset.query.select_related
+    if existing is True:
+        return queryset
+    selected = _flatten(existing) if isinstance(existing, dict) else set()
+
+    only, joined, whole, prefetches = {'pk'}, set(), set(), set()
+    for name in field_names:
+        dependencies = _field_dependencies(name, serializer.fields[name], meta)
+        if dependencies is None:
+            return queryset
+        for path in dependencies:
+            resolved = _resolve_path(queryset.model, path, selected)
+            if resolved is None:
+                return queryset
+            path_only, path_joined, path_whole, prefetch = resolved
+            only |= path_only
+            joined |= path_joined
+            whole |= path_whole
+            if prefetch:
+                prefetches.add(prefetch.split('__')[0])
+
+    # Relações carregadas inteiras não podem ser restringidas por subcaminhos
+    only = {path for path in only if not any(path.startswith(f'{relation}__') for relation in whole)}
+    lookups = [
+        lookup for lookup in queryset._prefetch_related_lookups
+        if getattr(lookup, 'prefetch_to', lookup).split('__')[0] in prefetches
+    ]
+    queryset = queryset.select_related(None).prefetch_related(None).prefetch_related(*lookups)
+    if joined:
+        queryset = queryset.select_related(*sorted(joined))
+    return queryset.only(*sorted(only))
+
+
+def _flatten(tree, prefix=''):
+    paths = set()
+    for name, children in tree.items():
+        path = f'{prefix}{name}'
+        paths.add(path)
+        paths |= _flatten(children, f'{path}__')
+    return paths
+
+
+class ConditionalReadMixin:
+    """
+    GETs condicionais (ETag/Last-Modified) para list/retrieve de viewsets DRF
+    (`ConditionalRequestMixin` acrescenta `If-Match` nas escritas).
+
+    A versão dos dados vem de uma única agregação sobre o queryset já
+    filtrado (escopo do usuário + filtros): `MAX(updated_at)` e `COUNT` para
+    listagens (exclusões mudam a contagem), a linha para detalhes. Com
+    `If-None-Match` igual, responde 304 antes de serializar.
+
+    O ETag tem duas partes, `W/"<versão>-<contexto>"`:
+    - versão: agregação acima (listagem) ou pk + `updated_at` (detalhe);
+    - contexto: `MAX(updated_at)`/`COUNT` das relações exibidas no payload
+      (`conditional_related`), gerações do `apps.core.response_cache` para
+      dados que mudam sem tocar `updated_at` (contadores, em
+      `conditional_depends_on`) e o usuário.
+    """
+
+    conditional_related = ()
+    conditional_depends_on = ()
+
+    def get_conditional_tenant(self, request):
+        from apps.core.response_cache import active_church
+
+        church = active_church(self, request)
+        return f'church:{church.pk}' if church else None
+
+    def _conditional_queryset(self, detail):
+        queryset = self.filter_queryset(self.get_queryset())
+        if detail:
+            lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+            queryset = queryset.filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        return queryset
+
+    def get_conditional_validators(self, detail=False):
+        """(etag, last_modified) dos dados da resposta, ou None se não aplicável."""
+        from django.core.exceptions import ValidationError as DjangoValidationError
+        from django.db.models import Count, Max
+
+        generations = []
+        if self.conditional_depends_on:
+            from apps.core.response_cache import get_generations
+
+            tenant = self.get_conditional_tenant(self.request)
+            if not tenant:
+                return None
+            generations = get_generations(tenant, self.conditional_depends_on)
+
+        aggregates = {'last': Max('updated_at'), 'count': Count('pk', distinct=True)}
+        if detail:
+            aggregates['pk'] = Max('pk')
+        for relation in self.conditional_related:
+            aggregates[f'{relation}__last'] = Max(f'{relation}__updated_at')
+            aggregates[f'{relation}__count'] = Count(relation, distinct=True)
+        try:
+            values = self._conditional_queryset(detail).order_by().aggregate(**aggregates)
+        except (ValueError, TypeError, DjangoValidationError):
+            # Lookup inválido: o fluxo normal responde (404/400)
+            return None
+        if detail and not values['count']:
+            return None
+
+        last = values['last']
+        version = _digest(values['pk'], last) if detail else _digest(last, values['count'])
+        context = _digest(
+            [(values[f'{relation}__last'], values[f'{relation}__count']) for relation in self.conditional_related],
+            generations,
+            self.request.user.pk,
+        )
+        related = [values[f'{relation}__last'] for relation in self.conditional_related]
+        last_modified = max([value for value in [last, *related] if value], default=None)
+        return f'W/"{version}-{context}"', last_modified
+
+    def _not_modified(self, request, validators, detail):
+        from django.utils.http import parse_http_date_safe
+        from rest_framework.response import Response
+
+        etag, last_modified = validators
+        if_none_match = request.headers.get('If-None-Match')
+        if if_none_match:
+            matched = '*' in _etags(if_none_match) or _opaque(etag) in _etags(if_none_match)
+        elif detail and last_modified and not self.conditional_depends_on and request.headers.get('If-Modified-Since'):
+            # Só no detalhe: exclusões em listagens não alteram MAX(updated_at)
+            since = parse_http_date_safe(request.headers['If-Modified-Since'])
+            matched = since is not None and int(last_modified.timestamp()) <= since
+        else:
+            matched = False
+        if not matched:
+            return None
+        return self._with_validators(Response(status=304), validators)
+
+    def _with_validators(self, response, validators):
+        from django.utils.cache import patch_cache_control, patch_vary_headers
+        from django.utils.http import http_date
+
+        if validators and (response.status_code == 304 or 200 <= response.status_code < 300):
+            etag, last_modified = validators
+            response['ETag'] = etag
+            if last_modified:
+                response['Last-Modified'] = http_date(last_modified.timestamp())
+            # Navegador guarda, mas revalida a cada uso
+            patch_cache_control(response, private=True, no_cache=True)
+            patch_vary_headers(response, ('Authorization',))
+        return response
+
+    def _conditional_read(self, handler, request, detail, *args, **kwargs):
+        validators = self.get_conditional_validators(detail=detail) if request.method in ('GET', 'HEAD') else None
+        if validators:
+            not_modified = self._not_modified(request, validators, detail)
+            if not_modified is not None:
+                return not_modified
+        return self._with_validators(handler(request, *args, **kwargs), validators)
+
+    def list(self, request, *args, **kwargs):
+        return self._conditional_read(super().list, request, False, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._conditional_read(super().retrieve, request, True, *args, **kwargs)
+
+
+class ConditionalRequestMixin(ConditionalReadMixin):
+    """
+    `ConditionalReadMixin` + `If-Match` em update/partial_update/destroy:
+    compara apenas a versão da linha (concorrência otimista); se divergir,
+    responde 412 sem alterar nada.
+    """
+
+    def _check_if_match(self, request):
+        """412 quando `If-Match` não corresponde à versão atual da linha."""
+        from rest_framework.response import Response
+
+        if_match = request.headers.get('If-Match')
+        if not if_match:
+            return None
+        tags = _etags(if_match)
+        if '*' in tags:
+            return None
+        instance = self.get_object()
+        version = _digest(instance.pk, instance.updated_at)
+        if any(tag.split('-')[0] == version for tag in tags):
+            return None
+        return Response(
+            {'detail': 'O registro foi alterado por outra requisição. Recarregue e tente novamente.'},
+            status=412,
+        )
+
+    def update(self, request, *args, **kwargs):
+        failed = self._check_if_match(request)
+        if failed is not None:
+            return failed
+        response = super().update(request, *args, **kwargs)
+        if response.status_code == 200:
+            response = self._with_validators(response, self.get_conditional_validators(detail=True))
+        return response
+
+    def destroy(self, request, *args, **kwargs):
+        failed = self._check_if_match(request)
+        if failed is not None:
+            return failed
+        return super().destroy(request, *args, **kwargs)
+
+
+def _digest(*values):
+    import hashlib
+
+    return hashlib.md5(repr(values).encode()).hexdigest()[:16]
+
+
+def _opaque(tag):
+    """Parte opaca de um ETag (sem `W/` e aspas)."""
+    tag = tag.strip()
+    if tag.startswith('W/'):
+        tag = tag[2:]
+    return tag.strip('"')
+
+
+def _etags(header):
+    return {_opaque(tag) for tag in header.split(',') if tag.strip()}
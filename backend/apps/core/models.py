@@ -9,6 +9,8 @@ from django.utils import timezone
 from django.core.validators import RegexValidator
 from django.core.exceptions import ValidationError
 
+from .query_cache import CachedQuerySetMixin
+
 
 class TimestampedModel(models.Model):
     """
@@ -73,9 +75,10 @@ class ActiveManager(models.Manager):
     def get_queryset(self):
         return super().get_queryset().filter(is_active=True)
 
-class TenantQuerySet(models.QuerySet):
+class TenantQuerySet(CachedQuerySetMixin, models.QuerySet):
     """
     QuerySet que aplica o filtro de tenant (igreja) automaticamente.
+    `.cached()` guarda o resultado por igreja (ver apps.core.query_cache).
     """
     def for_church(self, church):
         if not church:
@@ -126,6 +129,10 @@ class TenantManager(models.Manager):
                 return field.name
         return None
 
+    def cached(self, timeout=None):
+        """Queryset padrão com o resultado guardado no cache por igreja."""
+        return self.get_queryset().cached(timeout)
+
     def all_for_church(self, church):
         """
         Retorna TODOS os registros para uma igreja, incluindo os inativos.
@@ -273,7 +273,7 @@ class CanViewFinancialReports(BasePermission):
             return False
         
         return request.user.church_users.filter(
-            can_view_financial_reports=True,
+            can_view_reports=True,
             is_active=True
         ).exists()
 
@@ -0,0 +1,187 @@
+"""
+Cache de resultados de querysets por igreja para dados de referência.
+
+Filiais, ministérios e líderes mudam pouco, mas são consultados a cada
+formulário (dropdowns). `.cached()` marca o queryset: ao ser avaliado, a
+lista de linhas (valores das colunas na ordem do resultado, PK incluída) é
+guardada no cache e as próximas avaliações reconstroem as instâncias com
+`Model.from_db`, sem ir ao banco.
+
+    Branch.objects.filter(church=church).cached().order_by('name')
+    Member.objects.filter(church=church, user__isnull=False).cached(600)
+
+Regras:
+- só modelos registrados em `QUERY_CACHE_MODELS` (ImproperlyConfigured nos
+  demais);
+- o queryset precisa filtrar a igreja diretamente (`church=...`,
+  `church_id=...`); sem esse filtro, com `select_related`, anotações ou
+  `extra` ele é avaliado normalmente, sem cache;
+- a chave inclui o SQL e os parâmetros, então filtros, ordenação e fatias
+  diferentes são entradas diferentes.
+
+Invalidação: uma geração por (igreja, modelo), reaproveitando os contadores
+de `apps.core.response_cache`, incrementada por post_save/post_delete
+(`connect_query_cache_signals`). Alterações em massa (`update`,
+`bulk_create`) não disparam signals e devem chamar `invalidate_query_cache`.
+Campos mantidos por `update()` (ex.: contadores das filiais) podem ficar
+defasados até a próxima invalidação: use o cache só para dados de
+referência.
+"""
+
+import hashlib
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet, ImproperlyConfigured
+from django.db.models.query import ModelIterable
+from django.db.models.signals import post_delete, post_save
+
+from .response_cache import get_generations, invalidate
+
+CACHE_PREFIX = 'query-cache'
+
+# Modelos que aceitam `.cached()` (e cujas alterações invalidam o cache)
+QUERY_CACHE_MODELS = (
+    'branches.Branch',
+    'activities.Ministry',
+    'members.Member',
+    'accounts.ChurchUser',
+)
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def _dependency(model):
+    return f'query:{model._meta.label}'
+
+
+def invalidate_query_cache(model, church_ids):
+    """Descarta os resultados em cache de `model` nas igrejas informadas."""
+    invalidate([f'church:{church_id}' for church_id in church_ids if church_id], [_dependency(model)])
+
+
+class CachedQuerySetMixin:
+    """Adiciona `.cached(timeout)` a um QuerySet (ver módulo)."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._query_cache_timeout = None
+
+    def cached(self, timeout=None):
+        """Queryset cujo resultado é guardado no cache por igreja."""
+        if self.model._meta.label not in QUERY_CACHE_MODELS:
+            raise ImproperlyConfigured(
+                f'{self.model._meta.label} não está em QUERY_CACHE_MODELS; `.cached()` não é permitido.'
+            )
+        clone = self._chain()
+        clone._query_cache_timeout = _setting('QUERY_CACHE_TIMEOUT', 300) if timeout is None else timeout
+        return clone
+
+    def _clone(self):
+        clone = super()._clone()
+        clone._query_cache_timeout = self._query_cache_timeout
+        return clone
+
+    def _fetch_all(self):
+        if self._result_cache is None and self._query_cache_timeout is not None:
+            key = self._query_cache_key()
+            if key is not None:
+                self._result_cache = self._fetch_cached(key)
+        super()._fetch_all()
+
+    # =====================================
+    # CHAVE
+    # =====================================
+
+    def _cacheable(self):
+        query = self.query
+        return (
+            self._iterable_class is ModelIterable
+            and not query.select_related
+            and not query.annotations
+            and not query.extra
+        )
+
+    def _filtered_church_id(self):
+        """Igreja filtrada diretamente no WHERE (`church=...`), ou None."""
+        if self.query.where.connector != 'AND' or self.query.where.negated:
+            return None
+        for child in self.query.where.children:
+            target = getattr(getattr(child, 'lhs', None), 'target', None)
+            if (
+                getattr(child, 'lookup_name', None) == 'exact'
+                and target is not None
+                and target.name == 'church'
+                and target.model is self.model
+                and child.lhs.alias == self.query.base_table
+            ):
+                value = getattr(child.rhs, 'pk', child.rhs)
+                try:
+                    return int(value)
+                except (TypeError, ValueError):
+                    return None
+        return None
+
+    def _query_cache_key(self):
+        if not self._cacheable():
+            return None
+        church_id = self._filtered_church_id()
+        if church_id is None:
+            return None
+        try:
+            sql, params = self.query.get_compiler(self.db).as_sql()
+        except EmptyResultSet:
+            return None
+        label = self.model._meta.label
+        generation = get_generations(f'church:{church_id}', [_dependency(self.model)])[0]
+        digest = hashlib.sha256(f'{self.db}|{sql}|{params!r}'.encode()).hexdigest()[:32]
+        return f'{CACHE_PREFIX}:{label}:{church_id}:{generation}:{digest}'
+
+    # =====================================
+    # LEITURA / GRAVAÇÃO
+    # =====================================
+
+    def _fetch_cached(self, key):
+        entry = cache.get(key)
+        if entry is not None:
+            fields = entry['fields']
+            return [self.model.from_db(self.db, fields, values) for values in entry['rows']]
+
+        uncached = self._chain()
+        uncached._query_cache_timeout = None
+        instances = list(uncached)
+        fields = [
+            field.attname for field in self.model._meta.concrete_fields
+            if instances and field.attname not in instances[0].get_deferred_fields()
+        ]
+        rows = [[getattr(instance, name) for name in fields] for instance in instances]
+        cache.set(key, {'fields': fields, 'rows': rows}, self._query_cache_timeout)
+        return instances
+
+
+# =====================================
+# SIGNALS
+# =====================================
+
+def _instance_church_ids(instance):
+    church_ids = {instance.__dict__.get('church_id')}
+    # Mudança de igreja: a igreja anterior também perde o resultado
+    snapshot = getattr(instance, '_counter_snapshot', None) or {}
+    church_ids.add(snapshot.get('church_id'))
+    return church_ids
+
+
+def _model_changed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        invalidate_query_cache(sender, _instance_church_ids(instance))
+
+
+def connect_query_cache_signals():
+    """Registra a invalidação por modelo (chamado em `CoreConfig.ready`)."""
+    for label in QUERY_CACHE_MODELS:
+        model = apps.get_model(label)
+        post_save.connect(_model_changed, sender=model, dispatch_uid=f'query-cache-save-{label}')
+        post_delete.connect(_model_changed, sender=model, dispatch_uid=f'query-cache-delete-{label}')
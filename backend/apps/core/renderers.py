@@ -0,0 +1,129 @@
+"""
+Renderização JSON da API.
+
+- `FastJSONRenderer`: o `JSONRenderer` do DRF com codificação pelo `orjson`
+  (UUID, datas e datetimes nativos; Decimal, lazy strings, querysets etc.
+  pelo mesmo `default` do encoder do DRF, então o JSON gerado é o mesmo).
+  Sem o `orjson` instalado, ou para o que ele não representa (inteiros
+  acima de 64 bits, indentação pedida pelo cliente, `UNICODE_JSON=False`),
+  usa o encoder padrão do DRF.
+- `StreamingJSONResponse`: listas grandes (exportações) enviadas em
+  pedaços, serializadas por lote, sem montar o payload inteiro em memória.
+
+Uso:
+    return StreamingJSONResponse(
+        serialize_in_chunks(queryset, MemberSerializer, context=...),
+        envelope={'count': total}, key='members',
+    )
+"""
+
+import logging
+
+from django.http import StreamingHttpResponse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dependência opcional
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# Tamanho padrão dos lotes serializados em streaming
+STREAM_CHUNK_SIZE = 500
+
+_default = JSONEncoder().default
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+    _ENCODE_ERRORS = (orjson.JSONEncodeError,)
+else:
+    _ORJSON_OPTIONS = 0
+    _ENCODE_ERRORS = ()
+
+# Separadores de linha do JavaScript: escapados como no JSONRenderer do DRF
+_LINE_SEPARATORS = ((b'\xe2\x80\xa8', b'\\u2028'), (b'\xe2\x80\xa9', b'\\u2029'))
+
+
+def _escape_separators(content):
+    for raw, escaped in _LINE_SEPARATORS:
+        if raw in content:
+            content = content.replace(raw, escaped)
+    return content
+
+
+def dumps(data):
+    """JSON (bytes) de `data`, pelo `orjson` quando disponível."""
+    if orjson is not None:
+        try:
+            return _escape_separators(orjson.dumps(data, default=_default, option=_ORJSON_OPTIONS))
+        except _ENCODE_ERRORS:
+            logger.debug("[JSON] orjson não representa o payload; usando o encoder do DRF")
+    return JSONRenderer().render(data)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """`JSONRenderer` com codificação pelo `orjson` (mesmo formato de saída)."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if orjson is None or self.ensure_ascii or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            return _escape_separators(orjson.dumps(data, default=_default, option=_ORJSON_OPTIONS))
+        except _ENCODE_ERRORS:
+            return super().render(data, accepted_media_type, renderer_context)
+
+
+# =====================================
+# STREAMING
+# =====================================
+
+def serialize_in_chunks(queryset, serializer_class, context=None, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Itens serializados em lotes de `chunk_size`: cada lote é um `many=True`
+    (mantém as otimizações por página dos serializers) lido com um cursor
+    do servidor.
+    """
+    chunk = []
+    for instance in queryset.iterator(chunk_size=chunk_size):
+        chunk.append(instance)
+        if len(chunk) >= chunk_size:
+            yield from serializer_class(chunk, many=True, context=context or {}).data
+            chunk = []
+    if chunk:
+        yield from serializer_class(chunk, many=True, context=context or {}).data
+
+
+def stream_json(items, envelope=None, key=None, batch_size=100):
+    """
+    Gera o JSON de `items` em pedaços: uma lista no topo ou, com `key`, um
+    objeto com os campos de `envelope` seguidos de `key: [...]`.
+    """
+    if key is None:
+        yield b'['
+    else:
+        head = dumps({**(envelope or {}), key: []})
+        # Abre o objeto até a lista vazia do final: {"count":3,"members":[
+        yield head[:-2]
+    separator = b''
+    batch = []
+    for item in items:
+        batch.append(dumps(item))
+        if len(batch) >= batch_size:
+            yield separator + b','.join(batch)
+            separator = b','
+            batch = []
+    if batch:
+        yield separator + b','.join(batch)
+    yield b']' if key is None else b']}'
+
+
+class StreamingJSONResponse(StreamingHttpResponse):
+    """Resposta JSON em streaming (ver `stream_json`)."""
+
+    def __init__(self, items, envelope=None, key=None, **kwargs):
+        kwargs.setdefault('content_type', 'application/json')
+        super().__init__(stream_json(items, envelope=envelope, key=key), **kwargs)
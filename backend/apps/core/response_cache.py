@@ -0,0 +1,335 @@
+"""
+Cache de respostas dos dashboards com invalidação por dependência.
+
+Vários usuários da mesma igreja abrem os mesmos dashboards ao mesmo tempo
+(ex.: equipe no início do culto) e cada um recalculava os mesmos agregados.
+Aqui a resposta inteira é guardada no cache, com a chave formada por
+(endpoint, tenant, filial, escopo do papel, parâmetros, data).
+
+Invalidação: cada endpoint declara de quais dados depende (`members`,
+`visitors`, `activities`, `branches`, `churches`). Para cada tenant
+(`church:<id>` e `denomination:<id>`) e dependência existe um contador de
+geração, incrementado por post_save/post_delete dos modelos. As gerações
+atuais fazem parte da chave: depois de uma alteração a chave muda e a
+entrada antiga nunca mais é lida (expira sozinha). Operações em massa, que
+não disparam signals, chamam `invalidate` explicitamente.
+
+Proteção contra estouro: na falta da entrada, apenas uma requisição por
+chave recalcula (trava com `cache.add`); as demais aguardam a entrada ser
+gravada, até `RESPONSE_CACHE_LOCK_WAIT` segundos.
+
+Uso (actions DRF ou views com `@api_view`):
+
+    @action(detail=False, methods=['get'])
+    @cache_response('members-dashboard', depends_on=('members',))
+    def dashboard(self, request):
+        ...
+
+Superusuários não usam o cache (seus dashboards atravessam tenants).
+Hits, misses e esperas por endpoint ficam em `response_cache_metrics()`.
+"""
+
+import functools
+import hashlib
+import logging
+import threading
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+from rest_framework.response import Response
+
+logger = logging.getLogger(__name__)
+
+CACHE_PREFIX = 'response-cache'
+
+# Dependência -> modelo cujas alterações invalidam as respostas
+DEPENDENCIES = {
+    'members': 'members.Member',
+    'visitors': 'visitors.Visitor',
+    'activities': 'activities.Activity',
+    'branches': 'branches.Branch',
+    'churches': 'churches.Church',
+}
+_MODEL_DEPENDENCIES = {label: dependency for dependency, label in DEPENDENCIES.items()}
+
+# Tempo de cache do mapeamento igreja -> denominação (segundos)
+DENOMINATION_CACHE_TIMEOUT = 3600
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+# =====================================
+# GERAÇÕES
+# =====================================
+
+def _generation_key(tenant, dependency):
+    return f'{CACHE_PREFIX}:gen:{tenant}:{dependency}'
+
+
+def _initial_generation():
+    # Começa no relógio (ms): se o contador for descartado pelo cache, a nova
+    # geração nunca coincide com uma já usada em chaves ainda válidas
+    return int(time.time() * 1000)
+
+
+def get_generations(tenant, dependencies):
+    """Gerações atuais das dependências do tenant (uma ida ao cache)."""
+    keys = [_generation_key(tenant, dependency) for dependency in dependencies]
+    values = cache.get_many(keys)
+    generations = []
+    for key in keys:
+        if key not in values:
+            cache.add(key, _initial_generation(), None)
+            values[key] = cache.get(key)
+        generations.append(values[key])
+    return generations
+
+
+def _bump(keys):
+    for key in keys:
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, _initial_generation(), None)
+
+
+def invalidate(tenants, dependencies):
+    """
+    Invalida as respostas dos `tenants` (ex.: 'church:3') que dependem de
+    `dependencies`. Dentro de uma transação incrementa agora e de novo no
+    commit, para não reaproveitar um recálculo feito antes do commit.
+    """
+    keys = [
+        _generation_key(tenant, dependency)
+        for tenant in set(tenants) if tenant
+        for dependency in dependencies
+    ]
+    if not keys:
+        return
+    _bump(keys)
+    if connection.in_atomic_block:
+        transaction.on_commit(lambda: _bump(keys))
+
+
+def _denomination_key(church_id):
+    return f'{CACHE_PREFIX}:church-denomination:{church_id}'
+
+
+def church_tenants(church_ids):
+    """Tenants afetados por mudanças nas igrejas: a igreja e sua denominação."""
+    from apps.churches.models import Church
+
+    church_ids = {church_id for church_id in church_ids if church_id}
+    if not church_ids:
+        return []
+    keys = {church_id: _denomination_key(church_id) for church_id in church_ids}
+    known = cache.get_many(list(keys.values()))
+    missing = [church_id for church_id, key in keys.items() if key not in known]
+    if missing:
+        rows = dict(Church._base_manager.filter(pk__in=missing).values_list('pk', 'denomination_id'))
+        fresh = {keys[church_id]: rows.get(church_id) or 0 for church_id in missing}
+        cache.set_many(fresh, DENOMINATION_CACHE_TIMEOUT)
+        known.update(fresh)
+
+    tenants = {f'church:{church_id}' for church_id in church_ids}
+    tenants.update(f'denomination:{known[key]}' for key in keys.values() if known[key])
+    return list(tenants)
+
+
+# =====================================
+# SIGNALS
+# =====================================
+
+def _instance_church_ids(instance):
+    if instance._meta.label == 'churches.Church':
+        return {instance.pk}
+    church_ids = {instance.__dict__.get('church_id')}
+    # Estado anterior guardado pelos contadores (mudança de igreja)
+    snapshot = getattr(instance, '_counter_snapshot', None) or {}
+    church_ids.add(snapshot.get('church_id'))
+    return church_ids
+
+
+def _dependency_changed(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    dependency = _MODEL_DEPENDENCIES[sender._meta.label]
+    tenants = church_tenants(_instance_church_ids(instance))
+    if sender._meta.label == 'churches.Church':
+        # A igreja pode ter mudado de denominação: invalida a antiga (acima) e a atual
+        cache.delete(_denomination_key(instance.pk))
+        if instance.denomination_id:
+            tenants.append(f'denomination:{instance.denomination_id}')
+    invalidate(tenants, [dependency])
+
+
+def connect_response_cache_signals():
+    """Registra a invalidação por modelo (chamado em `CoreConfig.ready`)."""
+    for label in _MODEL_DEPENDENCIES:
+        model = apps.get_model(label)
+        post_save.connect(_dependency_changed, sender=model, dispatch_uid=f'response-cache-save-{label}')
+        post_delete.connect(_dependency_changed, sender=model, dispatch_uid=f'response-cache-delete-{label}')
+
+
+# =====================================
+# MÉTRICAS
+# =====================================
+
+_metrics = {}
+_metrics_lock = threading.Lock()
+
+
+def _count(endpoint, outcome):
+    with _metrics_lock:
+        entry = _metrics.setdefault(endpoint, {'hits': 0, 'misses': 0, 'coalesced': 0, 'bypassed': 0})
+        entry[outcome] += 1
+
+
+def response_cache_metrics():
+    """Hits, misses, esperas atendidas pelo recálculo de outra requisição e bypass por endpoint."""
+    with _metrics_lock:
+        return {endpoint: dict(values) for endpoint, values in _metrics.items()}
+
+
+def reset_response_cache_metrics():
+    with _metrics_lock:
+        _metrics.clear()
+
+
+# =====================================
+# CACHE DE RESPOSTAS
+# =====================================
+
+def _scope_of(request, church, vary_on):
+    """Filial ativa e escopo do papel do usuário na igreja (filiais gerenciadas)."""
+    from apps.accounts.models import ChurchUser
+
+    parts = []
+    if 'branch' in vary_on:
+        branch = request.headers.get('X-Branch') or getattr(getattr(request, 'branch', None), 'pk', None)
+        parts.append(f'branch={branch or ""}')
+    if 'role' in vary_on:
+        church_user = (
+            ChurchUser.objects.filter(user=request.user, church=church, is_active=True)
+            .values('id', 'role', 'active_branch_id')
+            .first()
+        )
+        if church_user:
+            managed = sorted(
+                ChurchUser.managed_branches.through.objects
+                .filter(churchuser_id=church_user['id'])
+                .values_list('branch_id', flat=True)
+            )
+            parts.append(
+                f"role={church_user['role']};active={church_user['active_branch_id']};managed={managed}"
+            )
+    return parts
+
+
+def _entry_key(endpoint, tenant, parts, params, generations):
+    digest = hashlib.md5(
+        repr((parts, sorted(params.lists()), timezone.localdate().isoformat())).encode()
+    ).hexdigest()
+    return f"{CACHE_PREFIX}:{endpoint}:{tenant}:{digest}:{'.'.join(map(str, generations))}"
+
+
+def _cacheable(response):
+    return (
+        isinstance(response, Response)
+        and response.status_code == 200
+        and not response.has_header('X-Dashboard-Partial')
+    )
+
+
+def _from_entry(entry, outcome):
+    response = Response(entry['data'], status=entry['status'])
+    response['X-Cache'] = outcome
+    return response
+
+
+def cached_response(request, endpoint, tenant, compute, depends_on, vary_on=('branch', 'role'), church=None):
+    """
+    Resposta de `compute()` em cache para o `tenant` ('church:<id>' ou
+    'denomination:<id>'); `tenant=None` desativa o cache nesta requisição.
+    """
+    timeout = _setting('RESPONSE_CACHE_TIMEOUT', 300)
+    if not tenant or not timeout or request.user.is_superuser:
+        _count(endpoint, 'bypassed')
+        return compute()
+
+    generations = get_generations(tenant, depends_on)
+    key = _entry_key(endpoint, tenant, _scope_of(request, church, vary_on), request.query_params, generations)
+
+    entry = cache.get(key)
+    if entry is not None:
+        _count(endpoint, 'hits')
+        return _from_entry(entry, 'HIT')
+
+    lock_key = f'{key}:lock'
+    if not cache.add(lock_key, 1, _setting('RESPONSE_CACHE_LOCK_TIMEOUT', 30)):
+        deadline = time.monotonic() + _setting('RESPONSE_CACHE_LOCK_WAIT', 5.0)
+        while time.monotonic() < deadline:
+            time.sleep(0.05)
+            entry = cache.get(key)
+            if entry is not None:
+                _count(endpoint, 'coalesced')
+                return _from_entry(entry, 'HIT')
+        logger.warning(f"[RESPONSE CACHE] {endpoint}: espera pelo recálculo esgotada, calculando localmente")
+        lock_key = None
+
+    try:
+        response = compute()
+        if _cacheable(response):
+            cache.set(key, {'status': response.status_code, 'data': response.data}, timeout)
+    finally:
+        if lock_key:
+            cache.delete(lock_key)
+    _count(endpoint, 'misses')
+    response['X-Cache'] = 'MISS'
+    return response
+
+
+def user_active_church(view, request):
+    """Igreja ativa do usuário (`ChurchUser.objects.get_active_church_for_user`)."""
+    from apps.accounts.models import ChurchUser
+    return ChurchUser.objects.get_active_church_for_user(request.user)
+
+
+def active_church(view, request):
+    """Igreja do dashboard: a mesma regra do `ChurchScopedQuerysetMixin` ou a igreja ativa do usuário."""
+    if hasattr(view, '_get_active_church'):
+        return view._get_active_church(request)
+    return user_active_church(view, request)
+
+
+def cache_response(endpoint, depends_on, vary_on=('branch', 'role'), church=active_church):
+    """
+    Decorator de actions DRF (`def action(self, request, ...)`) e views de
+    função (`def view(request, ...)`). `church(view, request)` resolve a
+    igreja da resposta, com a mesma regra usada pela view.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if hasattr(args[0], 'query_params'):
+                view, request = None, args[0]
+            else:
+                view, request = args[0], args[1]
+            resolved = church(view, request)
+            return cached_response(
+                request, endpoint,
+                tenant=f'church:{resolved.pk}' if resolved else None,
+                compute=lambda: func(*args, **kwargs),
+                depends_on=depends_on,
+                vary_on=vary_on,
+                church=resolved,
+            )
+        return wrapper
+    return decorator
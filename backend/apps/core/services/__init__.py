@@ -4,5 +4,8 @@ Centraliza lógica de negócio reutilizável.
 """
 
 from .email_service import EmailService
+from .kpi_service import KPIRecomputeService
+from .dashboard_service import DashboardFanout
+from .time_series import TimeSeries
 
-__all__ = ['EmailService']
+__all__ = ['EmailService', 'KPIRecomputeService', 'DashboardFanout', 'TimeSeries']
@@ -0,0 +1,207 @@
+"""
+Execução concorrente das seções dos dashboards.
+
+Os dashboards de denominação e igreja calculam vários agregados
+independentes; executados em sequência, a latência é a soma de todas as
+queries. Aqui cada seção é uma função síncrona (ORM) disparada com
+`asyncio.gather`, de modo que a latência total tende à da seção mais lenta.
+
+O ORM assíncrono do Django (`acount`, `aaggregate`...) ainda executa as
+queries via `sync_to_async(thread_sensitive=True)`, ou seja, uma por vez na
+mesma thread. Para obter paralelismo real cada seção roda em um pool de
+threads dedicado (cada thread com sua conexão), limitado por
+`DASHBOARD_MAX_CONCURRENCY` para não esgotar o pool de conexões do banco.
+
+Os resultados são guardados no cache por seção e por (escopo, dia): endpoints
+diferentes que usam a mesma seção (ex.: total de membros da denominação)
+compartilham o valor. Com `tenant`/`depends_on` a chave inclui também as
+gerações de `apps.core.response_cache`, e as seções deixam de valer assim
+que os dados de que dependem mudam. Seções que falham ou estouram o tempo limite retornam
+`None` e são reportadas em `DashboardResult.failed`, sem derrubar a resposta.
+
+Uso:
+    result = DashboardFanout(f'denomination-{denomination.id}', {
+        'total_churches': lambda: churches.count(),
+        'total_members': lambda: members.count(),
+    }).run()
+    response = Response({'total_churches': result['total_churches'], ...})
+    result.apply_headers(response)
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+CACHE_PREFIX = 'dashboard'
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_max_concurrency() -> int:
+    """Limite de seções simultâneas, respeitando o pool de conexões se houver."""
+    limit = getattr(settings, 'DASHBOARD_MAX_CONCURRENCY', 4)
+    pool = settings.DATABASES['default'].get('OPTIONS', {}).get('pool')
+    if isinstance(pool, dict) and pool.get('max_size'):
+        limit = min(limit, pool['max_size'])
+    return max(1, limit)
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Pool de threads compartilhado pelo processo (uma conexão por thread)."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=get_max_concurrency(),
+                    thread_name_prefix='dashboard',
+                )
+    return _executor
+
+
+def _run_in_worker(func):
+    """Executa `func` em uma thread do pool descartando conexões vencidas."""
+    close_old_connections()
+    try:
+        return func()
+    finally:
+        close_old_connections()
+
+
+class DashboardResult:
+    """Valores por seção, tempos de execução e seções que falharam."""
+
+    def __init__(self, values: Dict[str, Any], timings: Dict[str, float],
+                 failed: List[str], cached: List[str], elapsed: float):
+        self.values = values
+        self.timings = timings
+        self.failed = failed
+        self.cached = cached
+        self.elapsed = elapsed
+
+    def __getitem__(self, name):
+        return self.values[name]
+
+    def get(self, name, default=None):
+        value = self.values.get(name)
+        return default if value is None else value
+
+    @property
+    def partial(self) -> bool:
+        return bool(self.failed)
+
+    def apply_headers(self, response):
+        """
+        Expõe os tempos em `Server-Timing` (visível no DevTools) e as seções
+        ausentes em `X-Dashboard-Partial`.
+        """
+        metrics = [
+            f"{name};dur={duration:.1f}" + (';desc="cache"' if name in self.cached else '')
+            for name, duration in self.timings.items()
+        ]
+        metrics.append(f"total;dur={self.elapsed:.1f}")
+        response['Server-Timing'] = ', '.join(metrics)
+        if self.failed:
+            response['X-Dashboard-Partial'] = ','.join(self.failed)
+        return response
+
+
+class DashboardFanout:
+    """
+    Executa as seções de um dashboard em paralelo.
+
+    `scope` identifica o dono dos dados (ex.: `denomination-3`); junto com a
+    data corrente e o nome da seção forma a chave de cache.
+    """
+
+    def __init__(self, scope: str, sections: Dict[str, Callable[[], Any]], *,
+                 cache_timeout: Optional[int] = None, parallel: Optional[bool] = None,
+                 timeout: Optional[float] = None, tenant: Optional[str] = None,
+                 depends_on: Sequence[str] = ()):
+        self.scope = scope
+        self.sections = sections
+        self.tenant = tenant
+        self.depends_on = tuple(depends_on)
+        self._generations = ""
+        self.cache_timeout = (
+            settings.DASHBOARD_CACHE_TIMEOUT if cache_timeout is None else cache_timeout
+        )
+        self.parallel = settings.DASHBOARD_PARALLEL_QUERIES if parallel is None else parallel
+        self.timeout = settings.DASHBOARD_SECTION_TIMEOUT if timeout is None else timeout
+
+    def cache_key(self, section: str) -> str:
+        return f"{CACHE_PREFIX}:{self.scope}:{timezone.localdate().isoformat()}{self._generations}:{section}"
+
+    def run(self) -> DashboardResult:
+        """Versão síncrona (views WSGI/DRF)."""
+        return async_to_sync(self.arun)()
+
+    async def arun(self) -> DashboardResult:
+        started = time.monotonic()
+        cached = {}
+        if self.cache_timeout and self.tenant and self.depends_on:
+            from apps.core.response_cache import get_generations
+            generations = await sync_to_async(get_generations)(self.tenant, self.depends_on)
+            self._generations = ':g' + '.'.join(map(str, generations))
+        keys = {name: self.cache_key(name) for name in self.sections}
+        if self.cache_timeout:
+            hits = await sync_to_async(cache.get_many)(list(keys.values()))
+            cached = {name: hits[key] for name, key in keys.items() if key in hits}
+
+        values = dict(cached)
+        timings = {name: 0.0 for name in cached}
+        failed = []
+
+        pending = [name for name in self.sections if name not in cached]
+        semaphore = asyncio.Semaphore(get_max_concurrency())
+        outcomes = await asyncio.gather(*(self._run_section(name, semaphore) for name in pending))
+
+        fresh = {}
+        for name, (ok, value, duration) in zip(pending, outcomes):
+            timings[name] = duration
+            values[name] = value if ok else None
+            if ok:
+                fresh[keys[name]] = value
+            else:
+                failed.append(name)
+
+        if fresh and self.cache_timeout:
+            await sync_to_async(cache.set_many)(fresh, self.cache_timeout)
+
+        elapsed = (time.monotonic() - started) * 1000
+        if failed:
+            logger.warning(f"[DASHBOARD] {self.scope}: seções indisponíveis {failed}")
+        return DashboardResult(values, timings, failed, list(cached), elapsed)
+
+    async def _run_section(self, name, semaphore):
+        func = self.sections[name]
+        if self.parallel:
+            runner = sync_to_async(_run_in_worker, thread_sensitive=False, executor=get_executor())
+        else:
+            runner = sync_to_async(func, thread_sensitive=True)
+
+        async with semaphore:
+            started = time.monotonic()
+            try:
+                call = runner(func) if self.parallel else runner()
+                value = await asyncio.wait_for(call, timeout=self.timeout)
+                ok = True
+            except asyncio.TimeoutError:
+                logger.warning(f"[DASHBOARD] {self.scope}: seção '{name}' excedeu {self.timeout}s")
+                value, ok = None, False
+            except Exception as exc:
+                logger.exception(f"[DASHBOARD] {self.scope}: erro na seção '{name}': {exc}")
+                value, ok = None, False
+            return ok, value, (time.monotonic() - started) * 1000
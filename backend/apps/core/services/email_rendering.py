@@ -0,0 +1,221 @@
+"""
+Renderização dos emails transacionais.
+
+Os emails eram renderizados com `render_to_string` a cada envio (HTML e
+texto separadamente, cada um com seu contexto). Aqui:
+
+- os templates de `templates/emails/` são carregados por um `Engine`
+  próprio com o loader em cache: cada template é lido e compilado uma vez
+  por processo (`warm_email_templates` faz isso na inicialização);
+- o CSS do `<style>` de `emails/base.html` é aplicado como `style=""` nos
+  elementos dos templates HTML no momento da compilação (clientes de email
+  como o Gmail ignoram parte do `<style>`), sem custo por envio;
+- HTML e texto são renderizados sobre o mesmo `Context` (o texto sem
+  autoescape), e envios em massa reaproveitam o contexto compartilhado,
+  empilhando apenas os dados de cada destinatário.
+
+Uso:
+    email = render_email('emails/welcome_member', context)
+    email.html, email.text
+
+    for email in render_bulk('emails/welcome_member', shared, per_recipient):
+        ...
+"""
+
+import logging
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from django.conf import settings
+from django.template import Context, Engine, TemplateDoesNotExist
+from django.template.loaders.filesystem import Loader as FilesystemLoader
+from django.utils.html import strip_tags
+
+logger = logging.getLogger(__name__)
+
+# Template cujo <style> define o CSS aplicado nos demais
+BASE_TEMPLATE = 'emails/base.html'
+
+# Templates compilados por `warm_email_templates`
+EMAIL_TEMPLATES = (
+    'emails/welcome_member',
+    'emails/password_reset',
+    'emails/new_visitor_notification',
+    'emails/visitor_converted',
+)
+
+_STYLE_BLOCK = re.compile(r'<style[^>]*>(.*?)</style>', re.S | re.I)
+_COMMENT = re.compile(r'/\*.*?\*/', re.S)
+_AT_RULE = re.compile(r'@[^{]+\{(?:[^{}]*\{[^{}]*\})*[^{}]*\}', re.S)
+_RULE = re.compile(r'([^{}]+)\{([^{}]*)\}')
+_SIMPLE_SELECTOR = re.compile(r'^(\.[\w-]+|[a-z][a-z0-9]*)$', re.I)
+_OPEN_TAG = re.compile(r'<([a-z][a-z0-9]*)(\s[^<>]*?)?(/?)>', re.I)
+_CLASS_ATTR = re.compile(r'\sclass\s*=\s*"([^"]*)"', re.I)
+_STYLE_ATTR = re.compile(r'\sstyle\s*=\s*"([^"]*)"', re.I)
+
+
+# =====================================
+# CSS
+# =====================================
+
+def parse_inline_rules(css: str) -> List[Tuple[str, str]]:
+    """
+    Regras aplicáveis inline: seletores simples (`.classe` ou `tag`), na
+    ordem do CSS. Media queries, pseudo-classes e seletores compostos ficam
+    apenas no `<style>`.
+    """
+    css = _AT_RULE.sub('', _COMMENT.sub('', css))
+    rules = []
+    for selectors, body in _RULE.findall(css):
+        declarations = '; '.join(
+            ' '.join(part.split()) for part in body.split(';') if part.strip()
+        )
+        for selector in selectors.split(','):
+            selector = selector.strip()
+            if declarations and _SIMPLE_SELECTOR.match(selector):
+                rules.append((selector, declarations))
+    return rules
+
+
+def inline_css(source: str, rules: List[Tuple[str, str]]) -> str:
+    """
+    Aplica `rules` como atributo `style` nas tags de `source` (template
+    Django ainda não compilado). Ordem: seletores de tag, de classe e por
+    último o `style` já existente no elemento.
+    """
+    if not rules:
+        return source
+    body_start = source.lower().find('<body')
+    head, body = ('', source) if body_start < 0 else (source[:body_start], source[body_start:])
+
+    def apply(match):
+        tag, attrs, closing = match.group(1), match.group(2) or '', match.group(3)
+        class_match = _CLASS_ATTR.search(attrs)
+        classes = set(class_match.group(1).split()) if class_match else set()
+        declarations = [css for selector, css in rules if selector.lower() == tag.lower()]
+        declarations += [css for selector, css in rules if selector[0] == '.' and selector[1:] in classes]
+        if not declarations:
+            return match.group(0)
+        style_match = _STYLE_ATTR.search(attrs)
+        if style_match:
+            declarations.append(style_match.group(1).strip().rstrip(';'))
+            attrs = attrs[:style_match.start()] + attrs[style_match.end():]
+        style = '; '.join(declarations).replace('"', "'")
+        return f'<{tag}{attrs} style="{style}"{closing}>'
+
+    return head + _OPEN_TAG.sub(apply, body)
+
+
+class InlineCSSLoader(FilesystemLoader):
+    """Loader que entrega os templates HTML de email com o CSS já aplicado."""
+
+    _rules = None
+
+    def get_contents(self, origin):
+        contents = super().get_contents(origin)
+        if origin.template_name and origin.template_name.endswith('.html'):
+            contents = inline_css(contents, self.get_rules())
+        return contents
+
+    def get_rules(self):
+        if self._rules is None:
+            css = ''
+            for origin in self.get_template_sources(BASE_TEMPLATE):
+                try:
+                    css = '\n'.join(_STYLE_BLOCK.findall(super().get_contents(origin)))
+                    break
+                except TemplateDoesNotExist:
+                    continue
+            self._rules = parse_inline_rules(css)
+        return self._rules
+
+
+# =====================================
+# ENGINE
+# =====================================
+
+@lru_cache(maxsize=1)
+def get_email_engine() -> Engine:
+    """Engine dos emails (mesmos diretórios do projeto, loader em cache)."""
+    dirs = [str(path) for path in settings.TEMPLATES[0].get('DIRS', [])]
+    return Engine(
+        dirs=dirs,
+        loaders=[('django.template.loaders.cached.Loader', [
+            'apps.core.services.email_rendering.InlineCSSLoader',
+            'django.template.loaders.app_directories.Loader',
+        ])],
+    )
+
+
+def _get_template(name):
+    try:
+        return get_email_engine().get_template(name)
+    except TemplateDoesNotExist:
+        return None
+
+
+@lru_cache(maxsize=None)
+def _templates(name):
+    html, text = _get_template(f'{name}.html'), _get_template(f'{name}.txt')
+    if html is None and text is None:
+        raise TemplateDoesNotExist(name)
+    return html, text
+
+
+def warm_email_templates(names: Iterable[str] = EMAIL_TEMPLATES):
+    """Compila os templates de email (chamado em `CoreConfig.ready`)."""
+    for name in names:
+        try:
+            _templates(name)
+        except TemplateDoesNotExist:
+            logger.warning(f"[EMAIL] Template de email não encontrado: {name}")
+
+
+def reset_email_templates():
+    """Descarta os templates compilados (ex.: após editar os arquivos em dev)."""
+    _templates.cache_clear()
+    get_email_engine.cache_clear()
+
+
+# =====================================
+# RENDERIZAÇÃO
+# =====================================
+
+@dataclass
+class RenderedEmail:
+    html: Optional[str]
+    text: str
+    context: Dict
+
+
+def _render(templates, context: Context, values: Dict) -> RenderedEmail:
+    html_template, text_template = templates
+    html = None
+    if html_template is not None:
+        context.autoescape = True
+        html = html_template.render(context)
+    if text_template is not None:
+        context.autoescape = False
+        text = text_template.render(context)
+    else:
+        text = strip_tags(html)
+    return RenderedEmail(html=html, text=text, context=values)
+
+
+def render_email(name: str, context: Dict) -> RenderedEmail:
+    """HTML (`<name>.html`) e texto (`<name>.txt`) de um email."""
+    return _render(_templates(name), Context(context), context)
+
+
+def render_bulk(name: str, shared: Dict, recipients: Iterable[Dict]) -> Iterator[RenderedEmail]:
+    """
+    Um email por item de `recipients`: o contexto `shared` é montado uma
+    vez e os dados de cada destinatário são empilhados sobre ele.
+    """
+    templates = _templates(name)
+    context = Context(shared)
+    for overrides in recipients:
+        with context.push(overrides):
+            yield _render(templates, context, {**shared, **overrides})
@@ -10,6 +10,8 @@ Características:
 - Tratamento robusto de erros
 - Contexto rico para templates
 - Fallback para texto puro
+- Templates compilados uma vez por processo (ver email_rendering)
+- Envio em massa com contexto compartilhado (send_bulk)
 
 Uso:
     from apps.core.services import EmailService
@@ -27,9 +29,9 @@ Uso:
 import logging
 from typing import Optional
 from django.conf import settings
-from django.core.mail import EmailMultiAlternatives
-from django.template.loader import render_to_string
-from django.utils.html import strip_tags
+from django.core.mail import EmailMultiAlternatives, get_connection
+
+from .email_rendering import render_bulk, render_email
 
 logger = logging.getLogger(__name__)
 
@@ -51,9 +53,56 @@ class EmailService:
     DEFAULT_FROM_EMAIL = settings.DEFAULT_FROM_EMAIL
     FRONTEND_URL = settings.FRONTEND_URL
     
-    # Templates disponíveis
-    TEMPLATE_WELCOME_MEMBER = 'emails/welcome_member.html'
-    TEMPLATE_WELCOME_MEMBER_TXT = 'emails/welcome_member.txt'
+    # Templates disponíveis (`<nome>.html` + `<nome>.txt`, ver email_rendering)
+    TEMPLATE_WELCOME_MEMBER = 'emails/welcome_member'
+    TEMPLATE_PASSWORD_RESET = 'emails/password_reset'
+    
+    # Descrição das capacidades de cada papel (usada no email de boas-vindas)
+    ROLE_DESCRIPTIONS = {
+        'super_admin': (
+            'Como Super Administrador, você tem acesso completo ao sistema:\n'
+            '• Gerenciar todas as denominações e igrejas\n'
+            '• Configurar permissões globais\n'
+            '• Acessar relatórios consolidados\n'
+            '• Administrar usuários e cobranças'
+        ),
+        'church_admin': (
+            'Como Administrador da Igreja, você pode:\n'
+            '• Gerenciar todas as igrejas da denominação\n'
+            '• Criar e administrar filiais\n'
+            '• Cadastrar e editar membros\n'
+            '• Definir líderes e responsáveis\n'
+            '• Configurar atividades e ministérios\n'
+            '• Visualizar relatórios consolidados\n'
+            '• Gerenciar assinaturas e pagamentos'
+        ),
+        'secretary': (
+            'Como Secretário(a), você pode:\n'
+            '• Cadastrar e editar membros\n'
+            '• Registrar visitantes\n'
+            '• Organizar atividades e eventos\n'
+            '• Gerenciar pedidos de oração\n'
+            '• Gerar relatórios básicos\n'
+            '• Atualizar informações da igreja'
+        ),
+        # Roles legados (mantidos para compatibilidade)
+        'pastor': (
+            'Como Pastor, você tem acesso às informações da igreja e pode '
+            'acompanhar membros, atividades e relatórios.'
+        ),
+        'leader': (
+            'Como Líder, você pode visualizar informações do seu ministério '
+            'e acompanhar atividades relacionadas.'
+        ),
+        'member': (
+            'Como Membro, você pode visualizar informações gerais da igreja '
+            'e participar de atividades.'
+        ),
+        'read_only': (
+            'Você tem acesso somente leitura às informações da igreja.'
+        ),
+    }
+    DEFAULT_ROLE_DESCRIPTION = 'Você tem acesso ao sistema Obreiro Digital.'
     
     @staticmethod
     def _get_role_description(role: str) -> str:
@@ -66,52 +115,7 @@ class EmailService:
         Returns:
             Descrição formatada das responsabilidades do papel
         """
-        descriptions = {
-            'super_admin': (
-                'Como Super Administrador, você tem acesso completo ao sistema:\n'
-                '• Gerenciar todas as denominações e igrejas\n'
-                '• Configurar permissões globais\n'
-                '• Acessar relatórios consolidados\n'
-                '• Administrar usuários e cobranças'
-            ),
-            'church_admin': (
-                'Como Administrador da Igreja, você pode:\n'
-                '• Gerenciar todas as igrejas da denominação\n'
-                '• Criar e administrar filiais\n'
-                '• Cadastrar e editar membros\n'
-                '• Definir líderes e responsáveis\n'
-                '• Configurar atividades e ministérios\n'
-                '• Visualizar relatórios consolidados\n'
-                '• Gerenciar assinaturas e pagamentos'
-            ),
-            'secretary': (
-                'Como Secretário(a), você pode:\n'
-                '• Cadastrar e editar membros\n'
-                '• Registrar visitantes\n'
-                '• Organizar atividades e eventos\n'
-                '• Gerenciar pedidos de oração\n'
-                '• Gerar relatórios básicos\n'
-                '• Atualizar informações da igreja'
-            ),
-            # Roles legados (mantidos para compatibilidade)
-            'pastor': (
-                'Como Pastor, você tem acesso às informações da igreja e pode '
-                'acompanhar membros, atividades e relatórios.'
-            ),
-            'leader': (
-                'Como Líder, você pode visualizar informações do seu ministério '
-                'e acompanhar atividades relacionadas.'
-            ),
-            'member': (
-                'Como Membro, você pode visualizar informações gerais da igreja '
-                'e participar de atividades.'
-            ),
-            'read_only': (
-                'Você tem acesso somente leitura às informações da igreja.'
-            ),
-        }
-        
-        return descriptions.get(role, 'Você tem acesso ao sistema Obreiro Digital.')
+        return EmailService.ROLE_DESCRIPTIONS.get(role, EmailService.DEFAULT_ROLE_DESCRIPTION)
     
     @staticmethod
     def _build_email_context(
@@ -229,16 +233,10 @@ class EmailService:
                 **extra_context
             )
             
-            # Renderizar templates
+            # Renderizar templates (HTML e texto sobre o mesmo contexto)
             try:
-                html_content = render_to_string(
-                    EmailService.TEMPLATE_WELCOME_MEMBER,
-                    context
-                )
-                text_content = render_to_string(
-                    EmailService.TEMPLATE_WELCOME_MEMBER_TXT,
-                    context
-                )
+                rendered = render_email(EmailService.TEMPLATE_WELCOME_MEMBER, context)
+                html_content, text_content = rendered.html, rendered.text
             except Exception as e:
                 logger.error(f"❌ Erro ao renderizar templates: {e}")
                 raise EmailServiceError(f"Falha ao renderizar templates: {e}")
@@ -332,16 +330,10 @@ class EmailService:
                 'support_email': 'suporteobreirovirtual@gmail.com',
             }
             
-            # Renderizar templates
+            # Renderizar templates (HTML e texto sobre o mesmo contexto)
             try:
-                html_content = render_to_string(
-                    'emails/password_reset.html',
-                    context
-                )
-                text_content = render_to_string(
-                    'emails/password_reset.txt',
-                    context
-                )
+                rendered = render_email(EmailService.TEMPLATE_PASSWORD_RESET, context)
+                html_content, text_content = rendered.html, rendered.text
             except Exception as e:
                 logger.error(f"❌ Erro ao renderizar templates: {e}")
                 raise EmailServiceError(f"Falha ao renderizar templates: {e}")
@@ -379,6 +371,65 @@ class EmailService:
             )
             raise EmailServiceError(f"Falha ao enviar email: {e}")
     
+    @staticmethod
+    def send_bulk(
+        template: str,
+        subject: str,
+        shared_context: dict,
+        recipients: list,
+    ) -> int:
+        """
+        Envia o mesmo email para vários destinatários (ex.: cadastro em massa).
+        
+        O contexto compartilhado é montado uma vez; cada destinatário traz
+        apenas o que muda (`email` e demais variáveis). Todas as mensagens
+        saem por uma única conexão SMTP.
+        
+        Args:
+            template: Nome do template sem extensão (ex: 'emails/welcome_member')
+            subject: Assunto (pode usar variáveis do contexto com str.format)
+            shared_context: Variáveis comuns a todos os emails
+            recipients: Lista de dicts com 'email' e as variáveis do destinatário
+            
+        Returns:
+            Quantidade de emails enviados
+            
+        Raises:
+            EmailServiceError: Se houver erro crítico no envio
+        """
+        recipients = [recipient for recipient in recipients if recipient.get('email')]
+        if not recipients:
+            return 0
+        
+        try:
+            shared = {
+                'frontend_url': EmailService.FRONTEND_URL,
+                'login_url': f'{EmailService.FRONTEND_URL}/login',
+                'support_email': 'suporteobreirovirtual@gmail.com',
+                **shared_context,
+            }
+            connection = get_connection()
+            messages = []
+            for rendered in render_bulk(template, shared, recipients):
+                message = EmailMultiAlternatives(
+                    subject=subject.format(**rendered.context),
+                    body=rendered.text,
+                    from_email=EmailService.DEFAULT_FROM_EMAIL,
+                    to=[rendered.context['email']],
+                    connection=connection,
+                )
+                if rendered.html:
+                    message.attach_alternative(rendered.html, "text/html")
+                messages.append(message)
+            
+            sent = connection.send_messages(messages) or 0
+            logger.info(f"✅ {sent} email(s) '{template}' enviados em massa")
+            return sent
+            
+        except Exception as e:
+            logger.error(f"❌ Erro no envio em massa '{template}': {e}", exc_info=True)
+            raise EmailServiceError(f"Falha no envio em massa: {e}")
+    
     @staticmethod
     def send_notification(
         user_email: str,
@@ -0,0 +1,214 @@
+"""
+Verificação dos planos das consultas mais frequentes.
+
+Quase toda consulta filtra `is_active=True` (o `TenantManager` aplica o
+filtro automaticamente) e os registros desativados só crescem. As
+consultas mais quentes têm índices parciais `WHERE is_active` (ver os
+`Meta.indexes` de membros, visitantes, notificações, atividades e filiais);
+este módulo roda `EXPLAIN` sobre um catálogo dessas consultas, montadas
+pelos mesmos managers usados nas views, e aponta as que caem em
+`Seq Scan`.
+
+Uso:
+    plans = IndexAdvisor(church_id=1).run()
+    [plan.label for plan in plans if plan.seq_scans]
+
+Com `force_index=True` o planner é proibido de usar Seq Scan
+(`SET LOCAL enable_seqscan = off`): em bancos pequenos (dev) o Seq Scan é
+sempre o mais barato, e assim o relatório mostra qual índice seria usado.
+Exposto pelo comando `python manage.py index_advisor`.
+"""
+
+import json
+from dataclasses import dataclass, field
+from typing import Callable, List, NamedTuple, Optional
+
+from django.db import connections, transaction
+from django.db.models import Count
+from django.utils import timezone
+
+
+class SampleScope(NamedTuple):
+    """Igreja, filial e usuário usados como parâmetros das consultas."""
+
+    church_id: int
+    branch_id: int
+    user_id: int
+
+
+@dataclass
+class QueryPlan:
+    label: str
+    description: str
+    seq_scans: List[str] = field(default_factory=list)
+    indexes: List[str] = field(default_factory=list)
+    total_cost: float = 0.0
+    execution_ms: Optional[float] = None
+    plan: str = ''
+
+
+# =====================================
+# CATÁLOGO
+# =====================================
+
+def _members_list(scope):
+    from apps.members.models import Member
+
+    return Member.objects.filter(church_id=scope.church_id).order_by('-created_at')[:25]
+
+
+def _members_branch_list(scope):
+    from apps.members.models import Member
+
+    return (
+        Member.objects.filter(church_id=scope.church_id, branch_id=scope.branch_id)
+        .order_by('-created_at')[:25]
+    )
+
+
+def _members_by_status(scope):
+    from apps.members.models import Member
+
+    return (
+        Member.objects.filter(church_id=scope.church_id)
+        .values('membership_status').annotate(total=Count('id')).order_by()
+    )
+
+
+def _visitors_recent(scope):
+    from apps.visitors.models import Visitor
+
+    return Visitor.objects.filter(church_id=scope.church_id).order_by('-created_at')[:10]
+
+
+def _visitors_branch_list(scope):
+    from apps.visitors.models import Visitor
+
+    return (
+        Visitor.objects.filter(church_id=scope.church_id, branch_id=scope.branch_id)
+        .order_by('-created_at')[:25]
+    )
+
+
+def _notifications_unread(scope):
+    from apps.notifications.models import Notification
+
+    return (
+        Notification.objects.unread().filter(user_id=scope.user_id, church_id=scope.church_id)
+        .order_by('-created_at')[:20]
+    )
+
+
+def _activities_upcoming(scope):
+    from apps.activities.models import Activity
+
+    return (
+        Activity.objects.filter(church_id=scope.church_id, start_datetime__gte=timezone.now())
+        .order_by('start_datetime')[:10]
+    )
+
+
+def _branches_list(scope):
+    from apps.branches.models import Branch
+
+    return Branch.objects.filter(church_id=scope.church_id).order_by('name')
+
+
+class CatalogueEntry(NamedTuple):
+    label: str
+    description: str
+    build: Callable[[SampleScope], object]
+
+
+QUERY_CATALOGUE = (
+    CatalogueEntry('members.list', 'Listagem de membros da igreja (mais recentes)', _members_list),
+    CatalogueEntry('members.branch_list', 'Listagem de membros da filial ativa', _members_branch_list),
+    CatalogueEntry('members.by_status', 'Contagem de membros por status (dashboard)', _members_by_status),
+    CatalogueEntry('visitors.recent', 'Visitantes mais recentes', _visitors_recent),
+    CatalogueEntry('visitors.branch_list', 'Listagem de visitantes da filial ativa', _visitors_branch_list),
+    CatalogueEntry('notifications.unread', 'Notificações não lidas do usuário', _notifications_unread),
+    CatalogueEntry('activities.upcoming', 'Próximas atividades da igreja', _activities_upcoming),
+    CatalogueEntry('branches.list', 'Filiais da igreja', _branches_list),
+)
+
+
+# =====================================
+# EXPLAIN
+# =====================================
+
+def _walk(node):
+    yield node
+    for child in node.get('Plans', ()):
+        yield from _walk(child)
+
+
+class IndexAdvisor:
+    """Roda `EXPLAIN (FORMAT JSON)` em cada consulta do catálogo."""
+
+    def __init__(self, church_id=None, analyze=False, force_index=False, using='default', catalogue=QUERY_CATALOGUE):
+        self.church_id = church_id
+        self.analyze = analyze
+        self.force_index = force_index
+        self.using = using
+        self.catalogue = catalogue
+
+    def sample_scope(self):
+        """
+        Parâmetros das consultas: a igreja informada ou a ativa de menor id,
+        a filial principal dela e um usuário vinculado (ids inexistentes
+        quando não houver; o plano continua válido).
+        """
+        from apps.accounts.models import ChurchUser
+        from apps.branches.models import Branch
+        from apps.churches.models import Church
+
+        church_id = self.church_id
+        if church_id is None:
+            church_id = (
+                Church._base_manager.using(self.using).filter(is_active=True)
+                .order_by('pk').values_list('pk', flat=True).first()
+            )
+        if church_id is None:
+            return None
+        branch_id = (
+            Branch._base_manager.using(self.using).filter(church_id=church_id, is_active=True)
+            .order_by('-is_main', 'pk').values_list('pk', flat=True).first()
+        )
+        user_id = (
+            ChurchUser.objects.using(self.using).filter(church_id=church_id, is_active=True)
+            .order_by('pk').values_list('user_id', flat=True).first()
+        )
+        return SampleScope(church_id, branch_id or 0, user_id or 0)
+
+    def run(self, scope=None):
+        scope = scope or self.sample_scope()
+        if scope is None:
+            return []
+        return [self.explain(entry, scope) for entry in self.catalogue]
+
+    def explain(self, entry, scope):
+        queryset = entry.build(scope).using(self.using)
+        options = {'format': 'json'}
+        if self.analyze:
+            options['analyze'] = True
+        with transaction.atomic(using=self.using):
+            if self.force_index:
+                with connections[self.using].cursor() as cursor:
+                    cursor.execute('SET LOCAL enable_seqscan = off')
+            raw = queryset.explain(**options)
+
+        document = json.loads(raw)[0]
+        root = document['Plan']
+        plan = QueryPlan(
+            label=entry.label,
+            description=entry.description,
+            total_cost=root.get('Total Cost', 0.0),
+            execution_ms=document.get('Execution Time'),
+            plan=json.dumps(root, indent=2),
+        )
+        for node in _walk(root):
+            if node.get('Node Type') == 'Seq Scan':
+                plan.seq_scans.append(node.get('Relation Name', '?'))
+            elif node.get('Index Name') and node['Index Name'] not in plan.indexes:
+                plan.indexes.append(node['Index Name'])
+        return plan
@@ -0,0 +1,281 @@
+"""
+Recalculo em lote dos KPIs (contadores desnormalizados) do sistema.
+
+Substitui as chamadas objeto a objeto de `update_statistics` em Church,
+Branch, Denomination e Ministry: cada contador é obtido com uma única
+agregação agrupada (`values(...).annotate(...)`) e gravado de volta com
+`bulk_update` em lotes, apenas para as linhas que mudaram.
+
+Uso:
+    from apps.core.services import KPIRecomputeService
+
+    # Plataforma inteira, 4 denominações em paralelo
+    KPIRecomputeService().run(workers=4)
+
+    # Incremental: apenas igrejas com alterações desde `since`
+    KPIRecomputeService(since=ontem).run()
+
+    # Escopo de uma igreja ou denominação
+    KPIRecomputeService(church_ids=[church.id]).run()
+
+    # Apenas detectar divergências (sem gravar)
+    service = KPIRecomputeService(dry_run=True)
+    service.run()
+    service.drift
+"""
+
+import logging
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional
+
+from django.db import connections, transaction
+from django.db.models import Count, Sum
+from django.utils import timezone
+
+from apps.core.models import MembershipStatusChoices
+
+logger = logging.getLogger(__name__)
+
+
+class KPIRecomputeService:
+    """
+    Motor de recálculo de KPIs por agregações agrupadas.
+
+    Os managers com escopo de tenant são ignorados (`_base_manager`) para que
+    o resultado não dependa da requisição corrente.
+    """
+
+    DEFAULT_CHUNK_SIZE = 500
+
+    def __init__(
+        self,
+        *,
+        since=None,
+        church_ids: Optional[Iterable[int]] = None,
+        denomination_ids: Optional[Iterable[int]] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        dry_run: bool = False,
+    ):
+        self.since = since
+        self.dry_run = dry_run
+        # Divergências encontradas: (modelo, pk, campo, valor gravado, valor esperado)
+        self.drift = []
+        self.church_ids = list(church_ids) if church_ids is not None else None
+        self.denomination_ids = list(denomination_ids) if denomination_ids is not None else None
+        self.chunk_size = chunk_size
+
+    # =====================================
+    # ORQUESTRAÇÃO
+    # =====================================
+
+    def run(self, workers: int = 1) -> Dict[str, int]:
+        """
+        Recalcula filiais, ministérios, igrejas e denominações do escopo.
+
+        Com `workers > 1` cada denominação é processada em uma thread própria
+        (com sua própria conexão de banco). Retorna um resumo com o número de
+        registros atualizados por modelo e a duração.
+        """
+        started = time.monotonic()
+        churches_by_denomination = self._resolve_scope()
+
+        summary = Counter()
+        if workers > 1 and len(churches_by_denomination) > 1:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                for partial in executor.map(self._run_in_thread, churches_by_denomination.items()):
+                    summary.update(partial)
+        else:
+            for item in churches_by_denomination.items():
+                summary.update(self._run_denomination(item))
+
+        result = {
+            'denominations': summary['denominations'],
+            'churches': summary['churches'],
+            'branches': summary['branches'],
+            'ministries': summary['ministries'],
+            'duration_seconds': round(time.monotonic() - started, 3),
+        }
+        logger.info(f"[KPI] Recalculo concluído: {result}")
+        return result
+
+    def _run_in_thread(self, item):
+        try:
+            return self._run_denomination(item)
+        finally:
+            connections.close_all()
+
+    def _run_denomination(self, item) -> Counter:
+        denomination_id, church_ids = item
+        summary = Counter()
+        with transaction.atomic():
+            for chunk in self._chunks(church_ids):
+                summary['branches'] += self.recompute_branches(chunk)
+                summary['ministries'] += self.recompute_ministries(chunk)
+                summary['churches'] += self.recompute_churches(chunk)
+            summary['denominations'] += self.recompute_denominations([denomination_id])
+        return summary
+
+    def _resolve_scope(self) -> Dict[int, List[int]]:
+        """Mapa denominação -> igrejas a recalcular, conforme filtros e `since`."""
+        from apps.churches.models import Church
+
+        churches = Church._base_manager.all()
+        if self.church_ids is not None:
+            churches = churches.filter(id__in=self.church_ids)
+        if self.denomination_ids is not None:
+            churches = churches.filter(denomination_id__in=self.denomination_ids)
+        if self.since is not None:
+            churches = churches.filter(id__in=self._churches_changed_since(self.since))
+
+        scope: Dict[int, List[int]] = {}
+        for church_id, denomination_id in churches.values_list('id', 'denomination_id').order_by('id'):
+            scope.setdefault(denomination_id, []).append(church_id)
+
+        # Denominações sem igrejas também precisam ter os totais zerados
+        if self.denomination_ids is not None and self.since is None:
+            for denomination_id in self.denomination_ids:
+                scope.setdefault(denomination_id, [])
+        return scope
+
+    def _churches_changed_since(self, since) -> set:
+        """Igrejas com qualquer registro dependente alterado desde `since`."""
+        from apps.activities.models import Activity, Ministry
+        from apps.branches.models import Branch
+        from apps.churches.models import Church
+        from apps.members.models import Member
+        from apps.visitors.models import Visitor
+
+        changed = set(Church._base_manager.filter(updated_at__gte=since).values_list('id', flat=True))
+        for model in (Member, Visitor, Branch, Activity, Ministry):
+            changed.update(
+                model._base_manager.filter(updated_at__gte=since).values_list('church_id', flat=True).distinct()
+            )
+        return changed
+
+    def _chunks(self, ids: List[int]):
+        for start in range(0, len(ids), self.chunk_size):
+            yield ids[start:start + self.chunk_size]
+
+    # =====================================
+    # RECÁLCULO POR MODELO
+    # =====================================
+
+    @staticmethod
+    def _grouped(queryset, group_field: str, aggregate) -> Dict[int, int]:
+        rows = queryset.values(group_field).annotate(value=aggregate).values_list(group_field, 'value')
+        return {key: int(value or 0) for key, value in rows}
+
+    def _write(self, model, objects, values_by_field: Dict[str, Dict[int, int]]) -> int:
+        """Aplica os valores calculados e grava apenas os objetos alterados."""
+        now = timezone.now()
+        fields = list(values_by_field)
+        changed = []
+        for obj in objects:
+            dirty = False
+            for field, values in values_by_field.items():
+                value = values.get(obj.pk, 0)
+                stored = getattr(obj, field)
+                if stored != value:
+                    self.drift.append((model._meta.label, obj.pk, field, stored, value))
+                    setattr(obj, field, value)
+                    dirty = True
+            if dirty:
+                obj.updated_at = now
+                changed.append(obj)
+
+        if changed and not self.dry_run:
+            model._base_manager.bulk_update(changed, fields + ['updated_at'], batch_size=self.chunk_size)
+        return len(changed)
+
+    def recompute_branches(self, church_ids: List[int]) -> int:
+        """`Branch.total_visitors` e `Branch.total_activities`."""
+        from apps.activities.models import Activity
+        from apps.branches.models import Branch
+        from apps.visitors.models import Visitor
+
+        values = {
+            'total_visitors': self._grouped(
+                Visitor._base_manager.filter(church_id__in=church_ids, is_active=True, branch__isnull=False),
+                'branch_id', Count('id'),
+            ),
+            'total_activities': self._grouped(
+                Activity._base_manager.filter(church_id__in=church_ids, is_active=True, branch__isnull=False),
+                'branch_id', Count('id'),
+            ),
+        }
+        branches = Branch._base_manager.filter(church_id__in=church_ids).only('id', *values)
+        return self._write(Branch, branches, values)
+
+    def recompute_ministries(self, church_ids: List[int]) -> int:
+        """`Ministry.total_members` e `Ministry.total_activities`."""
+        from apps.activities.models import Activity, Ministry
+        from apps.members.models import Member
+
+        through = Member.ministries.through
+        values = {
+            'total_members': self._grouped(
+                through.objects.filter(ministry__church_id__in=church_ids, member__is_active=True),
+                'ministry_id', Count('member_id'),
+            ),
+            'total_activities': self._grouped(
+                Activity._base_manager.filter(church_id__in=church_ids, is_active=True),
+                'ministry_id', Count('id'),
+            ),
+        }
+        ministries = Ministry._base_manager.filter(church_id__in=church_ids).only('id', *values)
+        return self._write(Ministry, ministries, values)
+
+    def recompute_churches(self, church_ids: List[int]) -> int:
+        """`Church.total_members`, `total_visitors` e `total_visitors_registered`."""
+        from apps.branches.models import Branch
+        from apps.churches.models import Church
+        from apps.members.models import Member
+        from apps.visitors.models import Visitor
+
+        values = {
+            'total_members': self._grouped(
+                Member._base_manager.filter(
+                    church_id__in=church_ids,
+                    is_active=True,
+                    membership_status=MembershipStatusChoices.ACTIVE,
+                ),
+                'church_id', Count('id'),
+            ),
+            'total_visitors': self._grouped(
+                Visitor._base_manager.filter(church_id__in=church_ids, is_active=True),
+                'church_id', Count('id'),
+            ),
+            'total_visitors_registered': self._grouped(
+                Branch._base_manager.filter(church_id__in=church_ids, is_active=True),
+                'church_id', Sum('total_visitors_registered'),
+            ),
+        }
+        churches = Church._base_manager.filter(id__in=church_ids).only('id', *values)
+        return self._write(Church, churches, values)
+
+    def recompute_denominations(self, denomination_ids: List[int]) -> int:
+        """Totais agregados da denominação a partir das igrejas ativas."""
+        from apps.churches.models import Church
+        from apps.denominations.models import Denomination
+        from apps.members.models import Member
+
+        active_churches = Church._base_manager.filter(denomination_id__in=denomination_ids, is_active=True)
+        values = {
+            'total_churches': self._grouped(active_churches, 'denomination_id', Count('id')),
+            'total_members': self._grouped(
+                Member._base_manager.filter(
+                    church__denomination_id__in=denomination_ids,
+                    church__is_active=True,
+                    is_active=True,
+                ),
+                'church__denomination_id', Count('id'),
+            ),
+            'total_visitors': self._grouped(active_churches, 'denomination_id', Sum('total_visitors')),
+            'total_visitors_registered': self._grouped(
+                active_churches, 'denomination_id', Sum('total_visitors_registered')
+            ),
+        }
+        denominations = Denomination._base_manager.filter(id__in=denomination_ids).only('id', *values)
+        return self._write(Denomination, denominations, values)
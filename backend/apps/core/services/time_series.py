@@ -0,0 +1,199 @@
+"""
+Séries temporais dos gráficos (mensais ou semanais) com meses de calendário.
+
+Os gráficos montavam os meses com `hoje - 30 * i dias`, o que desliza ao
+longo do ano (meses repetidos ou pulados) e faziam uma query por mês ou por
+agregado. Aqui cada métrica sai de uma única query:
+
+- os períodos são agrupados com `date_trunc` (`Trunc` do ORM) no fuso do
+  projeto;
+- no PostgreSQL os períodos sem dados são preenchidos por `generate_series`
+  e os acumulados calculados com `SUM(...) OVER (ORDER BY período)`, já
+  somando o que existia antes do início da série;
+- nos demais bancos a mesma query agrupada é completada em Python.
+
+Uso:
+    rows = TimeSeries(
+        Member.objects.filter(church=church), 'membership_date',
+        metrics={'new_members': Count('id')},
+        cumulative={'total_members': 'new_members'},
+        periods=12,
+    ).run()
+    # [{'period': date(2025, 1, 1), 'key': '2025-01', 'new_members': 3, 'total_members': 40}, ...]
+
+Com `tenant`/`depends_on` o resultado fica em cache com as gerações de
+`apps.core.response_cache` (invalidado quando os dados mudam).
+"""
+
+import hashlib
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Optional, Sequence
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.db.models import DateField, DateTimeField
+from django.db.models.functions import Trunc
+from django.utils import timezone
+
+CACHE_PREFIX = 'time-series'
+
+MONTH = 'month'
+WEEK = 'week'
+
+MONTH_LABELS_PT = {
+    1: 'Jan', 2: 'Fev', 3: 'Mar', 4: 'Abr', 5: 'Mai', 6: 'Jun',
+    7: 'Jul', 8: 'Ago', 9: 'Set', 10: 'Out', 11: 'Nov', 12: 'Dez',
+}
+
+
+def period_start(value: date, unit: str) -> date:
+    """Início do período (mês ou semana iniciada na segunda-feira) de `value`."""
+    if unit == MONTH:
+        return value.replace(day=1)
+    return value - timedelta(days=value.weekday())
+
+
+def shift_period(value: date, unit: str, count: int) -> date:
+    """Início do período `count` períodos depois (ou antes) de `value`."""
+    if unit == MONTH:
+        month = value.month - 1 + count
+        return date(value.year + month // 12, month % 12 + 1, 1)
+    return value + timedelta(weeks=count)
+
+
+class TimeSeries:
+    """
+    Série de `periods` períodos terminando no período corrente (ou em `end`).
+
+    `metrics` mapeia nome -> contagem (ex.: `Count('id', filter=Q(...))`) e
+    `cumulative` mapeia nome do acumulado -> métrica acumulada (incluindo os
+    registros anteriores ao início da série).
+    """
+
+    def __init__(self, queryset, date_field: str, metrics: Dict[str, object], *,
+                 periods: int = 12, unit: str = MONTH, end: Optional[date] = None,
+                 cumulative: Optional[Dict[str, str]] = None,
+                 tenant: Optional[str] = None, depends_on: Sequence[str] = ()):
+        if unit not in (MONTH, WEEK):
+            raise ValueError(f"Unidade de período inválida: {unit}")
+        self.queryset = queryset
+        self.date_field = date_field
+        self.metrics = metrics
+        self.unit = unit
+        self.cumulative = cumulative or {}
+        self.last = period_start(end or timezone.localdate(), unit)
+        self.first = shift_period(self.last, unit, -(periods - 1))
+        self.tenant = tenant
+        self.depends_on = tuple(depends_on)
+
+    # =====================================
+    # EXECUÇÃO
+    # =====================================
+
+    def run(self, use_sql_series: Optional[bool] = None):
+        """Linhas em ordem cronológica, uma por período, sem lacunas."""
+        key = self.cache_key()
+        if key:
+            rows = cache.get(key)
+            if rows is not None:
+                return rows
+
+        connection = connections[self.queryset.db]
+        if use_sql_series is None:
+            use_sql_series = connection.vendor == 'postgresql'
+        rows = self._run_sql_series(connection) if use_sql_series else self._run_python()
+
+        if key:
+            cache.set(key, rows, getattr(settings, 'RESPONSE_CACHE_TIMEOUT', 300))
+        return rows
+
+    def cache_key(self):
+        if not (self.tenant and self.depends_on):
+            return None
+        from apps.core.response_cache import get_generations
+
+        generations = '.'.join(map(str, get_generations(self.tenant, self.depends_on)))
+        sql, params = self._grouped().query.sql_with_params()
+        # A janela entra na chave: com acumulados o SQL não depende de `first`
+        digest = hashlib.md5(
+            repr((sql, params, self.cumulative, self.first, self.last, self.unit)).encode()
+        ).hexdigest()
+        return f'{CACHE_PREFIX}:{self.tenant}:{digest}:{generations}'
+
+    def _grouped(self):
+        """Agregados por período (até o fim da série; desde o início se não houver acumulados)."""
+        lookups = {f'{self.date_field}__lt': self._bound(shift_period(self.last, self.unit, 1))}
+        if not self.cumulative:
+            lookups[f'{self.date_field}__gte'] = self._bound(self.first)
+        return (
+            self.queryset.filter(**lookups)
+            .annotate(period=Trunc(self.date_field, self.unit, output_field=DateField()))
+            .values('period')
+            .annotate(**self.metrics)
+            .order_by()
+        )
+
+    def _bound(self, value):
+        """Limite do filtro: meia-noite local para campos `DateTimeField`."""
+        field = self.queryset.model._meta.get_field(self.date_field)
+        if isinstance(field, DateTimeField):
+            return timezone.make_aware(datetime.combine(value, time.min))
+        return value
+
+    def _run_sql_series(self, connection):
+        names = list(self.metrics)
+        sql, params = self._grouped().query.sql_with_params()
+        step = '1 month' if self.unit == MONTH else '1 week'
+
+        values = ', '.join(f'COALESCE(c."{name}", 0) AS "{name}"' for name in names)
+        totals = ''.join(
+            f', SUM(COALESCE(c."{metric}", 0)) OVER (ORDER BY COALESCE(s.period, c.period::date)) AS "{name}"'
+            for name, metric in self.cumulative.items()
+        )
+        columns = ', '.join(f't."{name}"' for name in names + list(self.cumulative))
+        query = f"""
+            SELECT t.period, {columns}
+            FROM (
+                SELECT COALESCE(s.period, c.period::date) AS period, {values}{totals}
+                FROM (SELECT generate_series(%s::date, %s::date, %s::interval)::date AS period) s
+                FULL OUTER JOIN ({sql}) c ON c.period::date = s.period
+            ) t
+            WHERE t.period >= %s
+            ORDER BY t.period
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(query, [self.first, self.last, step, *params, self.first])
+            return [
+                self._row(period, dict(zip(names + list(self.cumulative), values)))
+                for period, *values in cursor.fetchall()
+            ]
+
+    def _run_python(self):
+        counts = {}
+        totals = {name: 0 for name in self.cumulative}
+        for row in self._grouped():
+            period = row.pop('period')
+            if hasattr(period, 'date'):
+                period = period.date()
+            if period < self.first:
+                for name, metric in self.cumulative.items():
+                    totals[name] += row[metric] or 0
+            else:
+                counts[period] = row
+
+        rows = []
+        period = self.first
+        while period <= self.last:
+            values = {name: (counts.get(period, {}).get(name) or 0) for name in self.metrics}
+            for name, metric in self.cumulative.items():
+                totals[name] += values[metric]
+                values[name] = totals[name]
+            rows.append(self._row(period, values))
+            period = shift_period(period, self.unit, 1)
+        return rows
+
+    def _row(self, period, values):
+        values = {name: int(value or 0) for name, value in values.items()}
+        key = period.strftime('%Y-%m') if self.unit == MONTH else period.isoformat()
+        return {'period': period, 'key': key, **values}
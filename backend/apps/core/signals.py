@@ -0,0 +1,267 @@
+"""
+Manutenção incremental dos contadores desnormalizados.
+
+`Church.total_members`/`total_visitors`, `Branch.total_visitors`/
+`total_activities` e `Denomination.total_*` são atualizados com deltas `F()`
+a cada post_save/post_delete (inclusive soft delete via `is_active`), em vez
+de depender de chamadas explícitas a `update_statistics`.
+
+Cada modelo declara quanto "contribui" para cada contador a partir de um
+pequeno conjunto de campos. O estado carregado do banco é guardado em
+`post_init`; ao salvar, aplica-se a diferença entre a contribuição nova e a
+antiga. O mesmo snapshot inclui os `TRACKED_FIELDS` do modelo, quando
+declarados, e é a fonte do estado anterior para outros usos (ver
+`previous_state` e `Member.get_previous_values`). Operações em massa (`QuerySet.update`, `bulk_create`) não disparam
+signals: devem aplicar `bulk_counter_deltas` explicitamente; o comando
+`reconcile_counters` detecta e corrige as derivas restantes.
+"""
+
+import logging
+
+from django.apps import apps
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
+
+from apps.core.models import MembershipStatusChoices
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_ATTR = '_counter_snapshot'
+
+
+def _via_church(church_id):
+    """Filtro da denominação de uma igreja ativa (subquery, sem leitura prévia)."""
+    return {'churches__id': church_id, 'churches__is_active': True}
+
+
+def _member_contributions(state):
+    if not state['is_active'] or not state['church_id']:
+        return []
+    contributions = [('denominations.Denomination', _via_church(state['church_id']), 'total_members', 1)]
+    if state['membership_status'] == MembershipStatusChoices.ACTIVE:
+        contributions.append(('churches.Church', {'pk': state['church_id']}, 'total_members', 1))
+    return contributions
+
+
+def _visitor_contributions(state):
+    if not state['is_active']:
+        return []
+    contributions = []
+    if state['church_id']:
+        contributions += [
+            ('churches.Church', {'pk': state['church_id']}, 'total_visitors', 1),
+            ('denominations.Denomination', _via_church(state['church_id']), 'total_visitors', 1),
+        ]
+    if state['branch_id']:
+        contributions.append(('branches.Branch', {'pk': state['branch_id']}, 'total_visitors', 1))
+    return contributions
+
+
+def _activity_contributions(state):
+    if not state['is_active'] or not state['branch_id']:
+        return []
+    return [('branches.Branch', {'pk': state['branch_id']}, 'total_activities', 1)]
+
+
+# Modelo -> (campos acompanhados, função de contribuição)
+COUNTER_SPECS = {
+    'members.Member': (('church_id', 'is_active', 'membership_status'), _member_contributions),
+    'visitors.Visitor': (('church_id', 'branch_id', 'is_active'), _visitor_contributions),
+    'activities.Activity': (('branch_id', 'is_active'), _activity_contributions),
+}
+
+# Mudanças estruturais (raras) que exigem reagregar os totais do pai
+STRUCTURAL_SPECS = {
+    'churches.Church': ('denomination_id', 'is_active'),
+    'branches.Branch': ('church_id', 'is_active'),
+}
+
+
+def tracked_fields(model):
+    """Campos guardados no snapshot: os dos contadores mais `model.TRACKED_FIELDS`."""
+    label = model._meta.label
+    fields = COUNTER_SPECS[label][0] if label in COUNTER_SPECS else STRUCTURAL_SPECS[label]
+    return tuple(dict.fromkeys(fields + tuple(getattr(model, 'TRACKED_FIELDS', ()))))
+
+
+def _snapshot(instance, fields):
+    """Lê os campos já carregados sem disparar queries de campos adiados."""
+    values = instance.__dict__
+    if any(field not in values for field in fields):
+        return None
+    return {field: values[field] for field in fields}
+
+
+def _load_state(instance, fields):
+    """Estado persistido de `instance` (fallback quando não há snapshot)."""
+    row = type(instance)._base_manager.filter(pk=instance.pk).values(*fields).first()
+    return row
+
+
+def _deltas(old_contributions, new_contributions):
+    deltas = {}
+    for sign, contributions in ((-1, old_contributions), (1, new_contributions)):
+        for label, lookup, field, value in contributions:
+            key = (label, tuple(sorted(lookup.items())))
+            fields = deltas.setdefault(key, {})
+            fields[field] = fields.get(field, 0) + sign * value
+    return deltas
+
+
+def apply_counter_deltas(deltas):
+    """Aplica `{(modelo, filtro): {campo: delta}}` com UPDATEs atômicos `F()`."""
+    updates = []
+    for (label, lookup), fields in deltas.items():
+        changes = {
+            field: Greatest(F(field) + delta, 0)
+            for field, delta in fields.items()
+            if delta
+        }
+        if changes:
+            updates.append((label, lookup, changes))
+
+    # Saves que não alteram contadores não abrem transação nem savepoint
+    if not updates:
+        return
+    with transaction.atomic():
+        for label, lookup, changes in updates:
+            apps.get_model(label)._base_manager.filter(**dict(lookup)).update(**changes)
+
+
+def bulk_counter_deltas(label, transitions):
+    """
+    Deltas agregados de transições `(estado antigo, estado novo)` de vários
+    objetos, para operações em massa que não disparam signals (ex.: um
+    `QuerySet.update` seguido de `apply_counter_deltas`).
+    """
+    contributions = COUNTER_SPECS[label][1]
+    merged = {}
+    for old_state, new_state in transitions:
+        old = contributions(old_state) if old_state else []
+        new = contributions(new_state) if new_state else []
+        for key, fields in _deltas(old, new).items():
+            target = merged.setdefault(key, {})
+            for field, delta in fields.items():
+                target[field] = target.get(field, 0) + delta
+    return merged
+
+
+def remember_state(instance):
+    """Guarda os valores atuais como estado persistido (após gravações em massa)."""
+    setattr(instance, SNAPSHOT_ATTR, _snapshot(instance, tracked_fields(type(instance))))
+
+
+def previous_state(instance):
+    """
+    Estado persistido de `instance` (vazio para objetos novos). Se o objeto
+    foi carregado com `only()`/`defer()`, lê os campos em uma única query e
+    guarda o resultado.
+    """
+    if instance._state.adding or not instance.pk:
+        return {}
+    state = getattr(instance, SNAPSHOT_ATTR, None)
+    if state is None:
+        state = _load_state(instance, tracked_fields(type(instance)))
+        setattr(instance, SNAPSHOT_ATTR, state)
+    return state or {}
+
+
+def _remember(sender, instance, **kwargs):
+    remember_state(instance)
+
+
+def _ensure_previous_state(sender, instance, raw=False, **kwargs):
+    """Garante o estado anterior quando o objeto foi carregado com `only()`."""
+    if not raw:
+        previous_state(instance)
+
+
+def _counter_post_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    fields, contributions = COUNTER_SPECS[sender._meta.label]
+    old_state = None if created else getattr(instance, SNAPSHOT_ATTR, None)
+    new_state = {field: getattr(instance, field) for field in fields}
+
+    old = contributions(old_state) if old_state else []
+    apply_counter_deltas(_deltas(old, contributions(new_state)))
+    remember_state(instance)
+
+
+def _counter_post_delete(sender, instance, **kwargs):
+    fields, contributions = COUNTER_SPECS[sender._meta.label]
+    state = getattr(instance, SNAPSHOT_ATTR, None) or {
+        field: getattr(instance, field) for field in fields
+    }
+    apply_counter_deltas(_deltas(contributions(state), []))
+
+
+def _structural_change(sender, instance, created=False, raw=False, deleted=False, **kwargs):
+    """Igreja/filial criada, removida, (re)ativada ou movida: reagrega os pais."""
+    if raw:
+        return
+    from apps.core.services import KPIRecomputeService
+
+    fields = STRUCTURAL_SPECS[sender._meta.label]
+    snapshot = getattr(instance, SNAPSHOT_ATTR, None)
+    old_state = {field: snapshot[field] for field in fields} if snapshot else None
+    new_state = {field: getattr(instance, field) for field in fields}
+    if not (created or deleted) and old_state == new_state:
+        return
+
+    parent_field = fields[0]
+    parent_ids = {state[parent_field] for state in (old_state, new_state) if state and state[parent_field]}
+    remember_state(instance)
+
+    def recompute():
+        service = KPIRecomputeService()
+        if sender._meta.label == 'branches.Branch':
+            service.recompute_churches(list(parent_ids))
+            from apps.churches.models import Church
+            denomination_ids = set(
+                Church._base_manager.filter(id__in=parent_ids).values_list('denomination_id', flat=True)
+            )
+        else:
+            denomination_ids = parent_ids
+        service.recompute_denominations(list(denomination_ids))
+
+    transaction.on_commit(recompute)
+
+
+def _structural_post_delete(sender, instance, **kwargs):
+    _structural_change(sender, instance, deleted=True)
+
+
+def increment_visitors_registered(branch, amount=1):
+    """
+    Incrementa os contadores de registros via QR Code da filial, da igreja e
+    da denominação de forma atômica (sem ler-modificar-gravar).
+    """
+    deltas = {
+        ('branches.Branch', (('pk', branch.pk),)): {'total_visitors_registered': amount},
+    }
+    if branch.is_active:
+        deltas[('churches.Church', (('pk', branch.church_id),))] = {'total_visitors_registered': amount}
+        deltas[('denominations.Denomination', tuple(sorted(_via_church(branch.church_id).items())))] = {
+            'total_visitors_registered': amount
+        }
+    apply_counter_deltas(deltas)
+
+
+def connect_counter_signals():
+    """Registra os handlers de contadores (chamado em `CoreConfig.ready`)."""
+    for label in COUNTER_SPECS:
+        model = apps.get_model(label)
+        post_init.connect(_remember, sender=model, dispatch_uid=f'counters-init-{label}')
+        pre_save.connect(_ensure_previous_state, sender=model, dispatch_uid=f'counters-pre-{label}')
+        post_save.connect(_counter_post_save, sender=model, dispatch_uid=f'counters-save-{label}')
+        post_delete.connect(_counter_post_delete, sender=model, dispatch_uid=f'counters-delete-{label}')
+
+    for label in STRUCTURAL_SPECS:
+        model = apps.get_model(label)
+        post_init.connect(_remember, sender=model, dispatch_uid=f'counters-init-{label}')
+        pre_save.connect(_ensure_previous_state, sender=model, dispatch_uid=f'counters-pre-{label}')
+        post_save.connect(_structural_change, sender=model, dispatch_uid=f'counters-save-{label}')
+        post_delete.connect(_structural_post_delete, sender=model, dispatch_uid=f'counters-delete-{label}')
@@ -0,0 +1,162 @@
+"""
+Dublês de teste compartilhados pelos apps.
+
+`FakeRedis` implementa em memória o subconjunto de comandos do Redis usado
+pelo projeto, inclusive os scripts Lua registrados (emulados em Python),
+permitindo testar e medir o throttling sem um servidor Redis.
+"""
+
+import threading
+import time
+
+
+class FakeScript:
+    """Emula `redis.commands.core.Script` despachando para uma função Python."""
+
+    def __init__(self, client, func):
+        self.client = client
+        self.func = func
+
+    def __call__(self, keys=(), args=(), client=None):
+        with self.client._lock:
+            return self.func(self.client, list(keys), list(args))
+
+
+def _sliding_window(client, keys, args):
+    """Equivalente Python de `apps.core.throttling.SLIDING_WINDOW_SCRIPT`."""
+    key = keys[0]
+    now, window, limit = int(args[0]), int(args[1]), int(args[2])
+    member = args[3]
+
+    client.zremrangebyscore(key, 0, now - window)
+    count = client.zcard(key)
+    if count < limit:
+        client.zadd(key, {member: now})
+        client.pexpire(key, window)
+        return [1, limit - count - 1, window]
+
+    oldest = client.zrange(key, 0, 0, withscores=True)
+    retry = window
+    if oldest:
+        retry = window - (now - int(oldest[0][1]))
+    return [0, 0, retry]
+
+
+class FakeRedis:
+    """Redis em memória, thread-safe, para testes e benchmarks."""
+
+    def __init__(self):
+        self._data = {}
+        self._expires = {}
+        self._lock = threading.RLock()
+        self.calls = 0
+
+    @classmethod
+    def script_registry(cls):
+        from apps.core.throttling import SLIDING_WINDOW_SCRIPT
+        return {SLIDING_WINDOW_SCRIPT: _sliding_window}
+
+    def _expire_if_needed(self, key):
+        deadline = self._expires.get(key)
+        if deadline is not None and time.monotonic() >= deadline:
+            self._data.pop(key, None)
+            self._expires.pop(key, None)
+
+    def register_script(self, script):
+        func = self.script_registry().get(script)
+        if func is None:
+            raise NotImplementedError("Script Lua não suportado pelo FakeRedis")
+        return FakeScript(self, func)
+
+    def flushall(self):
+        with self._lock:
+            self._data.clear()
+            self._expires.clear()
+
+    # --- chaves simples -----------------------------------------------------
+
+    def get(self, key):
+        with self._lock:
+            self.calls += 1
+            self._expire_if_needed(key)
+            return self._data.get(key)
+
+    def set(self, key, value, ex=None):
+        with self._lock:
+            self.calls += 1
+            self._data[key] = value
+            self._expires.pop(key, None)
+            if ex:
+                self._expires[key] = time.monotonic() + ex
+            return True
+
+    def incr(self, key, amount=1):
+        with self._lock:
+            self.calls += 1
+            self._expire_if_needed(key)
+            value = int(self._data.get(key) or 0) + amount
+            self._data[key] = value
+            return value
+
+    def delete(self, *keys):
+        with self._lock:
+            self.calls += 1
+            removed = 0
+            for key in keys:
+                removed += int(self._data.pop(key, None) is not None)
+                self._expires.pop(key, None)
+            return removed
+
+    def exists(self, key):
+        with self._lock:
+            self._expire_if_needed(key)
+            return int(key in self._data)
+
+    def pexpire(self, key, milliseconds):
+        with self._lock:
+            if key not in self._data:
+                return 0
+            self._expires[key] = time.monotonic() + milliseconds / 1000.0
+            return 1
+
+    def expire(self, key, seconds):
+        return self.pexpire(key, seconds * 1000)
+
+    # --- sorted sets --------------------------------------------------------
+
+    def _zset(self, key):
+        self._expire_if_needed(key)
+        return self._data.setdefault(key, {})
+
+    def zadd(self, key, mapping):
+        with self._lock:
+            self.calls += 1
+            zset = self._zset(key)
+            added = sum(1 for member in mapping if member not in zset)
+            zset.update(mapping)
+            return added
+
+    def zcard(self, key):
+        with self._lock:
+            self.calls += 1
+            self._expire_if_needed(key)
+            return len(self._data.get(key) or {})
+
+    def zremrangebyscore(self, key, minimum, maximum):
+        with self._lock:
+            self.calls += 1
+            zset = self._zset(key)
+            doomed = [m for m, score in zset.items() if minimum <= score <= maximum]
+            for member in doomed:
+                del zset[member]
+            return len(doomed)
+
+    def zrange(self, key, start, end, withscores=False):
+        with self._lock:
+            self.calls += 1
+            items = sorted(self._zset(key).items(), key=lambda item: (item[1], item[0]))
+            end = len(items) if end == -1 else end + 1
+            items = items[start:end]
+            if withscores:
+                return items
+            return [member for member, _ in items]
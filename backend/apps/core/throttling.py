@@ -1,7 +1,306 @@
+"""
+Throttling do Obreiro Virtual.
+
+Os throttles padrão do DRF (`SimpleRateThrottle`) guardam no cache a lista
+completa de timestamps de cada chave e a regravam a cada requisição: custo
+O(n) por hit e condição de corrida entre workers do gunicorn.
+
+Aqui usamos uma janela deslizante em um sorted set do Redis, executada de
+forma atômica por um script Lua. Quando o Redis não está disponível o
+throttle degrada para o algoritmo original baseado em cache.
+
+Também suportamos cotas por tenant: o limite de cada escopo é multiplicado
+de acordo com o `subscription_plan` da igreja e existe um escopo agregado
+por igreja (`qr_church`) para os endpoints públicos de QR Code.
+
+Os dados do último throttle avaliado ficam em `request.ratelimit` e são
+expostos como cabeçalhos `X-RateLimit-*` pelo `RateLimitHeadersMiddleware`.
+"""
+
+import logging
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
 from rest_framework.throttling import SimpleRateThrottle
 
+from apps.core.models import SubscriptionPlanChoices
+
+logger = logging.getLogger(__name__)
+
+
+# Janela deslizante: remove hits fora da janela, conta e registra o novo hit
+# apenas se ainda houver cota. Retorna {permitido, restantes, ms até liberar}.
+SLIDING_WINDOW_SCRIPT = """
+local key = KEYS[1]
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local limit = tonumber(ARGV[3])
+local member = ARGV[4]
+
+redis.call('ZREMRANGEBYSCORE', key, 0, now - window)
+local count = redis.call('ZCARD', key)
+
+if count < limit then
+    redis.call('ZADD', key, now, member)
+    redis.call('PEXPIRE', key, window)
+    return {1, limit - count - 1, window}
+end
+
+local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+local retry = window
+if oldest[2] then
+    retry = window - (now - tonumber(oldest[2]))
+end
+return {0, 0, retry}
+"""
+
+DEFAULT_PLAN_MULTIPLIERS = {
+    SubscriptionPlanChoices.BASIC: 1,
+    SubscriptionPlanChoices.PROFESSIONAL: 2,
+    SubscriptionPlanChoices.ENTERPRISE: 4,
+    SubscriptionPlanChoices.DENOMINATION: 8,
+}
+
+# Tempo de cache do plano resolvido por usuário/QR Code (segundos)
+PLAN_CACHE_TIMEOUT = 300
+
+# Após uma falha de conexão, evita tentar o Redis por alguns segundos
+REDIS_RETRY_INTERVAL = 30
+
+_redis_client = None
+_redis_down_until = 0.0
+
+
+def get_redis_client():
+    """
+    Retorna o cliente Redis usado pelos throttles (singleton por processo).
+
+    Usa `THROTTLE_REDIS_URL` e retorna None quando o backend configurado em
+    `THROTTLE_BACKEND` não é o Redis.
+    """
+    global _redis_client
+
+    if getattr(settings, 'THROTTLE_BACKEND', 'redis') != 'redis':
+        return None
+
+    if time.monotonic() < _redis_down_until:
+        return None
+
+    if _redis_client is None:
+        import redis
+
+        url = getattr(settings, 'THROTTLE_REDIS_URL', None)
+        if not url:
+            return None
+        _redis_client = redis.Redis.from_url(
+            url,
+            socket_connect_timeout=0.2,
+            socket_timeout=0.2,
+        )
+    return _redis_client
+
+
+def set_redis_client(client):
+    """Substitui o cliente Redis dos throttles (testes e benchmarks)."""
+    global _redis_client, _redis_down_until
+    _redis_client = client
+    _redis_down_until = 0.0
+    SlidingWindowLimiter._scripts.clear()
+
+
+def mark_redis_unavailable():
+    """Suspende o uso do Redis por `REDIS_RETRY_INTERVAL` segundos."""
+    global _redis_down_until
+    _redis_down_until = time.monotonic() + REDIS_RETRY_INTERVAL
+
+
+class SlidingWindowLimiter:
+    """
+    Limitador de janela deslizante atômico sobre um sorted set do Redis.
+
+    Cada chave guarda no máximo `limit` membros, portanto memória e custo por
+    hit são limitados pela cota e não pelo volume de tráfego.
+    """
+
+    # Script registrado por cliente (id do cliente -> Script)
+    _scripts = {}
+
+    def __init__(self, client):
+        self.client = client
+
+    def _get_script(self):
+        script = self._scripts.get(id(self.client))
+        if script is None:
+            script = self.client.register_script(SLIDING_WINDOW_SCRIPT)
+            self._scripts[id(self.client)] = script
+        return script
+
+    def hit(self, key, limit, window, now):
+        """
+        Registra um hit para `key`.
+
+        Retorna uma tupla (permitido, restantes, segundos até liberar).
+        """
+        now_ms = int(now * 1000)
+        window_ms = int(window * 1000)
+        member = f"{now_ms}-{uuid.uuid4().hex[:8]}"
+
+        allowed, remaining, retry_ms = self._get_script()(
+            keys=[key],
+            args=[now_ms, window_ms, limit, member],
+        )
+        return bool(int(allowed)), int(remaining), max(0, int(retry_ms)) / 1000.0
+
 
-class QRCodeAnonRateThrottle(SimpleRateThrottle):
+class RedisRateThrottle(SimpleRateThrottle):
+    """
+    Base dos throttles do projeto com janela deslizante no Redis.
+
+    Mantém a API do `SimpleRateThrottle` (`scope`, `rate`, `get_cache_key`)
+    para que as subclasses só precisem definir como identificar o cliente.
+    """
+
+    key_prefix = 'throttle'
+
+    def get_plan_multiplier(self, request, view):
+        """Multiplicador da cota conforme o plano do tenant (padrão: 1)."""
+        plan = self.get_subscription_plan(request, view)
+        if not plan:
+            return 1
+        multipliers = getattr(settings, 'THROTTLE_PLAN_MULTIPLIERS', DEFAULT_PLAN_MULTIPLIERS)
+        return multipliers.get(plan, 1)
+
+    def get_subscription_plan(self, request, view):
+        """Plano do tenant da requisição. Subclasses podem sobrescrever."""
+        return None
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        ident = self.get_cache_key(request, view)
+        if ident is None:
+            return True
+        self.key = f"{self.key_prefix}:{self.scope}:{ident}"
+
+        self.num_requests = self.num_requests * self.get_plan_multiplier(request, view)
+
+        client = get_redis_client()
+        if client is None:
+            return self._allow_request_fallback(request, view)
+
+        try:
+            allowed, remaining, reset = SlidingWindowLimiter(client).hit(
+                self.key,
+                self.num_requests,
+                self.duration,
+                self.timer(),
+            )
+        except Exception as exc:
+            logger.warning(f"[THROTTLE] Redis indisponível, usando cache local: {exc}")
+            mark_redis_unavailable()
+            return self._allow_request_fallback(request, view)
+
+        self._wait = reset if not allowed else None
+        self._record(request, remaining, reset)
+        return allowed
+
+    def _allow_request_fallback(self, request, view):
+        """Algoritmo original do DRF, baseado no cache padrão do Django."""
+        self.history = self.cache.get(self.key, [])
+        self.now = self.timer()
+        while self.history and self.history[-1] <= self.now - self.duration:
+            self.history.pop()
+
+        self._wait = None
+        if len(self.history) >= self.num_requests:
+            self._record(request, 0, self.wait())
+            return self.throttle_failure()
+
+        allowed = self.throttle_success()
+        self._record(request, self.num_requests - len(self.history), self.duration)
+        return allowed
+
+    def wait(self):
+        if getattr(self, '_wait', None) is not None:
+            return self._wait
+        return super().wait()
+
+    def _record(self, request, remaining, reset):
+        """Guarda os dados do throttle mais restritivo para os cabeçalhos."""
+        target = getattr(request, '_request', request)
+        current = getattr(target, 'ratelimit', None)
+        if current is not None and current['remaining'] <= remaining:
+            return
+        target.ratelimit = {
+            'limit': self.num_requests,
+            'remaining': max(0, remaining),
+            'reset': int(round(reset)),
+        }
+
+
+def _cached_plan(cache_key, resolver):
+    """Resolve o plano usando o cache padrão para evitar query por requisição."""
+    plan = cache.get(cache_key)
+    if plan is None:
+        plan = resolver() or ''
+        cache.set(cache_key, plan, PLAN_CACHE_TIMEOUT)
+    return plan or None
+
+
+class UserPlanMixin:
+    """Resolve o plano pela igreja ativa do usuário autenticado."""
+
+    def get_subscription_plan(self, request, view):
+        church = getattr(request, 'church', None)
+        if church is not None:
+            return church.subscription_plan
+
+        user = getattr(request, 'user', None)
+        if not user or not user.is_authenticated:
+            return None
+
+        def resolve():
+            from apps.accounts.models import ChurchUser
+            return (ChurchUser.objects
+                    .filter(user=user, is_active=True)
+                    .order_by('-is_user_active_church', 'id')
+                    .values_list('church__subscription_plan', flat=True)
+                    .first())
+
+        return _cached_plan(f"throttle-plan:user:{user.pk}", resolve)
+
+
+class QRCodePlanMixin:
+    """Resolve o plano pela igreja dona do QR Code da URL."""
+
+    def get_qr_church(self, view):
+        qr_code_uuid = getattr(view, 'kwargs', {}).get('qr_code_uuid')
+        if not qr_code_uuid:
+            return None
+
+        def resolve():
+            from apps.branches.models import Branch
+            row = (Branch.objects
+                   .filter(qr_code_uuid=qr_code_uuid)
+                   .values_list('church_id', 'church__subscription_plan')
+                   .first())
+            return f"{row[0]}:{row[1]}" if row else None
+
+        value = _cached_plan(f"throttle-plan:qr:{qr_code_uuid}", resolve)
+        if not value:
+            return None
+        church_id, plan = value.split(':', 1)
+        return {'id': church_id, 'plan': plan}
+
+    def get_subscription_plan(self, request, view):
+        church = self.get_qr_church(view)
+        return church['plan'] if church else None
+
+
+class QRCodeAnonRateThrottle(QRCodePlanMixin, RedisRateThrottle):
     """Throttle para endpoints públicos de QR Code (anônimos)."""
     scope = 'qr_anon'
 
@@ -10,7 +309,21 @@ class QRCodeAnonRateThrottle(SimpleRateThrottle):
         return self.get_ident(request)
 
 
-class QRCodeUserRateThrottle(SimpleRateThrottle):
+class QRCodeChurchRateThrottle(QRCodePlanMixin, RedisRateThrottle):
+    """
+    Cota agregada por igreja para os endpoints públicos de QR Code.
+
+    Protege contra abuso distribuído em vários IPs; o limite escala com o
+    plano da igreja.
+    """
+    scope = 'qr_church'
+
+    def get_cache_key(self, request, view):
+        church = self.get_qr_church(view)
+        return f"church-{church['id']}" if church else None
+
+
+class QRCodeUserRateThrottle(UserPlanMixin, RedisRateThrottle):
     """Throttle para endpoints de QR Code quando autenticado (fallback)."""
     scope = 'qr_user'
 
@@ -22,7 +335,7 @@ class QRCodeUserRateThrottle(SimpleRateThrottle):
         return self.cache_format % {'scope': self.scope, 'ident': ident}
 
 
-class AuthAnonRateThrottle(SimpleRateThrottle):
+class AuthAnonRateThrottle(RedisRateThrottle):
     """Throttle para endpoints públicos de autenticação (login)."""
     scope = 'auth_anon'
 
@@ -30,7 +343,7 @@ class AuthAnonRateThrottle(SimpleRateThrottle):
         return self.get_ident(request)
 
 
-class AuthUserRateThrottle(SimpleRateThrottle):
+class AuthUserRateThrottle(UserPlanMixin, RedisRateThrottle):
     """Throttle para endpoints de autenticação quando autenticado (baixa prioridade)."""
     scope = 'auth_user'
 
@@ -40,4 +353,3 @@ class AuthUserRateThrottle(SimpleRateThrottle):
         else:
             ident = self.get_ident(request)
         return self.cache_format % {'scope': self.scope, 'ident': ident}
-
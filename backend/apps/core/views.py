@@ -10,15 +10,15 @@ from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 from rest_framework import status
 from django.conf import settings
+from apps.core.db import connection_metrics
+from apps.core.response_cache import cache_response, response_cache_metrics
+from apps.core.services.time_series import MONTH_LABELS_PT, TimeSeries
 import requests
 from rest_framework.views import APIView
 from apps.churches.models import SubscriptionPlanChoices, Church
 from django.db.models import Count, Q
-from django.db.models.functions import TruncMonth
 from apps.members.models import Member
 from apps.visitors.models import Visitor
-from datetime import datetime, timedelta
-from django.utils import timezone
 
 User = get_user_model()
 
@@ -61,17 +61,24 @@ def dashboard_stats(request):
 def health_check(request):
     """
     Health check para monitoramento
+    
+    Métricas de conexões e do cache de respostas só para a equipe (staff):
+    o endpoint é público.
     """
     try:
         # Testar conexão com banco
         user_count = User.objects.count()
         
-        return Response({
+        data = {
             'status': 'healthy',
             'database': 'connected',
             'user_count': user_count,
             'timestamp': '2025-06-11T22:50:00Z'
-        })
+        }
+        if request.user.is_staff:
+            data['connections'] = connection_metrics()
+            data['response_cache'] = response_cache_metrics()
+        return Response(data)
     except Exception as e:
         return Response({
             'status': 'unhealthy',
@@ -197,29 +204,29 @@ class SubscriptionPlansView(APIView):
         return Response(plans, status=status.HTTP_200_OK)
 
 
+def _charts_church(view, request):
+    """Igreja dos gráficos: a do request (middleware) ou o primeiro vínculo ativo do usuário."""
+    from apps.accounts.models import ChurchUser
+
+    church = getattr(request, 'church', None)
+    if church:
+        return church
+    church_user = ChurchUser.objects.filter(
+        user=request.user,
+        is_active=True
+    ).select_related('church').first()
+    return church_user.church if church_user else None
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@cache_response('dashboard-charts', depends_on=('members', 'visitors'), vary_on=(), church=_charts_church)
 def dashboard_charts(request):
     """
     Retorna dados para os gráficos do dashboard
     """
-    from apps.accounts.models import ChurchUser
-    
     # Determinar a igreja do usuário (multi-tenant)
-    church = getattr(request, 'church', None)
-    
-    # Se não tem church no request, tentar pegar do ChurchUser
-    if not church:
-        try:
-            church_user = ChurchUser.objects.filter(
-                user=request.user,
-                is_active=True
-            ).select_related('church').first()
-            
-            if church_user:
-                church = church_user.church
-        except ChurchUser.DoesNotExist:
-            pass
+    church = _charts_church(None, request)
     
     if not church:
         # Tentar pegar da primeira igreja associada se for admin
@@ -233,88 +240,42 @@ def dashboard_charts(request):
             status=status.HTTP_400_BAD_REQUEST
         )
 
-    # Período: Últimos 12 meses
-    today = timezone.now().date()
-    start_date = today - timedelta(days=365)
-    
-    # 1. Evolução de Membros
-    # Agrupar por mês de membresia
-    members_data = Member.objects.filter(
-        church=church,
-        membership_date__gte=start_date
-    ).annotate(
-        month=TruncMonth('membership_date')
-    ).values('month').annotate(
-        new_members=Count('id')
-    ).order_by('month')
-    
-    # Calcular total acumulado (precisamos do total antes do período também)
-    total_before = Member.objects.filter(
-        church=church,
-        membership_date__lt=start_date
-    ).count()
-    
-    members_evolution = []
-    current_total = total_before
-    
-    # Criar dicionário para acesso rápido
-    members_by_month = {
-        item['month'].strftime('%Y-%m'): item['new_members'] 
-        for item in members_data if item['month']
-    }
-    
-    # Mapeamento de meses em português
-    meses_pt = {
-        1: 'Jan', 2: 'Fev', 3: 'Mar', 4: 'Abr', 5: 'Mai', 6: 'Jun',
-        7: 'Jul', 8: 'Ago', 9: 'Set', 10: 'Out', 11: 'Nov', 12: 'Dez'
-    }
-    
-    # Gerar lista dos últimos 12 meses (incluindo meses sem dados)
-    for i in range(12):
-        date_cursor = (today.replace(day=1) - timedelta(days=30 * (11-i)))
-        month_key = date_cursor.strftime('%Y-%m')
-        month_label = meses_pt[date_cursor.month]
-        
-        new_count = members_by_month.get(month_key, 0)
-        current_total += new_count
-        
-        members_evolution.append({
-            'month': month_label,
-            'full_date': month_key,
-            'new_members': new_count,
-            'total_members': current_total
-        })
+    # Últimos 12 meses de calendário (incluindo o corrente), uma query por métrica
+    members_series = TimeSeries(
+        Member.objects.filter(church=church),
+        'membership_date',
+        metrics={'new_members': Count('id')},
+        cumulative={'total_members': 'new_members'},
+        periods=12,
+    ).run()
+    members_evolution = [
+        {
+            'month': MONTH_LABELS_PT[row['period'].month],
+            'full_date': row['key'],
+            'new_members': row['new_members'],
+            'total_members': row['total_members'],
+        }
+        for row in members_series
+    ]
 
-    # 2. Estatísticas de Visitantes
-    visitors_data = Visitor.objects.filter(
-        church=church,
-        created_at__date__gte=start_date
-    ).annotate(
-        month=TruncMonth('created_at')
-    ).values('month').annotate(
-        total_visitors=Count('id'),
-        converted=Count('id', filter=Q(converted_to_member=True))
-    ).order_by('month')
-    
-    visitors_stats = []
-    visitors_by_month = {
-        item['month'].strftime('%Y-%m'): item 
-        for item in visitors_data if item['month']
-    }
-    
-    for i in range(12):
-        date_cursor = (today.replace(day=1) - timedelta(days=30 * (11-i)))
-        month_key = date_cursor.strftime('%Y-%m')
-        month_label = meses_pt[date_cursor.month]
-        
-        data = visitors_by_month.get(month_key, {'total_visitors': 0, 'converted': 0})
-        
-        visitors_stats.append({
-            'month': month_label,
-            'full_date': month_key,
-            'visitors': data['total_visitors'],
-            'converted': data['converted']
-        })
+    visitors_series = TimeSeries(
+        Visitor.objects.filter(church=church),
+        'created_at',
+        metrics={
+            'visitors': Count('id'),
+            'converted': Count('id', filter=Q(converted_to_member=True)),
+        },
+        periods=12,
+    ).run()
+    visitors_stats = [
+        {
+            'month': MONTH_LABELS_PT[row['period'].month],
+            'full_date': row['key'],
+            'visitors': row['visitors'],
+            'converted': row['converted'],
+        }
+        for row in visitors_series
+    ]
 
     return Response({
         'members_evolution': members_evolution,
@@ -0,0 +1,110 @@
+"""
+Seções dos dashboards de denominação.
+
+Cada função retorna um dicionário `{nome da seção: callable}` para o
+`DashboardFanout`; as seções são independentes entre si e executam em
+paralelo. As queries usam `_base_manager` com filtros explícitos para não
+depender do tenant da requisição (as seções rodam em outras threads).
+"""
+
+import hashlib
+from datetime import timedelta
+
+from django.db.models import Count
+from django.utils import timezone
+
+
+def _grouped_by_church(queryset):
+    """Mapa church_id -> quantidade em uma única query agrupada."""
+    rows = queryset.order_by().values('church_id').annotate(total=Count('id')).values_list('church_id', 'total')
+    return dict(rows)
+
+
+def _church_counts(church_filter):
+    """Seções de membros, visitantes e atividades ativos agrupados por igreja."""
+    from apps.activities.models import Activity
+    from apps.members.models import Member
+    from apps.visitors.models import Visitor
+
+    return {
+        'members_by_church': lambda: _grouped_by_church(
+            Member._base_manager.filter(is_active=True, **church_filter)
+        ),
+        'visitors_by_church': lambda: _grouped_by_church(
+            Visitor._base_manager.filter(is_active=True, **church_filter)
+        ),
+        'activities_by_church': lambda: _grouped_by_church(
+            Activity._base_manager.filter(is_active=True, **church_filter)
+        ),
+    }
+
+
+def network_scope(denomination, church_ids):
+    """Escopo de cache de um conjunto de igrejas da denominação."""
+    digest = hashlib.md5(','.join(map(str, sorted(church_ids))).encode()).hexdigest()[:12]
+    return f'denomination-{denomination.id}:churches-{digest}'
+
+
+def denomination_summary_sections(denomination):
+    """Totais usados por `dashboard_data` e `financial_reports`."""
+    from apps.churches.models import Church
+    from apps.members.models import Member
+
+    churches = Church._base_manager.filter(denomination=denomination, is_active=True)
+
+    return {
+        'total_churches': churches.count,
+        'total_members': lambda: Member._base_manager.filter(
+            church__denomination=denomination, church__is_active=True, is_active=True
+        ).count(),
+        'churches_by_state': lambda: list(
+            churches.order_by().values('state').annotate(count=Count('id')).order_by('-count')
+        ),
+        'recent_churches': lambda: list(
+            churches.order_by('-created_at').values('id', 'name', 'city', 'state', 'created_at')[:5]
+        ),
+    }
+
+
+def network_stats_sections(denomination, church_ids):
+    """Contagens da rede de igrejas do usuário (`DenominationViewSet.stats`)."""
+    from apps.churches.models import Church
+    from apps.members.models import Member
+    from apps.visitors.models import Visitor
+
+    def growth():
+        now = timezone.now()
+        last_month = now - timedelta(days=30)
+        members = Member._base_manager.filter(church_id__in=church_ids, is_active=True)
+        visitors = Visitor._base_manager.filter(church_id__in=church_ids, is_active=True)
+        return {
+            'members_this_month': members.filter(created_at__gte=last_month).count(),
+            'members_last_month': members.filter(created_at__lt=last_month).count(),
+            'visitors_this_month': visitors.filter(created_at__gte=last_month).count(),
+            'visitors_last_month': visitors.filter(
+                created_at__gte=now - timedelta(days=60), created_at__lt=last_month
+            ).count(),
+        }
+
+    sections = _church_counts({'church_id__in': church_ids})
+    sections.update({
+        'growth': growth,
+        'inactive_churches': Church._base_manager.filter(
+            denomination=denomination, is_active=False
+        ).count,
+    })
+    return sections
+
+
+def hierarchy_sections(denomination):
+    """Igrejas ativas da denominação e suas contagens (`hierarchy`)."""
+    from apps.churches.models import Church
+
+    churches = Church._base_manager.filter(denomination=denomination, is_active=True)
+    sections = _church_counts({'church__denomination': denomination, 'church__is_active': True})
+    sections['churches'] = lambda: list(churches.order_by('name').values(
+        'id', 'uuid', 'name', 'short_name', 'email', 'phone', 'address', 'city', 'state',
+        'zipcode', 'subscription_plan', 'subscription_status', 'total_members',
+        'total_visitors', 'is_active', 'created_at', 'updated_at',
+    ))
+    return sections
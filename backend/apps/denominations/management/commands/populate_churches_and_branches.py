@@ -2,7 +2,8 @@ from django.core.management.base import BaseCommand
 from django.contrib.auth import get_user_model
 from apps.denominations.models import Denomination
 from apps.churches.models import Church
-from apps.accounts.models import ChurchUser, RoleChoices
+from apps.churches.services import ChurchProvisioningService
+from django.utils.text import slugify
 import random
 
 User = get_user_model()
@@ -77,7 +78,7 @@ class Command(BaseCommand):
                 'city': 'São Paulo',
                 'state': 'SP',
                 'zipcode': '01234-567',
-                'subscription_plan': 'premium',
+                'subscription_plan': 'enterprise',
                 'subscription_status': 'active',
                 'has_branches': True,
                 'branches': [
@@ -125,123 +126,73 @@ class Command(BaseCommand):
                 'city': 'Santos',
                 'state': 'SP',
                 'zipcode': '11000-000',
-                'subscription_plan': 'standard',
+                'subscription_plan': 'professional',
                 'subscription_status': 'active',
                 'has_branches': False,
                 'branches': []
             }
         ]
 
-        created_churches = 0
-        created_branches = 0
-
+        # Igrejas e "filiais" (também igrejas) ainda não existentes, criadas em lote
+        rows = []
         for church_data in churches_data:
-            # Verificar se a igreja já existe
-            church, created = Church.objects.get_or_create(
-                name=church_data['name'],
-                denomination=denomination,
-                defaults={
-                    'short_name': church_data['short_name'],
-                    'email': church_data['email'],
-                    'phone': church_data['phone'],
-                    'address': church_data['address'],
-                    'city': church_data['city'],
-                    'state': church_data['state'],
-                    'zipcode': church_data['zipcode'],
-                    'subscription_plan': church_data['subscription_plan'],
-                    'subscription_status': church_data['subscription_status'],
-                    'is_active': True,
-                }
+            rows.append(church_data)
+            if church_data['has_branches']:
+                for branch_data in church_data['branches']:
+                    rows.append({
+                        'name': branch_data['name'],
+                        'short_name': branch_data['name'][:10],
+                        'email': church_data['email'].replace('contato@', f"{slugify(branch_data['name'])}@"),
+                        'phone': branch_data['phone'],
+                        'address': branch_data['address'],
+                        'city': branch_data['city'],
+                        'state': church_data['state'],
+                        'zipcode': church_data['zipcode'],
+                        'subscription_plan': church_data['subscription_plan'],
+                        'subscription_status': church_data['subscription_status'],
+                        'is_branch': True,
+                    })
+
+        existing = set(
+            Church.objects.filter(
+                denomination=denomination, name__in=[row['name'] for row in rows]
+            ).values_list('name', flat=True)
+        )
+        for name in sorted(existing):
+            self.stdout.write(self.style.WARNING(f'⚠️  Igreja já existe: {name}'))
+        rows = [row for row in rows if row['name'] not in existing]
+
+        # Dados de demonstração: sem o limite de igrejas do plano da denominação
+        result = ChurchProvisioningService(user=admin_user, enforce_limits=False).provision(rows, denomination)
+        for error in result['errors']:
+            self.stdout.write(
+                self.style.ERROR(f'❌ Erro ao criar {rows[error["index"]]["name"]}: {error["errors"]}')
             )
 
-            if created:
+        # Definir estatísticas iniciais realistas (um UPDATE em lote)
+        rows_by_name = {row['name']: row for row in rows}
+        created_churches = created_branches = 0
+        for church in result['churches']:
+            row = rows_by_name[church.name]
+            church.subscription_status = row['subscription_status']
+            if row.get('is_branch'):
+                created_branches += 1
+                church.total_members = random.randint(80, 400)
+                church.total_visitors = random.randint(20, 80)
+                self.stdout.write(self.style.SUCCESS(f'✅ Filial criada: {church.name}'))
+            else:
                 created_churches += 1
-                self.stdout.write(
-                    self.style.SUCCESS(f'✅ Igreja criada: {church.name}')
-                )
-
-                # Criar ChurchUser para associar o admin da denominação à igreja
-                church_user, cu_created = ChurchUser.objects.get_or_create(
-                    user=admin_user,
-                    church=church,
-                    defaults={
-                        'role': RoleChoices.CHURCH_ADMIN,
-                        'can_manage_denomination': True,
-                        'can_create_churches': True,
-                        'can_view_financial_reports': True,
-                        'is_active': True,
-                    }
-                )
-                
-                if cu_created:
-                    self.stdout.write(
-                        self.style.SUCCESS(f'✅ ChurchUser criado para {admin_user.email} na igreja {church.name}')
-                    )
-
-                # Definir estatísticas iniciais realistas
                 church.total_members = random.randint(300, 1500)
                 church.total_visitors = random.randint(50, 200)
-                church.save()
-
-            else:
-                self.stdout.write(
-                    self.style.WARNING(f'⚠️  Igreja já existe: {church.name}')
-                )
-
-            # Criar filiais se especificadas
-            if church_data['has_branches']:
-                for branch_data in church_data['branches']:
-                    try:
-                        # Para este exemplo, vamos usar o modelo Church para filiais também
-                        # mas marcando como filial da igreja principal
-                        branch, branch_created = Church.objects.get_or_create(
-                            name=branch_data['name'],
-                            denomination=denomination,
-                            defaults={
-                                'short_name': branch_data['name'][:10],
-                                'email': church.email,  # Usar email da igreja principal
-                                'phone': branch_data['phone'],
-                                'address': branch_data['address'],
-                                'city': branch_data['city'],
-                                'state': church.state,
-                                'zipcode': church.zipcode,
-                                'subscription_plan': church.subscription_plan,
-                                'subscription_status': church.subscription_status,
-                                'is_active': True,
-                                # Se houver campo parent_church, usar: parent_church=church
-                            }
-                        )
-
-                        if branch_created:
-                            created_branches += 1
-                            # Definir estatísticas para filial
-                            branch.total_members = random.randint(80, 400)
-                            branch.total_visitors = random.randint(20, 80)
-                            branch.save()
-                            
-                            # Nota: branches_count será calculado dinamicamente se necessário
-                            
-                            self.stdout.write(
-                                self.style.SUCCESS(f'✅ Filial criada: {branch.name}')
-                            )
-
-                            # Criar ChurchUser para a filial também
-                            ChurchUser.objects.get_or_create(
-                                user=admin_user,
-                                church=branch,
-                                defaults={
-                                    'role': RoleChoices.CHURCH_ADMIN,
-                                    'can_manage_denomination': True,
-                                    'can_create_churches': True,
-                                    'can_view_financial_reports': True,
-                                    'is_active': True,
-                                }
-                            )
+                self.stdout.write(self.style.SUCCESS(f'✅ Igreja criada: {church.name}'))
+        Church.objects.bulk_update(
+            result['churches'], ['subscription_status', 'total_members', 'total_visitors']
+        )
 
-                    except Exception as e:
-                        self.stdout.write(
-                            self.style.ERROR(f'❌ Erro ao criar filial {branch_data["name"]}: {e}')
-                        )
+        self.stdout.write(
+            f"⏱️  {result['created_count']} igreja(s) em {result['duration_seconds']}s "
+            f"({result['churches_per_second']} igrejas/s); QR Codes das filiais matriz gerados em segundo plano"
+        )
 
         # Atualizar estatísticas da denominação
         denomination.update_statistics()
@@ -1,3 +1,79 @@
-from django.test import TestCase
+from datetime import date
 
-# Create your tests here.
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.accounts.models import ChurchUser
+from apps.core.models import RoleChoices
+from apps.core.tests import create_church
+from apps.members.models import Member
+from apps.visitors.models import Visitor
+
+
+# As seções rodam na thread da requisição: a transação do teste não é visível
+# para conexões de outras threads
+@override_settings(DASHBOARD_PARALLEL_QUERIES=False)
+class DenominationDashboardTests(APITestCase):
+    """Dashboards da denominação montados pelo DashboardFanout."""
+
+    def setUp(self):
+        cache.clear()
+        self.church = create_church('dash-a')
+        self.denomination = self.church.denomination
+        self.other_church = create_church('dash-b', denomination=self.denomination)
+        self.admin = self.denomination.administrator
+
+        for church in (self.church, self.other_church):
+            ChurchUser.objects.create(
+                user=self.admin,
+                church=church,
+                role=RoleChoices.CHURCH_ADMIN,
+                can_view_reports=True,
+                is_active=True,
+            )
+
+        for index in range(3):
+            Member.objects.create(
+                church=self.church,
+                full_name=f'Membro {index}',
+                birth_date=date(1990, 1, 1),
+                phone='(11) 91111-2222',
+            )
+        Visitor.objects.create(church=self.other_church, full_name='Visitante')
+        self.client.force_authenticate(user=self.admin)
+
+    def test_dashboard_data(self):
+        url = reverse('denomination-dashboard-data', kwargs={'pk': self.denomination.pk})
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['total_churches'], 2)
+        self.assertEqual(response.data['total_members'], 3)
+        self.assertEqual(response.data['churches_by_state'], [{'state': 'SP', 'count': 2}])
+        self.assertEqual(len(response.data['recent_churches']), 2)
+        self.assertIn('total_members;dur=', response['Server-Timing'])
+        self.assertNotIn('X-Dashboard-Partial', response)
+
+        # financial_reports reaproveita as seções em cache do mesmo dia
+        url = reverse('denomination-financial-reports', kwargs={'pk': self.denomination.pk})
+        response = self.client.get(url)
+        self.assertEqual(response.data['total_members'], 3)
+        self.assertIn('total_members;dur=0.0;desc="cache"', response['Server-Timing'])
+
+    def test_stats_and_hierarchy(self):
+        response = self.client.get(reverse('denomination-stats'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['total_churches'], 2)
+        self.assertEqual(response.data['total_members'], 3)
+        self.assertEqual(response.data['total_visitors'], 1)
+        self.assertEqual(response.data['growth_metrics']['members_this_month'], 3)
+
+        response = self.client.get(reverse('denomination-hierarchy'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        node = response.data[0]
+        members = {child['data']['id']: child['stats']['members'] for child in node['children']}
+        self.assertEqual(members[self.church.id], 3)
+        self.assertEqual(node['data']['total_churches'], 2)
@@ -14,13 +14,23 @@ from .serializers import (
     DenominationSerializer, DenominationCreateSerializer, 
     DenominationSummarySerializer, DenominationStatsSerializer
 )
+from apps.core.mixins import ConditionalReadMixin
 from apps.core.permissions import (
     IsChurchAdmin, IsPlatformAdmin, CanManageDenomination,
     CanCreateChurches, CanViewFinancialReports, IsHierarchicallyAuthorized
 )
+from apps.core.services import DashboardFanout, KPIRecomputeService
+from apps.core.response_cache import cached_response
+from .dashboards import (
+    denomination_summary_sections, hierarchy_sections, network_scope, network_stats_sections
+)
+
 
+# Dados que alimentam os totais de igrejas e membros da denominação
+DENOMINATION_DASHBOARD_DEPENDENCIES = ('churches', 'members')
 
-class DenominationViewSet(viewsets.ReadOnlyModelViewSet):
+
+class DenominationViewSet(ConditionalReadMixin, viewsets.ReadOnlyModelViewSet):
     """
     ViewSet para denominações
     """
@@ -33,6 +43,7 @@ class DenominationViewSet(viewsets.ReadOnlyModelViewSet):
     filterset_fields = ['headquarters_state', 'is_active']
     ordering_fields = ['name', 'headquarters_city', 'total_churches', 'created_at']
     ordering = ['name']
+    conditional_related = ('churches',)
     
     def get_queryset(self):
         """Filtrar denominações baseado no usuário"""
@@ -104,7 +115,8 @@ class DenominationViewSet(viewsets.ReadOnlyModelViewSet):
     def update_statistics(self, request, pk=None):
         """Atualizar estatísticas da denominação"""
         denomination = self.get_object()
-        denomination.update_statistics()
+        KPIRecomputeService(denomination_ids=[denomination.id]).run()
+        denomination.refresh_from_db()
         
         return Response({
             'message': 'Estatísticas atualizadas',
@@ -147,8 +159,25 @@ class DenominationViewSet(viewsets.ReadOnlyModelViewSet):
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        dashboard_data = denomination.get_admin_dashboard_data()
-        return Response(dashboard_data)
+        def compute():
+            result = DashboardFanout(
+                f'denomination-{denomination.id}', denomination_summary_sections(denomination),
+                tenant=f'denomination:{denomination.id}', depends_on=DENOMINATION_DASHBOARD_DEPENDENCIES,
+            ).run()
+            dashboard_data = {
+                'total_churches': result.get('total_churches', 0),
+                'total_members': result.get('total_members', 0),
+                'churches_by_state': result.get('churches_by_state', []),
+                'recent_churches': result.get('recent_churches', []),
+            }
+            return result.apply_headers(Response(dashboard_data))
+
+        # Cache da resposta após a verificação de acesso, invalidado por
+        # mudanças em igrejas e membros da denominação
+        return cached_response(
+            request, 'denomination-dashboard', f'denomination:{denomination.id}', compute,
+            depends_on=DENOMINATION_DASHBOARD_DEPENDENCIES, vary_on=(),
+        )
     
     @action(detail=True, methods=['get'], permission_classes=[CanManageDenomination])
     def churches(self, request, pk=None):
@@ -200,18 +229,16 @@ class DenominationViewSet(viewsets.ReadOnlyModelViewSet):
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        from apps.churches.serializers import ChurchCreateSerializer
+        from apps.churches.services import ChurchProvisioningService
         
-        serializer = ChurchCreateSerializer(data=request.data)
-        if serializer.is_valid():
-            # Associar à denominação
-            church = serializer.save(denomination=denomination)
-            
-            from apps.churches.serializers import ChurchSerializer
-            response_serializer = ChurchSerializer(church)
-            return Response(response_serializer.data, status=status.HTTP_201_CREATED)
+        # Mesmo pipeline do provisionamento em lote (filial matriz e QR Code após o commit)
+        result = ChurchProvisioningService(user=request.user).provision([request.data], denomination=denomination)
+        if result['errors']:
+            return Response(result['errors'][0]['errors'], status=status.HTTP_400_BAD_REQUEST)
         
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        from apps.churches.serializers import ChurchSerializer
+        response_serializer = ChurchSerializer(result['churches'][0])
+        return Response(response_serializer.data, status=status.HTTP_201_CREATED)
     
     @action(detail=True, methods=['get'], permission_classes=[CanViewFinancialReports])
     def financial_reports(self, request, pk=None):
@@ -224,7 +251,7 @@ class DenominationViewSet(viewsets.ReadOnlyModelViewSet):
         # Verificar permissões específicas
         if not self.request.user.church_users.filter(
             church__denomination=denomination,
-            can_view_financial_reports=True,
+            can_view_reports=True,
             is_active=True
         ).exists() and not self.request.user.is_superuser:
             return Response(
@@ -232,10 +259,15 @@ class DenominationViewSet(viewsets.ReadOnlyModelViewSet):
                 status=status.HTTP_403_FORBIDDEN
             )
         
+        sections = denomination_summary_sections(denomination)
+        result = DashboardFanout(f'denomination-{denomination.id}', {
+            name: sections[name] for name in ('total_churches', 'total_members')
+        }, tenant=f'denomination:{denomination.id}', depends_on=DENOMINATION_DASHBOARD_DEPENDENCIES).run()
+        
         # Dados financeiros consolidados (mock - implementar conforme necessário)
         financial_data = {
-            'total_churches': denomination.churches_count,
-            'total_members': denomination.total_members_count,
+            'total_churches': result.get('total_churches', 0),
+            'total_members': result.get('total_members', 0),
             'monthly_summary': {
                 'total_tithes': 0,  # Implementar quando tiver módulo financeiro
                 'total_offerings': 0,
@@ -244,7 +276,7 @@ class DenominationViewSet(viewsets.ReadOnlyModelViewSet):
             'churches_performance': []  # Lista de performance por igreja
         }
         
-        return Response(financial_data)
+        return result.apply_headers(Response(financial_data))
     
     @action(detail=True, methods=['get'], permission_classes=[CanManageDenomination])
     def admin_users(self, request, pk=None):
@@ -322,112 +354,63 @@ class DenominationViewSet(viewsets.ReadOnlyModelViewSet):
                 'error': 'Usuário não está associado a nenhuma denominação'
             }, status=status.HTTP_404_NOT_FOUND)
         
-        from django.db.models import Count, Sum
         from django.utils import timezone
-        from datetime import timedelta
-        from apps.churches.models import Church
-        from apps.members.models import Member
-        from apps.visitors.models import Visitor
-        from apps.activities.models import Activity
+        from apps.accounts.models import ChurchUser
         
-        now = timezone.now()
-        last_month = now - timedelta(days=30)
-        this_year = now.replace(month=1, day=1)
+        this_year = timezone.now().replace(month=1, day=1)
         
         # Para Church Admin, contar todas as igrejas que ele tem acesso
-        # através de ChurchUser
-        from apps.accounts.models import ChurchUser
-        
+        # através de ChurchUser (ativas e inativas), pois ele precisa ver
+        # estatísticas consolidadas de toda sua rede
         user_churches = ChurchUser.objects.filter(
             user=user, 
             role__in=['church_admin', 'pastor']
         ).select_related('church')
-        
-        # Para Church Admin, incluir todas as igrejas (ativas e inativas)
-        # pois ele precisa ver estatísticas consolidadas de toda sua rede
         churches = [cu.church for cu in user_churches]
+        church_ids = [church.id for church in churches]
+        
+        # Agregados independentes executados em paralelo
+        result = DashboardFanout(
+            network_scope(denomination, church_ids),
+            network_stats_sections(denomination, church_ids),
+        ).run()
+        members_by_church = result.get('members_by_church', {})
+        visitors_by_church = result.get('visitors_by_church', {})
+        activities_by_church = result.get('activities_by_church', {})
+        growth = result.get('growth', {})
         
         # Estatísticas básicas
         total_churches = len(churches)
-        total_branches = 0  # Somar filiais quando modelo estiver implementado
         
-        # Calcular membros e visitantes reais
+        # Priorizar dados reais; sem registros, usar os campos da igreja
         total_members = 0
         total_visitors = 0
         total_activities = 0
         for church in churches:
-            # Primeiro tentar contar membros reais do banco de dados
-            try:
-                real_members = Member.objects.filter(church=church, is_active=True).count()
-                if real_members > 0:
-                    total_members += real_members
-                else:
-                    # Fallback para o campo total_members se não há membros cadastrados
-                    total_members += church.total_members or 0
-            except Exception as e:
-                # Em caso de erro, usar o campo total_members da igreja
-                total_members += church.total_members or 0
-            
-            # Contar visitantes reais
-            try:
-                real_visitors = Visitor.objects.filter(church=church).count()
-                if real_visitors > 0:
-                    total_visitors += real_visitors
-                else:
-                    total_visitors += church.total_visitors or 0
-            except Exception as e:
-                total_visitors += church.total_visitors or 0
-            
-            # Contar atividades reais
-            try:
-                real_activities = Activity.objects.filter(church=church, is_active=True).count()
-                if real_activities > 0:
-                    total_activities += real_activities
-                else:
-                    # Valor estimado baseado no tamanho da igreja
-                    total_activities += max(5, (church.total_members or 0) // 50)
-            except Exception as e:
-                total_activities += max(5, (church.total_members or 0) // 50)
+            total_members += members_by_church.get(church.id) or church.total_members or 0
+            total_visitors += visitors_by_church.get(church.id) or church.total_visitors or 0
+            # Sem atividades cadastradas: valor estimado pelo tamanho da igreja
+            total_activities += (
+                activities_by_church.get(church.id) or max(5, (church.total_members or 0) // 50)
+            )
         
         # Contar filiais (igrejas que pertencem à mesma denominação)
         # Para calcular filiais, vamos contar quantas igrejas além da principal existem
         # Por enquanto, consideramos todas as igrejas da denominação
         total_branches = max(0, total_churches - 1) if total_churches > 1 else 0
         
-        # Métricas de crescimento - usar IDs das igrejas do usuário
-        church_ids = [church.id for church in churches]
-        members_this_month = 0
-        members_last_month = 0
-        visitors_this_month = 0
-        visitors_last_month = 0
+        # Métricas de crescimento
         churches_this_year = len([c for c in churches if c.created_at >= this_year])
-        
-        try:
-            members_this_month = Member.objects.filter(
-                church_id__in=church_ids,
-                created_at__gte=last_month
-            ).count()
-            members_last_month = Member.objects.filter(
-                church_id__in=church_ids,
-                created_at__lt=last_month
-            ).count()
-        except:
+        if 'growth' in result.failed:
             members_this_month = int(total_members * 0.1)  # Estimativa 10% crescimento
             members_last_month = total_members - members_this_month
-        
-        try:
-            visitors_this_month = Visitor.objects.filter(
-                church_id__in=church_ids,
-                created_at__gte=last_month
-            ).count()
-            visitors_last_month = Visitor.objects.filter(
-                church_id__in=church_ids,
-                created_at__gte=now - timedelta(days=60),
-                created_at__lt=last_month
-            ).count()
-        except:
             visitors_this_month = int(total_visitors * 0.2)  # Estimativa
             visitors_last_month = int(total_visitors * 0.15)
+        else:
+            members_this_month = growth['members_this_month']
+            members_last_month = growth['members_last_month']
+            visitors_this_month = growth['visitors_this_month']
+            visitors_last_month = growth['visitors_last_month']
         
         # Indicadores de saúde
         active_churches_percentage = min(100, (total_churches / max(1, total_churches)) * 100)
@@ -442,10 +425,7 @@ class DenominationViewSet(viewsets.ReadOnlyModelViewSet):
         budget_variance = 15  # 15% de variação
         
         # Alertas
-        inactive_churches = Church.objects.filter(
-            denomination=denomination, 
-            is_active=False
-        ).count()
+        inactive_churches = result.get('inactive_churches', 0)
         low_attendance_churches = max(0, int(total_churches * 0.1))  # 10% das igrejas
         overdue_reports = max(0, int(total_churches * 0.05))  # 5% das igrejas
         subscription_expiring = max(0, int(total_churches * 0.08))  # 8% das igrejas
@@ -484,7 +464,7 @@ class DenominationViewSet(viewsets.ReadOnlyModelViewSet):
             }
         }
         
-        return Response(stats_data)
+        return result.apply_headers(Response(stats_data))
     
     @action(detail=False, methods=['get'])
     def hierarchy(self, request):
@@ -505,18 +485,20 @@ class DenominationViewSet(viewsets.ReadOnlyModelViewSet):
                 'error': 'Usuário não está associado a nenhuma denominação'
             }, status=status.HTTP_404_NOT_FOUND)
         
-        from apps.churches.models import Church
-        from apps.members.models import Member
-        from apps.visitors.models import Visitor
-        from apps.activities.models import Activity
         import random
         
+        # Igrejas e contagens por igreja em paralelo (uma query agrupada cada)
+        result = DashboardFanout(
+            f'denomination-{denomination.id}', hierarchy_sections(denomination)
+        ).run()
+        churches = result.get('churches', [])
+        members_by_church = result.get('members_by_church', {})
+        visitors_by_church = result.get('visitors_by_church', {})
+        activities_by_church = result.get('activities_by_church', {})
+        
         # Construir árvore hierárquica
         hierarchy_data = []
         
-        # Nó raiz - Denominação
-        churches = Church.objects.filter(denomination=denomination, is_active=True).order_by('name')
-        
         denomination_stats = {
             'members': 0,
             'visitors': 0,
@@ -530,27 +512,12 @@ class DenominationViewSet(viewsets.ReadOnlyModelViewSet):
         church_nodes = []
         
         for church in churches:
-            # Estatísticas da igreja - usando dados reais
-            try:
-                # Priorizar membros reais do banco de dados
-                real_members = Member.objects.filter(church=church, is_active=True).count()
-                church_members = real_members if real_members > 0 else (church.total_members or 0)
-            except Exception as e:
-                church_members = church.total_members or 0
-            
-            try:
-                # Priorizar visitantes reais do banco de dados
-                real_visitors = Visitor.objects.filter(church=church).count()
-                church_visitors = real_visitors if real_visitors > 0 else (church.total_visitors or 0)
-            except Exception as e:
-                church_visitors = church.total_visitors or 0
-                
-            try:
-                # Priorizar atividades reais do banco de dados
-                real_activities = Activity.objects.filter(church=church, is_active=True).count()
-                church_activities = real_activities if real_activities > 0 else max(5, (church.total_members or 0) // 50)
-            except Exception as e:
-                church_activities = max(5, (church.total_members or 0) // 50)
+            # Estatísticas da igreja - priorizar dados reais do banco de dados
+            church_members = members_by_church.get(church['id']) or church['total_members'] or 0
+            church_visitors = visitors_by_church.get(church['id']) or church['total_visitors'] or 0
+            church_activities = (
+                activities_by_church.get(church['id']) or max(5, (church['total_members'] or 0) // 50)
+            )
             
             # Calcular filiais (por enquanto usar contagem estimada)
             branches_count = 0
@@ -600,29 +567,29 @@ class DenominationViewSet(viewsets.ReadOnlyModelViewSet):
             
             # Nó da igreja
             church_node = {
-                'id': f'church-{church.id}',
-                'name': church.name,
+                'id': f"church-{church['id']}",
+                'name': church['name'],
                 'type': 'church',
                 'level': 1,
                 'data': {
-                    'id': church.id,
-                    'uuid': str(church.uuid) if hasattr(church, 'uuid') else f'church-{church.id}',
-                    'name': church.name,
-                    'short_name': church.short_name or church.name[:10],
-                    'email': church.email,
-                    'phone': church.phone,
-                    'address': church.address,
-                    'city': church.city,
-                    'state': church.state,
-                    'zipcode': church.zipcode,
-                    'subscription_plan': church.subscription_plan or 'basic',
-                    'subscription_status': church.subscription_status or 'active',
+                    'id': church['id'],
+                    'uuid': str(church['uuid']),
+                    'name': church['name'],
+                    'short_name': church['short_name'] or church['name'][:10],
+                    'email': church['email'],
+                    'phone': church['phone'],
+                    'address': church['address'],
+                    'city': church['city'],
+                    'state': church['state'],
+                    'zipcode': church['zipcode'],
+                    'subscription_plan': church['subscription_plan'] or 'basic',
+                    'subscription_status': church['subscription_status'] or 'active',
                     'total_members': church_members,
                     'total_visitors': church_visitors,
                     'branches_count': branches_count,
-                    'is_active': church.is_active,
-                    'created_at': church.created_at.isoformat(),
-                    'updated_at': church.updated_at.isoformat(),
+                    'is_active': church['is_active'],
+                    'created_at': church['created_at'].isoformat(),
+                    'updated_at': church['updated_at'].isoformat(),
                 },
                 'children': [],  # Filiais serão adicionadas aqui quando implementadas
                 'expanded': False,
@@ -678,4 +645,4 @@ class DenominationViewSet(viewsets.ReadOnlyModelViewSet):
         
         hierarchy_data.append(denomination_node)
         
-        return Response(hierarchy_data)
+        return result.apply_headers(Response(hierarchy_data))
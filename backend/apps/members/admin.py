@@ -1,5 +1,8 @@
 from django.contrib import admin
-from .models import Member, MembershipStatus, MembershipStatusLog, MemberTransferLog, BranchTransferLog, MinisterialFunctionHistory
+from .models import (
+    Member, MemberEvent, MembershipStatus, MembershipStatusLog, MemberTransferLog, BranchTransferLog,
+    MinisterialFunctionHistory,
+)
 
 
 @admin.register(Member)
@@ -120,3 +123,22 @@ class MinisterialFunctionHistoryAdmin(admin.ModelAdmin):
     search_fields = ['member__full_name', 'notes']
     ordering = ['member', '-start_date']
     readonly_fields = ['created_at', 'updated_at']
+
+
+@admin.register(MemberEvent)
+class MemberEventAdmin(admin.ModelAdmin):
+    """Log unificado de eventos (somente leitura)"""
+    list_display = ['member', 'kind', 'old_value', 'new_value', 'actor', 'created_at']
+    list_filter = ['kind']
+    search_fields = ['member__full_name']
+    ordering = ['-created_at']
+    raw_id_fields = ['member', 'church', 'actor']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
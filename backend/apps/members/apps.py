@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class MembersConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.members"
+
+    def ready(self):
+        """Importa signals quando o app está pronto"""
+        import apps.members.signals  # noqa
@@ -0,0 +1,145 @@
+"""
+Idade e aniversários dos membros calculados no banco.
+
+- Faixas etárias exatas: "idade >= N" equivale a "nasceu até hoje menos N
+  anos de calendário", então cada faixa vira um intervalo de `birth_date`
+  (usa o índice) e todas as faixas saem de um único `aggregate` com
+  `Count(filter=...)`, sem carregar membros em Python nem aproximar anos
+  por 365 dias.
+- Aniversários: `Member.birth_day_of_year` guarda o dia do ano normalizado
+  para um ano bissexto (29/02 = 60, 01/03 = 61 sempre) e `birth_month` o
+  mês; ambos indexados junto com a igreja.
+"""
+
+import calendar
+from datetime import date, timedelta
+
+from django.db.models import Case, Count, Q, Value, When
+from django.db.models.functions import ExtractDay, ExtractMonth
+from django.utils import timezone
+
+# Dias acumulados antes de cada mês em um ano bissexto
+_MONTH_OFFSETS = (0, 31, 60, 91, 121, 152, 182, 213, 244, 274, 305, 335)
+DAYS_IN_YEAR = 366
+
+# (rótulo, idade mínima, idade máxima inclusive ou None)
+DASHBOARD_AGE_BANDS = (
+    ('children', 0, 12),
+    ('youth', 13, 30),
+    ('adults', 31, 60),
+    ('elderly', 61, None),
+)
+
+CHURCH_AGE_BANDS = (
+    ('0-12', 0, 12),
+    ('13-17', 13, 17),
+    ('18-30', 18, 30),
+    ('31-50', 31, 50),
+    ('51-65', 51, 65),
+    ('65+', 66, None),
+)
+
+
+def age_on(birth_date, today):
+    """Idade exata em `today` (None sem data de nascimento)."""
+    if not birth_date:
+        return None
+    return today.year - birth_date.year - (
+        (today.month, today.day) < (birth_date.month, birth_date.day)
+    )
+
+
+def years_ago(today, years):
+    """Mesma data `years` anos antes (29/02 vira 28/02 em anos comuns)."""
+    try:
+        return today.replace(year=today.year - years)
+    except ValueError:
+        return today.replace(year=today.year - years, day=28)
+
+
+def age_range_q(min_age=None, max_age=None, today=None):
+    """Filtro exato por idade entre `min_age` e `max_age` (inclusive)."""
+    today = today or timezone.localdate()
+    q = Q()
+    if min_age is not None:
+        q &= Q(birth_date__lte=years_ago(today, min_age))
+    if max_age is not None:
+        # Idade <= max: ainda não completou max + 1 anos
+        q &= Q(birth_date__gt=years_ago(today, max_age + 1))
+    return q
+
+
+def age_band_counts(queryset, bands=DASHBOARD_AGE_BANDS, today=None):
+    """Quantidade de membros em cada faixa, em uma única query."""
+    today = today or timezone.localdate()
+    counts = queryset.order_by().aggregate(**{
+        label: Count('id', filter=age_range_q(min_age, max_age, today))
+        for label, min_age, max_age in bands
+    })
+    return {label: counts[label] for label, _, _ in bands}
+
+
+# =====================================
+# ANIVERSÁRIOS
+# =====================================
+
+def day_of_year(value):
+    """Dia do ano normalizado para ano bissexto (1..366)."""
+    return _MONTH_OFFSETS[value.month - 1] + value.day
+
+
+def day_of_year_expression(field='birth_date'):
+    """`day_of_year` calculado no banco (backfill e `QuerySet.update`)."""
+    return Case(
+        *[When(**{f'{field}__month': month}, then=Value(offset)) for month, offset in enumerate(_MONTH_OFFSETS, 1)]
+    ) + ExtractDay(field)
+
+
+def birthday_fields_expressions(field='birth_date'):
+    """Valores de `birth_month`/`birth_day_of_year` para `QuerySet.update`."""
+    return {
+        'birth_month': ExtractMonth(field),
+        'birth_day_of_year': day_of_year_expression(field),
+    }
+
+
+def birthday_window_q(start, days):
+    """
+    Aniversariantes de `start` até `start + days - 1`, tratando a virada do
+    ano (dezembro -> janeiro) com dois intervalos.
+
+    Como em `birthday_in_year`, quem nasceu em 29/02 entra no 28/02 dos anos
+    comuns cobertos pela janela.
+    """
+    days = max(1, min(days, DAYS_IN_YEAR))
+    end = start + timedelta(days=days - 1)
+    first = day_of_year(start)
+    last = day_of_year(end)
+    if days == DAYS_IN_YEAR:
+        return Q(birth_day_of_year__isnull=False)
+    if first <= last:
+        q = Q(birth_day_of_year__gte=first, birth_day_of_year__lte=last)
+    else:
+        q = Q(birth_day_of_year__gte=first) | Q(birth_day_of_year__lte=last)
+    if any(
+        not calendar.isleap(year) and start <= date(year, 2, 28) <= end
+        for year in {start.year, end.year}
+    ):
+        q |= Q(birth_day_of_year=day_of_year(date(2000, 2, 29)))
+    return q
+
+
+def birthday_in_year(birth_date, year):
+    """Aniversário em `year` (29/02 cai em 28/02 nos anos comuns)."""
+    try:
+        return birth_date.replace(year=year)
+    except ValueError:
+        return date(year, 2, 28)
+
+
+def next_birthday(birth_date, today):
+    """Próxima data de aniversário a partir de `today` (inclusive)."""
+    birthday = birthday_in_year(birth_date, today.year)
+    if birthday < today:
+        birthday = birthday_in_year(birth_date, today.year + 1)
+    return birthday
@@ -0,0 +1,363 @@
+"""
+Log unificado de eventos de membros (`MemberEvent`).
+
+- `record_events(logs)`: converte registros dos logs específicos em eventos,
+  com um único `bulk_create` (usado pelos signals e pelas operações em lote);
+- `stream_history(member_id, ...)`: gera o histórico já serializado em uma
+  única varredura ordenada, para respostas em streaming;
+- partições mensais no PostgreSQL: `ensure_partitions`, `list_partitions`,
+  `archive_partition` (usadas pelo comando `maintain_member_events`).
+
+Nos demais bancos a tabela não é particionada e a retenção apaga linhas em
+lotes por faixa de PK.
+"""
+
+import csv
+import gzip
+import json
+from datetime import date, datetime, time
+from pathlib import Path
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.utils import timezone
+
+TABLE = 'members_memberevent'
+DEFAULT_PARTITION = f'{TABLE}_default'
+
+HISTORY_FIELDS = ('id', 'kind', 'created_at', 'old_value', 'new_value', 'actor_id', 'details')
+# Maior `limit` aceito por página do histórico (sem `limit`, o histórico inteiro)
+HISTORY_MAX_LIMIT = 1000
+
+
+# =====================================
+# GRAVAÇÃO
+# =====================================
+
+def _compact(**values):
+    """Detalhes só com os valores preenchidos (None quando não sobra nada)."""
+    details = {
+        key: value.isoformat() if isinstance(value, date) else value
+        for key, value in values.items()
+        if value not in (None, '')
+    }
+    return details or None
+
+
+def event_from_log(log, church_id=None):
+    """`MemberEvent` (não salvo) equivalente a um registro de log específico."""
+    from .models import (
+        BranchTransferLog, MemberEvent, MemberTransferLog, MembershipStatusLog,
+        MinisterialFunctionHistory,
+    )
+
+    event = MemberEvent(
+        member_id=log.member_id,
+        church_id=church_id,
+        created_at=log.created_at or timezone.now(),
+        source_id=log.pk,
+    )
+    if isinstance(log, MembershipStatusLog):
+        event.kind = MemberEvent.KIND_STATUS
+        event.old_value, event.new_value = log.old_status, log.new_status
+        event.actor_id = log.changed_by_id
+        event.details = _compact(reason=log.reason)
+    elif isinstance(log, BranchTransferLog):
+        event.kind = MemberEvent.KIND_BRANCH_TRANSFER
+        event.old_value, event.new_value = str(log.from_branch_id), str(log.to_branch_id)
+        event.actor_id = log.transferred_by_id
+        event.details = _compact(
+            reason=log.reason,
+            transfer_type=log.transfer_type,
+            transfer_date=log.transfer_date,
+            previous_membership_start_date=log.previous_membership_start_date,
+        )
+    elif isinstance(log, MemberTransferLog):
+        event.kind = MemberEvent.KIND_CHURCH_TRANSFER
+        event.old_value, event.new_value = str(log.from_church_id), str(log.to_church_id)
+        event.actor_id = log.transferred_by_id
+        event.details = _compact(reason=log.reason)
+    elif isinstance(log, MinisterialFunctionHistory):
+        event.kind = MemberEvent.KIND_MINISTERIAL_FUNCTION
+        event.new_value = log.function
+        event.actor_id = log.changed_by_id
+        event.details = _compact(start_date=log.start_date, end_date=log.end_date, notes=log.notes)
+    else:
+        raise TypeError(f"Log sem evento correspondente: {type(log).__name__}")
+    return event
+
+
+def record_events(logs, church_ids=None):
+    """
+    Grava os eventos dos logs em um único `bulk_create`. `church_ids` mapeia
+    member_id -> church_id; membros ausentes do mapa são lidos em uma query.
+    """
+    from .models import Member, MemberEvent
+
+    logs = list(logs)
+    if not logs:
+        return []
+    church_ids = dict(church_ids or {})
+    missing = {log.member_id for log in logs} - set(church_ids)
+    if missing:
+        church_ids.update(
+            Member._base_manager.filter(pk__in=missing).values_list('pk', 'church_id')
+        )
+    return MemberEvent.objects.bulk_create(
+        [event_from_log(log, church_ids.get(log.member_id)) for log in logs]
+    )
+
+
+def _source_models():
+    from .models import (
+        BranchTransferLog, MemberEvent, MemberTransferLog, MembershipStatusLog,
+        MinisterialFunctionHistory,
+    )
+
+    return [
+        (MemberEvent.KIND_STATUS, MembershipStatusLog),
+        (MemberEvent.KIND_BRANCH_TRANSFER, BranchTransferLog),
+        (MemberEvent.KIND_CHURCH_TRANSFER, MemberTransferLog),
+        (MemberEvent.KIND_MINISTERIAL_FUNCTION, MinisterialFunctionHistory),
+    ]
+
+
+def earliest_log_date():
+    """Data do registro mais antigo entre os logs específicos (ou None)."""
+    from django.db.models import Min
+
+    dates = [
+        model._base_manager.aggregate(first=Min('created_at'))['first']
+        for _, model in _source_models()
+    ]
+    dates = [value for value in dates if value]
+    return timezone.localtime(min(dates)).date() if dates else None
+
+
+def backfill_events(batch_size=2000):
+    """
+    Copia para o log unificado os registros ainda não migrados: os logs de
+    cada tipo sem evento com o mesmo `source_id` (anti-join). Não depende de
+    ordem: logs antigos continuam pendentes mesmo depois que os signals já
+    gravaram eventos de logs mais novos. Idempotente; retorna
+    {tipo: linhas copiadas}.
+    """
+    from django.db.models import Exists, OuterRef
+
+    from .models import MemberEvent
+
+    copied = {}
+    for kind, model in _source_models():
+        migrated = MemberEvent.objects.filter(kind=kind, source_id=OuterRef('pk'))
+        pending = model._base_manager.filter(~Exists(migrated)).order_by('pk')
+        total = 0
+        batch = []
+        for log in pending.iterator(chunk_size=batch_size):
+            batch.append(log)
+            if len(batch) >= batch_size:
+                total += len(record_events(batch))
+                batch = []
+        if batch:
+            total += len(record_events(batch))
+        copied[MemberEvent.KIND_NAMES[kind]] = total
+    return copied
+
+
+# =====================================
+# LEITURA EM STREAMING
+# =====================================
+
+def stream_history(member_id, kinds=None, before=None, before_id=None, limit=None, chunk_size=500):
+    """
+    Histórico do membro como JSON, gerado em pedaços: uma varredura do
+    índice (member_id, created_at DESC) com cursor do servidor, sem COUNT
+    nem paginação por OFFSET. Para continuar, use `before` = `created_at` e
+    `before_id` = `id` do último evento recebido.
+    """
+    from .models import MemberEvent
+
+    events = MemberEvent.objects.history(member_id, kinds=kinds, before=before, before_id=before_id)
+    if limit:
+        events = events[:limit]
+    rows = events.values_list(*HISTORY_FIELDS).iterator(chunk_size=chunk_size)
+
+    encoder = DjangoJSONEncoder()
+    yield '{"member_id": %d, "events": [' % member_id
+    separator = ''
+    for event_id, kind, created_at, old_value, new_value, actor_id, details in rows:
+        yield separator + encoder.encode({
+            'id': event_id,
+            'kind': MemberEvent.KIND_NAMES.get(kind, kind),
+            # Precisão total (o encoder corta em milissegundos): o valor volta como cursor
+            'created_at': created_at.isoformat(),
+            'old_value': old_value,
+            'new_value': new_value,
+            'actor_id': actor_id,
+            'details': details,
+        })
+        separator = ','
+    yield ']}'
+
+
+# =====================================
+# PARTIÇÕES (POSTGRESQL)
+# =====================================
+
+def is_partitioned():
+    return connection.vendor == 'postgresql'
+
+
+def month_start(value):
+    return date(value.year, value.month, 1)
+
+
+def add_months(value, months):
+    month = value.month - 1 + months
+    return date(value.year + month // 12, month % 12 + 1, 1)
+
+
+def partition_name(month):
+    return f'{TABLE}_{month:%Y%m}'
+
+
+def _bound(month):
+    return timezone.make_aware(datetime.combine(month, time.min))
+
+
+def list_partitions():
+    """Partições mensais existentes: [(nome, primeiro dia do mês)], em ordem."""
+    if not is_partitioned():
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT child.relname
+            FROM pg_inherits
+            JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE parent.relname = %s AND child.relname <> %s
+            """,
+            [TABLE, DEFAULT_PARTITION],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+    partitions = []
+    for name in names:
+        suffix = name.rsplit('_', 1)[-1]
+        if suffix.isdigit() and len(suffix) == 6:
+            partitions.append((name, date(int(suffix[:4]), int(suffix[4:]), 1)))
+    return sorted(partitions, key=lambda item: item[1])
+
+
+def ensure_partitions(start, end):
+    """
+    Cria as partições mensais de `start` até `end` (inclusive) que ainda
+    não existem. Linhas do mês que caíram na partição DEFAULT são movidas
+    para a nova partição na mesma transação. Retorna os nomes criados.
+    """
+    if not is_partitioned():
+        return []
+    existing = {name for name, _ in list_partitions()}
+    created = []
+    month = month_start(start)
+    last = month_start(end)
+    while month <= last:
+        name = partition_name(month)
+        if name not in existing:
+            _create_partition(name, month)
+            created.append(name)
+        month = add_months(month, 1)
+    return created
+
+
+def _create_partition(name, month):
+    lower, upper = _bound(month), _bound(add_months(month, 1))
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} WHERE created_at >= %s AND created_at < %s)',
+            [lower, upper],
+        )
+        has_rows = cursor.fetchone()[0]
+        if has_rows:
+            cursor.execute(f'CREATE TEMP TABLE _moving_events (LIKE {TABLE}) ON COMMIT DROP')
+            cursor.execute(
+                f"""
+                WITH moved AS (
+                    DELETE FROM {DEFAULT_PARTITION}
+                    WHERE created_at >= %s AND created_at < %s
+                    RETURNING *
+                )
+                INSERT INTO _moving_events SELECT * FROM moved
+                """,
+                [lower, upper],
+            )
+        # Limites como literais: DDL não aceita parâmetros no lado do servidor
+        cursor.execute(
+            f"CREATE TABLE {name} PARTITION OF {TABLE} "
+            f"FOR VALUES FROM ('{lower.isoformat()}') TO ('{upper.isoformat()}')"
+        )
+        if has_rows:
+            cursor.execute(f'INSERT INTO {TABLE} SELECT * FROM _moving_events')
+
+
+def _write_archive(rows, columns, path):
+    with gzip.open(path, 'wt', newline='', encoding='utf-8') as handle:
+        writer = csv.writer(handle)
+        writer.writerow(columns)
+        count = 0
+        for row in rows:
+            writer.writerow([json.dumps(value) if isinstance(value, dict) else value for value in row])
+            count += 1
+    return count
+
+
+def _fetch_rows(cursor, size=2000):
+    while True:
+        rows = cursor.fetchmany(size)
+        if not rows:
+            return
+        yield from rows
+
+
+def archive_partition(name, archive_dir=None):
+    """
+    Exporta a partição (CSV gzip em `archive_dir`, se informado), desanexa e
+    remove. Retorna a quantidade de linhas arquivadas.
+    """
+    with transaction.atomic(), connection.cursor() as cursor:
+        count = 0
+        if archive_dir:
+            cursor.execute(f'SELECT * FROM {name} ORDER BY created_at, id')
+            columns = [column[0] for column in cursor.description]
+            count = _write_archive(_fetch_rows(cursor), columns, Path(archive_dir) / f'{name}.csv.gz')
+        else:
+            cursor.execute(f'SELECT COUNT(*) FROM {name}')
+            count = cursor.fetchone()[0]
+        cursor.execute(f'ALTER TABLE {TABLE} DETACH PARTITION {name}')
+        cursor.execute(f'DROP TABLE {name}')
+    return count
+
+
+def archive_before(cutoff, archive_dir=None, batch_size=5000):
+    """
+    Retenção sem partições: exporta e apaga, em lotes por faixa de PK, os
+    eventos anteriores a `cutoff`. Retorna a quantidade de linhas removidas.
+    """
+    from .models import MemberEvent
+
+    old = MemberEvent.objects.filter(created_at__lt=cutoff)
+    removed = 0
+    path = Path(archive_dir) / f'{TABLE}_before_{cutoff:%Y%m%d}.csv.gz' if archive_dir else None
+    if path:
+        columns = [field.column for field in MemberEvent._meta.concrete_fields]
+        _write_archive(
+            old.order_by('id').values_list(*[field.attname for field in MemberEvent._meta.concrete_fields])
+            .iterator(chunk_size=batch_size),
+            columns,
+            path,
+        )
+    while True:
+        ids = list(old.order_by('id').values_list('id', flat=True)[:batch_size])
+        if not ids:
+            return removed
+        # `_raw_delete`: DELETE direto, sem o bloqueio de somente inserção
+        removed += old.filter(id__gte=ids[0], id__lte=ids[-1])._raw_delete(old.db)
@@ -0,0 +1,246 @@
+"""
+Grafo familiar dos membros materializado em memória.
+
+Os vínculos familiares vêm de três fontes: `FamilyRelationship` (pais e
+filhos), `Member.spouse` e `Member.responsible` (dependentes). Em vez de uma
+query por pergunta ("filhos de X", "pais de X"...), o `FamilyGraph` carrega
+todas as arestas relevantes em uma única query (UNION das três fontes) e
+responde filhos, pais, irmãos e núcleo familiar a partir de mapas de
+adjacência.
+
+- `FamilyGraph.for_members(members)`: arestas de uma página de membros e de
+  seus parentes diretos (usado pelos serializers);
+- `FamilyGraph.for_church(church_id)`: índice de toda a igreja, em cache e
+  invalidado quando vínculos familiares mudam (ver `invalidate`).
+"""
+
+from collections import defaultdict
+from datetime import date
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import CharField, Q, Value
+
+from .demographics import age_on
+
+CACHE_KEY = 'members:family-graph:{church_id}'
+
+SPOUSE = 'spouse'
+DEPENDENT = 'dependent'
+INACTIVE = 'inactive'
+
+
+def _cache_timeout():
+    return getattr(settings, 'FAMILY_GRAPH_CACHE_TIMEOUT', 3600)
+
+
+class FamilyGraph:
+    """
+    Adjacências familiares: cada aresta é `(origem, destino, tipo)`, onde o
+    tipo segue `FamilyRelationship` ('child': destino é filho da origem;
+    'parent': destino é pai/mãe da origem), 'spouse' (destino é cônjuge da
+    origem) ou 'dependent' (destino é dependente da origem). Arestas
+    'inactive' (origem == destino) marcam membros inativos.
+    """
+
+    def __init__(self, edges, members=()):
+        from .models import FamilyRelationship
+
+        self.members = set(members)
+        self._children = defaultdict(set)
+        self._parents = defaultdict(set)
+        self._dependents = defaultdict(set)
+        self._spouse = {}
+        self._responsible = {}
+        self._inactive = set()
+        self._nodes = {}
+        self._today = date.today()
+
+        for source, target, kind in edges:
+            if kind == FamilyRelationship.RELATION_CHILD:
+                self._children[source].add(target)
+                self._parents[target].add(source)
+            elif kind == FamilyRelationship.RELATION_PARENT:
+                self._parents[source].add(target)
+                self._children[target].add(source)
+            elif kind == SPOUSE:
+                self._spouse[source] = target
+            elif kind == DEPENDENT:
+                self._dependents[source].add(target)
+                self._responsible[target] = source
+            elif kind == INACTIVE:
+                self._inactive.add(source)
+
+    # =====================================
+    # CONSTRUÇÃO
+    # =====================================
+
+    @classmethod
+    def for_members(cls, members):
+        """
+        Grafo de uma página de membros: vínculos diretos de cada um e os
+        filhos de seus pais e responsáveis (irmãos), em uma query de arestas
+        e uma de dados resumidos dos parentes.
+        """
+        from .models import FamilyRelationship, Member
+
+        ids = {member.pk for member in members if member.pk}
+        if not ids:
+            return cls([], ())
+
+        relationships = FamilyRelationship._base_manager
+        parents_of_page = relationships.filter(
+            member_id__in=ids, relation_type=FamilyRelationship.RELATION_PARENT
+        ).values('related_member_id')
+        responsibles_of_page = Member._base_manager.filter(pk__in=ids).values('responsible_id')
+
+        edges = cls._edges_query(
+            relationships.filter(
+                Q(member_id__in=ids) | Q(related_member_id__in=ids) | Q(member_id__in=parents_of_page)
+            ),
+            Member._base_manager.filter(pk__in=ids),
+            Member._base_manager.filter(
+                Q(pk__in=ids) | Q(responsible_id__in=ids) | Q(responsible_id__in=responsibles_of_page)
+            ),
+        )
+        graph = cls(edges, ids)
+        graph.load_nodes(graph.related_ids())
+        return graph
+
+    @classmethod
+    def for_church(cls, church_id):
+        """Índice familiar de toda a igreja, em cache até a próxima mudança."""
+        from .models import FamilyRelationship, Member
+
+        key = CACHE_KEY.format(church_id=church_id)
+        edges = cache.get(key)
+        if edges is None:
+            members = Member._base_manager.filter(church_id=church_id)
+            edges = list(cls._edges_query(
+                FamilyRelationship._base_manager.filter(member__church_id=church_id),
+                members,
+                members,
+                members.filter(is_active=False).values_list('pk', 'pk', Value(INACTIVE, output_field=CharField())),
+            ))
+            cache.set(key, edges, _cache_timeout())
+        return cls(edges)
+
+    @staticmethod
+    def _edges_query(relationships, spouses, dependents, *extra):
+        """UNION ALL das três fontes de vínculos no formato (origem, destino, tipo)."""
+        def kind(value):
+            return Value(value, output_field=CharField())
+
+        return relationships.order_by().values_list(
+            'member_id', 'related_member_id', 'relation_type'
+        ).union(
+            spouses.order_by().filter(spouse_id__isnull=False).values_list('pk', 'spouse_id', kind(SPOUSE)),
+            dependents.order_by().filter(responsible_id__isnull=False).values_list(
+                'responsible_id', 'pk', kind(DEPENDENT)
+            ),
+            *[query.order_by() for query in extra],
+            all=True,
+        )
+
+    @staticmethod
+    def invalidate(*church_ids):
+        """Descarta o índice em cache das igrejas informadas."""
+        keys = [CACHE_KEY.format(church_id=church_id) for church_id in set(church_ids) if church_id]
+        if keys:
+            cache.delete_many(keys)
+
+    def load_nodes(self, ids):
+        """Carrega (uma query) os dados resumidos dos membros ainda não carregados."""
+        from .models import Member
+
+        missing = set(ids) - set(self._nodes)
+        if not missing:
+            return
+        rows = Member._base_manager.filter(pk__in=missing).values(
+            'id', 'full_name', 'gender', 'birth_date', 'is_active'
+        )
+        for row in rows:
+            self._nodes[row['id']] = row
+            if not row['is_active']:
+                self._inactive.add(row['id'])
+
+    # =====================================
+    # CONSULTAS
+    # =====================================
+
+    def covers(self, member_id):
+        """Se o grafo foi montado com as arestas completas do membro."""
+        return member_id in self.members
+
+    def related_ids(self):
+        """Todos os membros que aparecem em alguma aresta."""
+        ids = set(self.members)
+        for adjacency in (self._children, self._parents, self._dependents):
+            for source, targets in adjacency.items():
+                ids.add(source)
+                ids.update(targets)
+        ids.update(self._spouse)
+        ids.update(self._spouse.values())
+        ids.update(self._responsible)
+        return ids
+
+    def _active(self, ids):
+        return {member_id for member_id in ids if member_id not in self._inactive}
+
+    def children(self, member_id):
+        return self._sorted(self._active(self._children.get(member_id, ())))
+
+    def parents(self, member_id):
+        return self._sorted(self._active(self._parents.get(member_id, ())))
+
+    def siblings(self, member_id):
+        """Filhos dos mesmos pais ou dependentes do mesmo responsável."""
+        siblings = set()
+        for parent_id in self._parents.get(member_id, ()):
+            siblings |= self._children.get(parent_id, set())
+        responsible_id = self._responsible.get(member_id)
+        if responsible_id:
+            siblings |= self._dependents.get(responsible_id, set())
+        siblings.discard(member_id)
+        return self._sorted(self._active(siblings))
+
+    def household(self, member_id):
+        """
+        Núcleo familiar, como em `Member.get_family_members`: cônjuge,
+        dependentes ativos e, para dependentes, o responsável e os demais
+        dependentes ativos dele.
+        """
+        household = self._active(self._dependents.get(member_id, ()))
+        spouse_id = self._spouse.get(member_id)
+        if spouse_id:
+            household.add(spouse_id)
+        responsible_id = self._responsible.get(member_id)
+        if responsible_id:
+            household.add(responsible_id)
+            household |= self._active(self._dependents.get(responsible_id, ()))
+        household.discard(member_id)
+        return self._sorted(household)
+
+    def brief(self, member_id):
+        """Dados resumidos (id, nome, idade, gênero, nascimento) do membro."""
+        node = self._nodes.get(member_id)
+        if node is None:
+            return None
+        return {
+            'id': node['id'],
+            'full_name': node['full_name'],
+            'age': age_on(node['birth_date'], self._today),
+            'gender': node['gender'],
+            'birth_date': node['birth_date'],
+        }
+
+    def briefs(self, ids):
+        """`brief` dos membros carregados, ordenados por nome."""
+        return [brief for brief in map(self.brief, self._sorted(ids)) if brief is not None]
+
+    def _sorted(self, ids):
+        # Mesma ordem da listagem de membros (nome) quando os dados estão carregados
+        return sorted(ids, key=lambda member_id: (
+            self._nodes[member_id]['full_name'] if member_id in self._nodes else '',
+            member_id,
+        ))
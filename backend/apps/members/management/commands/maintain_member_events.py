@@ -0,0 +1,119 @@
+"""
+Comando Django de manutenção do log unificado de eventos de membros.
+
+- cria as partições mensais futuras (PostgreSQL);
+- copia para o log os registros antigos dos logs específicos (--backfill);
+- arquiva e remove eventos além do período de retenção (--retain-months),
+  desanexando partições inteiras no PostgreSQL.
+
+Uso: python manage.py maintain_member_events
+     python manage.py maintain_member_events --backfill
+     python manage.py maintain_member_events --retain-months 60 --archive-dir /backups/eventos
+     python manage.py maintain_member_events --retain-months 60 --dry-run
+"""
+
+from datetime import datetime, time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.members import events
+
+
+class Command(BaseCommand):
+    help = 'Cria partições, faz backfill e aplica a retenção do log de eventos de membros'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--months-ahead',
+            type=int,
+            default=3,
+            help='Meses futuros com partição pré-criada (padrão: 3)',
+        )
+        parser.add_argument(
+            '--backfill',
+            action='store_true',
+            help='Copiar para o log os registros dos logs específicos ainda não migrados',
+        )
+        parser.add_argument(
+            '--retain-months',
+            type=int,
+            default=getattr(settings, 'MEMBER_EVENT_RETENTION_MONTHS', 0),
+            help='Arquivar eventos anteriores a N meses (0 desativa)',
+        )
+        parser.add_argument(
+            '--archive-dir',
+            help='Diretório onde gravar os eventos arquivados (CSV gzip) antes de removê-los',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Apenas mostrar o que seria feito',
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        today = timezone.localdate()
+
+        archive_dir = options.get('archive_dir')
+        if archive_dir and not dry_run:
+            Path(archive_dir).mkdir(parents=True, exist_ok=True)
+
+        # 1. Partições: do log mais antigo (no backfill) até os meses futuros
+        first = events.earliest_log_date() if options['backfill'] else None
+        start = min(first, today) if first else today
+        end = events.add_months(events.month_start(today), options['months_ahead'])
+        if events.is_partitioned():
+            if dry_run:
+                existing = {name for name, _ in events.list_partitions()}
+                month, missing = events.month_start(start), []
+                while month <= end:
+                    if events.partition_name(month) not in existing:
+                        missing.append(events.partition_name(month))
+                    month = events.add_months(month, 1)
+                self.stdout.write(f'🗂️ Partições a criar: {len(missing)}')
+            else:
+                created = events.ensure_partitions(start, end)
+                self.stdout.write(self.style.SUCCESS(f'✓ {len(created)} partição(ões) criada(s)'))
+
+        # 2. Backfill
+        if options['backfill']:
+            if dry_run:
+                self.stdout.write('📥 Backfill ignorado no modo --dry-run')
+            else:
+                copied = events.backfill_events()
+                for kind, total in copied.items():
+                    self.stdout.write(f'  {kind}: {total} evento(s) copiado(s)')
+
+        # 3. Retenção
+        retain = options['retain_months']
+        if not retain:
+            return
+        if retain < 1:
+            raise CommandError('--retain-months deve ser positivo')
+
+        cutoff = events.add_months(events.month_start(today), -retain)
+        self.stdout.write(f'🧹 Retenção: eventos anteriores a {cutoff:%m/%Y}')
+
+        if events.is_partitioned():
+            expired = [name for name, month in events.list_partitions() if month < cutoff]
+            for name in expired:
+                if dry_run:
+                    self.stdout.write(f'  {name} seria arquivada')
+                    continue
+                rows = events.archive_partition(name, archive_dir)
+                self.stdout.write(f'  {name}: {rows} evento(s) arquivado(s)')
+            if not expired:
+                self.stdout.write('  Nenhuma partição expirada')
+        else:
+            cutoff_at = timezone.make_aware(datetime.combine(cutoff, time.min))
+            if dry_run:
+                from apps.members.models import MemberEvent
+
+                total = MemberEvent.objects.filter(created_at__lt=cutoff_at).count()
+                self.stdout.write(f'  {total} evento(s) seriam arquivados')
+            else:
+                removed = events.archive_before(cutoff_at, archive_dir)
+                self.stdout.write(f'  {removed} evento(s) arquivado(s)')
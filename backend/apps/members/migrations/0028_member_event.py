@@ -0,0 +1,84 @@
+# Log unificado de eventos de membros, particionado por mês no PostgreSQL
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+POSTGRES_SQL = """
+CREATE TABLE members_memberevent (
+    id bigint GENERATED BY DEFAULT AS IDENTITY,
+    created_at timestamp with time zone NOT NULL,
+    member_id bigint NOT NULL,
+    church_id bigint NULL,
+    kind smallint NOT NULL CHECK (kind >= 0),
+    old_value varchar(100) NOT NULL,
+    new_value varchar(100) NOT NULL,
+    actor_id bigint NULL,
+    source_id bigint NULL,
+    details jsonb NULL,
+    PRIMARY KEY (id, created_at)
+) PARTITION BY RANGE (created_at);
+CREATE TABLE members_memberevent_default PARTITION OF members_memberevent DEFAULT;
+CREATE INDEX members_event_member_created ON members_memberevent (member_id, created_at DESC);
+CREATE INDEX members_event_church_created ON members_memberevent (church_id, created_at DESC);
+"""
+
+
+def create_member_event_table(apps, schema_editor):
+    """
+    PostgreSQL: tabela particionada por mês (as partições mensais são criadas
+    pelo comando `maintain_member_events`; até lá as linhas vão para a
+    partição DEFAULT). Demais bancos: tabela comum com os mesmos índices.
+    """
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(POSTGRES_SQL)
+    else:
+        schema_editor.create_model(apps.get_model('members', 'MemberEvent'))
+
+
+def drop_member_event_table(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute("DROP TABLE IF EXISTS members_memberevent CASCADE;")
+    else:
+        schema_editor.delete_model(apps.get_model('members', 'MemberEvent'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('churches', '0007_church_total_members_help_text'),
+        ('members', '0027_family_relationship'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name='MemberEvent',
+                    fields=[
+                        ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                        ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Criado em')),
+                        ('kind', models.PositiveSmallIntegerField(choices=[(1, 'Mudança de status'), (2, 'Transferência entre congregações'), (3, 'Transferência entre igrejas'), (4, 'Função ministerial')], verbose_name='Tipo')),
+                        ('old_value', models.CharField(blank=True, max_length=100, verbose_name='Valor anterior')),
+                        ('new_value', models.CharField(blank=True, max_length=100, verbose_name='Novo valor')),
+                        ('source_id', models.BigIntegerField(blank=True, null=True, verbose_name='Registro de origem')),
+                        ('details', models.JSONField(blank=True, null=True, verbose_name='Detalhes')),
+                        ('actor', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Autor')),
+                        ('church', models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='churches.church', verbose_name='Igreja')),
+                        ('member', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='events', to='members.member', verbose_name='Membro')),
+                    ],
+                    options={
+                        'verbose_name': 'Evento de Membro',
+                        'verbose_name_plural': 'Eventos de Membros',
+                        'indexes': [
+                            models.Index(fields=['member', '-created_at'], name='members_event_member_created'),
+                            models.Index(fields=['church', '-created_at'], name='members_event_church_created'),
+                        ],
+                    },
+                ),
+            ],
+        ),
+        migrations.RunPython(create_member_event_table, drop_member_event_table),
+    ]
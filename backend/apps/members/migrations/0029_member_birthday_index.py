@@ -0,0 +1,45 @@
+from django.db import migrations, models
+from django.db.models import Case, Value, When
+from django.db.models.functions import ExtractDay, ExtractMonth
+
+# Dias acumulados antes de cada mês em um ano bissexto (ver apps.members.demographics)
+MONTH_OFFSETS = (0, 31, 60, 91, 121, 152, 182, 213, 244, 274, 305, 335)
+
+
+def backfill_birthday_fields(apps, schema_editor):
+    Member = apps.get_model('members', 'Member')
+    Member.objects.filter(birth_date__isnull=False).update(
+        birth_month=ExtractMonth('birth_date'),
+        birth_day_of_year=Case(
+            *[When(birth_date__month=month, then=Value(offset)) for month, offset in enumerate(MONTH_OFFSETS, 1)]
+        ) + ExtractDay('birth_date'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('members', '0028_member_event'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='member',
+            name='birth_month',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, null=True, verbose_name='Mês de Nascimento'),
+        ),
+        migrations.AddField(
+            model_name='member',
+            name='birth_day_of_year',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, help_text='Dia do ano normalizado para ano bissexto (29/02 = 60)', null=True, verbose_name='Dia do Ano do Aniversário'),
+        ),
+        migrations.RunPython(backfill_birthday_fields, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='member',
+            index=models.Index(fields=['church', 'birth_month'], name='members_mem_church__34c794_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='member',
+            index=models.Index(fields=['church', 'birth_day_of_year'], name='members_mem_church__a6b6a8_idx'),
+        ),
+    ]
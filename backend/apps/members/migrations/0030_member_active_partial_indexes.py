@@ -0,0 +1,39 @@
+from django.contrib.postgres.operations import AddIndexConcurrently, RemoveIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Índices criados com CREATE INDEX CONCURRENTLY (sem bloquear escritas)
+    atomic = False
+
+    dependencies = [
+        ('members', '0029_member_birthday_index'),
+    ]
+
+    operations = [
+        RemoveIndexConcurrently(
+            model_name='member',
+            name='members_mem_church__53e067_idx',
+        ),
+        AddIndexConcurrently(
+            model_name='member',
+            index=models.Index(
+                fields=['church', '-created_at'], name='member_active_recent_idx',
+                condition=models.Q(('is_active', True)),
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name='member',
+            index=models.Index(
+                fields=['church', 'branch', '-created_at'], name='member_active_branch_idx',
+                condition=models.Q(('is_active', True)),
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name='member',
+            index=models.Index(
+                fields=['church', 'membership_status'], name='member_active_status_idx', include=['branch'],
+                condition=models.Q(('is_active', True)),
+            ),
+        ),
+    ]
@@ -3,11 +3,12 @@ Members models - Gestão de membros da igreja
 Sistema completo de membresia com dados eclesiásticos
 """
 
-from django.db import models
+from django.db import NotSupportedError, models
+from django.db.models import Case, Q, Value, When
 from django.conf import settings
 from django.utils import timezone
 from django.core.exceptions import ValidationError
-from datetime import date, timedelta
+from datetime import date
 from apps.core.models import (
     BaseModel, ActiveManager, TenantManager,
     GenderChoices, MembershipStatusChoices, MinisterialFunctionChoices
@@ -48,19 +49,31 @@ class MemberManager(TenantManager):
         """Filtra por função ministerial"""
         return self.get_queryset().filter(ministerial_function=function)
     
+    def bulk_update_with_relationships(self, objs, fields, batch_size=None):
+        """
+        `bulk_update` seguro para membros: além de gravar os campos, aplica
+        os efeitos colaterais de cônjuge (vínculo recíproco, desvinculação e
+        viuvez) que `Member.save` faria, com no máximo três UPDATEs.
+        """
+        from apps.core.query_cache import invalidate_query_cache
+
+        objs = list(objs)
+        previous = Member.previous_values_for(objs)
+        updated = self.bulk_update(objs, fields, batch_size=batch_size)
+        # `bulk_update` não dispara os signals que invalidam o cache de consultas
+        invalidate_query_cache(Member, {
+            church_id
+            for obj in objs
+            for church_id in (obj.church_id, previous.get(obj.pk, {}).get('church_id'))
+        })
+        Member.apply_relationship_changes(objs, previous)
+        return updated
+
     def by_age_range(self, min_age=None, max_age=None):
-        """Filtra por faixa etária"""
-        qs = self.get_queryset()
-        
-        if min_age:
-            max_birth_date = date.today() - timedelta(days=min_age * 365)
-            qs = qs.filter(birth_date__lte=max_birth_date)
-        
-        if max_age:
-            min_birth_date = date.today() - timedelta(days=max_age * 365)
-            qs = qs.filter(birth_date__gte=min_birth_date)
-        
-        return qs
+        """Filtra por faixa etária (idade exata, inclusive nas duas pontas)"""
+        from .demographics import age_range_q
+
+        return self.get_queryset().filter(age_range_q(min_age, max_age))
 
 
 class Member(BaseModel):
@@ -137,6 +150,21 @@ class Member(BaseModel):
         "Data de Nascimento",
         help_text="Data de nascimento"
     )
+
+    # Derivados de birth_date no save (ver apps.members.demographics)
+    birth_month = models.PositiveSmallIntegerField(
+        "Mês de Nascimento",
+        null=True,
+        blank=True,
+        editable=False
+    )
+    birth_day_of_year = models.PositiveSmallIntegerField(
+        "Dia do Ano do Aniversário",
+        null=True,
+        blank=True,
+        editable=False,
+        help_text="Dia do ano normalizado para ano bissexto (29/02 = 60)"
+    )
     
     gender = models.CharField(
         "Gênero",
@@ -443,12 +471,26 @@ class Member(BaseModel):
         ordering = ['church', 'full_name']
         indexes = [
             models.Index(fields=['church', 'full_name']),
-            models.Index(fields=['church', 'is_active']),
             models.Index(fields=['church', 'membership_status']),
             models.Index(fields=['church', 'branch']),
+            # Parciais (só membros ativos): listagens e contagens do escopo
+            models.Index(
+                fields=['church', '-created_at'], name='member_active_recent_idx',
+                condition=models.Q(is_active=True),
+            ),
+            models.Index(
+                fields=['church', 'branch', '-created_at'], name='member_active_branch_idx',
+                condition=models.Q(is_active=True),
+            ),
+            models.Index(
+                fields=['church', 'membership_status'], name='member_active_status_idx',
+                include=['branch'], condition=models.Q(is_active=True),
+            ),
             models.Index(fields=['ministerial_function']),
             models.Index(fields=['cpf']),
             models.Index(fields=['birth_date']),
+            models.Index(fields=['church', 'birth_month']),
+            models.Index(fields=['church', 'birth_day_of_year']),
             models.Index(fields=['membership_date']),
             models.Index(fields=['membership_end_date']),
         ]
@@ -456,6 +498,51 @@ class Member(BaseModel):
     def __str__(self):
         return f"{self.full_name} - {self.church.short_name}"
     
+    # Campos incluídos no snapshot do estado persistido (apps.core.signals,
+    # junto dos campos dos contadores) para detectar mudanças sem reler a linha
+    TRACKED_FIELDS = (
+        'church_id', 'branch_id', 'spouse_id', 'responsible_id', 'is_active',
+        'marital_status', 'membership_status',
+    )
+    # Campos que alteram o grafo familiar da igreja (ver `FamilyGraph`)
+    FAMILY_GRAPH_FIELDS = ('church_id', 'spouse_id', 'responsible_id', 'is_active')
+
+    def refresh_from_db(self, *args, **kwargs):
+        from apps.core.signals import remember_state
+
+        super().refresh_from_db(*args, **kwargs)
+        remember_state(self)
+
+    def get_previous_values(self):
+        """
+        Valores persistidos dos campos acompanhados (vazio para objetos novos).
+
+        Campos adiados com `only()`/`defer()` são lidos em uma única query.
+        """
+        from apps.core.signals import previous_state
+
+        return dict(previous_state(self))
+
+    @classmethod
+    def previous_values_for(cls, members):
+        """`get_previous_values` em lote: {pk: valores}, com no máximo uma query."""
+        from apps.core.signals import SNAPSHOT_ATTR, tracked_fields
+
+        previous = {}
+        missing = {}
+        for member in members:
+            state = getattr(member, SNAPSHOT_ATTR, None)
+            if state is None:
+                missing[member.pk] = member
+            else:
+                previous[member.pk] = dict(state)
+        if missing:
+            for row in cls._base_manager.filter(pk__in=missing).values('pk', *tracked_fields(cls)):
+                pk = row.pop('pk')
+                setattr(missing[pk], SNAPSHOT_ATTR, row)
+                previous[pk] = dict(row)
+        return previous
+
     def save(self, *args, **kwargs):
         """Override save para validações, formatações e sincronização de relacionamentos"""
         # Formatar campos
@@ -468,29 +555,39 @@ class Member(BaseModel):
         
         # Validar datas lógicas
         self._validate_dates()
+
+        self._set_birthday_fields(kwargs)
+
+        previous = self.get_previous_values()
+        church_changed = previous.get('church_id') != self.church_id
         
         # Validar dados do cônjuge
-        self._validate_spouse_data()
+        self._validate_spouse_data(
+            check_church=church_changed or previous.get('spouse_id') != self.spouse_id
+        )
 
-        if self.branch and self.branch.church_id != self.church_id:
+        # Filial só é revalidada quando ela ou a igreja mudam
+        if (
+            self.branch_id
+            and (church_changed or previous.get('branch_id') != self.branch_id)
+            and self.branch.church_id != self.church_id
+        ):
             raise ValidationError("Filial selecionada não pertence à mesma igreja.")
-
-        old_spouse = None
-        old_membership_status = None
-        if self.pk:
-            try:
-                old_instance = Member.objects.select_related('spouse').get(pk=self.pk)
-                old_spouse = old_instance.spouse
-                old_membership_status = old_instance.membership_status
-            except Member.DoesNotExist:
-                old_spouse = None
-                old_membership_status = None
         
         super().save(*args, **kwargs)
 
-        self._sync_spouse_relationship(old_spouse)
-        self._update_spouse_on_death(old_membership_status)
+        Member.apply_relationship_changes([self], {self.pk: previous})
     
+    def _set_birthday_fields(self, save_kwargs):
+        """Mantém birth_month/birth_day_of_year em sincronia com birth_date."""
+        from .demographics import day_of_year
+
+        self.birth_month = self.birth_date.month if self.birth_date else None
+        self.birth_day_of_year = day_of_year(self.birth_date) if self.birth_date else None
+        update_fields = save_kwargs.get('update_fields')
+        if update_fields is not None and 'birth_date' in update_fields:
+            save_kwargs['update_fields'] = set(update_fields) | {'birth_month', 'birth_day_of_year'}
+
     def _validate_dates(self):
         """Valida consistência das datas"""
         today = date.today()
@@ -519,57 +616,110 @@ class Member(BaseModel):
         if self.membership_start_date and self.membership_start_date > today:
             raise ValidationError("Início da membresia não pode ser no futuro")
 
-    def _validate_spouse_data(self):
+    def _validate_spouse_data(self, check_church=True):
         """Valida consistência dos dados do cônjuge antes de salvar"""
         if self.marital_status != 'married':
             self.spouse = None
             return
 
-        if self.spouse and self.spouse_id == self.id:
+        if self.spouse_id and self.spouse_id == self.id:
             self.spouse = None
             return
 
         # Garantir que o cônjuge pertença à mesma igreja
-        if self.spouse and self.spouse.church_id != self.church_id:
+        if check_church and self.spouse_id and self.spouse.church_id != self.church_id:
             raise ValidationError("Cônjuge deve pertencer à mesma igreja.")
 
-    def _sync_spouse_relationship(self, old_spouse):
-        """Sincroniza relacionamento bidirecional de cônjuge após salvar"""
-        # Se não está casado ou cônjuge não foi definido, limpar vínculo anterior
-        if self.marital_status != 'married' or not self.spouse_id:
-            if old_spouse and old_spouse.spouse_id == self.pk:
-                Member.objects.filter(pk=old_spouse.pk).update(
-                    spouse=None,
-                    marital_status='single',
-                    updated_at=timezone.now()
+    @classmethod
+    def apply_relationship_changes(cls, members, previous):
+        """
+        Sincroniza o relacionamento bidirecional de cônjuge após salvar.
+
+        `previous` mapeia pk -> valores persistidos antes da gravação (ver
+        `get_previous_values`). Os efeitos são aplicados com UPDATEs
+        direcionados, sem ler os cônjuges:
+        - cônjuge anterior que apontava para o membro volta a solteiro;
+        - novo cônjuge passa a apontar para o membro, como casado;
+        - cônjuge de membro que faleceu fica viúvo.
+
+        Também invalida o índice familiar e o cache de consultas (`.cached()`)
+        das igrejas afetadas: os UPDATEs não disparam signals.
+        """
+        from apps.core.query_cache import invalidate_query_cache
+        from apps.core.signals import remember_state
+
+        from .family_graph import FamilyGraph
+
+        clear_previous = Q()
+        link = {}
+        widowed = set()
+        family_churches = set()
+        spouse_churches = set()
+
+        for member in members:
+            before = previous.get(member.pk, {})
+            if before:
+                # Campos adiados não carregados não foram alterados
+                family_changed = any(
+                    before.get(field) != member.__dict__.get(field, before.get(field))
+                    for field in cls.FAMILY_GRAPH_FIELDS
                 )
-            return
+            else:
+                family_changed = bool(member.spouse_id or member.responsible_id)
+            if family_changed:
+                family_churches.update({member.church_id, before.get('church_id')})
+
+            old_spouse_id = before.get('spouse_id')
+            new_spouse_id = member.spouse_id if member.marital_status == 'married' else None
 
-        new_spouse = self.spouse
+            # Se tinha cônjuge anterior diferente, limpar vínculo recíproco
+            if old_spouse_id and old_spouse_id != new_spouse_id:
+                clear_previous |= Q(pk=old_spouse_id, spouse_id=member.pk)
+                spouse_churches.update({member.church_id, before.get('church_id')})
 
-        # Se tinha cônjuge anterior diferente, limpar vínculo recíproco
-        if old_spouse and old_spouse.pk != new_spouse.pk and old_spouse.spouse_id == self.pk:
-            Member.objects.filter(pk=old_spouse.pk).update(
+            # Garantir vínculo bidirecional com novo cônjuge
+            if new_spouse_id and (
+                old_spouse_id != new_spouse_id or before.get('marital_status') != 'married'
+            ):
+                link[new_spouse_id] = member.pk
+                spouse_churches.add(member.church_id)
+
+            # Atualiza cônjuge quando membro falece
+            if (
+                member.membership_status == 'deceased'
+                and before.get('membership_status') != 'deceased'
+                and member.spouse_id
+            ):
+                widowed.add(member.spouse_id)
+                family_churches.add(member.church_id)
+                spouse_churches.add(member.church_id)
+
+        now = timezone.now()
+        if clear_previous:
+            cls.objects.filter(clear_previous).update(
                 spouse=None,
                 marital_status='single',
-                updated_at=timezone.now()
+                updated_at=now
             )
-
-        # Garantir vínculo bidirecional com novo cônjuge
-        if new_spouse.spouse_id != self.pk or new_spouse.marital_status != 'married':
-            Member.objects.filter(pk=new_spouse.pk).update(
-                spouse=self.pk,
+        if link:
+            cls.objects.filter(pk__in=link).update(
+                spouse=Case(*[When(pk=spouse_id, then=Value(member_pk)) for spouse_id, member_pk in link.items()]),
                 marital_status='married',
-                updated_at=timezone.now()
+                updated_at=now
             )
-    def _update_spouse_on_death(self, old_membership_status):
-        """Atualiza cônjuge quando membro falece"""
-        if self.membership_status == 'deceased' and old_membership_status != 'deceased' and self.spouse_id:
-            Member.objects.filter(pk=self.spouse_id).update(
+        if widowed:
+            cls.objects.filter(pk__in=widowed).update(
                 marital_status='widowed',
                 spouse=None,
-                updated_at=timezone.now()
+                updated_at=now
             )
+
+        FamilyGraph.invalidate(*family_churches)
+        if spouse_churches:
+            invalidate_query_cache(cls, spouse_churches)
+
+        for member in members:
+            remember_state(member)
     
     # =====================================
     # PROPRIEDADES CALCULADAS
@@ -578,12 +728,9 @@ class Member(BaseModel):
     @property
     def age(self):
         """Calcula idade atual"""
-        if self.birth_date:
-            today = date.today()
-            return today.year - self.birth_date.year - (
-                (today.month, today.day) < (self.birth_date.month, self.birth_date.day)
-            )
-        return None
+        from .demographics import age_on
+
+        return age_on(self.birth_date, date.today())
     
     @property
     def membership_years(self):
@@ -660,24 +807,16 @@ class Member(BaseModel):
     # =====================================
     
     def get_family_members(self):
-        """Retorna membros da família (cônjuge + dependentes)"""
-        family = []
-        
-        # Cônjuge
-        if self.spouse:
-            family.append(self.spouse)
-        
-        # Dependentes
-        family.extend(self.dependents.filter(is_active=True))
-        
-        # Se é dependente, inclui responsável e irmãos
-        if self.responsible:
-            family.append(self.responsible)
-            family.extend(
-                self.responsible.dependents.filter(is_active=True).exclude(id=self.id)
-            )
-        
-        return list(set(family))  # Remove duplicatas
+        """
+        Retorna membros da família: cônjuge, dependentes e, se é dependente,
+        responsável e irmãos. Usa o índice familiar da igreja (em cache).
+        """
+        from .family_graph import FamilyGraph
+
+        family_ids = FamilyGraph.for_church(self.church_id).household(self.pk)
+        if not family_ids:
+            return []
+        return list(Member._base_manager.filter(pk__in=family_ids).order_by('full_name'))
     
     def can_be_responsible(self):
         """Verifica se pode ser responsável por menores"""
@@ -690,7 +829,7 @@ class Member(BaseModel):
     def update_membership_status(self, new_status, reason="", changed_by=None):
         """Atualiza status de membresia com log"""
         if new_status == self.membership_status:
-            return  # Sem mudança
+            return False  # Sem mudança
             
         old_status = self.membership_status
         self.membership_status = new_status
@@ -704,9 +843,7 @@ class Member(BaseModel):
             changed_by=changed_by,
             reason=reason
         )
-    
-    
-    
+        return True
     
     def transfer_to_church(self, new_church, reason=""):
         """Transfere membro para outra igreja"""
@@ -1159,3 +1296,137 @@ class MinisterialFunctionHistory(BaseModel):
         )
         if overlaps.exists():
             raise ValidationError("Período informado se sobrepõe a outro registro de função ministerial deste membro")
+
+
+# =====================================
+# LOG UNIFICADO DE EVENTOS DO MEMBRO
+# =====================================
+class MemberEventQuerySet(models.QuerySet):
+    """Consultas do log de eventos; o log é somente de inserção."""
+
+    def update(self, **kwargs):
+        raise NotSupportedError("MemberEvent é somente de inserção.")
+
+    def delete(self):
+        raise NotSupportedError(
+            "MemberEvent é somente de inserção; use o comando maintain_member_events para retenção."
+        )
+
+    def history(self, member_id, kinds=None, before=None, before_id=None):
+        """
+        Eventos do membro, do mais recente ao mais antigo (índice member_id,
+        created_at DESC). Cursor: `before` e `before_id` do último evento
+        recebido, comparados como o par (created_at, id) da ordenação, para
+        não perder eventos com o mesmo instante na borda da página.
+        """
+        qs = self.filter(member_id=member_id)
+        if kinds:
+            qs = qs.filter(kind__in=kinds)
+        if before and before_id:
+            qs = qs.filter(created_at__lte=before).filter(
+                Q(created_at__lt=before) | Q(id__lt=before_id)
+            )
+        elif before:
+            qs = qs.filter(created_at__lt=before)
+        return qs.order_by('-created_at', '-id')
+
+    def in_period(self, church_ids, since=None, until=None):
+        """Eventos de um conjunto de igrejas (relatórios da denominação) no período."""
+        qs = self.filter(church_id__in=church_ids)
+        if since:
+            qs = qs.filter(created_at__gte=since)
+        if until:
+            qs = qs.filter(created_at__lt=until)
+        return qs
+
+
+class MemberEvent(models.Model):
+    """
+    Log unificado e somente de inserção dos eventos de membresia: mudanças de
+    status, transferências entre congregações e igrejas e funções
+    ministeriais, em formato compacto (tipo em smallint, valores curtos e
+    detalhes opcionais em JSON).
+
+    Os logs específicos (`MembershipStatusLog`, `BranchTransferLog`,
+    `MemberTransferLog`, `MinisterialFunctionHistory`) continuam sendo a
+    fonte de edição; cada inserção neles gera um evento aqui (ver
+    `apps.members.events`).
+
+    No PostgreSQL a tabela é particionada por mês em `created_at` (chave
+    primária `(id, created_at)`); as partições são criadas e arquivadas pelo
+    comando `maintain_member_events`. Nos demais bancos é uma tabela comum.
+    """
+
+    KIND_STATUS = 1
+    KIND_BRANCH_TRANSFER = 2
+    KIND_CHURCH_TRANSFER = 3
+    KIND_MINISTERIAL_FUNCTION = 4
+
+    KIND_CHOICES = [
+        (KIND_STATUS, 'Mudança de status'),
+        (KIND_BRANCH_TRANSFER, 'Transferência entre congregações'),
+        (KIND_CHURCH_TRANSFER, 'Transferência entre igrejas'),
+        (KIND_MINISTERIAL_FUNCTION, 'Função ministerial'),
+    ]
+
+    # Nomes usados na API (?kind=status)
+    KIND_NAMES = {
+        KIND_STATUS: 'status',
+        KIND_BRANCH_TRANSFER: 'branch_transfer',
+        KIND_CHURCH_TRANSFER: 'church_transfer',
+        KIND_MINISTERIAL_FUNCTION: 'ministerial_function',
+    }
+
+    id = models.BigAutoField(primary_key=True)
+    created_at = models.DateTimeField("Criado em", default=timezone.now)
+    member = models.ForeignKey(
+        Member,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name='events',
+        verbose_name="Membro"
+    )
+    church = models.ForeignKey(
+        'churches.Church',
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        null=True,
+        related_name='+',
+        verbose_name="Igreja"
+    )
+    kind = models.PositiveSmallIntegerField("Tipo", choices=KIND_CHOICES)
+    old_value = models.CharField("Valor anterior", max_length=100, blank=True)
+    new_value = models.CharField("Novo valor", max_length=100, blank=True)
+    actor = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name="Autor"
+    )
+    # PK do registro no log de origem (backfill idempotente)
+    source_id = models.BigIntegerField("Registro de origem", null=True, blank=True)
+    details = models.JSONField("Detalhes", null=True, blank=True)
+
+    objects = MemberEventQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = "Evento de Membro"
+        verbose_name_plural = "Eventos de Membros"
+        indexes = [
+            models.Index(fields=['member', '-created_at'], name='members_event_member_created'),
+            models.Index(fields=['church', '-created_at'], name='members_event_church_created'),
+        ]
+
+    def __str__(self):
+        return f"{self.member_id}: {self.get_kind_display()} {self.old_value} → {self.new_value}"
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise NotSupportedError("MemberEvent é somente de inserção.")
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        raise NotSupportedError("MemberEvent é somente de inserção.")
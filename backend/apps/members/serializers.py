@@ -10,7 +10,9 @@ from datetime import date
 from django.contrib.auth import get_user_model
 from django.contrib.auth.password_validation import validate_password
 from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import QuerySet
 from .models import Member, MembershipStatusLog, MembershipStatus, FamilyRelationship
+from .family_graph import FamilyGraph
 from apps.branches.models import Branch
 from apps.core.models import MembershipStatusChoices, MinisterialFunctionChoices, RoleChoices
 from apps.accounts.models import ChurchUser, UserProfile
@@ -227,6 +229,19 @@ class MemberSerializer(serializers.ModelSerializer):
             'spouse_name', 'membership_status_display', 'ministerial_function_display',
             'created_at', 'updated_at'
         ]
+        # Colunas usadas pelos campos calculados (`?fields=`, ver SparseFieldsetMixin)
+        field_sources = {
+            'age': ('birth_date',),
+            'membership_years': ('membership_date',),
+            'full_address': ('address', 'number', 'complement', 'neighborhood', 'city', 'state', 'zipcode'),
+            'spouse_name': ('spouse__full_name',),
+            'has_system_access': ('user',),
+            'system_user_email': ('user__email',),
+            'system_user_role': ('user', 'church'),
+            'system_user_role_label': ('user', 'church'),
+            'children': (),
+            'parents': (),
+        }
     
     def get_age(self, obj):
         """Calcula a idade baseada na data de nascimento"""
@@ -280,34 +295,33 @@ class MemberSerializer(serializers.ModelSerializer):
         except Exception:
             return None
 
-    def _serialize_member_brief(self, member):
-        return {
-            'id': member.id,
-            'full_name': member.full_name,
-            'age': member.age,
-            'gender': member.gender,
-            'birth_date': member.birth_date,
-        }
+    def _family_graph(self, obj):
+        """
+        Grafo familiar compartilhado pela página serializada: uma query de
+        arestas para todos os membros em vez de duas por membro.
+        """
+        graph = getattr(self, '_family_graph_cache', None)
+        if graph is None or not graph.covers(obj.pk):
+            graph = FamilyGraph.for_members(self._family_graph_page(obj))
+            self._family_graph_cache = graph
+        return graph
+
+    def _family_graph_page(self, obj):
+        page = getattr(self.parent, 'instance', None) if isinstance(self.parent, serializers.ListSerializer) else None
+        if isinstance(page, QuerySet):
+            # Só reaproveita querysets já avaliados (sem nova query)
+            page = page._result_cache
+        if isinstance(page, (list, tuple)) and obj in page:
+            return page
+        return [obj]
 
     def get_children(self, obj):
-        try:
-            children = Member.objects.filter(
-                family_links__member=obj,
-                family_links__relation_type=FamilyRelationship.RELATION_CHILD
-            ).distinct()
-            return [self._serialize_member_brief(child) for child in children]
-        except Exception:
-            return []
+        graph = self._family_graph(obj)
+        return graph.briefs(graph.children(obj.pk))
 
     def get_parents(self, obj):
-        try:
-            parents = Member.objects.filter(
-                family_links__member=obj,
-                family_links__relation_type=FamilyRelationship.RELATION_PARENT
-            ).distinct()
-            return [self._serialize_member_brief(parent) for parent in parents]
-        except Exception:
-            return []
+        graph = self._family_graph(obj)
+        return graph.briefs(graph.parents(obj.pk))
 
 
 class MemberListSerializer(serializers.ModelSerializer):
@@ -330,6 +344,7 @@ class MemberListSerializer(serializers.ModelSerializer):
             'membership_date', 'membership_start_date', 'membership_end_date',
             'is_active'
         ]
+        field_sources = {'age': ('birth_date',)}
     
     def get_age(self, obj):
         """Calcula a idade baseada na data de nascimento"""
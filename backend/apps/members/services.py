@@ -9,6 +9,9 @@ from rest_framework import serializers
 
 from apps.accounts.models import ChurchUser
 from apps.branches.models import Branch
+from apps.core import response_cache
+from apps.core.models import MembershipStatusChoices
+from apps.core.query_cache import invalidate_query_cache
 from .models import Member
 from .serializers import MemberCreateSerializer
 
@@ -280,3 +283,176 @@ class MemberBulkImportService:
     def _is_duplicate(self, payload: Dict[str, Any]) -> bool:
         # Duplicidade de CPF/e-mail é permitida para membros/visitantes.
         return False
+
+
+class MemberBulkTransferService:
+    """
+    Transferência em lote de membros para uma filial (e, se ela for de outra
+    igreja, para a igreja dela).
+
+    A validação de permissão fica a cargo da view (uma única vez para a
+    filial de destino); `members` é o queryset já restrito ao escopo do
+    usuário. Tudo acontece em uma transação: um SELECT dos membros, um
+    UPDATE ... WHERE id IN e um `bulk_create` por tipo de log (mais um para
+    o log unificado `MemberEvent`).
+    """
+
+    MAX_MEMBERS = 1000
+
+    def __init__(self, *, user, target_branch: Branch, reason: str = ""):
+        self.user = user
+        self.target_branch = target_branch
+        self.reason = reason or ""
+
+    def transfer(self, *, members, member_ids) -> Dict[str, Any]:
+        from django.db import transaction
+        from django.utils import timezone
+
+        from apps.core.signals import apply_counter_deltas, bulk_counter_deltas
+        from .events import record_events
+        from .family_graph import FamilyGraph
+        from .models import BranchTransferLog, MemberTransferLog, MembershipStatusLog
+
+        ids = self._normalize_ids(member_ids)
+        target = self.target_branch
+        target_church_id = target.church_id
+        today = timezone.localdate()
+
+        rows = list(
+            members.filter(pk__in=ids, is_active=True)
+            .order_by()
+            .values(
+                "id", "church_id", "branch_id", "branch__name", "spouse_id",
+                "membership_status", "membership_start_date",
+            )
+        )
+        found = {row["id"] for row in rows}
+
+        skipped: List[int] = []
+        errors: List[Dict[str, Any]] = []
+        to_move: List[Dict[str, Any]] = []
+        for row in rows:
+            if row["branch_id"] == target.id:
+                skipped.append(row["id"])
+            elif (
+                row["church_id"] != target_church_id
+                and row["spouse_id"]
+                and row["spouse_id"] not in found
+            ):
+                # Cônjuge deve pertencer à mesma igreja (ver Member._validate_spouse_data)
+                errors.append({
+                    "member_id": row["id"],
+                    "messages": ["Cônjuge deve ser transferido junto para a nova igreja."],
+                })
+            else:
+                to_move.append(row)
+
+        if to_move:
+            with transaction.atomic():
+                self._apply(to_move, today)
+                status_logs, branch_logs, church_logs = self._build_logs(to_move, today)
+                MembershipStatusLog.objects.bulk_create(status_logs)
+                BranchTransferLog.objects.bulk_create(branch_logs)
+                MemberTransferLog.objects.bulk_create(church_logs)
+                record_events(
+                    status_logs + branch_logs + church_logs,
+                    church_ids={row["id"]: target_church_id for row in to_move},
+                )
+
+                apply_counter_deltas(bulk_counter_deltas("members.Member", [
+                    (
+                        {"church_id": row["church_id"], "is_active": True,
+                         "membership_status": row["membership_status"]},
+                        {"church_id": target_church_id, "is_active": True,
+                         "membership_status": MembershipStatusChoices.ACTIVE},
+                    )
+                    for row in to_move
+                ]))
+
+                moved_churches = {row["church_id"] for row in to_move if row["church_id"] != target_church_id}
+
+                def invalidate_caches():
+                    if moved_churches:
+                        FamilyGraph.invalidate(target_church_id, *moved_churches)
+                    response_cache.invalidate(
+                        response_cache.church_tenants({target_church_id, *moved_churches}), ["members"]
+                    )
+                    # O UPDATE em massa não dispara os signals do cache de consultas
+                    invalidate_query_cache(Member, {target_church_id, *moved_churches})
+
+                # Após o commit: uma leitura concorrente antes dele guardaria os dados antigos
+                transaction.on_commit(invalidate_caches)
+
+        return {
+            "requested": len(ids),
+            "transferred_count": len(to_move),
+            "transferred_member_ids": [row["id"] for row in to_move],
+            "skipped_member_ids": skipped,
+            "not_found_member_ids": sorted(set(ids) - found),
+            "error_count": len(errors),
+            "errors": errors,
+            "target_branch": {"id": target.id, "name": target.name},
+            "target_church_id": target_church_id,
+            "transfer_date": today.isoformat(),
+        }
+
+    def _normalize_ids(self, member_ids) -> List[int]:
+        if not isinstance(member_ids, (list, tuple)) or not member_ids:
+            raise serializers.ValidationError({"member_ids": "Informe uma lista de IDs de membros."})
+        try:
+            ids = list(dict.fromkeys(int(member_id) for member_id in member_ids))
+        except (TypeError, ValueError):
+            raise serializers.ValidationError({"member_ids": "IDs de membros inválidos."})
+        if len(ids) > self.MAX_MEMBERS:
+            raise serializers.ValidationError(
+                {"member_ids": f"Limite de {self.MAX_MEMBERS} membros por transferência."}
+            )
+        return ids
+
+    def _apply(self, rows: List[Dict[str, Any]], today) -> int:
+        """Mesmos campos da transferência individual, em um único UPDATE."""
+        from django.utils import timezone
+
+        return Member._base_manager.filter(pk__in=[row["id"] for row in rows]).update(
+            church_id=self.target_branch.church_id,
+            branch_id=self.target_branch.id,
+            membership_status=MembershipStatusChoices.ACTIVE,
+            membership_start_date=today,
+            membership_end_date=None,
+            updated_at=timezone.now(),
+        )
+
+    def _build_logs(self, rows: List[Dict[str, Any]], today):
+        from .models import BranchTransferLog, MemberTransferLog, MembershipStatusLog
+
+        target = self.target_branch
+        status_logs, branch_logs, church_logs = [], [], []
+        for row in rows:
+            same_church = row["church_id"] == target.church_id
+            if row["branch_id"]:
+                status_logs.append(MembershipStatusLog(
+                    member_id=row["id"],
+                    old_status=row["membership_status"],
+                    new_status=MembershipStatusChoices.TRANSFERRED,
+                    changed_by=self.user,
+                    reason=f"Transferido de {row['branch__name']} para {target.name}",
+                ))
+                branch_logs.append(BranchTransferLog(
+                    member_id=row["id"],
+                    from_branch_id=row["branch_id"],
+                    to_branch=target,
+                    previous_membership_start_date=row["membership_start_date"],
+                    transfer_date=today,
+                    transferred_by=self.user,
+                    reason=self.reason,
+                    transfer_type="same_church" if same_church else "different_church",
+                ))
+            if not same_church:
+                church_logs.append(MemberTransferLog(
+                    member_id=row["id"],
+                    from_church_id=row["church_id"],
+                    to_church_id=target.church_id,
+                    transferred_by=self.user,
+                    reason=self.reason,
+                ))
+        return status_logs, branch_logs, church_logs
@@ -0,0 +1,58 @@
+"""
+Signals para Members - invalidação do índice familiar em cache e registro
+dos logs específicos no log unificado de eventos
+"""
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .events import record_events
+from .family_graph import FamilyGraph
+from .models import (
+    BranchTransferLog, FamilyRelationship, Member, MemberTransferLog,
+    MembershipStatusLog, MinisterialFunctionHistory,
+)
+
+
+def _relationship_church_id(relationship):
+    if FamilyRelationship.member.is_cached(relationship):
+        return relationship.member.church_id
+    return (
+        Member._base_manager.filter(pk=relationship.member_id)
+        .values_list('church_id', flat=True)
+        .first()
+    )
+
+
+@receiver(post_save, sender=FamilyRelationship)
+@receiver(post_delete, sender=FamilyRelationship)
+def invalidate_family_graph_on_relationship_change(sender, instance, **kwargs):
+    """Vínculos pai/filho alterados invalidam o índice da igreja."""
+    FamilyGraph.invalidate(_relationship_church_id(instance))
+
+
+@receiver(post_delete, sender=Member)
+def invalidate_family_graph_on_member_delete(sender, instance, **kwargs):
+    """
+    Remoção física de membro: cônjuge e dependentes são desvinculados por
+    SET_NULL, sem signals. Alterações via save são tratadas em
+    `Member.apply_relationship_changes`.
+    """
+    FamilyGraph.invalidate(instance.church_id)
+
+
+@receiver(post_save, sender=MembershipStatusLog)
+@receiver(post_save, sender=BranchTransferLog)
+@receiver(post_save, sender=MemberTransferLog)
+@receiver(post_save, sender=MinisterialFunctionHistory)
+def record_member_event(sender, instance, created, raw=False, **kwargs):
+    """
+    Cada novo registro nos logs específicos vira um `MemberEvent`. Inserções
+    em lote (`bulk_create`) não disparam signals e chamam `record_events`.
+    """
+    if not created or raw:
+        return
+    church_ids = None
+    if sender.member.is_cached(instance):
+        church_ids = {instance.member_id: instance.member.church_id}
+    record_events([instance], church_ids)
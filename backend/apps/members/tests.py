@@ -1,16 +1,32 @@
+import json
+import os
+import tempfile
+
 from django.urls import reverse
 from django.test import TestCase
+from django.utils import timezone
+from django.db import NotSupportedError
 from rest_framework import status
 from rest_framework.test import APITestCase, APIClient
 from django.contrib.auth import get_user_model
-from datetime import date
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from unittest import mock
 from django.core.exceptions import ValidationError
 from django.core.files.uploadedfile import SimpleUploadedFile
 
 from apps.denominations.models import Denomination
 from apps.churches.models import Church
 from apps.branches.models import Branch
-from .models import Member, FamilyRelationship
+from django.core.cache import cache
+
+from .models import (
+    Member, FamilyRelationship, BranchTransferLog, MemberEvent, MemberTransferLog, MembershipStatusLog,
+    MinisterialFunctionHistory,
+)
+from . import events as events_module
+from .demographics import CHURCH_AGE_BANDS, age_band_counts, birthday_window_q, years_ago
+from .family_graph import FamilyGraph
+from .services import MemberBulkTransferService
 from apps.accounts.models import ChurchUser, RoleChoices, UserProfile
 
 User = get_user_model()
@@ -738,6 +754,77 @@ class FamilyRelationshipTest(APITestCase):
             member=parent, related_member=child2, relation_type=FamilyRelationship.RELATION_CHILD
         ).exists())
 
+    def _member(self, name, birth_date, **extra):
+        return Member.objects.create(
+            church=self.church,
+            branch=self.branch,
+            full_name=name,
+            birth_date=birth_date,
+            gender="M",
+            phone="(11) 97777-0000",
+            **extra
+        )
+
+    def _link(self, parent, child):
+        FamilyRelationship.objects.create(
+            member=parent, related_member=child, relation_type=FamilyRelationship.RELATION_CHILD
+        )
+        FamilyRelationship.objects.create(
+            member=child, related_member=parent, relation_type=FamilyRelationship.RELATION_PARENT
+        )
+
+    def test_family_graph_answers_page_in_two_queries(self):
+        parent = self._member("Graph Parent", date(1970, 1, 1))
+        child_a = self._member("Graph Child A", date(2005, 1, 1), responsible=parent)
+        child_b = self._member("Graph Child B", date(2007, 1, 1))
+        inactive = self._member("Graph Child Inactive", date(2009, 1, 1))
+        for child in (child_a, child_b, inactive):
+            self._link(parent, child)
+        inactive.is_active = False
+        inactive.save()
+
+        with self.assertNumQueries(2):
+            graph = FamilyGraph.for_members([parent, child_a])
+
+        self.assertEqual(graph.children(parent.id), [child_a.id, child_b.id])
+        self.assertEqual(graph.parents(child_a.id), [parent.id])
+        self.assertEqual(graph.siblings(child_a.id), [child_b.id])
+        self.assertEqual(graph.household(child_a.id), [parent.id])
+        self.assertEqual(graph.brief(child_a.id)["age"], child_a.age)
+
+        resp = self.client.get(reverse("member-detail", args=[parent.id]))
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual([c["id"] for c in resp.data["children"]], [child_a.id, child_b.id])
+        self.assertEqual(resp.data["parents"], [])
+
+    def test_church_family_index_is_cached_and_invalidated(self):
+        cache.clear()
+        parent = self._member("Index Parent", date(1975, 1, 1))
+        child = self._member("Index Child", date(2010, 1, 1), responsible=parent)
+        spouse = self._member("Index Spouse", date(1976, 1, 1))
+
+        resp = self.client.get(reverse("member-family", args=[child.id]))
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual([m["id"] for m in resp.data["household"]], [parent.id])
+
+        with self.assertNumQueries(0):
+            FamilyGraph.for_church(self.church.id)
+
+        # Novo vínculo pai/filho invalida o índice
+        self._link(parent, child)
+        self.assertEqual(FamilyGraph.for_church(self.church.id).parents(child.id), [parent.id])
+
+        # Cônjuge definido via save também invalida
+        parent.marital_status = "married"
+        parent.spouse = spouse
+        parent.save()
+        self.assertEqual(
+            {m.id for m in child.get_family_members()}, {parent.id}
+        )
+        self.assertEqual(
+            {m.id for m in parent.get_family_members()}, {spouse.id, child.id}
+        )
+
 
 class SpouseSynchronizationTest(TestCase):
     def setUp(self):
@@ -849,6 +936,65 @@ class SpouseSynchronizationTest(TestCase):
         self.assertEqual(self.member_b.marital_status, "widowed")
         self.assertIsNone(self.member_b.spouse_id)
 
+    def test_update_does_not_refetch_member_or_spouse(self):
+        self._marry_members()
+        member = Member.objects.get(pk=self.member_a.pk)
+
+        # Apenas o UPDATE do próprio membro
+        member.profession = "Professor"
+        with self.assertNumQueries(1):
+            member.save()
+
+    def test_deferred_fields_are_loaded_in_one_query(self):
+        self._marry_members()
+        member = Member.objects.only("id", "full_name", "church_id").get(pk=self.member_a.pk)
+
+        self.assertEqual(
+            member.get_previous_values()["spouse_id"],
+            self.member_b.id,
+        )
+
+    def test_partner_update_invalidates_cached_queries(self):
+        cache.clear()
+
+        def partner_status():
+            members = Member.objects.filter(church=self.church).cached()
+            return {member.pk: member.marital_status for member in members}[self.member_b.pk]
+
+        self.assertNotEqual(partner_status(), "married")
+        self.member_a.marital_status = "married"
+        self.member_a.spouse = self.member_b
+        # `bulk_update` e o UPDATE do cônjuge não disparam signals
+        Member.objects.bulk_update_with_relationships([self.member_a], ["marital_status", "spouse"])
+        self.assertEqual(partner_status(), "married")
+
+    def test_bulk_update_with_relationships(self):
+        self._marry_members()
+        member_c = Member.objects.create(
+            church=self.church,
+            branch=self.branch,
+            full_name="Ana Souza",
+            birth_date=date(1995, 3, 3),
+            phone="(11) 98888-0000",
+        )
+        member_a = Member.objects.get(pk=self.member_a.pk)
+        member_a.spouse = member_c
+        member_c.marital_status = "married"
+        member_c.membership_status = "deceased"
+        member_c.spouse = member_a
+
+        Member.objects.bulk_update_with_relationships(
+            [member_a, member_c], ["spouse", "marital_status", "membership_status"]
+        )
+
+        self.member_b.refresh_from_db()
+        member_a.refresh_from_db()
+        self.assertEqual(self.member_b.marital_status, "single")
+        self.assertIsNone(self.member_b.spouse_id)
+        # O vínculo com C foi criado e em seguida desfeito pelo falecimento de C
+        self.assertEqual(member_a.marital_status, "widowed")
+        self.assertIsNone(member_a.spouse_id)
+
 
 class MemberBulkUploadTests(APITestCase):
     """Testes para a ação de upload em lote de membros."""
@@ -964,3 +1110,571 @@ class MemberBulkUploadTests(APITestCase):
         self.assertEqual(response.data["success_count"], 0)
         self.assertEqual(response.data["error_count"], 1)
         self.assertTrue(response.data["errors"][0]["messages"])
+
+
+class MemberBulkTransferTests(APITestCase):
+    """Transferência em lote de membros entre filiais e igrejas."""
+
+    def setUp(self):
+        self.admin_user = User.objects.create_superuser(
+            email="transfer-admin@test.com",
+            password="adminpassword",
+            full_name="Transfer Admin",
+            phone="(11) 99999-1212",
+        )
+        self.denomination = Denomination.objects.create(
+            name="Transfer Denomination",
+            short_name="TD",
+            administrator=self.admin_user,
+            email="transfer@test.com",
+            phone="(11) 98888-1212",
+            headquarters_address="Rua 1",
+            headquarters_city="Cidade",
+            headquarters_state="SP",
+            headquarters_zipcode="01010-010",
+        )
+        self.church = self._church("Transfer Church", "TC")
+        self.other_church = self._church("Transfer Other Church", "TO")
+        self.origin = self.church.branches.get()
+        self.target = Branch.objects.create(
+            church=self.church,
+            name="Transfer Congregacao",
+            short_name="Congregação",
+            email="congregacao@test.com",
+            phone="(11) 96666-1212",
+            address="Rua 3",
+            neighborhood="Centro",
+            city="Cidade",
+            state="SP",
+            zipcode="03030-030",
+        )
+        ChurchUser.objects.create(
+            user=self.admin_user,
+            church=self.church,
+            role=RoleChoices.CHURCH_ADMIN,
+            is_active=True,
+            is_user_active_church=True,
+            active_branch=self.origin,
+            can_manage_members=True,
+        )
+        self.members = [
+            Member.objects.create(
+                church=self.church,
+                branch=self.origin,
+                full_name=f"Transfer Member {index}",
+                birth_date=date(1990, 1, index + 1),
+                gender="M",
+                phone="(11) 95555-1212",
+                membership_start_date=date(2015, 1, 1),
+            )
+            for index in range(3)
+        ]
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.admin_user)
+
+    def _church(self, name, short_name):
+        return Church.objects.create(
+            denomination=self.denomination,
+            name=name,
+            short_name=short_name,
+            email=f"{short_name.lower()}@test.com",
+            phone="(11) 97777-1212",
+            address="Rua 2",
+            city="Cidade",
+            state="SP",
+            zipcode="02020-020",
+            subscription_end_date=date(2099, 1, 1),
+        )
+
+    def test_bulk_transfer_branch_moves_members_in_one_transaction(self):
+        already_there = Member.objects.create(
+            church=self.church,
+            branch=self.target,
+            full_name="Transfer Already There",
+            birth_date=date(1991, 1, 1),
+            gender="F",
+            phone="(11) 95555-3434",
+        )
+        ids = [member.id for member in self.members]
+
+        resp = self.client.post(
+            reverse("member-bulk-transfer-branch"),
+            {"member_ids": ids + [already_there.id, 999999], "branch_id": self.target.id, "reason": "Reorganização"},
+            format="json",
+        )
+
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.data["transferred_count"], 3)
+        self.assertEqual(resp.data["skipped_member_ids"], [already_there.id])
+        self.assertEqual(resp.data["not_found_member_ids"], [999999])
+        self.assertEqual(Member.objects.filter(id__in=ids, branch=self.target).count(), 3)
+        self.assertEqual(
+            BranchTransferLog.objects.filter(member_id__in=ids, to_branch=self.target, reason="Reorganização").count(), 3
+        )
+        self.assertEqual(MembershipStatusLog.objects.filter(member_id__in=ids, new_status="transferred").count(), 3)
+        self.assertFalse(MemberTransferLog.objects.exists())
+
+    def test_service_query_count_does_not_grow_with_members(self):
+        service = MemberBulkTransferService(user=self.admin_user, target_branch=self.target)
+        # SELECT, SAVEPOINT, UPDATE, 2 bulk_create de logs, 1 de eventos, RELEASE
+        with self.assertNumQueries(7):
+            summary = service.transfer(members=Member._base_manager.all(), member_ids=[m.id for m in self.members])
+        self.assertEqual(summary["transferred_count"], 3)
+
+    def test_transfer_invalidates_cached_member_queries(self):
+        cache.clear()
+
+        def cached_ids(church):
+            return {member.pk for member in Member.objects.filter(church=church).cached()}
+
+        self.assertEqual(cached_ids(self.church), {member.pk for member in self.members})
+        self.assertEqual(cached_ids(self.other_church), set())
+
+        service = MemberBulkTransferService(user=self.admin_user, target_branch=self.other_church.branches.get())
+        with self.captureOnCommitCallbacks() as callbacks:
+            service.transfer(members=Member._base_manager.all(), member_ids=[self.members[0].pk])
+            # Nada é invalidado antes do commit
+            self.assertEqual(cached_ids(self.church), {member.pk for member in self.members})
+        for callback in callbacks:
+            callback()
+
+        self.assertEqual(cached_ids(self.church), {member.pk for member in self.members[1:]})
+        self.assertEqual(cached_ids(self.other_church), {self.members[0].pk})
+
+    def test_cross_church_transfer_requires_spouse_in_batch(self):
+        married, spouse, single = self.members
+        married.marital_status = "married"
+        married.spouse = spouse
+        married.save()
+        other_branch = self.other_church.branches.get()
+
+        resp = self.client.post(
+            reverse("church-bulk-transfer-members"),
+            {"member_ids": [married.id, single.id], "target_church_id": self.other_church.id},
+            format="json",
+        )
+
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.data["transferred_member_ids"], [single.id])
+        self.assertEqual([error["member_id"] for error in resp.data["errors"]], [married.id])
+        single.refresh_from_db()
+        self.assertEqual((single.church_id, single.branch_id), (self.other_church.id, other_branch.id))
+        self.assertTrue(MemberTransferLog.objects.filter(
+            member=single, from_church=self.church, to_church=self.other_church
+        ).exists())
+        self.other_church.refresh_from_db()
+        self.assertEqual(self.other_church.total_members, 1)
+
+
+class MemberEventLogTests(APITestCase):
+    """Log unificado de eventos: gravação, streaming e partições."""
+
+    def setUp(self):
+        self.admin_user = User.objects.create_superuser(
+            email="events-admin@test.com",
+            password="adminpassword",
+            full_name="Events Admin",
+            phone="(11) 99999-5656",
+        )
+        denomination = Denomination.objects.create(
+            name="Events Denomination",
+            short_name="ED",
+            administrator=self.admin_user,
+            email="events@test.com",
+            phone="(11) 98888-5656",
+            headquarters_address="Rua 1",
+            headquarters_city="Cidade",
+            headquarters_state="SP",
+            headquarters_zipcode="01010-010",
+        )
+        self.church = Church.objects.create(
+            denomination=denomination,
+            name="Events Church",
+            short_name="EC",
+            email="eventschurch@test.com",
+            phone="(11) 97777-5656",
+            address="Rua 2",
+            city="Cidade",
+            state="SP",
+            zipcode="02020-020",
+            subscription_end_date=date(2099, 1, 1),
+        )
+        ChurchUser.objects.create(
+            user=self.admin_user,
+            church=self.church,
+            role=RoleChoices.CHURCH_ADMIN,
+            is_active=True,
+            is_user_active_church=True,
+            can_manage_members=True,
+        )
+        self.member = Member.objects.create(
+            church=self.church,
+            full_name="Events Member",
+            birth_date=date(1990, 1, 1),
+            gender="M",
+            phone="(11) 95555-5656",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.admin_user)
+
+    def test_logs_are_mirrored_and_streamed_in_one_ordered_history(self):
+        self.member.update_membership_status("inactive", reason="Mudou-se", changed_by=self.admin_user)
+        MinisterialFunctionHistory.objects.create(
+            member=self.member, function="deacon", start_date=date(2020, 1, 1), changed_by=self.admin_user
+        )
+
+        events = list(MemberEvent.objects.history(self.member.id))
+        self.assertEqual(
+            [event.kind for event in events],
+            [MemberEvent.KIND_MINISTERIAL_FUNCTION, MemberEvent.KIND_STATUS],
+        )
+        self.assertEqual(events[1].church_id, self.church.id)
+        self.assertEqual(events[1].details, {"reason": "Mudou-se"})
+
+        url = reverse("member-events", args=[self.member.id])
+        resp = self.client.get(url)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        payload = json.loads(b"".join(resp.streaming_content))
+        self.assertEqual([e["kind"] for e in payload["events"]], ["ministerial_function", "status"])
+        self.assertEqual(payload["events"][1]["new_value"], "inactive")
+
+        resp = self.client.get(url, {"kind": "status"})
+        self.assertEqual(len(json.loads(b"".join(resp.streaming_content))["events"]), 1)
+        self.assertEqual(self.client.get(url, {"kind": "unknown"}).status_code, status.HTTP_400_BAD_REQUEST)
+
+        resp = self.client.get(url, {"limit": 1})
+        self.assertEqual(len(json.loads(b"".join(resp.streaming_content))["events"]), 1)
+        for limit in ("-1", "0", "abc"):
+            self.assertEqual(self.client.get(url, {"limit": limit}).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_events_are_append_only(self):
+        self.member.update_membership_status("inactive")
+        event = MemberEvent.objects.get(member=self.member)
+        with self.assertRaises(NotSupportedError):
+            event.save()
+        with self.assertRaises(NotSupportedError):
+            MemberEvent.objects.filter(member=self.member).delete()
+
+    def test_events_cursor_keeps_events_sharing_a_timestamp(self):
+        at = timezone.now().replace(microsecond=123456)
+        MemberEvent.objects.bulk_create([
+            MemberEvent(member=self.member, church=self.church, kind=MemberEvent.KIND_STATUS, created_at=at)
+            for _ in range(3)
+        ])
+        url = reverse("member-events", args=[self.member.id])
+
+        seen = []
+        params = {"limit": 2}
+        while True:
+            page = json.loads(b"".join(self.client.get(url, params).streaming_content))["events"]
+            if not page:
+                break
+            seen += [event["id"] for event in page]
+            params = {"limit": 2, "before": page[-1]["created_at"], "before_id": page[-1]["id"]}
+
+        self.assertEqual(sorted(seen), sorted(MemberEvent.objects.filter(member=self.member).values_list("id", flat=True)))
+        self.assertEqual(len(seen), 3)
+        self.assertEqual(self.client.get(url, {"before_id": seen[0]}).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_backfill_copies_logs_older_than_already_recorded_events(self):
+        # Logs anteriores ao deploy (sem evento) e um log novo já espelhado pelos signals
+        old_log = MembershipStatusLog.objects.create(member=self.member, old_status="active", new_status="inactive")
+        MemberEvent.objects.filter(source_id=old_log.pk)._raw_delete(MemberEvent.objects.db)
+        self.member.update_membership_status("disciplined")
+        self.assertTrue(MemberEvent.objects.filter(source_id__gt=old_log.pk).exists())
+
+        copied = events_module.backfill_events()
+        self.assertEqual(copied["status"], 1)
+        self.assertTrue(MemberEvent.objects.filter(kind=MemberEvent.KIND_STATUS, source_id=old_log.pk).exists())
+        self.assertEqual(events_module.backfill_events()["status"], 0)
+
+    def test_partitions_receive_default_rows_and_are_archived(self):
+        if not events_module.is_partitioned():
+            self.skipTest("Particionamento disponível apenas no PostgreSQL")
+        old_month = date(2001, 1, 1)
+        old_at = timezone.make_aware(datetime(2001, 1, 15, 12, 0))
+        log = MembershipStatusLog.objects.create(member=self.member, old_status="active", new_status="inactive")
+        MembershipStatusLog.objects.filter(pk=log.pk).update(created_at=old_at)
+        MemberEvent.objects.bulk_create([
+            MemberEvent(member=self.member, church=self.church, kind=MemberEvent.KIND_STATUS, created_at=old_at)
+        ])
+
+        created = events_module.ensure_partitions(old_month, old_month)
+        self.assertEqual(created, [events_module.partition_name(old_month)])
+        self.assertEqual(MemberEvent.objects.filter(created_at=old_at).count(), 1)
+
+        with tempfile.TemporaryDirectory() as archive_dir:
+            rows = events_module.archive_partition(created[0], archive_dir)
+            self.assertEqual(rows, 1)
+            self.assertTrue(os.path.exists(os.path.join(archive_dir, f"{created[0]}.csv.gz")))
+        self.assertFalse(MemberEvent.objects.filter(created_at=old_at).exists())
+        self.assertNotIn(created[0], [name for name, _ in events_module.list_partitions()])
+
+
+class MemberDemographicsTests(APITestCase):
+    """Faixas etárias exatas no banco e aniversariantes indexados."""
+
+    def setUp(self):
+        self.admin_user = User.objects.create_superuser(
+            email="demo-admin@test.com",
+            password="adminpassword",
+            full_name="Demo Admin",
+            phone="(11) 99999-7070",
+        )
+        denomination = Denomination.objects.create(
+            name="Demo Denomination",
+            short_name="DD",
+            administrator=self.admin_user,
+            email="demo@test.com",
+            phone="(11) 98888-7070",
+            headquarters_address="Rua 1",
+            headquarters_city="Cidade",
+            headquarters_state="SP",
+            headquarters_zipcode="01010-010",
+        )
+        self.church = Church.objects.create(
+            denomination=denomination,
+            name="Demo Church",
+            short_name="DC",
+            email="demochurch@test.com",
+            phone="(11) 97777-7070",
+            address="Rua 2",
+            city="Cidade",
+            state="SP",
+            zipcode="02020-020",
+            subscription_end_date=date(2099, 1, 1),
+        )
+        ChurchUser.objects.create(
+            user=self.admin_user,
+            church=self.church,
+            role=RoleChoices.CHURCH_ADMIN,
+            is_active=True,
+            is_user_active_church=True,
+            can_manage_members=True,
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.admin_user)
+
+    def _member(self, name, birth_date):
+        return Member.objects.create(
+            church=self.church, full_name=name, birth_date=birth_date, gender="M", phone="(11) 95555-7070"
+        )
+
+    def test_birthday_columns_are_kept_in_sync(self):
+        member = self._member("Leap Member", date(2000, 2, 29))
+        self.assertEqual((member.birth_month, member.birth_day_of_year), (2, 60))
+
+        member.birth_date = date(1990, 3, 1)
+        member.save(update_fields=["birth_date"])
+        member.refresh_from_db()
+        self.assertEqual((member.birth_month, member.birth_day_of_year), (3, 61))
+
+    def test_age_bands_are_exact_on_birthday_edges(self):
+        today = date(2025, 6, 15)
+        self._member("Turns Thirteen Today", years_ago(today, 13))
+        self._member("Turns Thirteen Tomorrow", date(2012, 6, 16))
+        self._member("Sixty Five", date(1960, 1, 1))
+        self._member("Sixty Six Today", years_ago(today, 66))
+
+        counts = age_band_counts(Member.objects.filter(church=self.church), CHURCH_AGE_BANDS, today)
+        self.assertEqual(counts["0-12"], 1)
+        self.assertEqual(counts["13-17"], 1)
+        self.assertEqual(counts["51-65"], 1)
+        self.assertEqual(counts["65+"], 1)
+
+    def test_birthday_window_wraps_the_year(self):
+        self._member("New Year", date(1990, 1, 2))
+        self._member("Christmas", date(1990, 12, 25))
+        self._member("Year End", date(1990, 12, 31))
+
+        names = set(
+            Member.objects.filter(church=self.church)
+            .filter(birthday_window_q(date(2025, 12, 29), 7))
+            .values_list("full_name", flat=True)
+        )
+        self.assertEqual(names, {"New Year", "Year End"})
+
+    def test_birthday_window_includes_leap_day_on_feb_28_of_common_years(self):
+        self._member("Leap Day", date(1992, 2, 29))
+        self._member("Feb 28", date(1990, 2, 28))
+
+        def names(start, days):
+            return set(
+                Member.objects.filter(church=self.church)
+                .filter(birthday_window_q(start, days))
+                .values_list("full_name", flat=True)
+            )
+
+        # 2025 não é bissexto: o aniversário de 29/02 cai em 28/02
+        self.assertEqual(names(date(2025, 2, 22), 7), {"Leap Day", "Feb 28"})
+        self.assertEqual(names(date(2025, 2, 28), 1), {"Leap Day", "Feb 28"})
+        # 2028 é bissexto: 29/02 fica fora de uma janela que termina em 28/02
+        self.assertEqual(names(date(2028, 2, 22), 7), {"Feb 28"})
+
+    def test_birthdays_endpoint_uses_local_date(self):
+        self._member("Local Birthday", date(1990, 6, 15))
+        # 23:30 em São Paulo já é 16/06 em UTC
+        late_evening = datetime(2025, 6, 16, 2, 30, tzinfo=dt_timezone.utc)
+
+        with mock.patch("django.utils.timezone.now", return_value=late_evening):
+            resp = self.client.get(reverse("member-birthdays"), {"period": "week"})
+
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual([m["full_name"] for m in resp.data["results"]], ["Local Birthday"])
+        self.assertTrue(resp.data["results"][0]["is_today"])
+        self.assertEqual(resp.data["results"][0]["turning_age"], 35)
+
+    def test_birthdays_endpoint_lists_week_and_month(self):
+        today = timezone.localdate()
+        self._member("Birthday Today", years_ago(today, 30))
+        later = today + timedelta(days=120)
+        self._member("Later Birthday", date(1980, later.month, min(later.day, 28)))
+
+        url = reverse("member-birthdays")
+        resp = self.client.get(url, {"period": "week"})
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual([m["full_name"] for m in resp.data["results"]], ["Birthday Today"])
+        self.assertTrue(resp.data["results"][0]["is_today"])
+        self.assertEqual(resp.data["results"][0]["turning_age"], 30)
+
+        resp = self.client.get(url, {"period": "month"})
+        self.assertIn("Birthday Today", [m["full_name"] for m in resp.data["results"]])
+        self.assertEqual(self.client.get(url, {"period": "year"}).status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class MemberListFixtureMixin:
+    """Igreja com três membros e um administrador autenticado."""
+
+    def setUp(self):
+        self.admin_user = User.objects.create_superuser(
+            email="sparse-admin@test.com",
+            password="adminpassword",
+            full_name="Sparse Admin",
+            phone="(11) 99999-8080",
+        )
+        denomination = Denomination.objects.create(
+            name="Sparse Denomination",
+            short_name="SD",
+            administrator=self.admin_user,
+            email="sparse@test.com",
+            phone="(11) 98888-8080",
+            headquarters_address="Rua 1",
+            headquarters_city="Cidade",
+            headquarters_state="SP",
+            headquarters_zipcode="01010-010",
+        )
+        self.church = Church.objects.create(
+            denomination=denomination,
+            name="Sparse Church",
+            short_name="SC",
+            email="sparsechurch@test.com",
+            phone="(11) 97777-8080",
+            address="Rua 2",
+            city="Cidade",
+            state="SP",
+            zipcode="02020-020",
+            subscription_end_date=date(2099, 1, 1),
+        )
+        ChurchUser.objects.create(
+            user=self.admin_user,
+            church=self.church,
+            role=RoleChoices.CHURCH_ADMIN,
+            is_active=True,
+            is_user_active_church=True,
+            can_manage_members=True,
+        )
+        for index in range(3):
+            Member.objects.create(
+                church=self.church, full_name=f"Sparse Member {index}", birth_date=date(1990, 1, index + 1),
+                gender="M", phone=f"(11) 9555{index}-8080", notes="Observação longa",
+            )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.admin_user)
+        self.url = reverse("member-list")
+
+
+class MemberSparseFieldsetTests(MemberListFixtureMixin, APITestCase):
+    """`?fields=` reduz a resposta e as colunas lidas da listagem."""
+
+    def _results(self, response):
+        return response.data["results"] if isinstance(response.data, dict) else response.data
+
+    def test_fields_limit_payload_and_columns(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as queries:
+            resp = self.client.get(self.url, {"fields": "id,full_name,phone,age,church_name"})
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        results = self._results(resp)
+        self.assertEqual(len(results), 3)
+        self.assertEqual(set(results[0]), {"id", "full_name", "phone", "age", "church_name"})
+
+        select = next(
+            query["sql"] for query in queries.captured_queries
+            if query["sql"].startswith("SELECT") and '"members_member"."full_name"' in query["sql"]
+        )
+        self.assertIn('"members_member"."birth_date"', select)
+        self.assertIn('"churches_church"."name"', select)
+        self.assertNotIn('"members_member"."notes"', select)
+        self.assertNotIn('"branches_branch"', select)
+
+    def test_without_fields_payload_is_unchanged(self):
+        resp = self.client.get(self.url)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertIn("membership_status_display", self._results(resp)[0])
+
+    def test_unknown_field_is_rejected(self):
+        resp = self.client.get(self.url, {"fields": "id,password"})
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+        resp = self.client.get(self.url, {"fields": "id", "expand": "notes"})
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_export_is_streamed_with_same_envelope(self):
+        resp = self.client.get(reverse("member-export"))
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertTrue(resp.streaming)
+        data = json.loads(b"".join(resp.streaming_content))
+        self.assertEqual(data["count"], 3)
+        self.assertIn("exported_at", data)
+        self.assertEqual(sorted(m["full_name"] for m in data["members"])[0], "Sparse Member 0")
+
+
+class MemberConditionalRequestTests(MemberListFixtureMixin, APITestCase):
+    """ETag/Last-Modified na listagem e no detalhe, e `If-Match` nas escritas."""
+
+    def test_list_revalidates_with_304_until_data_changes(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        first = self.client.get(self.url)
+        etag = first["ETag"]
+        self.assertTrue(etag.startswith('W/"'))
+        self.assertIn("no-cache", first["Cache-Control"])
+
+        with CaptureQueriesContext(connection) as queries:
+            cached = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(cached.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(cached["ETag"], etag)
+        self.assertFalse(any('"members_member"."full_name"' in q["sql"] for q in queries.captured_queries))
+
+        Member.objects.filter(church=self.church).first().delete()
+        changed = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(changed.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(changed["ETag"], etag)
+
+    def test_detail_if_match_detects_concurrent_update(self):
+        member = Member.objects.filter(church=self.church).first()
+        url = reverse("member-detail", args=[member.pk])
+        etag = self.client.get(url)["ETag"]
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_304_NOT_MODIFIED)
+
+        # Outra requisição altera o membro depois da leitura
+        Member.objects.get(pk=member.pk).save()
+        resp = self.client.patch(url, {"notes": "Atualizado"}, format="json", HTTP_IF_MATCH=etag)
+        self.assertEqual(resp.status_code, status.HTTP_412_PRECONDITION_FAILED)
+
+        current = self.client.get(url)["ETag"]
+        resp = self.client.patch(url, {"notes": "Atualizado"}, format="json", HTTP_IF_MATCH=current)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(resp["ETag"], current)
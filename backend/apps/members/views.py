@@ -15,11 +15,19 @@ from datetime import datetime, date
 from django.contrib.auth import get_user_model
 from django.contrib.auth.password_validation import validate_password
 from django.core.exceptions import ValidationError as DjangoValidationError
-from django.http import HttpResponse
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 import csv
 
-from .models import Member, MembershipStatusLog, MinisterialFunctionHistory, MembershipStatus
-from apps.core.mixins import ChurchScopedQuerysetMixin
+from .models import Member, MemberEvent, MembershipStatusLog, MinisterialFunctionHistory, MembershipStatus
+from .events import HISTORY_MAX_LIMIT, stream_history
+from .demographics import (
+    DASHBOARD_AGE_BANDS, age_band_counts, birthday_in_year, birthday_window_q, next_birthday,
+)
+from apps.core.mixins import ChurchScopedQuerysetMixin, ConditionalRequestMixin, SparseFieldsetMixin
+from apps.core.renderers import StreamingJSONResponse, serialize_in_chunks
+from apps.core.response_cache import cache_response
 from .serializers import (
     MemberSerializer, MemberListSerializer, MemberCreateSerializer, 
     MemberUpdateSerializer, MemberSummarySerializer,
@@ -27,14 +35,15 @@ from .serializers import (
     MinisterialFunctionHistorySerializer, MembershipStatusSerializer,
     MemberBulkUploadSerializer
 )
-from .services import MemberBulkImportService
+from .services import MemberBulkImportService, MemberBulkTransferService
+from .family_graph import FamilyGraph
 import logging
 
 # Logger do app Members (usado para auditoria e tracking de ações sensíveis)
 logger = logging.getLogger('apps.members')
 
 
-class MemberViewSet(ChurchScopedQuerysetMixin, viewsets.ModelViewSet):
+class MemberViewSet(ConditionalRequestMixin, SparseFieldsetMixin, ChurchScopedQuerysetMixin, viewsets.ModelViewSet):
     """
     ViewSet para CRUD de membros com otimizações
     """
@@ -45,6 +54,8 @@ class MemberViewSet(ChurchScopedQuerysetMixin, viewsets.ModelViewSet):
     filterset_fields = ['gender', 'marital_status', 'ministerial_function']
     ordering_fields = ['full_name', 'membership_date', 'created_at']
     ordering = ['-created_at']
+    conditional_related = ('church', 'branch')
+    conditional_depends_on = ('members',)
     
     def get_queryset(self):
         """QuerySet otimizado + escopo por igreja/branch/secretário."""
@@ -224,6 +235,39 @@ class MemberViewSet(ChurchScopedQuerysetMixin, viewsets.ModelViewSet):
             return MemberSummarySerializer
         return MemberSerializer
 
+    @action(detail=False, methods=['post'], url_path='bulk-transfer-branch')
+    def bulk_transfer_branch(self, request):
+        """
+        Transfere vários membros para uma filial da mesma igreja em uma única
+        transação. Corpo: {"member_ids": [...], "branch_id": X, "reason": ""}.
+        Retorna um resumo (transferidos, ignorados, não encontrados, erros).
+        """
+        from apps.branches.models import Branch
+
+        try:
+            target_branch_id = int(request.data.get('branch_id'))
+        except (TypeError, ValueError):
+            return Response({'error': 'branch_id inválido ou não informado'}, status=status.HTTP_400_BAD_REQUEST)
+
+        target_branch = Branch.objects.filter(id=target_branch_id, is_active=True).select_related('church').first()
+        if not target_branch:
+            return Response({'error': 'Filial alvo não encontrada'}, status=status.HTTP_404_NOT_FOUND)
+
+        if not self._user_can_write_branch(request.user, target_branch):
+            raise PermissionDenied('Sem permissão para transferir para esta filial.')
+
+        service = MemberBulkTransferService(
+            user=request.user,
+            target_branch=target_branch,
+            reason=request.data.get('reason', ''),
+        )
+        summary = service.transfer(
+            # Apenas membros visíveis ao usuário e da mesma igreja da filial
+            members=self.get_queryset().filter(church_id=target_branch.church_id),
+            member_ids=request.data.get('member_ids'),
+        )
+        return Response(summary, status=status.HTTP_200_OK)
+
     @action(detail=False, methods=['get'], url_path='me/status')
     def my_membership_status(self, request):
         """
@@ -346,6 +390,7 @@ class MemberViewSet(ChurchScopedQuerysetMixin, viewsets.ModelViewSet):
         )
     
     @action(detail=False, methods=['get'])
+    @cache_response('members-dashboard', depends_on=('members',))
     def dashboard(self, request):
         """
         Endpoint para dados do dashboard de membros
@@ -389,30 +434,8 @@ class MemberViewSet(ChurchScopedQuerysetMixin, viewsets.ModelViewSet):
             count=Count('id')
         ).order_by('-count'))
         
-        # Estatísticas por faixa etária
-        # Crianças (0-12 anos)
-        children_date = today - timedelta(days=12*365)
-        children = queryset.filter(birth_date__gte=children_date).count()
-        
-        # Jovens (13-30 anos)
-        youth_min_date = today - timedelta(days=30*365)
-        youth_max_date = children_date
-        youth = queryset.filter(
-            birth_date__gte=youth_min_date,
-            birth_date__lt=youth_max_date
-        ).count()
-        
-        # Adultos (31-60 anos)
-        adults_min_date = today - timedelta(days=60*365)
-        adults_max_date = youth_min_date
-        adults = queryset.filter(
-            birth_date__gte=adults_min_date,
-            birth_date__lt=adults_max_date
-        ).count()
-        
-        # Idosos (acima de 60 anos)
-        elderly_date = adults_min_date
-        elderly = queryset.filter(birth_date__lt=elderly_date).count()
+        # Estatísticas por faixa etária (idade exata, uma única query)
+        age_distribution = age_band_counts(queryset, DASHBOARD_AGE_BANDS, today)
         
         data = {
             'total_members': total_members,
@@ -422,16 +445,53 @@ class MemberViewSet(ChurchScopedQuerysetMixin, viewsets.ModelViewSet):
             'growth_rate': round(growth_rate, 2),
             'status_distribution': status_distribution,
             'gender_distribution': gender_distribution,
-            'age_distribution': {
-                'children': children,
-                'youth': youth,
-                'adults': adults,
-                'elderly': elderly
-            }
+            'age_distribution': age_distribution
         }
         
         return Response(data)
     
+    @action(detail=False, methods=['get'])
+    def birthdays(self, request):
+        """
+        Aniversariantes para acompanhamento pastoral.
+        Parâmetros: period=week (próximos 7 dias, padrão) | month (mês corrente)
+        """
+        period = request.query_params.get('period', 'week')
+        if period not in ('week', 'month'):
+            return Response({'error': 'period deve ser week ou month'}, status=status.HTTP_400_BAD_REQUEST)
+
+        today = timezone.localdate()
+        queryset = self.filter_queryset(self.get_queryset())
+        if period == 'week':
+            queryset = queryset.filter(birthday_window_q(today, 7))
+        else:
+            queryset = queryset.filter(birth_month=today.month)
+
+        members = []
+        rows = queryset.order_by().values(
+            'id', 'full_name', 'birth_date', 'phone', 'email', 'branch_id', 'branch__name'
+        )
+        for row in rows:
+            if period == 'week':
+                birthday = next_birthday(row['birth_date'], today)
+            else:
+                birthday = birthday_in_year(row['birth_date'], today.year)
+            members.append({
+                'id': row['id'],
+                'full_name': row['full_name'],
+                'birth_date': row['birth_date'],
+                'birthday': birthday,
+                'turning_age': birthday.year - row['birth_date'].year,
+                'is_today': birthday == today,
+                'phone': row['phone'],
+                'email': row['email'],
+                'branch_id': row['branch_id'],
+                'branch_name': row['branch__name'],
+            })
+        members.sort(key=lambda member: (member['birthday'], member['full_name']))
+
+        return Response({'period': period, 'count': len(members), 'results': members})
+
     @action(detail=False, methods=['get'])
     def all(self, request):
         """Lista todos os membros, incluindo inativos"""
@@ -519,6 +579,75 @@ class MemberViewSet(ChurchScopedQuerysetMixin, viewsets.ModelViewSet):
         
         return Response(member_data)
     
+    @action(detail=True, methods=['get'])
+    def family(self, request, pk=None):
+        """Árvore familiar do membro (filhos, pais, irmãos e núcleo familiar)"""
+        member = self.get_object()
+        graph = FamilyGraph.for_church(member.church_id)
+
+        relations = {
+            'children': graph.children(member.pk),
+            'parents': graph.parents(member.pk),
+            'siblings': graph.siblings(member.pk),
+            'household': graph.household(member.pk),
+        }
+        graph.load_nodes(set().union(*relations.values()))
+
+        data = {'member_id': member.pk}
+        data.update({name: graph.briefs(ids) for name, ids in relations.items()})
+        return Response(data)
+
+    @action(detail=True, methods=['get'])
+    def events(self, request, pk=None):
+        """
+        Histórico unificado (status, transferências e funções ministeriais)
+        em streaming, do mais recente ao mais antigo.
+        Parâmetros: kind (repetível), before (ISO 8601) e before_id (cursor:
+        created_at e id do último evento recebido), limit (1 a
+        HISTORY_MAX_LIMIT; sem ele, o histórico inteiro).
+        """
+        member = self.get_object()
+
+        kinds_by_name = {name: kind for kind, name in MemberEvent.KIND_NAMES.items()}
+        requested = request.query_params.getlist('kind')
+        unknown = [name for name in requested if name not in kinds_by_name]
+        if unknown:
+            return Response({'error': f'Tipos de evento inválidos: {", ".join(unknown)}'}, status=status.HTTP_400_BAD_REQUEST)
+
+        before = request.query_params.get('before')
+        if before:
+            before = parse_datetime(before)
+            if before is None:
+                return Response({'error': 'before deve ser uma data/hora ISO 8601'}, status=status.HTTP_400_BAD_REQUEST)
+
+        before_id = request.query_params.get('before_id')
+        if before_id is not None:
+            if not before or not before_id.isdigit():
+                return Response(
+                    {'error': 'before_id deve ser o id (inteiro) do último evento, junto com before'},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            before_id = int(before_id)
+
+        limit = request.query_params.get('limit')
+        if limit is not None:
+            try:
+                limit = int(limit)
+            except ValueError:
+                limit = 0
+            if limit <= 0:
+                return Response({'error': 'limit deve ser um inteiro positivo'}, status=status.HTTP_400_BAD_REQUEST)
+            # Validado aqui: erros dentro do gerador só apareceriam depois dos cabeçalhos 200
+            limit = min(limit, HISTORY_MAX_LIMIT)
+
+        return StreamingHttpResponse(
+            stream_history(
+                member.pk, kinds=[kinds_by_name[name] for name in requested],
+                before=before, before_id=before_id, limit=limit,
+            ),
+            content_type='application/json',
+        )
+
     @action(detail=True, methods=['get'])
     def status_history(self, request, pk=None):
         """Histórico de mudanças de status - ENDPOINT SIMPLES E EFICIENTE"""
@@ -536,7 +665,8 @@ class MemberViewSet(ChurchScopedQuerysetMixin, viewsets.ModelViewSet):
                 'current_status': member.membership_status,
                 'current_status_display': member.get_membership_status_display(),
                 'history': serializer.data,
-                'total_changes': history.count()
+                # Total já contado pelo paginador (sem um segundo COUNT)
+                'total_changes': self.paginator.page.paginator.count
             })
         
         # Sem paginação
@@ -564,14 +694,15 @@ class MemberViewSet(ChurchScopedQuerysetMixin, viewsets.ModelViewSet):
                 Q(cpf__icontains=search)
             )
         
-        # Serializar dados
-        serializer = MemberSerializer(queryset, many=True)
-        
-        return Response({
-            'count': queryset.count(),
-            'exported_at': datetime.now().isoformat(),
-            'members': serializer.data
-        })
+        # Serializar em lotes e enviar em streaming (sem montar a lista inteira)
+        return StreamingJSONResponse(
+            serialize_in_chunks(queryset, MemberSerializer),
+            envelope={
+                'count': queryset.count(),
+                'exported_at': datetime.now().isoformat(),
+            },
+            key='members',
+        )
 
     @action(
         detail=False,
@@ -839,11 +970,12 @@ class MemberViewSet(ChurchScopedQuerysetMixin, viewsets.ModelViewSet):
         church = active_church
         
         # Buscar todos os membros ativos da igreja que têm User associado
-        members_queryset = self.get_queryset().filter(
+        # (só campos do próprio membro: sem select_related, em cache por igreja)
+        members_queryset = self.get_queryset().select_related(None).filter(
             is_active=True,
             church=church,
             user__isnull=False  # Apenas membros com User associado
-        )
+        ).cached()
         
         # Aplicar filtro de busca se fornecido
         search = request.query_params.get('search', '').strip()
@@ -857,7 +989,7 @@ class MemberViewSet(ChurchScopedQuerysetMixin, viewsets.ModelViewSet):
         data = []
         for member in members_queryset.order_by('full_name'):
             data.append({
-                'id': member.user.id,  # User ID para o campo leader do Ministry
+                'id': member.user_id,  # User ID para o campo leader do Ministry
                 'name': member.full_name,
                 'role': member.get_ministerial_function_display() or 'Membro',
                 'type': 'member',
@@ -3,7 +3,7 @@ Admin para o sistema de notificações
 """
 from django.contrib import admin
 from django.utils.html import format_html
-from .models import Notification
+from .models import Notification, NotificationDigest
 
 
 @admin.register(Notification)
@@ -155,3 +155,14 @@ class NotificationAdmin(admin.ModelAdmin):
         """Otimiza queryset com select_related"""
         qs = super().get_queryset(request)
         return qs.select_related('user', 'church')
+
+
+@admin.register(NotificationDigest)
+class NotificationDigestAdmin(admin.ModelAdmin):
+    """Resumos diários gerados pela retenção (somente leitura)"""
+    
+    list_display = ['day', 'user', 'church', 'total', 'unread']
+    list_filter = ['day']
+    search_fields = ['user__email', 'church__name']
+    raw_id_fields = ['user', 'church']
+    readonly_fields = ['user', 'church', 'day', 'total', 'unread', 'by_type', 'created_at', 'updated_at']
@@ -0,0 +1,47 @@
+"""
+Comando Django de retenção das notificações.
+
+Remove, em faixas de PK, as notificações lidas/não lidas além do período de
+retenção (resumindo-as em `NotificationDigest`) e o excedente por usuário e
+igreja. Ver `apps/notifications/retention.py`.
+
+Uso: python manage.py prune_notifications
+     python manage.py prune_notifications --read-days 15 --max-per-user 200
+     python manage.py prune_notifications --dry-run
+"""
+
+from django.core.management.base import BaseCommand
+
+from apps.notifications.retention import NotificationRetention
+
+
+class Command(BaseCommand):
+    help = 'Aplica a retenção das notificações (faixas de PK, resumos diários e limite por usuário)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--read-days', type=int, help='Dias para manter notificações lidas')
+        parser.add_argument('--unread-days', type=int, help='Dias para manter notificações não lidas')
+        parser.add_argument('--max-per-user', type=int, help='Máximo por usuário/igreja (0 desativa)')
+        parser.add_argument('--chunk-size', type=int, help='Linhas por faixa de PK')
+        parser.add_argument('--no-digest', action='store_true', help='Não gerar resumos diários')
+        parser.add_argument('--dry-run', action='store_true', help='Apenas contar o que seria removido')
+
+    def handle(self, *args, **options):
+        retention = NotificationRetention(
+            read_days=options['read_days'],
+            unread_days=options['unread_days'],
+            max_per_user=options['max_per_user'],
+            chunk_size=options['chunk_size'],
+            digest=False if options['no_digest'] else None,
+        )
+
+        if options['dry_run']:
+            self.stdout.write(f'🗑️ Lidas expiradas: {retention.expired_read().count()}')
+            self.stdout.write(f'🗑️ Não lidas expiradas: {retention.expired_unread().count()}')
+            return
+
+        for phase, stats in retention.run().items():
+            self.stdout.write(self.style.SUCCESS(
+                f"✓ {phase}: {stats['deleted']} removida(s), {stats['digested']} resumida(s), "
+                f"{stats['chunks']} faixa(s), {stats['rows_per_second']} linhas/s"
+            ))
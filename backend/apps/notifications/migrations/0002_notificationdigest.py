@@ -0,0 +1,37 @@
+# Generated by Django 5.2.3 on 2026-10-19 03:59
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('churches', '0007_church_total_members_help_text'),
+        ('notifications', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationDigest',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='Data e hora de criação do registro', verbose_name='Criado em')),
+                ('updated_at', models.DateTimeField(auto_now=True, help_text='Data e hora da última atualização', verbose_name='Atualizado em')),
+                ('day', models.DateField(verbose_name='Dia')),
+                ('total', models.PositiveIntegerField(default=0, verbose_name='Total')),
+                ('unread', models.PositiveIntegerField(default=0, help_text='Notificações removidas sem terem sido lidas', verbose_name='Não lidas')),
+                ('by_type', models.JSONField(blank=True, default=dict, help_text='Contagem por tipo de notificação', verbose_name='Por tipo')),
+                ('church', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notification_digests', to='churches.church', verbose_name='Igreja')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notification_digests', to=settings.AUTH_USER_MODEL, verbose_name='Usuário')),
+            ],
+            options={
+                'verbose_name': 'Resumo de Notificações',
+                'verbose_name_plural': 'Resumos de Notificações',
+                'ordering': ['-day'],
+                'constraints': [models.UniqueConstraint(fields=('user', 'church', 'day'), name='notification_digest_user_church_day_uniq')],
+            },
+        ),
+    ]
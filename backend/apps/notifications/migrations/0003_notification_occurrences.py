@@ -0,0 +1,18 @@
+# Generated by Django 5.2.3 on 2026-10-19 04:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0002_notificationdigest'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='occurrences',
+            field=models.PositiveIntegerField(default=1, help_text='Quantidade de eventos agrupados nesta notificação', verbose_name='Ocorrências'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Índices criados com CREATE INDEX CONCURRENTLY (sem bloquear escritas)
+    atomic = False
+
+    dependencies = [
+        ('notifications', '0003_notification_occurrences'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='notification',
+            index=models.Index(
+                fields=['user', 'church', '-created_at'], name='notif_unread_idx',
+                condition=models.Q(('is_active', True), ('is_read', False)),
+            ),
+        ),
+    ]
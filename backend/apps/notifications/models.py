@@ -7,7 +7,7 @@ from django.conf import settings
 from django.utils import timezone
 from django.core.exceptions import ValidationError
 
-from apps.core.models import BaseModel, TenantManager
+from apps.core.models import BaseModel, TenantManager, TimestampedModel
 from apps.churches.models import Church
 
 
@@ -159,6 +159,13 @@ class Notification(BaseModel):
         help_text='URL para redirecionar ao clicar na notificação'
     )
     
+    # Agrupamento (ver NotificationService: eventos do mesmo tipo na janela)
+    occurrences = models.PositiveIntegerField(
+        'Ocorrências',
+        default=1,
+        help_text='Quantidade de eventos agrupados nesta notificação'
+    )
+    
     # Prioridade
     priority = models.CharField(
         'Prioridade',
@@ -181,6 +188,11 @@ class Notification(BaseModel):
             models.Index(fields=['user', 'is_read', '-created_at']),
             models.Index(fields=['church', 'notification_type', '-created_at']),
             models.Index(fields=['priority', '-created_at']),
+            # Parcial: não lidas (contador do sino e "marcar todas como lidas")
+            models.Index(
+                fields=['user', 'church', '-created_at'], name='notif_unread_idx',
+                condition=models.Q(is_active=True, is_read=False),
+            ),
         ]
         # Permissões personalizadas
         permissions = [
@@ -237,3 +249,59 @@ class Notification(BaseModel):
         """Sobrescreve save para executar validações"""
         self.full_clean()
         super().save(*args, **kwargs)
+
+
+class NotificationDigest(TimestampedModel):
+    """
+    Resumo diário das notificações removidas pela retenção
+    
+    Uma linha por usuário, igreja e dia, com o total e a contagem por tipo
+    das notificações que saíram da tabela (ver `retention.py`).
+    """
+    
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='notification_digests',
+        verbose_name='Usuário'
+    )
+    
+    church = models.ForeignKey(
+        Church,
+        on_delete=models.CASCADE,
+        related_name='notification_digests',
+        verbose_name='Igreja'
+    )
+    
+    day = models.DateField('Dia')
+    
+    total = models.PositiveIntegerField('Total', default=0)
+    
+    unread = models.PositiveIntegerField(
+        'Não lidas',
+        default=0,
+        help_text='Notificações removidas sem terem sido lidas'
+    )
+    
+    by_type = models.JSONField(
+        'Por tipo',
+        default=dict,
+        blank=True,
+        help_text='Contagem por tipo de notificação'
+    )
+    
+    objects = models.Manager()
+    
+    class Meta:
+        verbose_name = 'Resumo de Notificações'
+        verbose_name_plural = 'Resumos de Notificações'
+        ordering = ['-day']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'church', 'day'],
+                name='notification_digest_user_church_day_uniq'
+            ),
+        ]
+    
+    def __str__(self):
+        return f'{self.day:%d/%m/%Y} - {self.total} notificação(ões)'
@@ -0,0 +1,218 @@
+"""
+Retenção das notificações (a tabela que mais cresce).
+
+O `QuerySet.delete()` carrega todas as linhas para coletar cascatas e
+signals, segurando locks e memória por minutos em tabelas grandes. Aqui:
+
+- as remoções andam por faixas de PK (`pk__gte/pk__lte`) de no máximo
+  `chunk_size` linhas, cada faixa na sua própria transação;
+- quando nada depende das notificações (sem FKs apontando para elas nem
+  signals de exclusão) a faixa é removida com um único `DELETE ... WHERE`
+  (`_raw_delete`), sem carregar as linhas; caso contrário usa `delete()`
+  na faixa;
+- antes de remover, as notificações expiradas são resumidas em
+  `NotificationDigest` (uma linha por usuário, igreja e dia);
+- cada (usuário, igreja) mantém apenas as `max_per_user` mais recentes;
+- cada fase informa linhas removidas, faixas e linhas por segundo.
+
+Uso:
+    stats = NotificationRetention().run()
+    # {'expired_read': {'deleted': 1200, 'rows_per_second': 45000.0, ...}, ...}
+
+Agendado pela task `notifications.prune_notifications` (Celery beat) ou
+pelo comando `python manage.py prune_notifications`.
+"""
+
+import logging
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import router, transaction
+from django.db.models import Count, Max, Q, Sum
+from django.db.models.deletion import Collector
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import Notification, NotificationDigest
+
+logger = logging.getLogger(__name__)
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+@dataclass
+class PhaseStats:
+    """Resultado de uma fase da retenção."""
+
+    deleted: int = 0
+    digested: int = 0
+    chunks: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rows_per_second(self):
+        return round(self.deleted / self.seconds, 1) if self.seconds else 0.0
+
+    def as_dict(self):
+        return {
+            'deleted': self.deleted,
+            'digested': self.digested,
+            'chunks': self.chunks,
+            'seconds': round(self.seconds, 3),
+            'rows_per_second': self.rows_per_second,
+        }
+
+
+class NotificationRetention:
+    """
+    Remove notificações lidas há mais de `read_days`, não lidas criadas há
+    mais de `unread_days` e o excedente de `max_per_user` por usuário e
+    igreja (0 desativa o limite).
+    """
+
+    def __init__(self, read_days=None, unread_days=None, max_per_user=None,
+                 chunk_size=None, digest=None, now=None):
+        self.read_days = _setting('NOTIFICATION_RETENTION_READ_DAYS', 30) if read_days is None else read_days
+        self.unread_days = _setting('NOTIFICATION_RETENTION_UNREAD_DAYS', 90) if unread_days is None else unread_days
+        self.max_per_user = _setting('NOTIFICATION_MAX_PER_USER', 0) if max_per_user is None else max_per_user
+        self.chunk_size = chunk_size or _setting('NOTIFICATION_RETENTION_CHUNK_SIZE', 5000)
+        self.digest = _setting('NOTIFICATION_RETENTION_DIGESTS', True) if digest is None else digest
+        self.now = now or timezone.now()
+        self.db = router.db_for_write(Notification)
+
+    # =====================================
+    # FASES
+    # =====================================
+
+    def expired_read(self):
+        return self._base().filter(is_read=True, read_at__lt=self.now - timedelta(days=self.read_days))
+
+    def expired_unread(self):
+        return self._base().filter(is_read=False, created_at__lt=self.now - timedelta(days=self.unread_days))
+
+    def run(self):
+        """Executa as fases e retorna as estatísticas de cada uma."""
+        results = {
+            'expired_read': self.purge(self.expired_read(), digest=self.digest),
+            'expired_unread': self.purge(self.expired_unread(), digest=self.digest),
+        }
+        if self.max_per_user:
+            results['over_cap'] = self.enforce_cap()
+        for phase, stats in results.items():
+            logger.info(
+                f"[NOTIFICAÇÕES] Retenção {phase}: {stats.deleted} removida(s) em {stats.chunks} faixa(s), "
+                f"{stats.rows_per_second} linhas/s"
+            )
+        return {phase: stats.as_dict() for phase, stats in results.items()}
+
+    def enforce_cap(self):
+        """Mantém só as `max_per_user` notificações mais recentes de cada usuário/igreja."""
+        stats = PhaseStats()
+        over = (
+            self._base().values('user_id', 'church_id')
+            .annotate(total=Count('id')).filter(total__gt=self.max_per_user)
+            .order_by()
+        )
+        for group in over.iterator():
+            scope = self._base().filter(user_id=group['user_id'], church_id=group['church_id'])
+            boundary = (
+                scope.order_by('-created_at', '-id')
+                .values('created_at', 'id')[self.max_per_user - 1:self.max_per_user]
+                .first()
+            )
+            older = scope.filter(
+                Q(created_at__lt=boundary['created_at'])
+                | Q(created_at=boundary['created_at'], id__lt=boundary['id'])
+            )
+            self.purge(older, digest=self.digest, stats=stats)
+        return stats
+
+    # =====================================
+    # REMOÇÃO EM FAIXAS
+    # =====================================
+
+    def purge(self, queryset, digest=True, stats=None):
+        """Remove `queryset` em faixas de PK de até `chunk_size` linhas."""
+        stats = stats or PhaseStats()
+        started = time.monotonic()
+        high = queryset.aggregate(high=Max('pk'))['high']
+        start = queryset.order_by('pk').values_list('pk', flat=True).first()
+        while start is not None:
+            end = (
+                queryset.filter(pk__gte=start).order_by('pk')
+                .values_list('pk', flat=True)[self.chunk_size - 1:self.chunk_size]
+                .first()
+            ) or high
+            chunk = queryset.filter(pk__gte=start, pk__lte=end)
+            with transaction.atomic(using=self.db):
+                if digest:
+                    stats.digested += self.summarize(chunk)
+                stats.deleted += self._delete(chunk)
+            stats.chunks += 1
+            start = queryset.filter(pk__gt=end, pk__lte=high).order_by('pk').values_list('pk', flat=True).first()
+        stats.seconds += time.monotonic() - started
+        return stats
+
+    def _delete(self, queryset):
+        queryset = queryset.order_by()
+        if Collector(using=self.db, origin=queryset).can_fast_delete(queryset):
+            return queryset._raw_delete(self.db)
+        return queryset.delete()[0]
+
+    def _base(self):
+        # Todas as notificações (sem filtro de tenant nem de `is_active`)
+        return Notification._base_manager.using(self.db)
+
+    # =====================================
+    # RESUMOS DIÁRIOS
+    # =====================================
+
+    def summarize(self, queryset):
+        """
+        Soma as notificações de `queryset` (com as ocorrências agrupadas) nos
+        resumos diários; retorna quantos eventos resumiu.
+        """
+        rows = (
+            queryset.annotate(day=TruncDate('created_at'))
+            .values('user_id', 'church_id', 'day', 'notification_type')
+            .annotate(total=Sum('occurrences'), unread=Sum('occurrences', filter=Q(is_read=False)))
+            .order_by()
+        )
+        totals = {}
+        for row in rows:
+            entry = totals.setdefault(
+                (row['user_id'], row['church_id'], row['day']), {'total': 0, 'unread': 0, 'by_type': {}}
+            )
+            entry['total'] += row['total']
+            entry['unread'] += row['unread'] or 0
+            entry['by_type'][row['notification_type']] = (
+                entry['by_type'].get(row['notification_type'], 0) + row['total']
+            )
+        if not totals:
+            return 0
+
+        users, churches, days = (set(values) for values in zip(*totals))
+        existing = {
+            (digest.user_id, digest.church_id, digest.day): digest
+            for digest in NotificationDigest.objects.using(self.db).select_for_update()
+            .filter(user_id__in=users, church_id__in=churches, day__in=days)
+        }
+        created, updated = [], []
+        for (user_id, church_id, day), entry in totals.items():
+            digest = existing.get((user_id, church_id, day))
+            if digest is None:
+                created.append(NotificationDigest(user_id=user_id, church_id=church_id, day=day, **entry))
+                continue
+            digest.updated_at = self.now
+            digest.total += entry['total']
+            digest.unread += entry['unread']
+            for notification_type, count in entry['by_type'].items():
+                digest.by_type[notification_type] = digest.by_type.get(notification_type, 0) + count
+            updated.append(digest)
+        NotificationDigest.objects.using(self.db).bulk_create(created)
+        NotificationDigest.objects.using(self.db).bulk_update(updated, ['total', 'unread', 'by_type', 'updated_at'])
+        return sum(entry['total'] for entry in totals.values())
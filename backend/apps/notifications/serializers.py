@@ -41,6 +41,7 @@ class NotificationSerializer(serializers.ModelSerializer):
             'action_url',
             'priority',
             'priority_display',
+            'occurrences',
             'is_recent',
             'age_in_days',
             'created_at',
@@ -56,6 +57,7 @@ class NotificationSerializer(serializers.ModelSerializer):
             'metadata',
             'action_url',
             'priority',
+            'occurrences',
             'created_at',
             'updated_at',
         ]
@@ -83,6 +85,7 @@ class NotificationListSerializer(serializers.ModelSerializer):
             'is_read',
             'action_url',
             'priority',
+            'occurrences',
             'created_at',
         ]
 
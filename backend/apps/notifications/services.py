@@ -2,9 +2,13 @@
 Service layer para criação e gerenciamento de notificações
 Centraliza a lógica de negócio de notificações
 """
+from datetime import timedelta
 from typing import List, Optional, Dict, Any
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.db import transaction
 from django.db.models import Q
+from django.utils import timezone
 
 from apps.churches.models import Church
 from apps.branches.models import Branch
@@ -30,6 +34,10 @@ class NotificationService:
             metadata={'visitor_id': 123}
         )
         
+        # Eventos do mesmo tipo para o mesmo usuário/igreja dentro da janela
+        # (COALESCE_WINDOWS) atualizam a notificação não lida existente:
+        # "27 novos visitantes" em vez de 27 linhas por administrador
+        
         # Notificar todos admins da igreja
         NotificationService.notify_church_admins(
             church=church,
@@ -39,6 +47,45 @@ class NotificationService:
         )
     """
     
+    # Janela de agrupamento por tipo, em segundos (0 = sempre cria nova).
+    # Sobrescrita por settings.NOTIFICATION_COALESCE_WINDOWS
+    COALESCE_WINDOWS = {
+        NotificationTypeChoices.NEW_VISITOR: 24 * 3600,
+        NotificationTypeChoices.NEW_MEMBER: 24 * 3600,
+        NotificationTypeChoices.VISITOR_CONVERTED: 24 * 3600,
+        NotificationTypeChoices.MEMBER_STATUS_CHANGED: 3600,
+        NotificationTypeChoices.MEMBER_TRANSFERRED: 3600,
+    }
+    
+    # Título e URL da notificação agrupada
+    COALESCED_TITLES = {
+        NotificationTypeChoices.NEW_VISITOR: '{count} novos visitantes',
+        NotificationTypeChoices.NEW_MEMBER: '{count} novos membros cadastrados',
+        NotificationTypeChoices.VISITOR_CONVERTED: '{count} visitantes convertidos em membros',
+        NotificationTypeChoices.MEMBER_STATUS_CHANGED: '{count} alterações de status de membros',
+        NotificationTypeChoices.MEMBER_TRANSFERRED: '{count} membros transferidos',
+    }
+    COALESCED_URLS = {
+        NotificationTypeChoices.NEW_VISITOR: '/visitantes',
+        NotificationTypeChoices.NEW_MEMBER: '/membros',
+        NotificationTypeChoices.VISITOR_CONVERTED: '/membros',
+        NotificationTypeChoices.MEMBER_STATUS_CHANGED: '/membros',
+        NotificationTypeChoices.MEMBER_TRANSFERRED: '/membros',
+    }
+    
+    # Máximo de eventos guardados em metadata['items'] (o contador segue somando)
+    COALESCE_MAX_ITEMS = 50
+    
+    PRIORITY_ORDER = [choice for choice, _ in NotificationPriorityChoices.choices]
+    
+    @staticmethod
+    def get_coalesce_window(notification_type: str) -> int:
+        """Janela de agrupamento (segundos) do tipo de notificação"""
+        windows = getattr(settings, 'NOTIFICATION_COALESCE_WINDOWS', None) or {}
+        if notification_type in windows:
+            return windows[notification_type]
+        return NotificationService.COALESCE_WINDOWS.get(notification_type, 0)
+    
     @staticmethod
     def create_notification(
         user: User,
@@ -64,8 +111,16 @@ class NotificationService:
             priority: Prioridade (low, medium, high, critical)
         
         Returns:
-            Notification: Notificação criada
+            Notification: Notificação criada (ou a agrupada, atualizada)
         """
+        window = NotificationService.get_coalesce_window(notification_type)
+        if window:
+            with transaction.atomic():
+                notification = NotificationService._coalescing_target(user, church, notification_type, window)
+                if notification is not None:
+                    NotificationService._coalesce(notification, message, metadata, priority)
+                    return notification
+        
         return Notification.objects.create(
             user=user,
             church=church,
@@ -77,6 +132,50 @@ class NotificationService:
             priority=priority
         )
     
+    @staticmethod
+    def _coalescing_target(user, church, notification_type, window) -> Optional[Notification]:
+        """Notificação não lida do mesmo tipo aberta dentro da janela (bloqueada para atualização)"""
+        return (
+            Notification._base_manager.select_for_update()
+            .filter(
+                user=user,
+                church=church,
+                notification_type=notification_type,
+                is_read=False,
+                is_active=True,
+                created_at__gte=timezone.now() - timedelta(seconds=window),
+            )
+            .order_by('-created_at')
+            .first()
+        )
+    
+    @staticmethod
+    def _coalesce(notification: Notification, message: str, metadata, priority: str):
+        """Soma um evento à notificação agrupada (contador, itens e prioridade)"""
+        item = {**(metadata or {}), 'message': message}
+        if notification.occurrences == 1:
+            # Primeiro agrupamento: o evento original vira o primeiro item
+            first = {**notification.metadata, 'message': notification.message}
+            notification.metadata = {'coalesced': True, 'items': [first]}
+        
+        items = (notification.metadata.get('items', []) + [item])[-NotificationService.COALESCE_MAX_ITEMS:]
+        notification.occurrences += 1
+        notification.metadata = {**notification.metadata, 'items': items, 'count': notification.occurrences}
+        
+        title = NotificationService.COALESCED_TITLES.get(notification.notification_type, '{count} notificações')
+        notification.title = title.format(count=notification.occurrences)[:200]
+        notification.message = f'Mais recente: {message}'[:500]
+        notification.action_url = NotificationService.COALESCED_URLS.get(
+            notification.notification_type, notification.action_url
+        )
+        order = NotificationService.PRIORITY_ORDER
+        if priority in order and order.index(priority) > order.index(notification.priority):
+            notification.priority = priority
+        
+        notification.save(update_fields=[
+            'occurrences', 'metadata', 'title', 'message', 'action_url', 'priority', 'updated_at'
+        ])
+    
     @staticmethod
     def notify_church_admins(
         church: Church,
@@ -344,6 +443,9 @@ class NotificationService:
         """
         Remove notificações antigas
         
+        Usa a retenção em faixas de PK (ver `retention.py`), que também
+        resume as notificações removidas em `NotificationDigest`.
+        
         Args:
             days_read: Dias para manter notificações lidas (padrão: 30)
             days_unread: Dias para manter notificações não lidas (padrão: 90)
@@ -351,25 +453,15 @@ class NotificationService:
         Returns:
             Dict com contagens de remoções
         """
-        from django.utils import timezone
-        
-        cutoff_read = timezone.now() - timezone.timedelta(days=days_read)
-        cutoff_unread = timezone.now() - timezone.timedelta(days=days_unread)
-        
-        # Deletar notificações lidas antigas
-        deleted_read = Notification.objects.filter(
-            is_read=True,
-            read_at__lt=cutoff_read
-        ).delete()
+        from .retention import NotificationRetention
         
-        # Deletar notificações não lidas muito antigas
-        deleted_unread = Notification.objects.filter(
-            is_read=False,
-            created_at__lt=cutoff_unread
-        ).delete()
+        retention = NotificationRetention(read_days=days_read, unread_days=days_unread, max_per_user=0)
+        stats = retention.run()
+        deleted_read = stats['expired_read']['deleted']
+        deleted_unread = stats['expired_unread']['deleted']
         
         return {
-            'deleted_read': deleted_read[0] if deleted_read else 0,
-            'deleted_unread': deleted_unread[0] if deleted_unread else 0,
-            'total': (deleted_read[0] if deleted_read else 0) + (deleted_unread[0] if deleted_unread else 0)
+            'deleted_read': deleted_read,
+            'deleted_unread': deleted_unread,
+            'total': deleted_read + deleted_unread
         }
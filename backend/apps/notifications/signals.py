@@ -25,37 +25,27 @@ def visitor_created_notification(sender, instance, created, **kwargs):
     from apps.notifications.services import NotificationService
     
     try:
-        # Notificar admins da igreja sobre novo visitante
+        # Notificar admins da igreja sobre novo visitante (uma notificação
+        # por visitante; pedido de oração aumenta a prioridade)
+        message = f'{instance.full_name} visitou {instance.branch.name if instance.branch else "a igreja"}'
+        if instance.wants_prayer:
+            message += ' e pediu oração'
         NotificationService.notify_church_admins(
             church=instance.church,
             notification_type='new_visitor',
-            title='Novo Visitante Cadastrado',
-            message=f'{instance.full_name} visitou {instance.branch.name if instance.branch else "a igreja"}',
-            priority='medium',
+            title='Visitante Solicitou Oração' if instance.wants_prayer else 'Novo Visitante Cadastrado',
+            message=message,
+            priority='high' if instance.wants_prayer else 'medium',
             action_url=f'/visitantes/{instance.id}',  # URL em português
             metadata={
                 'visitor_id': instance.id,
                 'visitor_name': instance.full_name,
                 'branch_id': instance.branch.id if instance.branch else None,
                 'branch_name': instance.branch.name if instance.branch else None,
+                'wants_prayer': bool(instance.wants_prayer),
             }
         )
         
-        # Se visitante quer oração, aumentar prioridade
-        if instance.wants_prayer:
-            NotificationService.notify_church_admins(
-                church=instance.church,
-                notification_type='new_visitor',
-                title='Visitante Solicitou Oração',
-                message=f'{instance.full_name} pediu oração',
-                priority='high',
-                action_url=f'/visitantes/{instance.id}',  # URL em português
-                metadata={
-                    'visitor_id': instance.id,
-                    'wants_prayer': True,
-                }
-            )
-        
         logger.info(f"Notificação criada para novo visitante: {instance.id}")
         
     except Exception as e:
@@ -146,16 +136,16 @@ def member_status_changed_notification(sender, instance, **kwargs):
         return  # Novo membro, não precisa notificar mudança
     
     try:
-        from apps.members.models import Member
-        old_instance = Member.objects.get(pk=instance.pk)
+        # Valor persistido vem do snapshot carregado (apps.core.signals, sem reler a linha)
+        old_status = instance.get_previous_values().get('membership_status')
         
         # Verificar se status mudou
-        if old_instance.membership_status == instance.membership_status:
+        if old_status is None or old_status == instance.membership_status:
             return
         
         # Armazenar informação para post_save
         instance._status_changed = {
-            'old_status': old_instance.membership_status,
+            'old_status': old_status,
             'new_status': instance.membership_status,
         }
         
@@ -0,0 +1,12 @@
+"""
+Tasks Celery das notificações
+"""
+from celery import shared_task
+
+from .retention import NotificationRetention
+
+
+@shared_task(name='notifications.prune_notifications')
+def prune_notifications():
+    """Aplica a retenção das notificações (agendada no beat, ver config/celery.py)"""
+    return NotificationRetention().run()
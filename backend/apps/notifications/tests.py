@@ -0,0 +1,161 @@
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from apps.accounts.models import CustomUser
+from apps.churches.models import Church
+from apps.denominations.models import Denomination
+from apps.notifications.models import Notification, NotificationDigest
+from apps.notifications.retention import NotificationRetention
+from apps.notifications.services import NotificationService
+
+
+class NotificationFixtureMixin:
+    """Usuário e igreja das notificações."""
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            email="retencao@test.com",
+            password="SenhaForte123!",
+            full_name="Usuário Retenção",
+            phone="(11) 99999-4444",
+        )
+        denomination = Denomination.objects.create(
+            name="Retention Denomination",
+            short_name="RD",
+            administrator=self.user,
+            email="retention@test.com",
+            phone="(11) 98888-4444",
+            headquarters_address="Rua 1",
+            headquarters_city="Cidade",
+            headquarters_state="SP",
+            headquarters_zipcode="01010-010",
+        )
+        self.church = Church.objects.create(
+            denomination=denomination,
+            name="Retention Church",
+            short_name="RC",
+            email="retentionchurch@test.com",
+            phone="(11) 97777-4444",
+            address="Rua 2",
+            city="Cidade",
+            state="SP",
+            zipcode="02020-020",
+            subscription_plan="basic",
+        )
+        self.now = timezone.now()
+
+
+class NotificationRetentionTests(NotificationFixtureMixin, TestCase):
+    """Retenção em faixas de PK, resumos diários e limite por usuário."""
+
+    def _notify(self, days_ago, is_read=False, notification_type='new_visitor'):
+        notification = Notification.objects.create(
+            user=self.user,
+            church=self.church,
+            notification_type=notification_type,
+            title='Notificação',
+            message='Mensagem',
+        )
+        created_at = self.now - timedelta(days=days_ago)
+        Notification._base_manager.filter(pk=notification.pk).update(
+            created_at=created_at,
+            is_read=is_read,
+            read_at=created_at if is_read else None,
+        )
+        return notification
+
+    def test_expired_notifications_are_deleted_in_chunks_and_digested(self):
+        for _ in range(3):
+            self._notify(100)
+        self._notify(100, notification_type='new_member')
+        self._notify(40, is_read=True)
+        kept = [self._notify(1), self._notify(40), self._notify(10, is_read=True)]
+
+        stats = NotificationRetention(max_per_user=0, chunk_size=2, now=self.now).run()
+
+        self.assertEqual(stats['expired_unread']['deleted'], 4)
+        self.assertEqual(stats['expired_unread']['chunks'], 2)
+        self.assertEqual(stats['expired_read']['deleted'], 1)
+        self.assertCountEqual(Notification._base_manager.values_list('pk', flat=True), [n.pk for n in kept])
+
+        digests = {digest.day: digest for digest in NotificationDigest.objects.all()}
+        old_day = timezone.localdate(self.now - timedelta(days=100))
+        self.assertEqual(digests[old_day].total, 4)
+        self.assertEqual(digests[old_day].unread, 4)
+        self.assertEqual(digests[old_day].by_type, {'new_visitor': 3, 'new_member': 1})
+
+        # Uma segunda execução soma no mesmo resumo do dia
+        self._notify(100)
+        NotificationRetention(max_per_user=0, now=self.now).run()
+        self.assertEqual(NotificationDigest.objects.get(day=old_day).total, 5)
+
+    def test_cap_keeps_only_latest_per_user(self):
+        notifications = [self._notify(days_ago) for days_ago in range(6)]
+
+        stats = NotificationRetention(max_per_user=2, chunk_size=2, digest=False, now=self.now).run()
+
+        self.assertEqual(stats['over_cap']['deleted'], 4)
+        self.assertCountEqual(
+            Notification._base_manager.values_list('pk', flat=True),
+            [notifications[0].pk, notifications[1].pk],
+        )
+        self.assertFalse(NotificationDigest.objects.exists())
+
+    def test_cleanup_old_notifications_keeps_legacy_result(self):
+        self._notify(100)
+        self._notify(40, is_read=True)
+
+        self.assertEqual(
+            NotificationService.cleanup_old_notifications(),
+            {'deleted_read': 1, 'deleted_unread': 1, 'total': 2},
+        )
+
+
+class NotificationCoalescingTests(NotificationFixtureMixin, TestCase):
+    """Eventos do mesmo tipo na janela atualizam uma única notificação."""
+
+    def _visitor(self, name, priority='medium'):
+        return NotificationService.create_notification(
+            user=self.user,
+            church=self.church,
+            notification_type='new_visitor',
+            title='Novo Visitante Cadastrado',
+            message=f'{name} visitou a igreja',
+            metadata={'visitor_name': name},
+            priority=priority,
+        )
+
+    def test_events_in_window_are_coalesced(self):
+        first = self._visitor('Ana')
+        self._visitor('Bruno', priority='high')
+        last = self._visitor('Carla')
+
+        self.assertEqual(last.pk, first.pk)
+        notification = Notification._base_manager.get()
+        self.assertEqual(notification.occurrences, 3)
+        self.assertEqual(notification.title, '3 novos visitantes')
+        self.assertEqual(notification.message, 'Mais recente: Carla visitou a igreja')
+        self.assertEqual(notification.priority, 'high')
+        self.assertEqual(notification.action_url, '/visitantes')
+        self.assertEqual([item['visitor_name'] for item in notification.metadata['items']], ['Ana', 'Bruno', 'Carla'])
+        self.assertEqual(NotificationService.get_unread_count(self.user, self.church), 1)
+
+    def test_read_notification_or_other_types_start_new_rows(self):
+        self._visitor('Ana').mark_as_read()
+        self._visitor('Bruno')
+        for _ in range(2):
+            NotificationService.create_notification(
+                user=self.user, church=self.church, notification_type='system_alert',
+                title='Alerta', message='Mensagem',
+            )
+
+        self.assertEqual(Notification._base_manager.filter(notification_type='new_visitor').count(), 2)
+        self.assertEqual(Notification._base_manager.filter(notification_type='system_alert').count(), 2)
+
+    @override_settings(NOTIFICATION_COALESCE_WINDOWS={'new_visitor': 0})
+    def test_window_can_be_disabled_per_type(self):
+        self._visitor('Ana')
+        self._visitor('Bruno')
+        self.assertEqual(Notification._base_manager.count(), 2)
@@ -111,6 +111,15 @@ class PrayerRequestSerializer(serializers.ModelSerializer):
             'id', 'uuid', 'created_at', 'updated_at', 'author', 'church',
             'answered_at'
         ]
+        # `?fields=`/`?expand=` (ver SparseFieldsetMixin)
+        field_sources = {
+            'author_name': ('is_anonymous', 'author'),
+            'messages_count': (),
+            'prayers_count': (),
+            'is_praying': (),
+            'can_edit': ('author',),
+        }
+        expandable_fields = ('prayer_messages', 'prayer_responses')
     
     def get_author_name(self, obj):
         """Retorna nome do autor ou 'Anônimo' se for pedido anônimo"""
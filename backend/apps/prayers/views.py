@@ -8,6 +8,8 @@ from rest_framework.permissions import IsAuthenticated, BasePermission
 from rest_framework.parsers import MultiPartParser, JSONParser
 from django_filters.rest_framework import DjangoFilterBackend
 
+from apps.core.mixins import SparseFieldsetMixin
+
 from .models import PrayerRequest, PrayerMessage, PrayerResponse
 from .serializers import (
     PrayerRequestSerializer,
@@ -61,7 +63,7 @@ class PrayerRequestPermission(BasePermission):
         return True
 
 
-class PrayerRequestViewSet(viewsets.ModelViewSet):
+class PrayerRequestViewSet(SparseFieldsetMixin, viewsets.ModelViewSet):
     """ViewSet para pedidos de oração"""
     
     serializer_class = PrayerRequestSerializer
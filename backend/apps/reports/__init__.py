@@ -0,0 +1,4 @@
+"""
+Reports app - Relatórios gerados fora da requisição
+Jobs de relatório por denominação, executados por igreja em um pool de processos
+"""
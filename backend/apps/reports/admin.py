@@ -0,0 +1,22 @@
+"""
+Admin dos relatórios
+"""
+from django.contrib import admin
+
+from .models import ReportJob
+
+
+@admin.register(ReportJob)
+class ReportJobAdmin(admin.ModelAdmin):
+    list_display = [
+        'id', 'report_type', 'output_format', 'denomination', 'requested_by',
+        'status', 'parts_done', 'parts_total', 'row_count', 'created_at', 'expires_at',
+    ]
+    list_filter = ['status', 'report_type', 'output_format', 'created_at']
+    search_fields = ['denomination__name', 'requested_by__email']
+    raw_id_fields = ['denomination', 'requested_by']
+    readonly_fields = [
+        'uuid', 'status', 'parts_total', 'parts_done', 'row_count', 'result_file', 'result_size',
+        'error', 'started_at', 'finished_at', 'expires_at', 'created_at', 'updated_at',
+    ]
+    date_hierarchy = 'created_at'
@@ -0,0 +1,164 @@
+"""
+Relatórios disponíveis.
+
+Cada relatório é dividido por igreja: `build_part(church_id, parameters)`
+devolve as linhas de uma igreja e roda dentro dos processos do pool (por
+isso as funções ficam no nível do módulo e recebem apenas ids e
+parâmetros serializáveis). `totals`, quando definido, recebe todas as
+linhas e devolve as linhas finais (ex.: total geral).
+"""
+
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence
+
+from django.core.exceptions import ValidationError
+from django.db.models import Count, Q
+from django.utils import timezone
+
+
+@dataclass(frozen=True)
+class ReportDefinition:
+    name: str
+    title: str
+    columns: Sequence[str]
+    build_part: Callable[[int, Dict], List[list]]
+    totals: Optional[Callable[[List[list]], List[list]]] = None
+    clean_parameters: Callable[[Dict], Dict] = field(default=lambda parameters: {})
+
+    def partition(self, denomination_id):
+        """Igrejas ativas da denominação, na ordem em que aparecem no arquivo."""
+        from apps.churches.models import Church
+
+        return list(
+            Church._base_manager.filter(denomination_id=denomination_id, is_active=True)
+            .order_by('name', 'pk').values_list('pk', flat=True)
+        )
+
+
+REPORTS: Dict[str, ReportDefinition] = {}
+
+
+def register(definition):
+    REPORTS[definition.name] = definition
+    return definition
+
+
+def get_report(name):
+    try:
+        return REPORTS[name]
+    except KeyError:
+        raise ValidationError(f'Relatório desconhecido: {name}')
+
+
+def run_part(report_type, church_id, parameters, close_connections=True):
+    """
+    Linhas de uma igreja (executado dentro do pool). Nos threads e processos
+    do pool a conexão aberta pela parte é fechada ao final.
+    """
+    from django.db import connections
+
+    try:
+        return get_report(report_type).build_part(church_id, parameters)
+    finally:
+        if close_connections:
+            connections.close_all()
+
+
+def _clean_year(parameters):
+    year = parameters.get('year', timezone.now().year)
+    try:
+        year = int(year)
+    except (TypeError, ValueError):
+        raise ValidationError({'year': 'Ano inválido.'})
+    if not 2000 <= year <= 2100:
+        raise ValidationError({'year': 'Ano fora do intervalo permitido (2000-2100).'})
+    return {'year': year}
+
+
+# =====================================
+# RELATÓRIO ANUAL DA DENOMINAÇÃO
+# =====================================
+
+ANNUAL_COLUMNS = (
+    'Igreja', 'Cidade', 'UF', 'Filiais', 'Membros ativos', 'Novos membros no ano',
+    'Visitantes no ano', 'Visitantes convertidos no ano', 'Atividades no ano',
+)
+
+
+def annual_part(church_id, parameters):
+    from apps.activities.models import Activity
+    from apps.branches.models import Branch
+    from apps.churches.models import Church
+    from apps.members.models import Member
+    from apps.visitors.models import Visitor
+
+    year = parameters['year']
+    church = Church._base_manager.values('name', 'city', 'state').get(pk=church_id)
+    members = Member._base_manager.filter(church_id=church_id, is_active=True).aggregate(
+        total=Count('id'),
+        new=Count('id', filter=Q(membership_date__year=year)),
+    )
+    visitors = Visitor._base_manager.filter(church_id=church_id, is_active=True).aggregate(
+        total=Count('id', filter=Q(created_at__year=year)),
+        converted=Count('id', filter=Q(converted_to_member=True, conversion_date__year=year)),
+    )
+    branches = Branch._base_manager.filter(church_id=church_id, is_active=True).count()
+    activities = Activity._base_manager.filter(
+        church_id=church_id, is_active=True, start_datetime__year=year
+    ).count()
+    return [[
+        church['name'], church['city'], church['state'], branches, members['total'], members['new'],
+        visitors['total'], visitors['converted'], activities,
+    ]]
+
+
+def annual_totals(rows):
+    totals = ['Total', '', ''] + [sum(row[index] for row in rows) for index in range(3, len(ANNUAL_COLUMNS))]
+    return rows + [totals]
+
+
+register(ReportDefinition(
+    name='denomination_annual',
+    title='Relatório anual da denominação',
+    columns=ANNUAL_COLUMNS,
+    build_part=annual_part,
+    totals=annual_totals,
+    clean_parameters=_clean_year,
+))
+
+
+# =====================================
+# MEMBROS DA DENOMINAÇÃO
+# =====================================
+
+MEMBERS_COLUMNS = (
+    'Igreja', 'Filial', 'Nome', 'Situação', 'Função ministerial', 'Data de membresia',
+    'Telefone', 'Email', 'Cidade', 'UF',
+)
+
+
+def members_part(church_id, parameters):
+    from apps.members.models import Member
+
+    statuses = dict(Member._meta.get_field('membership_status').choices)
+    functions = dict(Member._meta.get_field('ministerial_function').choices)
+    rows = (
+        Member._base_manager.filter(church_id=church_id, is_active=True)
+        .order_by('full_name', 'pk')
+        .values_list(
+            'church__name', 'branch__name', 'full_name', 'membership_status', 'ministerial_function',
+            'membership_date', 'phone', 'email', 'city', 'state',
+        )
+    )
+    return [
+        [church, branch, name, statuses.get(status, status), functions.get(function, function), *rest]
+        for church, branch, name, status, function, *rest in rows.iterator(chunk_size=2000)
+    ]
+
+
+register(ReportDefinition(
+    name='denomination_members',
+    title='Membros da denominação',
+    columns=MEMBERS_COLUMNS,
+    build_part=members_part,
+))
@@ -0,0 +1,185 @@
+"""
+Execução dos jobs de relatório.
+
+Relatórios de denominação (ex.: fechamento anual de uma denominação com
+centenas de igrejas) não cabem no tempo de uma requisição. Aqui:
+
+- o job é retirado da fila (`ReportJob.objects.claim`, com SKIP LOCKED);
+- o trabalho é dividido por igreja e cada parte roda em um pool de
+  processos (`REPORTS_EXECUTOR`: `process`, `thread` ou `inline`, este
+  último sem paralelismo, para testes e depuração);
+- `parts_done` avança a cada igreja concluída (progresso consultável pela
+  API enquanto o job roda);
+- as linhas são gravadas na ordem das igrejas em CSV ou XLSX, salvas no
+  storage padrão (`reports/AAAA/MM/`) com validade de
+  `REPORTS_RESULT_TTL_HOURS`; `purge_expired` remove os arquivos vencidos.
+
+Os processos do pool são iniciados com `spawn` (cada um com o Django e a
+sua própria conexão ao banco); o que roda neles fica em `definitions.py`,
+que não importa models no carregamento do módulo. Em workers Celery com pool `prefork` os
+processos são daemon e não podem ter filhos: use uma fila dedicada
+(`reports`) atendida por um worker `--pool=solo` ou o comando
+`run_report_jobs`.
+
+Uso:
+    ReportEngine().run(job_id)
+    ReportEngine(executor='inline').run_next()
+"""
+
+import logging
+import multiprocessing
+import tempfile
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from datetime import timedelta
+
+import django
+from django.conf import settings
+from django.core.files import File
+from django.db.models import F
+from django.utils import timezone
+
+from .definitions import get_report, run_part
+from .models import ReportJob, ReportStatusChoices
+from .writers import WRITERS
+
+logger = logging.getLogger(__name__)
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+# =====================================
+# EXECUTORES
+# =====================================
+
+class InlineExecutor(Executor):
+    """Executor que roda cada parte na hora, no próprio processo (testes)."""
+
+    def submit(self, fn, /, *args, **kwargs):
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as exc:
+            future.set_exception(exc)
+        return future
+
+
+def get_executor(kind=None, max_workers=None):
+    kind = kind or _setting('REPORTS_EXECUTOR', 'process')
+    max_workers = max_workers or _setting('REPORTS_MAX_WORKERS', 4)
+    if kind == 'inline':
+        return InlineExecutor()
+    if kind == 'thread':
+        return ThreadPoolExecutor(max_workers=max_workers)
+    return ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=django.setup,
+    )
+
+
+# =====================================
+# ENGINE
+# =====================================
+
+class ReportEngine:
+
+    def __init__(self, executor=None, max_workers=None):
+        self.executor_kind = executor
+        self.max_workers = max_workers
+
+    def run_next(self):
+        """Executa o job mais antigo da fila; retorna o job ou None."""
+        job = ReportJob.objects.claim()
+        if job is not None:
+            self.execute(job)
+        return job
+
+    def run(self, job_id):
+        """Executa o job informado, se ainda estiver na fila."""
+        job = ReportJob.objects.claim(pk=job_id)
+        if job is None:
+            logger.info(f"[RELATÓRIOS] Job {job_id} não está na fila; ignorado")
+            return None
+        self.execute(job)
+        return job
+
+    def execute(self, job):
+        started = time.monotonic()
+        try:
+            definition = get_report(job.report_type)
+            church_ids = definition.partition(job.denomination_id)
+            job.parts_total = len(church_ids)
+            job.save(update_fields=['parts_total', 'updated_at'])
+
+            rows = self._build(job, definition, church_ids)
+            if definition.totals:
+                rows = definition.totals(rows)
+            self._store(job, definition, rows)
+        except Exception as exc:
+            logger.exception(f"[RELATÓRIOS] Job {job.pk} ({job.report_type}) falhou")
+            job.status = ReportStatusChoices.FAILED
+            job.error = str(exc)[:2000]
+            job.finished_at = timezone.now()
+            job.save(update_fields=['status', 'error', 'finished_at', 'updated_at'])
+            return job
+
+        logger.info(
+            f"[RELATÓRIOS] Job {job.pk} ({job.report_type}): {job.row_count} linha(s) de "
+            f"{job.parts_total} igreja(s) em {time.monotonic() - started:.1f}s"
+        )
+        return job
+
+    def _build(self, job, definition, church_ids):
+        if not church_ids:
+            return []
+        workers = min(self.max_workers or _setting('REPORTS_MAX_WORKERS', 4), len(church_ids))
+        results = {}
+        executor = get_executor(self.executor_kind, workers)
+        try:
+            isolated = not isinstance(executor, InlineExecutor)
+            futures = {
+                executor.submit(run_part, job.report_type, church_id, job.parameters, isolated): index
+                for index, church_id in enumerate(church_ids)
+            }
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+                ReportJob.objects.filter(pk=job.pk).update(
+                    parts_done=F('parts_done') + 1, updated_at=timezone.now()
+                )
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+        job.parts_done = len(church_ids)
+        return [row for index in range(len(church_ids)) for row in results[index]]
+
+    def _store(self, job, definition, rows):
+        writer = WRITERS[job.output_format]
+        with tempfile.TemporaryFile() as handle:
+            job.row_count = writer(handle, definition.columns, rows, title=definition.title)
+            job.result_size = handle.tell()
+            handle.seek(0)
+            filename = f'{job.report_type}-{job.uuid}.{job.output_format}'
+            job.result_file.save(filename, File(handle), save=False)
+
+        now = timezone.now()
+        job.status = ReportStatusChoices.DONE
+        job.finished_at = now
+        job.expires_at = now + timedelta(hours=_setting('REPORTS_RESULT_TTL_HOURS', 72))
+        job.save(update_fields=[
+            'status', 'parts_done', 'row_count', 'result_file', 'result_size',
+            'finished_at', 'expires_at', 'updated_at',
+        ])
+
+
+def purge_expired(now=None):
+    """Remove os arquivos vencidos e marca os jobs como expirados; retorna quantos."""
+    purged = 0
+    for job in ReportJob.objects.expired(now).iterator():
+        if job.result_file:
+            job.result_file.delete(save=False)
+        job.status = ReportStatusChoices.EXPIRED
+        job.save(update_fields=['status', 'result_file', 'updated_at'])
+        purged += 1
+    return purged
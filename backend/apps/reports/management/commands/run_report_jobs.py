@@ -0,0 +1,53 @@
+"""
+Comando Django que atende a fila de relatórios no banco.
+
+Alternativa ao worker Celery (ou complemento, para jobs cuja publicação
+falhou): retira os jobs `queued` por ordem de chegada e os executa com o
+pool de processos (ver `apps/reports/engine.py`).
+
+Uso: python manage.py run_report_jobs                 # executa os jobs na fila e sai
+     python manage.py run_report_jobs --loop          # continua aguardando novos jobs
+     python manage.py run_report_jobs --workers 8
+     python manage.py run_report_jobs --purge-expired # também remove arquivos vencidos
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.reports.engine import ReportEngine, purge_expired
+
+
+class Command(BaseCommand):
+    help = 'Executa os jobs de relatório na fila do banco'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='Continuar aguardando novos jobs')
+        parser.add_argument('--interval', type=float, default=5.0, help='Segundos entre verificações com --loop')
+        parser.add_argument('--workers', type=int, help='Processos do pool (padrão: REPORTS_MAX_WORKERS)')
+        parser.add_argument(
+            '--executor', choices=['process', 'thread', 'inline'], help='Executor das partes (padrão: REPORTS_EXECUTOR)'
+        )
+        parser.add_argument('--purge-expired', action='store_true', help='Remover os arquivos vencidos')
+
+    def handle(self, *args, **options):
+        if options['purge_expired']:
+            self.stdout.write(f'🗑️ {purge_expired()} relatório(s) expirado(s) removido(s)')
+
+        engine = ReportEngine(executor=options['executor'], max_workers=options['workers'])
+        processed = 0
+        while True:
+            job = engine.run_next()
+            if job is not None:
+                processed += 1
+                style = self.style.SUCCESS if job.status == 'done' else self.style.ERROR
+                self.stdout.write(style(
+                    f'  {job.pk} {job.report_type}: {job.get_status_display()} '
+                    f'({job.row_count} linha(s), {job.parts_total} igreja(s))'
+                ))
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+        self.stdout.write(self.style.SUCCESS(f'✓ {processed} job(s) processado(s)'))
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.3 on 2026-10-19 04:17
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('denominations', '0004_backfill_denomination_stats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='Data e hora de criação do registro', verbose_name='Criado em')),
+                ('updated_at', models.DateTimeField(auto_now=True, help_text='Data e hora da última atualização', verbose_name='Atualizado em')),
+                ('uuid', models.UUIDField(default=uuid.uuid4, editable=False, help_text='Identificador único universal', unique=True, verbose_name='UUID')),
+                ('is_active', models.BooleanField(default=True, help_text='Indica se o registro está ativo no sistema', verbose_name='Ativo')),
+                ('report_type', models.CharField(help_text='Nome do relatório em apps.reports.definitions.REPORTS', max_length=50, verbose_name='Tipo de relatório')),
+                ('output_format', models.CharField(choices=[('csv', 'CSV'), ('xlsx', 'Excel (XLSX)')], default='csv', max_length=10, verbose_name='Formato')),
+                ('parameters', models.JSONField(blank=True, default=dict, help_text='Parâmetros do relatório (ex.: ano)', verbose_name='Parâmetros')),
+                ('status', models.CharField(choices=[('queued', 'Na fila'), ('running', 'Em execução'), ('done', 'Concluído'), ('failed', 'Falhou'), ('expired', 'Expirado')], default='queued', max_length=10, verbose_name='Situação')),
+                ('parts_total', models.PositiveIntegerField(default=0, verbose_name='Partes')),
+                ('parts_done', models.PositiveIntegerField(default=0, verbose_name='Partes concluídas')),
+                ('row_count', models.PositiveIntegerField(default=0, verbose_name='Linhas')),
+                ('result_file', models.FileField(blank=True, upload_to='reports/%Y/%m/', verbose_name='Arquivo')),
+                ('result_size', models.PositiveBigIntegerField(default=0, verbose_name='Tamanho (bytes)')),
+                ('error', models.TextField(blank=True, verbose_name='Erro')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='Iniciado em')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Concluído em')),
+                ('expires_at', models.DateTimeField(blank=True, help_text='Após esta data o arquivo é removido', null=True, verbose_name='Expira em')),
+                ('denomination', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='report_jobs', to='denominations.denomination', verbose_name='Denominação')),
+                ('requested_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='report_jobs', to=settings.AUTH_USER_MODEL, verbose_name='Solicitado por')),
+            ],
+            options={
+                'verbose_name': 'Job de Relatório',
+                'verbose_name_plural': 'Jobs de Relatórios',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'created_at'], name='reports_rep_status_051565_idx'), models.Index(fields=['requested_by', '-created_at'], name='reports_rep_request_94cc01_idx'), models.Index(fields=['status', 'expires_at'], name='reports_rep_status_7c3798_idx')],
+            },
+        ),
+    ]
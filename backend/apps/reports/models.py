@@ -0,0 +1,167 @@
+"""
+Models do app de relatórios
+
+Um `ReportJob` é um pedido de relatório: fica na fila (`queued`), é
+executado por um worker (`running`, ver `engine.py`) e termina com o
+arquivo gerado (`done`) ou com o erro (`failed`). O arquivo expira após
+`REPORTS_RESULT_TTL_HOURS` e é removido pela limpeza (`expired`).
+"""
+
+from django.conf import settings
+from django.db import models, transaction
+from django.utils import timezone
+
+from apps.core.models import BaseModel
+from apps.denominations.models import Denomination
+
+
+class ReportStatusChoices(models.TextChoices):
+    """Situação do job de relatório"""
+    QUEUED = 'queued', 'Na fila'
+    RUNNING = 'running', 'Em execução'
+    DONE = 'done', 'Concluído'
+    FAILED = 'failed', 'Falhou'
+    EXPIRED = 'expired', 'Expirado'
+
+
+class ReportFormatChoices(models.TextChoices):
+    """Formato do arquivo gerado"""
+    CSV = 'csv', 'CSV'
+    XLSX = 'xlsx', 'Excel (XLSX)'
+
+
+class ReportJobQuerySet(models.QuerySet):
+
+    def claim(self, pk=None):
+        """
+        Retira um job da fila (o informado ou o mais antigo) e o marca como
+        em execução. Com `SKIP LOCKED`, workers concorrentes nunca pegam o
+        mesmo job. Retorna None se não houver job disponível.
+        """
+        with transaction.atomic(using=self.db):
+            queryset = self.select_for_update(skip_locked=True).filter(
+                status=ReportStatusChoices.QUEUED, is_active=True
+            )
+            if pk is not None:
+                queryset = queryset.filter(pk=pk)
+            job = queryset.order_by('created_at', 'pk').first()
+            if job is None:
+                return None
+            job.status = ReportStatusChoices.RUNNING
+            job.started_at = timezone.now()
+            job.save(update_fields=['status', 'started_at', 'updated_at'])
+        return job
+
+    def expired(self, now=None):
+        """Jobs concluídos cujo arquivo já passou da validade"""
+        return self.filter(status=ReportStatusChoices.DONE, expires_at__lte=now or timezone.now())
+
+
+class ReportJob(BaseModel):
+    """
+    Pedido de relatório de uma denominação
+
+    O trabalho é dividido por igreja (`parts_total`); `parts_done` avança
+    conforme cada igreja é processada pelo pool de processos.
+    """
+
+    report_type = models.CharField(
+        'Tipo de relatório',
+        max_length=50,
+        help_text='Nome do relatório em apps.reports.definitions.REPORTS'
+    )
+
+    output_format = models.CharField(
+        'Formato',
+        max_length=10,
+        choices=ReportFormatChoices.choices,
+        default=ReportFormatChoices.CSV
+    )
+
+    parameters = models.JSONField(
+        'Parâmetros',
+        default=dict,
+        blank=True,
+        help_text='Parâmetros do relatório (ex.: ano)'
+    )
+
+    denomination = models.ForeignKey(
+        Denomination,
+        on_delete=models.CASCADE,
+        related_name='report_jobs',
+        verbose_name='Denominação'
+    )
+
+    requested_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='report_jobs',
+        verbose_name='Solicitado por'
+    )
+
+    status = models.CharField(
+        'Situação',
+        max_length=10,
+        choices=ReportStatusChoices.choices,
+        default=ReportStatusChoices.QUEUED
+    )
+
+    parts_total = models.PositiveIntegerField('Partes', default=0)
+
+    parts_done = models.PositiveIntegerField('Partes concluídas', default=0)
+
+    row_count = models.PositiveIntegerField('Linhas', default=0)
+
+    result_file = models.FileField(
+        'Arquivo',
+        upload_to='reports/%Y/%m/',
+        blank=True
+    )
+
+    result_size = models.PositiveBigIntegerField('Tamanho (bytes)', default=0)
+
+    error = models.TextField('Erro', blank=True)
+
+    started_at = models.DateTimeField('Iniciado em', null=True, blank=True)
+
+    finished_at = models.DateTimeField('Concluído em', null=True, blank=True)
+
+    expires_at = models.DateTimeField(
+        'Expira em',
+        null=True,
+        blank=True,
+        help_text='Após esta data o arquivo é removido'
+    )
+
+    objects = ReportJobQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = 'Job de Relatório'
+        verbose_name_plural = 'Jobs de Relatórios'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+            models.Index(fields=['requested_by', '-created_at']),
+            models.Index(fields=['status', 'expires_at']),
+        ]
+
+    def __str__(self):
+        return f'{self.report_type} ({self.get_output_format_display()}) - {self.get_status_display()}'
+
+    @property
+    def progress(self):
+        """Percentual concluído (0-100)"""
+        if self.status == ReportStatusChoices.DONE:
+            return 100
+        if not self.parts_total:
+            return 0
+        return min(99, int(self.parts_done * 100 / self.parts_total))
+
+    @property
+    def is_downloadable(self):
+        return (
+            self.status == ReportStatusChoices.DONE
+            and bool(self.result_file)
+            and (self.expires_at is None or self.expires_at > timezone.now())
+        )
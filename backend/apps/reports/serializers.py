@@ -0,0 +1,72 @@
+"""
+Serializers dos relatórios
+"""
+from django.core.exceptions import ValidationError as DjangoValidationError
+from rest_framework import serializers
+from rest_framework.reverse import reverse
+
+from apps.denominations.models import Denomination
+
+from .definitions import REPORTS
+from .models import ReportFormatChoices, ReportJob
+
+
+class ReportJobSerializer(serializers.ModelSerializer):
+    """Job de relatório com situação, progresso e link de download"""
+
+    status_display = serializers.CharField(source='get_status_display', read_only=True)
+    report_title = serializers.SerializerMethodField()
+    progress = serializers.ReadOnlyField()
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ReportJob
+        fields = [
+            'id',
+            'report_type',
+            'report_title',
+            'output_format',
+            'parameters',
+            'denomination',
+            'status',
+            'status_display',
+            'progress',
+            'parts_total',
+            'parts_done',
+            'row_count',
+            'result_size',
+            'error',
+            'created_at',
+            'started_at',
+            'finished_at',
+            'expires_at',
+            'download_url',
+        ]
+        read_only_fields = fields
+
+    def get_report_title(self, obj):
+        definition = REPORTS.get(obj.report_type)
+        return definition.title if definition else obj.report_type
+
+    def get_download_url(self, obj):
+        if not obj.is_downloadable:
+            return None
+        return reverse('report-job-download', args=[obj.pk], request=self.context.get('request'))
+
+
+class ReportJobCreateSerializer(serializers.Serializer):
+    """Pedido de relatório"""
+
+    report_type = serializers.ChoiceField(choices=[(name, d.title) for name, d in REPORTS.items()])
+    output_format = serializers.ChoiceField(
+        choices=ReportFormatChoices.choices, default=ReportFormatChoices.CSV
+    )
+    denomination = serializers.PrimaryKeyRelatedField(queryset=Denomination.objects.filter(is_active=True))
+    parameters = serializers.DictField(required=False, default=dict)
+
+    def validate(self, attrs):
+        try:
+            attrs['parameters'] = REPORTS[attrs['report_type']].clean_parameters(attrs['parameters'])
+        except DjangoValidationError as exc:
+            raise serializers.ValidationError({'parameters': exc.messages})
+        return attrs
@@ -0,0 +1,73 @@
+"""
+Pedido de relatórios: cria o `ReportJob` e o envia para execução.
+
+`REPORTS_DISPATCH` define o que acontece após o commit:
+- `celery`: publica a task `reports.run_report_job` na fila `reports`;
+- `inline`: executa o job no próprio processo (desenvolvimento/testes);
+- `none`: o job fica na fila do banco para o comando `run_report_jobs`.
+
+Se a publicação no Celery falhar, o job continua na fila do banco e é
+atendido pelo `run_report_jobs`.
+"""
+
+import logging
+
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.db import transaction
+
+from apps.core.models import RoleChoices
+
+from .definitions import get_report
+from .models import ReportJob
+
+logger = logging.getLogger(__name__)
+
+
+def can_request_reports(user, denomination):
+    """
+    Administrador da plataforma ou CHURCH_ADMIN na denominação, como no
+    dashboard da denominação: os relatórios consolidam todas as igrejas, e
+    `can_view_reports` de um vínculo vale só para a própria igreja.
+    """
+    if user.is_superuser:
+        return True
+    return user.church_users.filter(
+        church__denomination=denomination,
+        role=RoleChoices.CHURCH_ADMIN,
+        is_active=True,
+    ).exists()
+
+
+def dispatch(job_id):
+    mode = getattr(settings, 'REPORTS_DISPATCH', 'celery')
+    if mode == 'inline':
+        from .engine import ReportEngine
+
+        ReportEngine().run(job_id)
+    elif mode == 'celery':
+        try:
+            from config.celery import app
+
+            app.send_task('reports.run_report_job', args=[job_id], queue='reports')
+        except Exception:
+            logger.exception(f"[RELATÓRIOS] Falha ao publicar o job {job_id}; fica para o run_report_jobs")
+
+
+class ReportService:
+
+    @staticmethod
+    def request(user, denomination, report_type, output_format, parameters=None):
+        """Cria o job (na fila) e o despacha após o commit."""
+        if not can_request_reports(user, denomination):
+            raise PermissionDenied('Sem permissão para gerar relatórios desta denominação')
+        definition = get_report(report_type)
+        job = ReportJob.objects.create(
+            report_type=report_type,
+            output_format=output_format,
+            parameters=definition.clean_parameters(parameters or {}),
+            denomination=denomination,
+            requested_by=user,
+        )
+        transaction.on_commit(lambda: dispatch(job.pk))
+        return job
@@ -0,0 +1,19 @@
+"""
+Tasks Celery dos relatórios
+"""
+from celery import shared_task
+
+from .engine import ReportEngine, purge_expired
+
+
+@shared_task(name='reports.run_report_job')
+def run_report_job(job_id):
+    """Executa um job de relatório (publicado na fila `reports`)"""
+    job = ReportEngine().run(job_id)
+    return job.status if job else None
+
+
+@shared_task(name='reports.purge_expired_reports')
+def purge_expired_reports():
+    """Remove os arquivos de relatório vencidos (agendada no beat, ver config/celery.py)"""
+    return purge_expired()
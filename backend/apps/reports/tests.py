@@ -0,0 +1,211 @@
+import csv
+import io
+import zipfile
+from datetime import date, timedelta
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from apps.accounts.models import ChurchUser, CustomUser
+from apps.churches.models import Church
+from apps.core.models import RoleChoices
+from apps.denominations.models import Denomination
+from apps.members.models import Member
+from apps.reports.engine import ReportEngine, purge_expired
+from apps.reports.models import ReportJob, ReportStatusChoices
+from apps.visitors.models import Visitor
+
+MEDIA_ROOT = '/tmp/obreiro-test-media'
+
+
+class ReportFixtureMixin:
+    """Denominação com duas igrejas, membros e visitantes."""
+
+    def setUp(self):
+        self.admin = CustomUser.objects.create_user(
+            email='relatorios@test.com',
+            password='SenhaForte123!',
+            full_name='Admin Relatórios',
+            phone='(11) 99999-5555',
+        )
+        self.denomination = Denomination.objects.create(
+            name='Report Denomination',
+            short_name='RPD',
+            administrator=self.admin,
+            email='reports@test.com',
+            phone='(11) 98888-5555',
+            headquarters_address='Rua 1',
+            headquarters_city='Cidade',
+            headquarters_state='SP',
+            headquarters_zipcode='01010-010',
+        )
+        self.churches = [self._church('Igreja Beta', 'beta'), self._church('Igreja Alfa', 'alfa')]
+        ChurchUser.objects.create(user=self.admin, church=self.churches[0], role=RoleChoices.CHURCH_ADMIN)
+
+        year = timezone.now().year
+        for index, (church, membership_date) in enumerate([
+            (self.churches[0], date(year, 2, 1)),
+            (self.churches[0], date(2010, 5, 1)),
+            (self.churches[1], date(year, 3, 1)),
+        ]):
+            Member.objects.create(
+                church=church,
+                branch=church.branches.first(),
+                full_name=f'Membro {index}',
+                birth_date=date(1990, 1, 1),
+                phone='(11) 91111-2222',
+                membership_date=membership_date,
+            )
+        Visitor.objects.create(church=self.churches[1], branch=self.churches[1].branches.first(), full_name='Visitante')
+
+    def _church(self, name, slug):
+        return Church.objects.create(
+            denomination=self.denomination,
+            name=name,
+            short_name=slug,
+            email=f'{slug}@test.com',
+            phone='(11) 97777-5555',
+            address='Rua 2',
+            city='Cidade',
+            state='SP',
+            zipcode='02020-020',
+            subscription_plan='basic',
+        )
+
+    def _job(self, report_type='denomination_annual', output_format='csv', **parameters):
+        return ReportJob.objects.create(
+            report_type=report_type,
+            output_format=output_format,
+            parameters={'year': timezone.now().year, **parameters},
+            denomination=self.denomination,
+            requested_by=self.admin,
+        )
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, REPORTS_EXECUTOR='inline', REPORTS_DISPATCH='none')
+class ReportEngineTests(ReportFixtureMixin, TestCase):
+    """Execução por igreja, arquivo com validade e progresso."""
+
+    def _csv_rows(self, job):
+        with job.result_file.open('rb') as handle:
+            return list(csv.reader(io.StringIO(handle.read().decode('utf-8-sig')), delimiter=';'))
+
+    def test_annual_report_is_partitioned_per_church_in_name_order(self):
+        job = ReportEngine().run(self._job().pk)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, ReportStatusChoices.DONE)
+        self.assertEqual((job.parts_total, job.parts_done, job.progress), (2, 2, 100))
+        self.assertGreater(job.expires_at, timezone.now() + timedelta(hours=71))
+        rows = self._csv_rows(job)
+        self.assertEqual(rows[0][0], 'Igreja')
+        self.assertEqual([row[0] for row in rows[1:]], ['Igreja Alfa', 'Igreja Beta', 'Total'])
+        # Membros ativos, novos no ano e visitantes no ano
+        self.assertEqual(rows[1][4:7], ['1', '1', '1'])
+        self.assertEqual(rows[2][4:7], ['2', '1', '0'])
+        self.assertEqual(rows[3][4:7], ['3', '2', '1'])
+        self.assertEqual(job.row_count, 3)
+
+    def test_members_report_as_xlsx(self):
+        job = ReportEngine().run(self._job('denomination_members', 'xlsx').pk)
+
+        self.assertEqual(job.status, ReportStatusChoices.DONE)
+        self.assertEqual(job.row_count, 3)
+        with job.result_file.open('rb') as handle, zipfile.ZipFile(handle) as archive:
+            sheet = archive.read('xl/worksheets/sheet1.xml').decode()
+        self.assertIn('Membro 2', sheet)
+        self.assertLess(sheet.index('Igreja Alfa'), sheet.index('Igreja Beta'))
+
+    def test_failure_is_recorded_and_jobs_run_once(self):
+        job = self._job('nao_existe')
+
+        ReportEngine().run_next()
+        job.refresh_from_db()
+        self.assertEqual(job.status, ReportStatusChoices.FAILED)
+        self.assertIn('nao_existe', job.error)
+        self.assertIsNone(ReportEngine().run(job.pk))
+
+    def test_purge_expired_removes_files(self):
+        job = ReportEngine().run(self._job().pk)
+        storage, name = job.result_file.storage, job.result_file.name
+
+        self.assertEqual(purge_expired(now=timezone.now() + timedelta(days=4)), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, ReportStatusChoices.EXPIRED)
+        self.assertFalse(storage.exists(name))
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, REPORTS_EXECUTOR='inline', REPORTS_DISPATCH='inline')
+class ReportJobAPITests(ReportFixtureMixin, TestCase):
+    """Pedido, acompanhamento e download pela API."""
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_request_track_and_download(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('report-job-list'), {
+                'report_type': 'denomination_annual',
+                'output_format': 'csv',
+                'denomination': self.denomination.pk,
+                'parameters': {'year': timezone.now().year},
+            }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['status'], ReportStatusChoices.QUEUED)
+
+        detail = self.client.get(reverse('report-job-detail', args=[response.data['id']]))
+        self.assertEqual(detail.data['status'], ReportStatusChoices.DONE)
+        self.assertEqual(detail.data['progress'], 100)
+
+        download = self.client.get(detail.data['download_url'])
+        self.assertEqual(download.status_code, status.HTTP_200_OK)
+        self.assertEqual(download['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertIn('Igreja Alfa', b''.join(download.streaming_content).decode('utf-8-sig'))
+
+        purge_expired(now=timezone.now() + timedelta(days=4))
+        gone = self.client.get(reverse('report-job-download', args=[response.data['id']]))
+        self.assertEqual(gone.status_code, status.HTTP_410_GONE)
+
+    def test_validation_and_permissions(self):
+        invalid = self.client.post(reverse('report-job-list'), {
+            'report_type': 'denomination_annual',
+            'denomination': self.denomination.pk,
+            'parameters': {'year': 'abc'},
+        }, format='json')
+        self.assertEqual(invalid.status_code, status.HTTP_400_BAD_REQUEST)
+
+        outsider = CustomUser.objects.create_user(
+            email='fora@test.com', password='SenhaForte123!', full_name='Fora', phone='(11) 99999-6666',
+        )
+        self.client.force_authenticate(outsider)
+        forbidden = self.client.post(reverse('report-job-list'), {
+            'report_type': 'denomination_annual',
+            'denomination': self.denomination.pk,
+        }, format='json')
+        self.assertEqual(forbidden.status_code, status.HTTP_403_FORBIDDEN)
+
+        # Secretária de uma igreja não pede relatórios da denominação inteira
+        secretary = CustomUser.objects.create_user(
+            email='secretaria@test.com', password='SenhaForte123!', full_name='Secretária', phone='(11) 99999-7777',
+        )
+        ChurchUser.objects.create(
+            user=secretary, church=self.churches[1], role=RoleChoices.SECRETARY, can_view_reports=True,
+        )
+        self.client.force_authenticate(secretary)
+        forbidden = self.client.post(reverse('report-job-list'), {
+            'report_type': 'denomination_annual',
+            'denomination': self.denomination.pk,
+        }, format='json')
+        self.assertEqual(forbidden.status_code, status.HTTP_403_FORBIDDEN)
+        self.client.force_authenticate(outsider)
+
+        pending = self._job()
+        self.assertEqual(self.client.get(reverse('report-job-detail', args=[pending.pk])).status_code, 404)
+        self.client.force_authenticate(self.admin)
+        not_ready = self.client.get(reverse('report-job-download', args=[pending.pk]))
+        self.assertEqual(not_ready.status_code, status.HTTP_409_CONFLICT)
@@ -0,0 +1,74 @@
+"""
+Views dos relatórios
+
+Endpoints:
+- GET /reports/ - Jobs do usuário
+- POST /reports/ - Pedir relatório (fica na fila; responde 202)
+- GET /reports/{id}/ - Situação e progresso
+- GET /reports/{id}/download/ - Arquivo gerado (410 após expirar)
+"""
+import os
+
+from django.core.exceptions import PermissionDenied as DjangoPermissionDenied
+from django.http import FileResponse
+from rest_framework import mixins, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import PermissionDenied
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from .models import ReportJob, ReportStatusChoices
+from .serializers import ReportJobCreateSerializer, ReportJobSerializer
+from .services import ReportService
+from .writers import CONTENT_TYPES
+
+
+class ReportJobViewSet(mixins.CreateModelMixin,
+                       mixins.ListModelMixin,
+                       mixins.RetrieveModelMixin,
+                       viewsets.GenericViewSet):
+    """Jobs de relatório do usuário logado"""
+
+    permission_classes = [IsAuthenticated]
+    serializer_class = ReportJobSerializer
+
+    def get_queryset(self):
+        queryset = ReportJob.objects.filter(is_active=True).select_related('denomination')
+        if self.request.user.is_superuser:
+            return queryset
+        return queryset.filter(requested_by=self.request.user)
+
+    def get_serializer_class(self):
+        if self.action == 'create':
+            return ReportJobCreateSerializer
+        return ReportJobSerializer
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            job = ReportService.request(request.user, **serializer.validated_data)
+        except DjangoPermissionDenied as exc:
+            raise PermissionDenied(str(exc))
+        data = ReportJobSerializer(job, context=self.get_serializer_context()).data
+        return Response(data, status=status.HTTP_202_ACCEPTED)
+
+    @action(detail=True, methods=['get'])
+    def download(self, request, pk=None):
+        job = self.get_object()
+        if not job.is_downloadable:
+            if job.status in (ReportStatusChoices.DONE, ReportStatusChoices.EXPIRED):
+                return Response(
+                    {'error': 'O arquivo deste relatório expirou. Gere novamente.'},
+                    status=status.HTTP_410_GONE,
+                )
+            return Response(
+                {'error': 'Relatório ainda não está pronto.', 'status': job.status, 'progress': job.progress},
+                status=status.HTTP_409_CONFLICT,
+            )
+        return FileResponse(
+            job.result_file.open('rb'),
+            as_attachment=True,
+            filename=os.path.basename(job.result_file.name),
+            content_type=CONTENT_TYPES[job.output_format],
+        )
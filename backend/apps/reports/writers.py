@@ -0,0 +1,138 @@
+"""
+Gravação dos relatórios em arquivo.
+
+- CSV no mesmo padrão das exportações existentes (`;`, aspas em todos os
+  campos, UTF-8 com BOM para abrir direto no Excel);
+- XLSX mínimo (uma planilha, células inline) gerado com `zipfile`, sem
+  dependências externas.
+"""
+
+import csv
+import zipfile
+from datetime import date, datetime
+from decimal import Decimal
+from xml.sax.saxutils import escape
+
+CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+
+def _text(value):
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        return value.strftime('%d/%m/%Y %H:%M')
+    if isinstance(value, date):
+        return value.strftime('%d/%m/%Y')
+    return str(value)
+
+
+def write_csv(handle, columns, rows, title=None):
+    """Grava em `handle` (binário) e retorna a quantidade de linhas."""
+    handle.write('\ufeff'.encode('utf-8'))
+    text = _Utf8Writer(handle)
+    writer = csv.writer(text, delimiter=';', quoting=csv.QUOTE_ALL)
+    writer.writerow(columns)
+    count = 0
+    for row in rows:
+        writer.writerow([_text(value) for value in row])
+        count += 1
+    return count
+
+
+class _Utf8Writer:
+    def __init__(self, handle):
+        self.handle = handle
+
+    def write(self, value):
+        self.handle.write(value.encode('utf-8'))
+
+
+# =====================================
+# XLSX
+# =====================================
+
+_CONTENT_TYPES_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '</Types>'
+)
+_ROOT_RELS_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+_WORKBOOK_RELS_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '</Relationships>'
+)
+_WORKBOOK_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="{title}" sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+
+
+def _column_letter(index):
+    letters = ''
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def _cell(ref, value):
+    if isinstance(value, bool) or value is None or not isinstance(value, (int, float, Decimal)):
+        return f'<c r="{ref}" t="inlineStr"><is><t xml:space="preserve">{escape(_text(value))}</t></is></c>'
+    return f'<c r="{ref}"><v>{value}</v></c>'
+
+
+def _row_xml(number, values):
+    cells = ''.join(_cell(f'{_column_letter(index)}{number}', value) for index, value in enumerate(values))
+    return f'<row r="{number}">{cells}</row>'
+
+
+def write_xlsx(handle, columns, rows, title='Relatório'):
+    """Grava em `handle` (binário) e retorna a quantidade de linhas."""
+    # Nome de planilha: até 31 caracteres, sem []:*?/\
+    title = escape(''.join(char for char in title if char not in '[]:*?/\\')[:31] or 'Relatório')
+    count = 0
+    with zipfile.ZipFile(handle, 'w', zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('[Content_Types].xml', _CONTENT_TYPES_XML)
+        archive.writestr('_rels/.rels', _ROOT_RELS_XML)
+        archive.writestr('xl/workbook.xml', _WORKBOOK_XML.format(title=title))
+        archive.writestr('xl/_rels/workbook.xml.rels', _WORKBOOK_RELS_XML)
+        with archive.open('xl/worksheets/sheet1.xml', 'w') as sheet:
+            sheet.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+            )
+            sheet.write(_row_xml(1, columns).encode('utf-8'))
+            for count, row in enumerate(rows, 1):
+                sheet.write(_row_xml(count + 1, row).encode('utf-8'))
+            sheet.write(b'</sheetData></worksheet>')
+    return count
+
+
+WRITERS = {
+    'csv': write_csv,
+    'xlsx': write_xlsx,
+}
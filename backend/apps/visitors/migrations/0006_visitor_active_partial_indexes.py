@@ -0,0 +1,28 @@
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Índices criados com CREATE INDEX CONCURRENTLY (sem bloquear escritas)
+    atomic = False
+
+    dependencies = [
+        ('visitors', '0005_rename_visitors_bra_created_idx_visitors_vi_branch__96de7c_idx'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='visitor',
+            index=models.Index(
+                fields=['church', '-created_at'], name='visitor_active_recent_idx',
+                condition=models.Q(('is_active', True)),
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name='visitor',
+            index=models.Index(
+                fields=['branch', '-created_at'], name='visitor_active_branch_idx',
+                condition=models.Q(('is_active', True)),
+            ),
+        ),
+    ]
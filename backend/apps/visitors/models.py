@@ -269,6 +269,15 @@ class Visitor(BaseModel):
             models.Index(fields=['church', 'converted_to_member']),
             models.Index(fields=['qr_code_used']),
             models.Index(fields=['branch', 'created_at']),
+            # Parciais (só visitantes ativos): listagens por data de cadastro
+            models.Index(
+                fields=['church', '-created_at'], name='visitor_active_recent_idx',
+                condition=models.Q(is_active=True),
+            ),
+            models.Index(
+                fields=['branch', '-created_at'], name='visitor_active_branch_idx',
+                condition=models.Q(is_active=True),
+            ),
         ]
     
     def __str__(self):
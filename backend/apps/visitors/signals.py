@@ -7,8 +7,8 @@ from django.db.models.signals import post_save
 from django.dispatch import receiver
 from django.core.mail import send_mail
 from django.conf import settings
-from django.template.loader import render_to_string
-from django.utils.html import strip_tags
+
+from apps.core.services.email_rendering import render_email
 
 from .models import Visitor
 
@@ -34,32 +34,9 @@ def visitor_registered_notification(sender, instance, created, **kwargs):
             'registration_date': instance.created_at,
         }
         
-        # Renderizar template HTML (se existir)
-        try:
-            html_message = render_to_string('emails/new_visitor_notification.html', context)
-            plain_message = strip_tags(html_message)
-        except:
-            # Fallback para mensagem simples
-            plain_message = f"""
-Novo Visitante Registrado via QR Code
-
-Nome: {instance.full_name}
-E-mail: {instance.email}
-Telefone: {instance.phone}
-Igreja: {instance.church.name}
-Filial: {instance.branch.name}
-Data: {instance.created_at.strftime('%d/%m/%Y às %H:%M')}
-
-Primeira visita: {'Sim' if instance.first_visit else 'Não'}
-Quer oração: {'Sim' if instance.wants_prayer else 'Não'}
-Interesse em grupo de crescimento: {'Sim' if instance.wants_growth_group else 'Não'}
-
-Observações: {instance.observations or 'Nenhuma'}
-
----
-Sistema Obreiro Digital
-"""
-            html_message = None
+        # Mensagem (emails/new_visitor_notification.txt, compilado uma vez por processo)
+        rendered = render_email('emails/new_visitor_notification', context)
+        plain_message, html_message = rendered.text, rendered.html
         
         # Lista de destinatários (pastor da filial + administrativos)
         recipients = []
@@ -140,21 +117,8 @@ def visitor_converted_notification(sender, instance, created, **kwargs):
             'conversion_date': instance.conversion_date,
         }
         
-        # Mensagem de conversão
-        plain_message = f"""
-Visitante Convertido em Membro
-
-Visitante: {instance.full_name}
-Membro ID: {instance.converted_member.id if instance.converted_member else 'N/A'}
-Igreja: {instance.church.name}
-Filial: {instance.branch.name}
-Data da Conversão: {instance.conversion_date.strftime('%d/%m/%Y às %H:%M')}
-
-Notas da Conversão: {instance.conversion_notes or 'Nenhuma'}
-
----
-Sistema Obreiro Digital
-"""
+        # Mensagem de conversão (emails/visitor_converted.txt)
+        plain_message = render_email('emails/visitor_converted', context).text
         
         # Lista de destinatários
         recipients = []
@@ -24,8 +24,14 @@ from .serializers import (
 )
 from apps.branches.models import Branch
 from apps.core.permissions import IsMemberUser
-from apps.core.mixins import ChurchScopedQuerysetMixin
-from apps.core.throttling import QRCodeAnonRateThrottle, QRCodeUserRateThrottle
+from apps.core.mixins import ChurchScopedQuerysetMixin, SparseFieldsetMixin
+from apps.core import response_cache
+from apps.core.response_cache import cache_response, user_active_church
+from apps.core.services import TimeSeries
+from apps.core.signals import increment_visitors_registered
+from apps.core.throttling import (
+    QRCodeAnonRateThrottle, QRCodeChurchRateThrottle, QRCodeUserRateThrottle
+)
 
 
 # =====================================
@@ -68,7 +74,7 @@ def validate_qr_code(request, qr_code_uuid):
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
-@throttle_classes([QRCodeAnonRateThrottle])
+@throttle_classes([QRCodeAnonRateThrottle, QRCodeChurchRateThrottle])
 def register_visitor(request, qr_code_uuid):
     """
     Registra um novo visitante via QR Code
@@ -103,9 +109,8 @@ def register_visitor(request, qr_code_uuid):
             ip_address=request.META.get('REMOTE_ADDR')
         )
         
-        # Incrementar contador da filial
-        branch.total_visitors_registered += 1
-        branch.save(update_fields=['total_visitors_registered'])
+        # Incrementar contadores de registros via QR (filial, igreja e denominação)
+        increment_visitors_registered(branch)
         
         return Response({
             'success': True,
@@ -129,7 +134,7 @@ def register_visitor(request, qr_code_uuid):
 # ENDPOINTS ADMINISTRATIVOS (Com autenticação)
 # =====================================
 
-class VisitorViewSet(ChurchScopedQuerysetMixin, viewsets.ModelViewSet):
+class VisitorViewSet(SparseFieldsetMixin, ChurchScopedQuerysetMixin, viewsets.ModelViewSet):
     """
     ViewSet para administração de visitantes
     Requer autenticação e permissões de igreja
@@ -465,10 +470,12 @@ class VisitorViewSet(ChurchScopedQuerysetMixin, viewsets.ModelViewSet):
             if action == 'update_status':
                 follow_up_status = serializer.validated_data.get('follow_up_status')
                 if follow_up_status:
+                    church_ids = self._church_ids(visitors)
                     visitors.update(
                         follow_up_status=follow_up_status,
                         last_contact_date=timezone.now()
                     )
+                    self._invalidate_cached_responses(church_ids)
                     return Response({
                         'success': True,
                         'message': f'Status atualizado para {visitors.count()} visitantes'
@@ -476,11 +483,13 @@ class VisitorViewSet(ChurchScopedQuerysetMixin, viewsets.ModelViewSet):
             
             elif action == 'bulk_follow_up':
                 notes = serializer.validated_data.get('notes', '')
+                church_ids = self._church_ids(visitors)
                 visitors.update(
                     follow_up_status='contacted',
                     last_contact_date=timezone.now(),
                     conversion_notes=notes
                 )
+                self._invalidate_cached_responses(church_ids)
                 return Response({
                     'success': True,
                     'message': f'Follow-up realizado para {visitors.count()} visitantes'
@@ -495,6 +504,15 @@ class VisitorViewSet(ChurchScopedQuerysetMixin, viewsets.ModelViewSet):
         
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    @staticmethod
+    def _church_ids(visitors):
+        return set(visitors.order_by().values_list('church_id', flat=True).distinct())
+
+    @staticmethod
+    def _invalidate_cached_responses(church_ids):
+        """`update()` não dispara post_save: invalida os dashboards em cache das igrejas."""
+        response_cache.invalidate(response_cache.church_tenants(church_ids), ['visitors'])
+
 
 # =====================================
 # ENDPOINTS ESPECÍFICOS
@@ -514,6 +532,7 @@ def recent_visitors(request):
 
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated, IsMemberUser])
+@cache_response('visitors-dashboard', depends_on=('visitors',), vary_on=('role',), church=user_active_church)
 def dashboard_stats(request):
     """
     Estatísticas para dashboard - Multi-tenant scoped
@@ -547,18 +566,11 @@ def dashboard_stats(request):
     pending_follow_up = queryset.filter(follow_up_status='pending').count()
     converted = queryset.filter(converted_to_member=True).count()
     
-    # Visitantes por mês (últimos 6 meses)
-    monthly_data = []
-    for i in range(6):
-        month_date = now - timedelta(days=30 * i)
-        month_visitors = queryset.filter(
-            created_at__month=month_date.month,
-            created_at__year=month_date.year
-        ).count()
-        monthly_data.append({
-            'month': month_date.strftime('%Y-%m'),
-            'visitors': month_visitors
-        })
+    # Visitantes por mês (últimos 6 meses de calendário, uma query)
+    monthly_data = [
+        {'month': row['key'], 'visitors': row['visitors']}
+        for row in TimeSeries(queryset, 'created_at', metrics={'visitors': Count('id')}, periods=6).run()
+    ]
     
     return Response({
         'total_visitors': total_visitors,
@@ -566,5 +578,5 @@ def dashboard_stats(request):
         'pending_follow_up': pending_follow_up,
         'converted_to_members': converted,
         'conversion_rate': round((converted / total_visitors) * 100, 2) if total_visitors > 0 else 0,
-        'monthly_data': monthly_data[::-1]  # Ordem cronológica
+        'monthly_data': monthly_data  # Ordem cronológica
     })
@@ -0,0 +1,13 @@
+"""
+Benchmarks de desempenho do backend.
+
+Cada módulo `bench_*.py` pode ser executado diretamente, por exemplo:
+
+    python -m benchmarks.bench_throttling
+
+Para os benchmarks que precisam de dados, `benchmarks.datagen` gera um
+conjunto sintético (e o remove com `--cleanup`). `bench_hot_paths` e
+`bench_load_api` gravam os resultados em JSON (`benchmarks/results/`, ver
+`benchmarks.harness`) e aceitam `--compare <execução anterior>.json`, que
+termina com código 1 em caso de regressão.
+"""
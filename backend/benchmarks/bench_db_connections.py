@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+"""
+Teste de carga: custo de abrir conexão por requisição vs conexões reutilizadas.
+
+Simula o ciclo de requisições curtas do Django (`request_started` → query
+→ `request_finished`) em N threads, como os workers do gunicorn:
+
+- fresh:      CONN_MAX_AGE=0, uma conexão nova (e handshake TLS) por requisição
+- persistent: CONN_MAX_AGE>0 com health check, conexão reaproveitada
+- pool:       pool do psycopg 3 (apenas quando DB_POOL=True nas settings)
+
+Uso:
+    DATABASE_URL=postgres://... python -m benchmarks.bench_db_connections \\
+        [--requests 500] [--threads 3] [--queries 1]
+
+Para medir o ganho real aponte DATABASE_URL para o Postgres gerenciado (com
+`?sslmode=require`): em localhost sem TLS a diferença é bem menor.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.dev')
+
+
+def simulate_requests(total, threads, queries):
+    """Executa `total` requisições simuladas; retorna latências em ms."""
+    from django.core import signals
+    from django.db import connection
+
+    latencies = []
+    lock = threading.Lock()
+    per_thread = max(1, total // threads)
+
+    def worker():
+        local = []
+        for _ in range(per_thread):
+            started = time.perf_counter()
+            signals.request_started.send(sender=None)
+            for _ in range(queries):
+                with connection.cursor() as cursor:
+                    cursor.execute('SELECT 1')
+                    cursor.fetchone()
+            signals.request_finished.send(sender=None)
+            local.append((time.perf_counter() - started) * 1000)
+        connection.close()
+        with lock:
+            latencies.extend(local)
+
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    return latencies
+
+
+def configure(mode):
+    """Ajusta a persistência do alias default para o modo medido."""
+    from django.conf import settings
+    from django.db import connections
+
+    config = settings.DATABASES['default']
+    if mode == 'fresh':
+        config['CONN_MAX_AGE'] = 0
+        config['CONN_HEALTH_CHECKS'] = False
+    elif mode == 'persistent':
+        config['CONN_MAX_AGE'] = 600
+        config['CONN_HEALTH_CHECKS'] = True
+    # As threads de cada rodada criam wrappers novos, que leem este dicionário
+    connections.close_all()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--threads', type=int, default=3)
+    parser.add_argument('--queries', type=int, default=1, help='queries por requisição')
+    args = parser.parse_args()
+
+    import django
+    from django.conf import settings
+
+    django.setup()
+
+    from apps.core.db import connection_metrics
+
+    pooled = bool(settings.DATABASES['default'].get('OPTIONS', {}).get('pool'))
+    modes = ['pool'] if pooled else ['fresh', 'persistent']
+
+    print(f"Requisições: {args.requests} | threads: {args.threads} | queries/req: {args.queries}")
+    print(f"{'modo':<12}{'média (ms)':>12}{'p95 (ms)':>12}{'req/s':>10}{'conexões':>10}")
+    for mode in modes:
+        if mode != 'pool':
+            configure(mode)
+        opened_before = connection_metrics()['default']['connections_opened']
+
+        started = time.perf_counter()
+        latencies = simulate_requests(args.requests, args.threads, args.queries)
+        elapsed = time.perf_counter() - started
+
+        metrics = connection_metrics()['default']
+        if mode == 'pool':
+            # Com pool, `connection_created` dispara a cada checkout
+            opened = metrics['pool']['connections_num']
+        else:
+            opened = metrics['connections_opened'] - opened_before
+        p95 = statistics.quantiles(latencies, n=20)[-1] if len(latencies) > 1 else latencies[0]
+        print(
+            f"{mode:<12}{statistics.mean(latencies):>12.2f}{p95:>12.2f}"
+            f"{len(latencies) / elapsed:>10.0f}{opened:>10}"
+        )
+
+    if pooled:
+        print(f"pool: {connection_metrics()['default'].get('pool')}")
+
+
+if __name__ == '__main__':
+    main()
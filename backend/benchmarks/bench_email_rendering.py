@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+"""
+Microbenchmark: renderização de emails de boas-vindas em massa.
+
+Simula um cadastro em massa (ex.: importação de membros com acesso ao
+sistema) renderizando `--emails` emails de boas-vindas (HTML + texto):
+
+- legado: contexto montado e `render_to_string` do HTML e do texto por
+  destinatário, como o `EmailService` fazia;
+- pipeline: `render_bulk` (templates compilados com o CSS já aplicado,
+  contexto compartilhado e só os dados do destinatário por email).
+
+Uso:
+    python -m benchmarks.bench_email_rendering [--emails 10000]
+
+Nada é enviado e o banco não é acessado.
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.dev')
+
+
+def recipients(total):
+    return [
+        {
+            'email': f'membro{index}@exemplo.com.br',
+            'user_email': f'membro{index}@exemplo.com.br',
+            'member_name': f'Membro {index}',
+            'user_password': f'Senha{index:06d}!',
+        }
+        for index in range(total)
+    ]
+
+
+def shared_context():
+    from apps.core.services import EmailService
+
+    return {
+        'church_name': 'Igreja Evangélica Central',
+        'role_display': 'Secretário(a)',
+        'role_description': EmailService._get_role_description('secretary'),
+        'login_url': f'{EmailService.FRONTEND_URL}/login',
+        'frontend_url': EmailService.FRONTEND_URL,
+        'support_email': 'suporteobreirovirtual@gmail.com',
+    }
+
+
+def legacy(items):
+    from django.template.loader import render_to_string
+
+    from apps.core.services import EmailService
+
+    for item in items:
+        context = EmailService._build_email_context(
+            member_name=item['member_name'],
+            user_email=item['user_email'],
+            user_password=item['user_password'],
+            church_name='Igreja Evangélica Central',
+            role_display='Secretário(a)',
+            role_code='secretary',
+        )
+        render_to_string('emails/welcome_member.html', context)
+        render_to_string('emails/welcome_member.txt', context)
+
+
+def pipeline(items):
+    from apps.core.services.email_rendering import render_bulk
+
+    for _ in render_bulk('emails/welcome_member', shared_context(), items):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--emails', type=int, default=10000)
+    args = parser.parse_args()
+
+    import django
+
+    django.setup()
+
+    items = recipients(args.emails)
+    print(f"Emails de boas-vindas: {args.emails}")
+    print(f"{'renderização':<28}{'s':>10}{'µs/email':>12}{'emails/s':>12}")
+    for label, func in (('render_to_string (legado)', legacy), ('render_bulk', pipeline)):
+        start = time.perf_counter()
+        func(items)
+        elapsed = time.perf_counter() - start
+        print(f"{label:<28}{elapsed:>10.2f}{elapsed / args.emails * 1e6:>12.1f}{args.emails / elapsed:>12.0f}")
+
+
+if __name__ == '__main__':
+    main()
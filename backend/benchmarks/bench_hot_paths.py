@@ -0,0 +1,192 @@
+#!/usr/bin/env python
+"""
+Microbenchmark: caminhos mais quentes da API, isolados da camada HTTP.
+
+Casos:
+- `tenant_middleware`: `TenantMiddleware` resolvendo o vínculo ativo do
+  usuário (e `tenant_middleware_x_church`, com o header `X-Church`);
+- `scope_filter`: `ChurchScopedQuerysetMixin.filter_queryset_by_scope` com
+  o queryset da listagem de membros, avaliando uma página;
+- `member_serializer` / `member_list_serializer`: serialização de uma página
+  de membros já carregada (detalhe e listagem);
+- `member_bulk_import`: `MemberBulkImportService.process_csv` com um CSV de
+  `--import-rows` linhas, desfeito ao fim de cada rodada.
+
+Sem `--church`, gera um conjunto pequeno com `benchmarks.datagen` e o remove
+ao final (a menos que `--keep`). Os resultados vão para
+`benchmarks/results/` (ver `benchmarks.harness`).
+
+Uso:
+    python -m benchmarks.bench_hot_paths [--church ID] [--rounds 30]
+                                         [--members 2000] [--page 25]
+                                         [--import-rows 100]
+                                         [--cases scope_filter member_serializer]
+                                         [--compare benchmarks/results/hot_paths-....json]
+"""
+
+import argparse
+import io
+import os
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.dev')
+
+CASES = [
+    'tenant_middleware',
+    'tenant_middleware_x_church',
+    'scope_filter',
+    'member_serializer',
+    'member_list_serializer',
+    'member_bulk_import',
+]
+
+CSV_HEADER = 'Nome Completo;Data Nascimento;Telefone;Email;CPF;Data Membresia;Genero;Estado Civil;Funcao Ministerial'
+
+
+def build_csv(rows):
+    """CSV de importação com `rows` membros válidos e distintos."""
+    lines = [CSV_HEADER]
+    for number in range(1, rows + 1):
+        lines.append(
+            f'Membro Importado {number:05d};{number % 28 + 1:02d}/{number % 12 + 1:02d}/{1960 + number % 40};'
+            f'(85) 9{number:04d}-{number % 10000:04d};importado{number}@bench.obreiro.test;;'
+            f'01/01/2020;{"M" if number % 2 else "F"};Solteiro(a);Membro'
+        )
+    return ('\n'.join(lines) + '\n').encode('utf-8')
+
+
+def church_admin(church_id):
+    """Usuário com vínculo ativo na igreja (preferindo o administrador)."""
+    from apps.accounts.models import ChurchUser
+    from apps.core.models import RoleChoices
+
+    church_users = ChurchUser.objects.select_related('user').filter(church_id=church_id, is_active=True)
+    church_user = (
+        church_users.filter(role=RoleChoices.CHURCH_ADMIN).order_by('pk').first()
+        or church_users.order_by('pk').first()
+    )
+    if church_user is None:
+        raise SystemExit(f'Igreja {church_id} não tem usuários ativos.')
+    return church_user.user
+
+
+def run(args, church_id):
+    from django.core.files.uploadedfile import SimpleUploadedFile
+    from django.db import transaction
+    from django.test import RequestFactory
+
+    from apps.core.middleware import TenantMiddleware
+    from apps.core.mixins import ChurchScopedQuerysetMixin
+    from apps.members.models import Member
+    from apps.members.serializers import MemberListSerializer, MemberSerializer
+    from apps.members.services import MemberBulkImportService
+    from benchmarks.harness import measure
+
+    user = church_admin(church_id)
+    factory = RequestFactory()
+    middleware = TenantMiddleware(lambda request: None)
+
+    def tenant_request(**headers):
+        request = factory.get('/api/v1/members/', **headers)
+        request.user = user
+        middleware(request)
+        return request
+
+    request = tenant_request()
+    mixin = ChurchScopedQuerysetMixin()
+
+    def member_page():
+        queryset = Member.objects.select_related('church', 'branch', 'spouse', 'responsible')
+        return list(mixin.filter_queryset_by_scope(request, queryset, has_branch=True)[:args.page])
+
+    members = member_page()
+    context = {'request': request}
+    payload = build_csv(args.import_rows)
+
+    def bulk_import():
+        uploaded = SimpleUploadedFile('membros.csv', payload, content_type='text/csv')
+        with transaction.atomic():
+            service = MemberBulkImportService(
+                request=request, church=request.church, user=user, branch=request.branch
+            )
+            result = service.process_csv(uploaded_file=uploaded)
+            transaction.set_rollback(True)
+        if result['error_count']:
+            raise SystemExit(f"Importação com erros: {result['errors'][:3]}")
+
+    cases = {
+        'tenant_middleware': (lambda: tenant_request(), 1),
+        'tenant_middleware_x_church': (lambda: tenant_request(HTTP_X_CHURCH=str(church_id)), 1),
+        'scope_filter': (member_page, 1),
+        'member_serializer': (lambda: MemberSerializer(members, many=True, context=context).data, len(members)),
+        'member_list_serializer': (
+            lambda: MemberListSerializer(members, many=True, context=context).data, len(members)
+        ),
+        'member_bulk_import': (bulk_import, args.import_rows),
+    }
+
+    print(f"Igreja {church_id} | usuário {user.email} | página de {len(members)} membro(s)")
+    print(f"{'caso':<30}{'mediana ms':>12}{'p95 ms':>10}{'ops/s':>12}")
+    results = {}
+    for name in args.cases:
+        func, operations = cases[name]
+        rounds = max(3, args.rounds // 10) if name == 'member_bulk_import' else args.rounds
+        results[name] = measure(func, rounds=rounds, warmup=min(args.warmup, rounds), operations=operations)
+        stats = results[name]
+        print(f"{name:<30}{stats['median_ms']:>12.3f}{stats['p95_ms']:>10.3f}{stats['ops_per_second']:>12.1f}")
+    return results
+
+
+def main():
+    from benchmarks.harness import add_result_arguments, finish
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--church', type=int, help='Igreja existente (padrão: gera um conjunto sintético)')
+    parser.add_argument('--rounds', type=int, default=30)
+    parser.add_argument('--warmup', type=int, default=3)
+    parser.add_argument('--page', type=int, default=25, help='Membros por página (padrão do DRF)')
+    parser.add_argument('--import-rows', type=int, default=100)
+    parser.add_argument('--members', type=int, default=2000, help='Membros por igreja no conjunto gerado')
+    parser.add_argument('--seed', type=int, default=9050)
+    parser.add_argument('--keep', action='store_true', help='Não remover o conjunto gerado')
+    parser.add_argument('--cases', nargs='+', choices=CASES, default=CASES)
+    add_result_arguments(parser)
+    args = parser.parse_args()
+
+    import django
+
+    django.setup()
+
+    from benchmarks import datagen
+
+    generated = None
+    church_id = args.church
+    if church_id is None:
+        datagen.cleanup(args.seed)
+        generated = datagen.generate(datagen.DatasetConfig(churches=1, members=args.members, seed=args.seed))
+        church_id = generated['churches'][0]['id']
+        print(f"Conjunto gerado em {generated['duration_seconds']}s: {generated['counts']}")
+
+    try:
+        results = run(args, church_id)
+    finally:
+        if generated is not None and not args.keep:
+            datagen.cleanup(args.seed)
+
+    parameters = {
+        'church': args.church,
+        'generated': generated['counts'] if generated else None,
+        'page': args.page,
+        'import_rows': args.import_rows,
+        'rounds': args.rounds,
+    }
+    sys.exit(finish('hot_paths', args, results, parameters))
+
+
+if __name__ == '__main__':
+    main()
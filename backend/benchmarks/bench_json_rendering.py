@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+"""
+Microbenchmark: renderização JSON e compressão de payloads de membros.
+
+Compara o `JSONRenderer` do DRF (json da stdlib) com o `FastJSONRenderer`
+(orjson) sobre a listagem de membros já serializada, e mostra o tamanho do
+payload sem compressão, com gzip e com brotli (se instalado), como enviado
+pelo `CompressionMiddleware`.
+
+Uso:
+    python -m benchmarks.bench_json_rendering [--members 2000] [--repeat 5]
+    python -m benchmarks.bench_json_rendering --church 3   # membros reais do banco
+
+Sem `--church` os membros são gerados em memória (não acessa o banco) e
+serializados com o `MemberListSerializer`; com `--church` a exportação usa
+o `MemberSerializer` completo sobre os membros da igreja.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.dev')
+
+FIRST_NAMES = ['Ana', 'João', 'Maria', 'José', 'Francisca', 'Antônio', 'Adriana', 'Paulo', 'Márcia', 'Lucas']
+LAST_NAMES = ['Silva', 'Santos', 'Oliveira', 'Souza', 'Lima', 'Pereira', 'Ferreira', 'Almeida', 'Costa']
+
+
+def synthetic_payload(total, seed=42):
+    """Listagem serializada de `total` membros gerados em memória."""
+    from apps.branches.models import Branch
+    from apps.churches.models import Church
+    from apps.members.models import Member
+    from apps.members.serializers import MemberListSerializer
+
+    rng = random.Random(seed)
+    church = Church(id=1, name='Igreja Evangélica Central')
+    branches = [Branch(id=index, name=f'Congregação {index}', church=church) for index in range(1, 6)]
+    members = []
+    for index in range(1, total + 1):
+        name = f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {rng.choice(LAST_NAMES)}'
+        birth = date(1940, 1, 1) + timedelta(days=rng.randint(0, 30000))
+        members.append(Member(
+            id=index,
+            church=church,
+            branch=rng.choice(branches),
+            full_name=name,
+            email=f'membro{index}@exemplo.com.br',
+            phone=f'(85) 9{rng.randint(1000, 9999)}-{rng.randint(1000, 9999)}',
+            birth_date=birth,
+            membership_status='active',
+            ministerial_function='member',
+            membership_date=birth + timedelta(days=rng.randint(5000, 9000)),
+            is_active=True,
+        ))
+    return {'count': total, 'next': None, 'previous': None, 'results': MemberListSerializer(members, many=True).data}
+
+
+def database_payload(church_id):
+    """Exportação (MemberSerializer) dos membros reais de uma igreja."""
+    from apps.members.models import Member
+    from apps.members.serializers import MemberSerializer
+
+    members = Member._base_manager.filter(church_id=church_id, is_active=True).select_related(
+        'church', 'branch', 'spouse', 'responsible'
+    )
+    data = MemberSerializer(list(members), many=True).data
+    return {'count': len(data), 'members': data}
+
+
+def best_of(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--members', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--church', type=int, default=None)
+    args = parser.parse_args()
+
+    import django
+
+    django.setup()
+
+    from rest_framework.renderers import JSONRenderer
+
+    from apps.core.middleware import CompressionMiddleware
+    from apps.core.renderers import FastJSONRenderer, orjson
+
+    payload = database_payload(args.church) if args.church else synthetic_payload(args.members)
+    members = payload['count']
+
+    print(f"Membros: {members} | orjson: {'sim' if orjson else 'não'} | repetições: {args.repeat}")
+    print(f"{'renderer':<28}{'ms':>10}{'µs/membro':>12}{'bytes':>12}")
+    rendered = None
+    for label, renderer in (('JSONRenderer (DRF)', JSONRenderer()), ('FastJSONRenderer', FastJSONRenderer())):
+        elapsed, rendered = best_of(lambda: renderer.render(payload), args.repeat)
+        print(f"{label:<28}{elapsed * 1000:>10.2f}{elapsed / max(members, 1) * 1e6:>12.2f}{len(rendered):>12}")
+
+    middleware = CompressionMiddleware(lambda request: None)
+    encodings = ['gzip'] + (['br'] if middleware.brotli else [])
+    print()
+    print(f"{'compressão':<28}{'ms':>10}{'bytes':>12}{'razão':>10}")
+    for encoding in encodings:
+        elapsed, compressed = best_of(lambda: middleware._compress(rendered, encoding), args.repeat)
+        ratio = len(compressed) / len(rendered)
+        print(f"{encoding:<28}{elapsed * 1000:>10.2f}{len(compressed):>12}{ratio:>10.1%}")
+    if not middleware.brotli:
+        print("(brotli não instalado: pip install brotli)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,260 @@
+#!/usr/bin/env python
+"""
+Teste de carga: cenário de uso da API com usuários virtuais (estilo Locust).
+
+Cada usuário virtual faz login, fixa a sua igreja (`X-Church`) e repete, com
+pausa aleatória entre as chamadas (`--wait`), tarefas sorteadas pelo peso:
+
+    notifications_unread   6   GET  notifications/unread_count/ (polling)
+    member_list            5   GET  members/?page=N
+    members_dashboard      2   GET  members/dashboard/
+    main_dashboard         1   GET  churches/main-dashboard/
+    visitors_dashboard     1   GET  visitors/admin/dashboard-stats/
+    qr_register            1   POST visitors/public/qr/<uuid>/register/ (anônimo)
+
+Os logins e os UUIDs de QR Code vêm do resumo do `benchmarks.datagen`
+(`--dataset`); sem ele, todos os usuários usam `--email`/`--password` e o
+cenário de QR Code usa `--qr-uuid`, quando informado. Respostas 429 são
+contadas à parte (`throttled`): o limite do QR Code por IP é esperado.
+
+Não roda contra produção: os registros de visitantes são gravados de fato.
+
+Uso:
+    python -m benchmarks.datagen --churches 5 --output /tmp/bench.json
+    python manage.py runserver   # ou gunicorn, em outro terminal
+    python -m benchmarks.bench_load_api --dataset /tmp/bench.json
+                                        [--host http://127.0.0.1:8000]
+                                        [--users 20] [--duration 60]
+                                        [--compare benchmarks/results/load_api-....json]
+"""
+
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from benchmarks.harness import add_result_arguments, finish, percentile  # noqa: E402
+
+API_PREFIX = '/api/v1/'
+
+# (nome, peso)
+TASKS = [
+    ('notifications_unread', 6),
+    ('member_list', 5),
+    ('members_dashboard', 2),
+    ('main_dashboard', 1),
+    ('visitors_dashboard', 1),
+    ('qr_register', 1),
+]
+
+
+class Stats:
+    """Tempos e falhas por tarefa, compartilhados entre as threads."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.timings = {}
+        self.failures = {}
+        self.throttled = {}
+        self.errors = {}
+
+    def record(self, name, elapsed_ms, status_code=None, error=None):
+        with self.lock:
+            if error is not None or status_code >= 500 or status_code in (400, 401, 403, 404):
+                self.failures[name] = self.failures.get(name, 0) + 1
+                message = error or f'HTTP {status_code}'
+                self.errors.setdefault(name, {}).setdefault(message, 0)
+                self.errors[name][message] += 1
+            elif status_code == 429:
+                self.throttled[name] = self.throttled.get(name, 0) + 1
+            else:
+                self.timings.setdefault(name, []).append(elapsed_ms)
+
+    def summary(self, duration):
+        results = {}
+        for name in sorted(set(self.timings) | set(self.failures) | set(self.throttled)):
+            timings = self.timings.get(name, [])
+            results[name] = {
+                'requests': len(timings),
+                'failures': self.failures.get(name, 0),
+                'throttled': self.throttled.get(name, 0),
+                'rps': round(len(timings) / duration, 2),
+                'p50_ms': round(percentile(timings, 0.50), 2),
+                'p95_ms': round(percentile(timings, 0.95), 2),
+                'p99_ms': round(percentile(timings, 0.99), 2),
+                'max_ms': round(max(timings), 2) if timings else 0.0,
+            }
+            if name in self.errors:
+                results[name]['errors'] = self.errors[name]
+        return results
+
+
+class VirtualUser(threading.Thread):
+    """Um cliente da API: sessão HTTP própria, login e laço de tarefas."""
+
+    def __init__(self, number, args, account, qr_uuids, stats, stop_at):
+        super().__init__(daemon=True, name=f'vu-{number}')
+        self.number = number
+        self.args = args
+        self.account = account
+        self.qr_uuids = qr_uuids
+        self.stats = stats
+        self.stop_at = stop_at
+        self.rng = random.Random(args.seed + number)
+        self.member_pages = 1
+
+    def url(self, path):
+        return f"{self.args.host.rstrip('/')}{API_PREFIX}{path}"
+
+    def call(self, name, method, path, session=None, **kwargs):
+        session = session or self.session
+        start = time.perf_counter()
+        try:
+            response = session.request(method, self.url(path), timeout=self.args.timeout, **kwargs)
+        except Exception as exc:
+            self.stats.record(name, 0.0, error=type(exc).__name__)
+            return None
+        self.stats.record(name, (time.perf_counter() - start) * 1000, response.status_code)
+        return response
+
+    def login(self):
+        response = self.call('login', 'POST', 'auth/login/', json={
+            'email': self.account['email'], 'password': self.account['password'],
+        })
+        if response is None or response.status_code != 200:
+            return False
+        self.session.headers['Authorization'] = f"Token {response.json()['token']}"
+        if self.account.get('church_id'):
+            self.session.headers['X-Church'] = str(self.account['church_id'])
+        return True
+
+    # =====================================
+    # TAREFAS
+    # =====================================
+
+    def notifications_unread(self):
+        self.call('notifications_unread', 'GET', 'notifications/unread_count/')
+
+    def member_list(self):
+        page = self.rng.randint(1, self.member_pages)
+        response = self.call('member_list', 'GET', 'members/', params={'page': page})
+        if response is not None and response.status_code == 200:
+            count = response.json().get('count') or 0
+            self.member_pages = max(1, min(20, -(-count // 25)))
+
+    def members_dashboard(self):
+        self.call('members_dashboard', 'GET', 'members/dashboard/')
+
+    def main_dashboard(self):
+        self.call('main_dashboard', 'GET', 'churches/main-dashboard/')
+
+    def visitors_dashboard(self):
+        self.call('visitors_dashboard', 'GET', 'visitors/admin/dashboard-stats/')
+
+    def qr_register(self):
+        if not self.qr_uuids:
+            return
+        number = self.rng.randrange(10 ** 9)
+        self.call(
+            'qr_register', 'POST', f'visitors/public/qr/{self.rng.choice(self.qr_uuids)}/register/',
+            session=self.anonymous,
+            json={
+                'full_name': f'Visitante Carga {number}',
+                'email': f'visitante{number}@bench.obreiro.test',
+                'phone': '(85) 98888-0000',
+                'city': 'Fortaleza',
+                'state': 'CE',
+            },
+        )
+
+    def run(self):
+        import requests
+
+        self.session = requests.Session()
+        self.anonymous = requests.Session()
+        if not self.login():
+            return
+        names = [name for name, _ in TASKS]
+        weights = [weight for _, weight in TASKS]
+        while time.monotonic() < self.stop_at:
+            getattr(self, self.rng.choices(names, weights)[0])()
+            time.sleep(self.rng.uniform(*self.args.wait))
+
+
+def load_accounts(args):
+    """Contas e UUIDs de QR Code do resumo do datagen (ou dos argumentos)."""
+    if args.dataset:
+        dataset = json.loads(Path(args.dataset).read_text(encoding='utf-8'))
+        accounts = [
+            {'email': email, 'password': dataset['password'], 'church_id': church['id']}
+            for church in dataset['churches'] for email in church['logins']
+        ]
+        qr_uuids = [uuid for church in dataset['churches'] for uuid in church['qr_code_uuids']]
+        return accounts, qr_uuids
+    if not (args.email and args.password):
+        raise SystemExit('Informe --dataset ou --email e --password.')
+    return [{'email': args.email, 'password': args.password}], list(args.qr_uuid or [])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='http://127.0.0.1:8000')
+    parser.add_argument('--dataset', help='Resumo gerado por `benchmarks.datagen --output`')
+    parser.add_argument('--email')
+    parser.add_argument('--password')
+    parser.add_argument('--qr-uuid', nargs='+')
+    parser.add_argument('--users', type=int, default=10, help='Usuários virtuais simultâneos')
+    parser.add_argument('--duration', type=float, default=30, help='Segundos de carga')
+    parser.add_argument('--ramp', type=float, default=5, help='Segundos para iniciar todos os usuários')
+    parser.add_argument('--wait', type=float, nargs=2, default=(0.5, 2.0), metavar=('MIN', 'MAX'))
+    parser.add_argument('--timeout', type=float, default=30)
+    parser.add_argument('--seed', type=int, default=42)
+    add_result_arguments(parser)
+    args = parser.parse_args()
+
+    accounts, qr_uuids = load_accounts(args)
+    stats = Stats()
+    started = time.monotonic()
+    stop_at = started + args.ramp + args.duration
+    print(f"{args.users} usuário(s) virtual(is) contra {args.host} por {args.duration:.0f}s (+{args.ramp:.0f}s de rampa)")
+
+    users = []
+    for number in range(args.users):
+        user = VirtualUser(number, args, accounts[number % len(accounts)], qr_uuids, stats, stop_at)
+        user.start()
+        users.append(user)
+        time.sleep(args.ramp / args.users)
+    for user in users:
+        user.join()
+
+    duration = time.monotonic() - started
+    results = stats.summary(duration)
+    print(f"\n{'tarefa':<24}{'req':>7}{'falhas':>8}{'429':>6}{'req/s':>8}{'p50':>9}{'p95':>9}{'p99':>9}")
+    for name, row in results.items():
+        print(
+            f"{name:<24}{row['requests']:>7}{row['failures']:>8}{row['throttled']:>6}{row['rps']:>8.2f}"
+            f"{row['p50_ms']:>9.1f}{row['p95_ms']:>9.1f}{row['p99_ms']:>9.1f}"
+        )
+        for message, count in row.get('errors', {}).items():
+            print(f"    {count}x {message}")
+
+    parameters = {
+        'host': args.host,
+        'users': args.users,
+        'duration': args.duration,
+        'wait': list(args.wait),
+        'accounts': len(accounts),
+        'dataset': args.dataset,
+    }
+    sys.exit(finish('load_api', args, results, parameters, metric='p95_ms'))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+"""
+Microbenchmark: custo do login (hash da senha e busca do usuário).
+
+No início dos cultos muitos usuários fazem login ao mesmo tempo. Cada login
+custa uma verificação de senha (PBKDF2, intencionalmente cara) e a busca do
+usuário pelo email. O benchmark mostra, para cada número de iterações do
+PBKDF2, o tempo por verificação, os logins/s por núcleo e quantos núcleos
+são necessários para atender `--clients` clientes no limite do
+`AuthAnonRateThrottle` (escopo `auth_anon`).
+
+Uso:
+    python -m benchmarks.bench_login [--iterations 260000 600000 1000000]
+                                     [--repeat 20] [--clients 500]
+    python -m benchmarks.bench_login --explain   # planos da busca (lê o banco)
+
+Com `--explain` mostra o plano do PostgreSQL para a busca antiga
+(`UPPER(email) OR UPPER(username)`) e a nova (`LOWER(email)`, índice
+`accounts_user_email_lower_uniq`); nenhuma linha é alterada.
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.dev')
+
+PASSWORD = 'SenhaForte123!'
+
+
+def hasher_for(iterations):
+    from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+    class BenchHasher(PBKDF2PasswordHasher):
+        pass
+
+    BenchHasher.iterations = iterations
+    return BenchHasher()
+
+
+def time_verify(iterations, repeat):
+    """Melhor tempo (s) de uma verificação de senha com `iterations`."""
+    hasher = hasher_for(iterations)
+    encoded = hasher.encode(PASSWORD, hasher.salt())
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        assert hasher.verify(PASSWORD, encoded)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def throttle_rate():
+    """Logins/s permitidos por cliente no escopo `auth_anon`."""
+    from apps.core.throttling import AuthAnonRateThrottle
+
+    throttle = AuthAnonRateThrottle()
+    num_requests, duration = throttle.parse_rate(throttle.get_rate())
+    return throttle.get_rate(), num_requests / duration
+
+
+def explain_lookups(login):
+    from django.contrib.auth import get_user_model
+    from django.db.models import Q
+
+    from apps.accounts.backends import EmailBackend
+
+    User = get_user_model()
+    legacy = User.objects.filter(Q(email__iexact=login) | Q(username__iexact=login))
+    current = User.objects.with_email(login)
+    for label, queryset in (('UPPER(email) OR UPPER(username)', legacy), ('LOWER(email)', current)):
+        print(f"--- {label}")
+        print(queryset.explain())
+    start = time.perf_counter()
+    try:
+        EmailBackend.get_user_by_login(login)
+    except User.DoesNotExist:
+        pass
+    print(f"\nbusca atual: {(time.perf_counter() - start) * 1000:.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, nargs='+', default=None)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--clients', type=int, default=500)
+    parser.add_argument('--explain', action='store_true')
+    parser.add_argument('--login', default='usuario@exemplo.com.br')
+    args = parser.parse_args()
+
+    import django
+
+    django.setup()
+
+    from django.contrib.auth.hashers import get_hasher
+
+    if args.explain:
+        explain_lookups(args.login)
+        return
+
+    current = get_hasher('default')
+    iterations = args.iterations or sorted({getattr(current, 'iterations', 600000), 260000, 600000, 1000000})
+    rate, per_client = throttle_rate()
+    demand = args.clients * per_client
+
+    print(f"Hasher atual: {current.algorithm} ({getattr(current, 'iterations', '-')} iterações)")
+    print(f"auth_anon: {rate} -> {args.clients} clientes no limite = {demand:.2f} logins/s")
+    print(f"{'iterações':>12}{'ms/login':>12}{'logins/s/núcleo':>18}{'núcleos':>10}")
+    for count in iterations:
+        elapsed = time_verify(count, args.repeat)
+        throughput = 1 / elapsed
+        print(f"{count:>12}{elapsed * 1000:>12.2f}{throughput:>18.1f}{demand / throughput:>10.2f}")
+    print("\nAjuste com PASSWORD_HASH_ITERATIONS; hashes com outro custo são refeitos no próximo login.")
+
+
+if __name__ == '__main__':
+    main()
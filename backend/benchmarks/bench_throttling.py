@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+"""
+Microbenchmark: throttles padrão do DRF vs janela deslizante no Redis.
+
+O `SimpleRateThrottle` regrava a lista inteira de timestamps no cache a cada
+hit, então o custo cresce com a cota. A janela deslizante executa um script
+atômico cujo custo independe do histórico.
+
+Uso:
+    python -m benchmarks.bench_throttling [--hits 5000] [--rate 1000/minute]
+                                          [--redis-url redis://localhost:6379/9]
+
+Com `--redis-url` os dois throttles usam o mesmo servidor Redis (o DRF via
+`RedisCache`), que é a comparação relevante para produção. Sem ele o Redis é
+emulado pelo `apps.core.testing.FakeRedis` e o legado usa `LocMemCache`: útil
+para validar o harness, mas os números não representam o custo real.
+
+Todas as chaves do benchmark usam o prefixo `bench-throttle:` e só elas são
+removidas, antes e depois da execução; o restante do banco Redis não é
+alterado.
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.dev')
+
+KEY_PREFIX = 'bench-throttle'
+
+
+def build_throttles(rate, redis_url=None):
+    from django.core.cache.backends.locmem import LocMemCache
+    from django.core.cache.backends.redis import RedisCache
+    from rest_framework.throttling import SimpleRateThrottle
+
+    from apps.core.throttling import RedisRateThrottle
+
+    legacy_cache = (
+        RedisCache(redis_url, {'KEY_PREFIX': KEY_PREFIX}) if redis_url else LocMemCache(KEY_PREFIX, {})
+    )
+
+    class LegacyThrottle(SimpleRateThrottle):
+        scope = 'bench'
+        cache = legacy_cache
+        THROTTLE_RATES = {'bench': rate}
+
+        def get_cache_key(self, request, view):
+            return self.get_ident(request)
+
+    class SlidingThrottle(RedisRateThrottle):
+        key_prefix = KEY_PREFIX
+        scope = 'bench'
+        THROTTLE_RATES = {'bench': rate}
+
+        def get_cache_key(self, request, view):
+            return self.get_ident(request)
+
+    return LegacyThrottle, SlidingThrottle
+
+
+def clear_bench_keys(client):
+    """Remove apenas as chaves do benchmark (prefixo `KEY_PREFIX`)."""
+    keys = list(client.scan_iter(match=f'{KEY_PREFIX}:*', count=1000))
+    if keys:
+        client.delete(*keys)
+    return len(keys)
+
+
+def run(throttle_class, hits):
+    from rest_framework.request import Request
+    from rest_framework.test import APIRequestFactory
+
+    request = Request(APIRequestFactory().get('/api/v1/bench/', REMOTE_ADDR='10.0.0.1'))
+    blocked = 0
+    start = time.perf_counter()
+    for _ in range(hits):
+        if not throttle_class().allow_request(request, None):
+            blocked += 1
+    elapsed = time.perf_counter() - start
+    return elapsed, blocked
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--hits', type=int, default=5000)
+    parser.add_argument('--rate', default='1000/minute')
+    parser.add_argument('--redis-url', default=None)
+    args = parser.parse_args()
+
+    import django
+    from django.conf import settings
+
+    django.setup()
+    settings.THROTTLE_BACKEND = 'redis'
+
+    from apps.core.testing import FakeRedis
+    from apps.core.throttling import set_redis_client
+
+    if args.redis_url:
+        import redis
+        client = redis.Redis.from_url(args.redis_url)
+        clear_bench_keys(client)
+    else:
+        client = FakeRedis()
+    set_redis_client(client)
+
+    legacy, sliding = build_throttles(args.rate, args.redis_url)
+
+    print(f"Hits: {args.hits} | rate: {args.rate} | redis: {args.redis_url or 'FakeRedis'}")
+    print(f"{'throttle':<28}{'total (s)':>12}{'µs/hit':>12}{'bloqueados':>12}")
+    for label, throttle_class in (('SimpleRateThrottle (DRF)', legacy), ('RedisRateThrottle', sliding)):
+        elapsed, blocked = run(throttle_class, args.hits)
+        print(f"{label:<28}{elapsed:>12.3f}{elapsed / args.hits * 1e6:>12.1f}{blocked:>12}")
+
+    if args.redis_url:
+        clear_bench_keys(client)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,367 @@
+#!/usr/bin/env python
+"""
+Gerador de dados sintéticos para os benchmarks e testes de carga.
+
+Cria uma denominação de benchmark com igrejas, filiais, usuários (um
+CHURCH_ADMIN e secretários por igreja), membros, visitantes, notificações e
+pedidos de oração, tudo com `bulk_create` (as igrejas e filiais matriz pelo
+`ChurchProvisioningService`). Os contadores desnormalizados são
+recalculados no final pelo `KPIRecomputeService`.
+
+Os dados são identificados pela semente: denominação `[bench] seed=<n>` e
+e-mails `@bench.obreiro.test`, todos com a senha `BENCH_PASSWORD`. O resumo
+(igrejas, logins, UUIDs dos QR Codes) pode ser gravado com `--output` e é
+lido por `benchmarks.bench_load_api --dataset`.
+
+Uso:
+    python -m benchmarks.datagen [--churches 3] [--branches 2] [--users 2]
+                                 [--members 500] [--visitors 100]
+                                 [--notifications 50] [--prayer-requests 20]
+                                 [--seed 42] [--replace] [--output dataset.json]
+    python -m benchmarks.datagen --cleanup [--seed 42]
+
+Quantidades de membros, visitantes e pedidos de oração são por igreja;
+notificações, por usuário. Só roda com DEBUG=True (ou `--force`).
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from dataclasses import asdict, dataclass
+from datetime import date, timedelta
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.dev')
+
+BENCH_PREFIX = '[bench]'
+BENCH_EMAIL_DOMAIN = 'bench.obreiro.test'
+BENCH_PASSWORD = 'BenchSenha123!'
+BATCH_SIZE = 1000
+
+FIRST_NAMES = ['Ana', 'João', 'Maria', 'José', 'Francisca', 'Antônio', 'Adriana', 'Paulo', 'Márcia', 'Lucas']
+LAST_NAMES = ['Silva', 'Santos', 'Oliveira', 'Souza', 'Lima', 'Pereira', 'Ferreira', 'Almeida', 'Costa']
+CITIES = [('Fortaleza', 'CE'), ('São Paulo', 'SP'), ('Recife', 'PE'), ('Belo Horizonte', 'MG'), ('Curitiba', 'PR')]
+
+
+@dataclass
+class DatasetConfig:
+    churches: int = 3
+    branches: int = 2  # filiais além da matriz, por igreja
+    users: int = 2  # por igreja: 1 administrador + secretários
+    members: int = 500  # por igreja
+    visitors: int = 100  # por igreja
+    notifications: int = 50  # por usuário
+    prayer_requests: int = 20  # por igreja
+    seed: int = 42
+
+
+def denomination_name(seed):
+    return f'{BENCH_PREFIX} seed={seed}'
+
+
+def _email(local, seed):
+    return f'{local}.s{seed}@{BENCH_EMAIL_DOMAIN}'
+
+
+def _phone(rng):
+    return f'(85) 9{rng.randint(1000, 9999)}-{rng.randint(1000, 9999)}'
+
+
+def _name(rng):
+    return f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {rng.choice(LAST_NAMES)}'
+
+
+# =====================================
+# GERAÇÃO
+# =====================================
+
+def generate(config):
+    """Cria o conjunto de dados e retorna o resumo (ver módulo)."""
+    from django.contrib.auth.hashers import make_password
+    from django.db import transaction
+    from django.test.utils import override_settings
+
+    from apps.accounts.models import ChurchUser, CustomUser
+    from apps.branches.models import Branch
+    from apps.churches.services import ChurchProvisioningService
+    from apps.core.models import RoleChoices
+    from apps.core.services import KPIRecomputeService
+    from apps.denominations.models import Denomination
+
+    rng = random.Random(config.seed)
+    started = time.monotonic()
+    password = make_password(BENCH_PASSWORD)  # um hash para todos os usuários
+
+    # QR Codes não são renderizados: o benchmark só precisa dos UUIDs. O
+    # override cobre o commit, quando o provisionamento despacha a renderização.
+    with override_settings(QR_CODE_RENDERING='none'), transaction.atomic():
+        owner = CustomUser.objects.create(
+            email=_email('denominacao', config.seed), username=f'bench-owner-{config.seed}',
+            full_name='Administrador Benchmark', phone='(85) 99999-0000', password=password,
+        )
+        denomination = Denomination.objects.create(
+            name=denomination_name(config.seed),
+            short_name=f'BENCH{config.seed}',
+            administrator=owner,
+            email=_email('contato', config.seed),
+            phone='(85) 99999-0001',
+            headquarters_address='Rua do Benchmark, 1',
+            headquarters_city='Fortaleza',
+            headquarters_state='CE',
+            headquarters_zipcode='60000-000',
+        )
+
+        rows = []
+        for index in range(config.churches):
+            city, state = CITIES[index % len(CITIES)]
+            rows.append({
+                'name': f'Igreja Benchmark {index + 1:03d}',
+                'short_name': f'Bench {index + 1:03d}',
+                'email': _email(f'igreja{index + 1}', config.seed),
+                'phone': _phone(rng),
+                'address': f'Rua {index + 1}, 100',
+                'city': city,
+                'state': state,
+                'zipcode': '60000-000',
+                'subscription_plan': 'enterprise',
+            })
+        churches = ChurchProvisioningService(enforce_limits=False).provision(rows, denomination)['churches']
+
+        branches = Branch.objects.bulk_create([
+            Branch(
+                church=church, name=f'{church.short_name} - Congregação {number}',
+                short_name=f'Cong. {number}', address=church.address, neighborhood='Centro',
+                city=church.city, state=church.state, zipcode=church.zipcode,
+            )
+            for church in churches for number in range(1, config.branches + 1)
+        ], batch_size=BATCH_SIZE)
+        branches_by_church = {}
+        for branch in Branch._base_manager.filter(church__in=churches).order_by('-is_main', 'pk'):
+            branches_by_church.setdefault(branch.church_id, []).append(branch)
+
+        users_by_church = {}
+        users = []
+        for church_number, church in enumerate(churches, 1):
+            for number in range(config.users):
+                users.append(CustomUser(
+                    email=_email(f'{"admin" if number == 0 else f"secretaria{number}"}{church_number}', config.seed),
+                    username=f'bench-{config.seed}-{church_number}-{number}',
+                    full_name=_name(rng), phone=_phone(rng), password=password,
+                ))
+                users_by_church.setdefault(church.pk, []).append(users[-1])
+        CustomUser.objects.bulk_create(users, batch_size=BATCH_SIZE)
+        ChurchUser.objects.bulk_create([
+            ChurchUser(
+                user=user, church_id=church_id, is_user_active_church=True,
+                role=RoleChoices.CHURCH_ADMIN if number == 0 else RoleChoices.SECRETARY,
+                can_access_admin=number == 0, can_manage_members=True, can_manage_visitors=True,
+                can_manage_activities=True, can_view_reports=True, can_manage_branches=number == 0,
+            )
+            for church_id, church_users in users_by_church.items()
+            for number, user in enumerate(church_users)
+        ], batch_size=BATCH_SIZE)
+
+        counts = {
+            'members': _members(rng, config, churches, branches_by_church),
+            'visitors': _visitors(rng, config, churches, branches_by_church),
+            'notifications': _notifications(rng, config, users_by_church),
+            'prayer_requests': _prayer_requests(rng, config, churches, users_by_church),
+        }
+
+    # Filiais, igrejas e a denominação (bulk_create não aplica os contadores)
+    KPIRecomputeService(denomination_ids=[denomination.pk]).run()
+
+    return {
+        'seed': config.seed,
+        'config': asdict(config),
+        'denomination_id': denomination.pk,
+        'password': BENCH_PASSWORD,
+        'churches': [
+            {
+                'id': church.pk,
+                'name': church.name,
+                'branch_ids': [branch.pk for branch in branches_by_church[church.pk]],
+                'qr_code_uuids': [str(branch.qr_code_uuid) for branch in branches_by_church[church.pk]],
+                'logins': [user.email for user in users_by_church[church.pk]],
+            }
+            for church in churches
+        ],
+        'counts': {
+            'churches': len(churches),
+            'branches': len(churches) + len(branches),
+            'users': len(users),
+            **counts,
+        },
+        'duration_seconds': round(time.monotonic() - started, 2),
+    }
+
+
+def _members(rng, config, churches, branches_by_church):
+    from apps.core.models import GenderChoices, MinisterialFunctionChoices
+    from apps.members.demographics import day_of_year
+    from apps.members.models import Member
+
+    marital_statuses = [value for value, _ in Member._meta.get_field('marital_status').choices]
+    functions = [MinisterialFunctionChoices.MEMBER] * 8 + [
+        MinisterialFunctionChoices.DEACON, MinisterialFunctionChoices.ELDER,
+    ]
+    members = []
+    for church in churches:
+        for index in range(config.members):
+            birth = date(1940, 1, 1) + timedelta(days=rng.randint(0, 30000))
+            members.append(Member(
+                church=church,
+                branch=rng.choice(branches_by_church[church.pk]),
+                full_name=_name(rng),
+                email=f'membro{index}.{church.pk}@{BENCH_EMAIL_DOMAIN}',
+                phone=_phone(rng),
+                birth_date=birth,
+                birth_month=birth.month,
+                birth_day_of_year=day_of_year(birth),
+                gender=rng.choice(GenderChoices.values),
+                marital_status=rng.choice(marital_statuses),
+                ministerial_function=rng.choice(functions),
+                membership_date=birth + timedelta(days=rng.randint(5000, 9000)),
+                city=church.city,
+                state=church.state,
+            ))
+    Member.objects.bulk_create(members, batch_size=BATCH_SIZE)
+    return len(members)
+
+
+def _visitors(rng, config, churches, branches_by_church):
+    from apps.visitors.models import Visitor
+
+    visitors = [
+        Visitor(
+            church=church,
+            branch=rng.choice(branches_by_church[church.pk]),
+            full_name=_name(rng),
+            email=f'visitante{index}.{church.pk}@{BENCH_EMAIL_DOMAIN}',
+            phone=_phone(rng),
+            city=church.city,
+            state=church.state,
+            first_visit=rng.random() < 0.7,
+        )
+        for church in churches for index in range(config.visitors)
+    ]
+    Visitor.objects.bulk_create(visitors, batch_size=BATCH_SIZE)
+    return len(visitors)
+
+
+def _notifications(rng, config, users_by_church):
+    from apps.notifications.models import Notification, NotificationTypeChoices
+
+    types = [NotificationTypeChoices.NEW_VISITOR, NotificationTypeChoices.NEW_MEMBER]
+    notifications = [
+        Notification(
+            user=user,
+            church_id=church_id,
+            notification_type=rng.choice(types),
+            title=f'Notificação {index}',
+            message='Mensagem gerada para benchmark',
+            is_read=rng.random() < 0.6,
+        )
+        for church_id, users in users_by_church.items()
+        for user in users
+        for index in range(config.notifications)
+    ]
+    Notification.objects.bulk_create(notifications, batch_size=BATCH_SIZE)
+    return len(notifications)
+
+
+def _prayer_requests(rng, config, churches, users_by_church):
+    from apps.prayers.models import PrayerCategoryChoices, PrayerRequest
+
+    requests = [
+        PrayerRequest(
+            church=church,
+            author=rng.choice(users_by_church[church.pk]),
+            title=f'Pedido de oração {index}',
+            content='Pedido gerado para benchmark',
+            category=rng.choice(PrayerCategoryChoices.values),
+        )
+        for church in churches for index in range(config.prayer_requests)
+    ]
+    PrayerRequest.objects.bulk_create(requests, batch_size=BATCH_SIZE)
+    return len(requests)
+
+
+# =====================================
+# LIMPEZA
+# =====================================
+
+def cleanup(seed=None):
+    """Remove os dados de benchmark (de uma semente ou todos); retorna quantas denominações."""
+    from apps.accounts.models import CustomUser
+    from apps.churches.models import Church
+    from apps.denominations.models import Denomination
+
+    denominations = Denomination.objects.filter(name__startswith=BENCH_PREFIX)
+    users = CustomUser.objects.filter(email__endswith=f'@{BENCH_EMAIL_DOMAIN}')
+    if seed is not None:
+        denominations = denominations.filter(name=denomination_name(seed))
+        users = users.filter(email__endswith=f'.s{seed}@{BENCH_EMAIL_DOMAIN}')
+
+    total = 0
+    for denomination in denominations:
+        Church._base_manager.filter(denomination=denomination).delete()
+        denomination.delete()
+        total += 1
+    users.delete()
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    defaults = DatasetConfig()
+    for field, value in asdict(defaults).items():
+        # Sem --seed, --cleanup remove todos os conjuntos
+        parser.add_argument(f"--{field.replace('_', '-')}", type=int, default=None if field == 'seed' else value)
+    parser.add_argument('--replace', action='store_true', help='Remover antes os dados da mesma semente')
+    parser.add_argument('--cleanup', action='store_true', help='Apenas remover os dados de benchmark (de --seed ou todos)')
+    parser.add_argument('--output', help='Gravar o resumo (JSON) neste arquivo')
+    parser.add_argument('--force', action='store_true', help='Permitir com DEBUG=False')
+    args = parser.parse_args()
+
+    import django
+
+    django.setup()
+
+    from django.conf import settings
+
+    if not settings.DEBUG and not args.force:
+        parser.error('DEBUG=False: use --force para gerar dados de benchmark neste banco')
+
+    if args.cleanup:
+        print(f"🗑️ {cleanup(args.seed)} conjunto(s) de benchmark removido(s)")
+        return
+    if args.seed is None:
+        args.seed = defaults.seed
+
+    from apps.denominations.models import Denomination
+
+    if Denomination.objects.filter(name=denomination_name(args.seed)).exists():
+        if not args.replace:
+            parser.error(f'já existe o conjunto seed={args.seed}; use --replace ou --cleanup')
+        cleanup(args.seed)
+
+    config = DatasetConfig(**{field: getattr(args, field) for field in asdict(defaults)})
+    summary = generate(config)
+    counts = ', '.join(f'{value} {name}' for name, value in summary['counts'].items())
+    print(f"✅ Denominação {summary['denomination_id']} ({denomination_name(config.seed)}): {counts}")
+    print(f"   {summary['duration_seconds']}s | login: {summary['churches'][0]['logins'][0]} / {BENCH_PASSWORD}")
+    if args.output:
+        Path(args.output).write_text(json.dumps(summary, indent=2, ensure_ascii=False) + '\n', encoding='utf-8')
+        print(f"   Resumo gravado em {args.output}")
+
+
+if __name__ == '__main__':
+    main()
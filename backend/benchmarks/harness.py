@@ -0,0 +1,180 @@
+"""
+Utilitários comuns dos benchmarks: medição e registro dos resultados em JSON.
+
+Cada execução grava `benchmarks/results/<nome>-<AAAAMMDD-HHMMSS>.json` (ou o
+caminho de `--json`) com o commit, o ambiente e as métricas por caso. Com
+`--compare base.json` os casos são comparados com uma execução anterior e o
+processo termina com código 1 se algum piorar mais que `--threshold`
+(padrão 20%), para uso em CI.
+
+Formato:
+    {
+      "benchmark": "hot_paths",
+      "created_at": "2026-10-19T12:00:00+00:00",
+      "commit": "75c6d98",
+      "environment": {"python": "3.11.7", "django": "5.2.3", ...},
+      "parameters": {...},
+      "results": {"tenant_middleware": {"median_ms": 1.2, "p95_ms": 1.9, ...}}
+    }
+"""
+
+import json
+import math
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+RESULTS_DIR = Path(__file__).resolve().parent / 'results'
+
+# Métrica comparada por padrão (menor é melhor)
+DEFAULT_METRIC = 'median_ms'
+
+
+# =====================================
+# MEDIÇÃO
+# =====================================
+
+def percentile(values, fraction):
+    """Percentil por interpolação linear (`fraction` entre 0 e 1)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * fraction
+    lower, upper = math.floor(position), math.ceil(position)
+    if lower == upper:
+        return ordered[lower]
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def summarize(timings_ms, operations=1):
+    """Estatísticas de uma lista de tempos (ms); `operations` itens por rodada."""
+    median = statistics.median(timings_ms)
+    return {
+        'rounds': len(timings_ms),
+        'min_ms': round(min(timings_ms), 4),
+        'median_ms': round(median, 4),
+        'mean_ms': round(statistics.fmean(timings_ms), 4),
+        'p95_ms': round(percentile(timings_ms, 0.95), 4),
+        'max_ms': round(max(timings_ms), 4),
+        'stdev_ms': round(statistics.stdev(timings_ms), 4) if len(timings_ms) > 1 else 0.0,
+        'ops_per_second': round(operations * 1000 / median, 2) if median else 0.0,
+    }
+
+
+def measure(func, rounds=30, warmup=3, setup=None, operations=1):
+    """
+    Executa `func` `warmup + rounds` vezes e resume os tempos das rodadas
+    medidas. `setup`, se informado, roda antes de cada chamada fora da
+    medição.
+    """
+    timings = []
+    for index in range(warmup + rounds):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        func()
+        elapsed = (time.perf_counter() - start) * 1000
+        if index >= warmup:
+            timings.append(elapsed)
+    return summarize(timings, operations)
+
+
+# =====================================
+# REGISTRO E COMPARAÇÃO
+# =====================================
+
+def add_result_arguments(parser):
+    parser.add_argument('--json', dest='json_path', help='Arquivo de saída (padrão: benchmarks/results/)')
+    parser.add_argument('--no-json', action='store_true', help='Não gravar o resultado')
+    parser.add_argument('--compare', help='Resultado anterior (JSON) para comparação')
+    parser.add_argument(
+        '--threshold', type=float, default=0.20, help='Piora tolerada na comparação (padrão: 0.20 = 20%%)'
+    )
+
+
+def _commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, timeout=5, cwd=Path(__file__).resolve().parent,
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def _environment():
+    environment = {
+        'python': platform.python_version(),
+        'platform': platform.platform(terse=True),
+        'machine': platform.machine(),
+        'node': platform.node(),
+    }
+    try:
+        import django
+        from django.conf import settings
+
+        environment['django'] = django.get_version()
+        if settings.configured:
+            environment['settings'] = settings.SETTINGS_MODULE
+            environment['database'] = settings.DATABASES['default']['ENGINE'].rsplit('.', 1)[-1]
+    except ImportError:
+        pass
+    return environment
+
+
+def write_results(name, results, parameters=None, path=None):
+    """Grava o JSON da execução e retorna o caminho."""
+    created_at = datetime.now(timezone.utc)
+    document = {
+        'benchmark': name,
+        'created_at': created_at.isoformat(timespec='seconds'),
+        'commit': _commit(),
+        'environment': _environment(),
+        'parameters': parameters or {},
+        'results': results,
+    }
+    path = Path(path) if path else RESULTS_DIR / f"{name}-{created_at.strftime('%Y%m%d-%H%M%S')}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(document, indent=2, ensure_ascii=False, default=str) + '\n', encoding='utf-8')
+    return path
+
+
+def compare_results(results, baseline_path, threshold=0.20, metric=DEFAULT_METRIC):
+    """
+    Imprime a variação de `metric` por caso em relação ao JSON anterior e
+    retorna os casos que pioraram mais que `threshold`.
+    """
+    baseline = json.loads(Path(baseline_path).read_text(encoding='utf-8'))['results']
+    regressions = []
+    print(f"\nComparação com {baseline_path} ({metric}, tolerância {threshold:.0%})")
+    print(f"{'caso':<36}{'antes':>12}{'agora':>12}{'variação':>11}")
+    for case, values in results.items():
+        before = baseline.get(case, {}).get(metric)
+        now = values.get(metric)
+        if before is None or now is None:
+            print(f"{case:<36}{'-':>12}{now if now is not None else '-':>12}{'novo':>11}")
+            continue
+        change = (now - before) / before if before else 0.0
+        flag = ''
+        if change > threshold:
+            regressions.append(case)
+            flag = '  ⚠️'
+        print(f"{case:<36}{before:>12.3f}{now:>12.3f}{change:>+11.1%}{flag}")
+    return regressions
+
+
+def finish(name, args, results, parameters=None, metric=DEFAULT_METRIC):
+    """Grava e compara conforme os argumentos; retorna o código de saída."""
+    if not args.no_json:
+        path = write_results(name, results, parameters, args.json_path)
+        print(f"\nResultados gravados em {path}")
+    if args.compare:
+        regressions = compare_results(results, args.compare, args.threshold, metric)
+        if regressions:
+            print(f"\n❌ {len(regressions)} caso(s) acima da tolerância: {', '.join(regressions)}")
+            return 1
+        print("\n✅ Nenhuma regressão acima da tolerância")
+    return 0
@@ -16,6 +16,7 @@ from apps.members.views import MemberViewSet, MinisterialFunctionHistoryViewSet,
 from apps.visitors.views import VisitorViewSet
 from apps.activities.views import ActivityViewSet, MinistryViewSet
 from apps.notifications.views import NotificationViewSet
+from apps.reports.views import ReportJobViewSet
 
 # Views de usuários removidas - usar sistema de cadastro existente
 
@@ -33,6 +34,7 @@ router.register(r'visitors', VisitorViewSet, basename='visitor')
 router.register(r'activities', ActivityViewSet, basename='activity')
 router.register(r'ministries', MinistryViewSet, basename='ministry')
 router.register(r'notifications', NotificationViewSet, basename='notification')
+router.register(r'reports', ReportJobViewSet, basename='report-job')
 
 # Importar views necessárias
 from apps.accounts.views import me, my_church, upload_avatar, update_personal_data, update_church_data
@@ -3,6 +3,7 @@ Celery Configuration for Obreiro Digital
 """
 import os
 from celery import Celery
+from celery.schedules import crontab
 from django.conf import settings
 
 # Set default Django settings module
@@ -19,6 +20,21 @@ app.autodiscover_tasks(lambda: settings.INSTALLED_APPS)
 
 # Celery beat schedule (if needed)
 app.conf.beat_schedule = {
+    # Retenção das notificações: expiradas viram resumos diários, excedente por usuário é removido
+    'prune-notifications': {
+        'task': 'notifications.prune_notifications',
+        'schedule': crontab(hour=3, minute=30),
+    },
+    # Arquivos de relatório vencidos (REPORTS_RESULT_TTL_HOURS)
+    'purge-expired-reports': {
+        'task': 'reports.purge_expired_reports',
+        'schedule': crontab(minute=15),
+    },
+    # QR Codes de filiais criadas em lote ainda sem imagem (falha ao publicar a task)
+    'render-pending-qr-codes': {
+        'task': 'branches.render_pending_qr_codes',
+        'schedule': crontab(minute='*/10'),
+    },
     # Example: Clean expired tokens every day at midnight
     # 'clean-expired-tokens': {
     #     'task': 'apps.accounts.tasks.clean_expired_tokens',
@@ -7,6 +7,8 @@ import os
 import environ
 from pathlib import Path
 
+from .database import database_settings
+
 # Build paths
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 
@@ -68,6 +70,7 @@ LOCAL_APPS = [
     "apps.activities",
     "apps.prayers",
     "apps.notifications",
+    "apps.reports",
 ]
 
 INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
@@ -78,12 +81,18 @@ INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    # Compressão gzip/brotli: antes de tudo que lê ou altera o corpo da resposta
+    "apps.core.middleware.CompressionMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
+    # Cabeçalhos X-RateLimit-* preenchidos pelos throttles
+    "apps.core.middleware.RateLimitHeadersMiddleware",
+    # Leituras de dashboards/relatórios/exportações na réplica (se configurada)
+    "apps.core.middleware.ReplicaRoutingMiddleware",
     # Nosso middleware multi-tenant.
     # Deve vir após a autenticação para que `request.user` exista.
     "apps.core.middleware.TenantMiddleware",
@@ -118,9 +127,22 @@ WSGI_APPLICATION = "config.wsgi.application"
 # DATABASE
 # =================================
 
-DATABASES = {
-    "default": env.db("DATABASE_URL")
-}
+# Conexões persistentes com health check (ou pool do psycopg 3 com DB_POOL)
+# e réplica de leitura opcional; ver config/settings/database.py
+DATABASES = database_settings(env)
+
+# Endpoints pesados somente leitura (dashboards, relatórios, exportações) leem
+# da réplica quando DATABASE_REPLICA_URL está configurada. Os jobs de
+# relatório (/reports/) ficam no primário: acompanhamento e download logo após
+# o POST não podem sofrer com o atraso da réplica.
+DATABASE_ROUTERS = ["apps.core.db.ReadReplicaRouter"]
+DATABASE_REPLICA_PATHS = [
+    r"dashboard",
+    r"/financial_reports/",
+    r"export",
+    r"/stats/",
+    r"/hierarchy/",
+]
 
 # =================================
 # INTERNATIONALIZATION
@@ -149,11 +171,23 @@ MEDIA_ROOT = BASE_DIR / "media"
 AUTH_USER_MODEL = "accounts.CustomUser"
 
 # Backend de autenticação personalizado
+# (o EmailBackend estende o ModelBackend: um segundo backend repetiria a busca
+# e o hash da senha em todo login inválido)
 AUTHENTICATION_BACKENDS = [
     'apps.accounts.backends.EmailBackend',
-    'django.contrib.auth.backends.ModelBackend',
 ]
 
+# PBKDF2 com custo configurável (apps.accounts.hashers); hashes com outro
+# número de iterações são refeitos no próximo login
+PASSWORD_HASHERS = [
+    "apps.accounts.hashers.ConfigurablePBKDF2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    "django.contrib.auth.hashers.Argon2PasswordHasher",
+    "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+    "django.contrib.auth.hashers.ScryptPasswordHasher",
+]
+PASSWORD_HASH_ITERATIONS = env.int("PASSWORD_HASH_ITERATIONS", default=0)  # 0 = padrão do Django
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
@@ -176,7 +210,8 @@ AUTH_PASSWORD_VALIDATORS = [
 REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework.authentication.TokenAuthentication",
+        # Token -> snapshot do usuário em cache (apps.accounts.authentication)
+        "apps.accounts.authentication.CachedTokenAuthentication",
         "rest_framework.authentication.SessionAuthentication",
     ],
     "DEFAULT_PERMISSION_CLASSES": [
@@ -190,7 +225,8 @@ REST_FRAMEWORK = {
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 20,
     "DEFAULT_RENDERER_CLASSES": [
-        "rest_framework.renderers.JSONRenderer",
+        # orjson com fallback para o encoder do DRF (apps.core.renderers)
+        "apps.core.renderers.FastJSONRenderer",
     ],
     "DEFAULT_THROTTLE_CLASSES": [
         "rest_framework.throttling.AnonRateThrottle",
@@ -203,11 +239,23 @@ REST_FRAMEWORK = {
         # Escopos específicos (QR público e autenticação)
         "qr_anon": "30/minute",
         "qr_user": "120/minute",
+        "qr_church": "300/minute",
         "auth_anon": "10/minute",
         "auth_user": "30/minute",
     },
 }
 
+# Snapshot do usuário por token em cache, invalidado por signals (o timeout é
+# uma rede de segurança). TTL/rotação dos tokens: 0 desativa
+AUTH_SNAPSHOT_TIMEOUT = env.int("AUTH_SNAPSHOT_TIMEOUT", default=300)  # segundos
+AUTH_TOKEN_TTL = env.int("AUTH_TOKEN_TTL", default=0)  # segundos
+AUTH_TOKEN_ROTATE_AFTER = env.int("AUTH_TOKEN_ROTATE_AFTER", default=0)  # segundos
+
+# Compressão das respostas (apps.core.middleware.CompressionMiddleware):
+# brotli quando o pacote `brotli` estiver instalado, senão gzip
+RESPONSE_COMPRESSION_MIN_SIZE = env.int("RESPONSE_COMPRESSION_MIN_SIZE", default=1024)  # bytes
+RESPONSE_COMPRESSION_BROTLI_QUALITY = env.int("RESPONSE_COMPRESSION_BROTLI_QUALITY", default=5)
+
 # =================================
 # DRF SPECTACULAR (Swagger/OpenAPI)
 # =================================
@@ -253,6 +301,9 @@ CELERY_ACCEPT_CONTENT = ["json"]
 CELERY_TASK_SERIALIZER = "json"
 CELERY_RESULT_SERIALIZER = "json"
 CELERY_TIMEZONE = TIME_ZONE
+# Relatórios usam pool de processos próprio: fila dedicada, atendida por um
+# worker `--pool=solo` (celery -A config worker -Q reports --pool=solo)
+CELERY_TASK_ROUTES = {"reports.*": {"queue": "reports"}}
 
 # =================================
 # NOTIFICATIONS CONFIGURATION
@@ -270,6 +321,40 @@ SSE_MAX_CONNECTIONS_PER_USER = env.int("SSE_MAX_CONNECTIONS_PER_USER", default=1
 # Polling como estratégia principal/fallback
 NOTIFICATION_POLLING_INTERVAL = env.int("NOTIFICATION_POLLING_INTERVAL", default=60000)  # ms
 
+# Retenção (apps.notifications.retention, task diária prune_notifications)
+NOTIFICATION_RETENTION_READ_DAYS = env.int("NOTIFICATION_RETENTION_READ_DAYS", default=30)
+NOTIFICATION_RETENTION_UNREAD_DAYS = env.int("NOTIFICATION_RETENTION_UNREAD_DAYS", default=90)
+NOTIFICATION_MAX_PER_USER = env.int("NOTIFICATION_MAX_PER_USER", default=500)  # por usuário/igreja; 0 desativa
+NOTIFICATION_RETENTION_CHUNK_SIZE = env.int("NOTIFICATION_RETENTION_CHUNK_SIZE", default=5000)  # linhas por faixa
+NOTIFICATION_RETENTION_DIGESTS = env.bool("NOTIFICATION_RETENTION_DIGESTS", default=True)  # resumos diários
+
+# Agrupamento de eventos por (usuário, igreja, tipo): {"new_visitor": 3600, ...}
+# em segundos, sobrescrevendo NotificationService.COALESCE_WINDOWS (0 desativa o tipo)
+NOTIFICATION_COALESCE_WINDOWS = {}
+
+# =================================
+# REPORTS CONFIGURATION
+# =================================
+
+# Jobs de relatório (apps.reports): despacho após o pedido (celery | inline | none,
+# este último atendido por `manage.py run_report_jobs`), executor das partes por
+# igreja (process | thread | inline) e validade dos arquivos gerados
+REPORTS_DISPATCH = env("REPORTS_DISPATCH", default="celery")
+REPORTS_EXECUTOR = env("REPORTS_EXECUTOR", default="process")
+REPORTS_MAX_WORKERS = env.int("REPORTS_MAX_WORKERS", default=4)  # processos por job
+REPORTS_RESULT_TTL_HOURS = env.int("REPORTS_RESULT_TTL_HOURS", default=72)
+
+# =================================
+# PROVISIONING CONFIGURATION
+# =================================
+
+# Provisionamento de igrejas em lote (apps.churches.services): tamanho dos lotes
+# de INSERT e renderização dos QR Codes das filiais matriz após o commit
+# (celery | inline | none; pendências também são varridas pelo beat e por
+# `manage.py render_qr_codes`)
+CHURCH_PROVISIONING_BATCH_SIZE = env.int("CHURCH_PROVISIONING_BATCH_SIZE", default=500)
+QR_CODE_RENDERING = env("QR_CODE_RENDERING", default="celery")
+
 # =================================
 # CACHE CONFIGURATION
 # =================================
@@ -281,6 +366,52 @@ CACHES = {
     }
 }
 
+# =================================
+# RATE LIMITING
+# =================================
+
+# "redis": janela deslizante atômica no Redis (apps.core.throttling)
+# "cache": algoritmo padrão do DRF sobre o cache do Django
+THROTTLE_BACKEND = env("THROTTLE_BACKEND", default="redis")
+THROTTLE_REDIS_URL = env("THROTTLE_REDIS_URL", default=env("REDIS_URL", default="redis://localhost:6379/0"))
+
+# Multiplicador das cotas por plano de assinatura da igreja
+THROTTLE_PLAN_MULTIPLIERS = {
+    "basic": 1,
+    "professional": 2,
+    "enterprise": 4,
+    "denomination": 8,
+}
+
+# =================================
+# DASHBOARDS
+# =================================
+
+# Seções independentes dos dashboards executam em paralelo, cada uma com sua
+# própria conexão de banco: mantenha o limite <= tamanho do pool de conexões
+DASHBOARD_PARALLEL_QUERIES = env.bool("DASHBOARD_PARALLEL_QUERIES", default=True)
+DASHBOARD_MAX_CONCURRENCY = env.int("DASHBOARD_MAX_CONCURRENCY", default=4)
+DASHBOARD_SECTION_TIMEOUT = env.float("DASHBOARD_SECTION_TIMEOUT", default=10.0)  # segundos
+DASHBOARD_CACHE_TIMEOUT = env.int("DASHBOARD_CACHE_TIMEOUT", default=60)  # segundos
+
+# Cache de respostas completas dos dashboards (apps.core.response_cache),
+# invalidado por signals; 0 desativa. A trava evita recálculos simultâneos
+RESPONSE_CACHE_TIMEOUT = env.int("RESPONSE_CACHE_TIMEOUT", default=300)  # segundos
+RESPONSE_CACHE_LOCK_TIMEOUT = env.int("RESPONSE_CACHE_LOCK_TIMEOUT", default=30)  # segundos
+RESPONSE_CACHE_LOCK_WAIT = env.float("RESPONSE_CACHE_LOCK_WAIT", default=5.0)  # segundos
+
+# Resultado de querysets de referência marcados com `.cached()` (filiais,
+# ministérios, líderes), por igreja (apps.core.query_cache)
+QUERY_CACHE_TIMEOUT = env.int("QUERY_CACHE_TIMEOUT", default=300)  # segundos
+
+# Índice familiar por igreja (apps.members.family_graph), invalidado a cada
+# mudança de vínculo; o timeout é apenas uma rede de segurança
+FAMILY_GRAPH_CACHE_TIMEOUT = env.int("FAMILY_GRAPH_CACHE_TIMEOUT", default=3600)  # segundos
+
+# Retenção do log unificado de eventos de membros (maintain_member_events);
+# 0 mantém todo o histórico
+MEMBER_EVENT_RETENTION_MONTHS = env.int("MEMBER_EVENT_RETENTION_MONTHS", default=0)
+
 # =================================
 # LOGGING
 # =================================
@@ -0,0 +1,72 @@
+"""
+Configuração das conexões com o PostgreSQL.
+
+Por padrão o Django abre uma conexão nova a cada requisição (CONN_MAX_AGE=0);
+com o banco gerenciado isso inclui o handshake TLS em toda requisição curta.
+Aqui as conexões são persistentes por worker (com health check antes do
+reuso) ou, opcionalmente, servidas por um pool do psycopg 3.
+
+Variáveis de ambiente:
+    DATABASE_URL            banco principal
+    DATABASE_REPLICA_URL    réplica de leitura (opcional, alias "replica")
+    DB_CONN_MAX_AGE         segundos de vida da conexão persistente (padrão 60)
+    DB_CONN_HEALTH_CHECKS   valida a conexão antes de reutilizá-la (padrão True)
+    DB_POOL                 usa o pool do psycopg 3 (requer psycopg[pool])
+    DB_POOL_MIN_SIZE / DB_POOL_MAX_SIZE / DB_POOL_TIMEOUT
+    DB_SSLMODE              sslmode do libpq (ex.: require), se não vier na URL
+"""
+
+from django.core.exceptions import ImproperlyConfigured
+
+REPLICA_ALIAS = 'replica'
+
+
+def _pool_available():
+    try:
+        import psycopg  # noqa: F401
+        import psycopg_pool  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def database_config(env, url):
+    """Monta o dicionário de um alias a partir da URL e das variáveis DB_*."""
+    config = env.db_url_config(url)
+    options = config.setdefault('OPTIONS', {})
+
+    sslmode = env('DB_SSLMODE', default='')
+    if sslmode:
+        options.setdefault('sslmode', sslmode)
+
+    if env.bool('DB_POOL', default=False):
+        if not _pool_available():
+            raise ImproperlyConfigured(
+                'DB_POOL=True requer o psycopg 3 com pool: pip install "psycopg[binary,pool]"'
+            )
+        options['pool'] = {
+            'min_size': env.int('DB_POOL_MIN_SIZE', default=2),
+            'max_size': env.int('DB_POOL_MAX_SIZE', default=10),
+            'timeout': env.float('DB_POOL_TIMEOUT', default=10.0),
+        }
+        # O pool gerencia o ciclo de vida; o Django exige CONN_MAX_AGE=0
+        config['CONN_MAX_AGE'] = 0
+    else:
+        config['CONN_MAX_AGE'] = env.int('DB_CONN_MAX_AGE', default=60)
+        config['CONN_HEALTH_CHECKS'] = env.bool('DB_CONN_HEALTH_CHECKS', default=True)
+
+    return config
+
+
+def database_settings(env):
+    """`DATABASES` com o banco principal e, se configurada, a réplica."""
+    databases = {'default': database_config(env, env('DATABASE_URL'))}
+
+    replica_url = env('DATABASE_REPLICA_URL', default='')
+    if replica_url:
+        replica = database_config(env, replica_url)
+        # Nos testes a réplica aponta para o banco de teste principal
+        replica['TEST'] = {'MIRROR': 'default'}
+        databases[REPLICA_ALIAS] = replica
+
+    return databases
@@ -24,14 +24,6 @@ ALLOWED_HOSTS = [
 
 ENABLE_SSE = True  # SSE funciona em dev com runserver
 
-# =================================
-# DATABASE - PostgreSQL para consistência
-# =================================
-
-DATABASES = {
-    'default': env.db('DATABASE_URL')
-}
-
 # =================================
 # CORS - Liberado para desenvolvimento
 # =================================
@@ -97,7 +89,7 @@ LOGGING['loggers']['apps'] = {
 # =================================
 
 REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'] = [
-    'rest_framework.renderers.JSONRenderer',
+    'apps.core.renderers.FastJSONRenderer',
     'rest_framework.renderers.BrowsableAPIRenderer',  # UI navegável
 ]
 
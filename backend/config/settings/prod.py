@@ -31,14 +31,6 @@ ALLOWED_HOSTS = env.list('DJANGO_ALLOWED_HOSTS', default=['obreirovirtual.com',
 # Enquanto isso, polling é estável e confiável (latência 60s é aceitável)
 ENABLE_SSE = False  # Polling ativo como estratégia principal
 
-# =================================
-# DATABASE - PostgreSQL
-# =================================
-
-DATABASES = {
-    'default': env.db('DATABASE_URL')
-}
-
 # =================================
 # SECURITY SETTINGS
 # =================================